@@ -32,6 +32,9 @@ from rich.tree import Tree
 from cli.models import AnalystType
 from cli.utils import *
 from tradingagents.default_config import DEFAULT_CONFIG
+from tradingagents.graph.analyst_cache import ANALYST_REPORT_KEYS, AnalystReportCache
+from tradingagents.graph.checkpointing import CheckpointManager
+from tradingagents.graph.result_store import create_result_store
 from tradingagents.graph.trading_graph import TradingAgentsGraph
 from tradingagents.utils.logging_manager import get_logger
 
@@ -140,6 +143,8 @@ class MessageBuffer:
         self.tool_calls = deque(maxlen=max_length)
         self.current_report = None
         self.final_report = None  # Store the complete final report
+        self.streaming_node = None  # Node whose LLM output is currently streaming
+        self.streaming_text = ""
         self.agent_status = {
             # Analyst Team
             "Market Analyst": "pending",
@@ -178,6 +183,16 @@ class MessageBuffer:
         timestamp = datetime.datetime.now().strftime("%H:%M:%S")
         self.tool_calls.append((timestamp, tool_name, args))
 
+    def add_stream_tokens(self, node, text):
+        if node != self.streaming_node:
+            self.streaming_node = node
+            self.streaming_text = ""
+        self.streaming_text += text
+
+    def clear_stream(self):
+        self.streaming_node = None
+        self.streaming_text = ""
+
     def update_agent_status(self, agent, status):
         if agent in self.agent_status:
             self.agent_status[agent] = status
@@ -452,8 +467,17 @@ def update_display(layout, spinner_text=None):
         )
     )
 
-    # Analysis panel showing current report
-    if message_buffer.current_report:
+    # Analysis panel showing streaming output, or the current report
+    if message_buffer.streaming_text:
+        layout["analysis"].update(
+            Panel(
+                Text(message_buffer.streaming_text[-1500:], overflow="fold"),
+                title=f"Live Output: {message_buffer.streaming_node}",
+                border_style="yellow",
+                padding=(1, 2),
+            )
+        )
+    elif message_buffer.current_report:
         layout["analysis"].update(
             Panel(
                 Markdown(message_buffer.current_report),
@@ -973,7 +997,18 @@ def check_api_keys(llm_provider: str) -> bool:
 
     return True
 
-def run_analysis():
+def save_to_result_store(results):
+    """将完成的分析写入结果库，供 history 命令和Web历史页查询"""
+    if not DEFAULT_CONFIG.get("result_store_enabled", True):
+        return
+    try:
+        analysis_id = create_result_store(DEFAULT_CONFIG).save(results, analysis_id=results.get("run_id"))
+        ui.show_user_message(f"💾 已保存到历史记录 | Saved to history: {analysis_id}", "dim")
+    except Exception as e:
+        logger.warning(f"⚠️ [结果存储] 保存分析结果失败: {e}")
+
+
+def run_analysis(force_refresh: bool = False):
     # First get all user selections
     selections = get_user_selections()
 
@@ -1168,11 +1203,19 @@ def run_analysis():
         ui.show_step_header(3, "数据获取阶段 | Data Collection Phase")
         ui.show_progress("正在获取股票基本信息...")
 
-        # Initialize state and get graph args
-        init_agent_state = graph.propagator.create_initial_state(
-            selections["ticker"], selections["analysis_date"]
+        # Initialize state (restores cached analyst reports) and register the checkpointed run
+        init_agent_state = graph.create_initial_state(
+            selections["ticker"], selections["analysis_date"], force_refresh=force_refresh
         )
-        args = graph.propagator.get_graph_args()
+        cached_reports = [
+            analyst.value for analyst in selections["analysts"]
+            if init_agent_state.get(ANALYST_REPORT_KEYS[analyst.value])
+        ]
+        if cached_reports:
+            ui.show_user_message(f"♻️ 复用缓存的分析师报告: {', '.join(cached_reports)} (使用 --force-refresh 强制重新分析)", "dim")
+        run_id = graph.start_run(selections["ticker"], selections["analysis_date"])
+        if run_id:
+            ui.show_user_message(f"💾 运行ID | Run ID: {run_id} (失败后可用 tradingagents resume {run_id} 继续)", "dim")
 
         ui.show_success("数据获取准备完成")
 
@@ -1195,7 +1238,12 @@ def run_analysis():
         # 跟踪已完成的分析师，避免重复提示
         completed_analysts = set()
 
-        for chunk in graph.graph.stream(init_agent_state, **args):
+        def on_tokens(node, text):
+            message_buffer.add_stream_tokens(node, text)
+            update_display(layout)
+
+        for chunk in graph.stream_run(init_agent_state, run_id, on_tokens=on_tokens):
+            message_buffer.clear_stream()
             if len(chunk["messages"]) > 0:
                 # Get the last message from the chunk
                 last_message = chunk["messages"][-1]
@@ -1489,6 +1537,11 @@ def run_analysis():
         decision = graph.process_signal(final_state["final_trade_decision"], selections['ticker'])
 
         ui.show_success("🤖 投资信号处理完成")
+        if graph.ttft_metrics:
+            ttft_summary = ", ".join(
+                f"{node} {stats['avg_s']:.1f}s" for node, stats in graph.ttft_metrics.items()
+            )
+            ui.show_user_message(f"⏱️ 首token延迟 | TTFT: {ttft_summary}", "dim")
 
         # Update all agent statuses to completed
         for agent in message_buffer.agent_status:
@@ -1509,6 +1562,17 @@ def run_analysis():
 
         # Display the complete final report
         display_complete_report(final_state)
+        save_to_result_store({
+            "stock_symbol": selections["ticker"],
+            "analysis_date": selections["analysis_date"],
+            "analysts": [analyst.value for analyst in selections["analysts"]],
+            "research_depth": selections["research_depth"],
+            "llm_provider": config["llm_provider"],
+            "llm_model": config["deep_think_llm"],
+            "state": final_state,
+            "decision": decision,
+            "run_id": graph.run_id,
+        })
 
         ui.show_success("📋 分析报告生成完成")
         ui.show_success(f"🎉 {selections['ticker']} 股票分析全部完成！")
@@ -1520,12 +1584,225 @@ def run_analysis():
     name="analyze",
     help="开始股票分析 | Start stock analysis"
 )
-def analyze():
+def analyze(
+    force_refresh: bool = typer.Option(False, "--force-refresh", "-f", help="忽略分析师缓存，重新运行所有分析师 | Ignore the analyst cache and re-run all analysts")
+):
     """
     启动交互式股票分析工具
     Launch interactive stock analysis tool
     """
-    run_analysis()
+    run_analysis(force_refresh=force_refresh)
+
+
+@app.command(
+    name="analyst-cache",
+    help="分析师报告缓存管理 | Analyst report cache management"
+)
+def analyst_cache(
+    clear: bool = typer.Option(False, "--clear", "-c", help="使缓存条目失效 | Invalidate cache entries"),
+    ticker: Optional[str] = typer.Option(None, "--ticker", "-t", help="只处理该股票 | Only this ticker"),
+    date: Optional[str] = typer.Option(None, "--date", "-d", help="只处理该交易日期 YYYY-MM-DD | Only this trade date"),
+    analyst: Optional[str] = typer.Option(None, "--analyst", "-a", help="只处理该分析师 (market/social/news/fundamentals) | Only this analyst"),
+):
+    """
+    查看或清除分析师阶段缓存
+    Show or invalidate the analyst stage cache
+    """
+    cache = AnalystReportCache(
+        os.path.join(DEFAULT_CONFIG["data_cache_dir"], "analyst_reports")
+    )
+
+    if clear:
+        removed = cache.invalidate(ticker=ticker, trade_date=date, analyst=analyst)
+        console.print(f"[green]✅ 已清除 {removed} 个分析师缓存条目 | Invalidated {removed} entries[/green]")
+        return
+
+    stats = cache.get_stats()
+    stats_table = Table(show_header=True, header_style="bold magenta")
+    stats_table.add_column("项目 | Item", style="cyan")
+    stats_table.add_column("值 | Value", style="green")
+    stats_table.add_row("缓存目录 | Cache Directory", stats["cache_dir"])
+    stats_table.add_row("条目数 | Entries", str(stats["entries"]))
+    stats_table.add_row("大小 | Size (MB)", str(stats["total_size_mb"]))
+    console.print(stats_table)
+    console.print("[yellow]💡 清除缓存: tradingagents analyst-cache --clear [--ticker AAPL] [--date 2025-01-02][/yellow]")
+
+
+@app.command(
+    name="resume",
+    help="从断点恢复失败的分析 | Resume a failed analysis from its last checkpoint"
+)
+def resume(
+    run_id: Optional[str] = typer.Argument(None, help="要恢复的运行ID | Run ID to resume"),
+    list_runs: bool = typer.Option(False, "--list", "-l", help="列出可恢复的失败运行 | List failed runs that can be resumed"),
+):
+    """
+    从最后完成的节点继续失败的分析
+    Continue a failed analysis from its last completed node
+    """
+    manager = CheckpointManager(DEFAULT_CONFIG)
+
+    if list_runs or not run_id:
+        runs = manager.registry.list_runs(status="failed")
+        if not runs:
+            console.print("[green]✅ 没有可恢复的失败运行 | No failed runs to resume[/green]")
+            return
+        runs_table = Table(show_header=True, header_style="bold magenta")
+        runs_table.add_column("运行ID | Run ID", style="cyan")
+        runs_table.add_column("股票 | Ticker", style="green")
+        runs_table.add_column("日期 | Date")
+        runs_table.add_column("失败时间 | Failed At")
+        runs_table.add_column("错误 | Error", style="red")
+        for run in runs:
+            runs_table.add_row(
+                run["run_id"], run["ticker"], run["trade_date"],
+                run["updated_at"][:19], (run["error"] or "")[:60]
+            )
+        console.print(runs_table)
+        console.print("[yellow]💡 恢复运行: tradingagents resume <run_id>[/yellow]")
+        return
+
+    record = manager.registry.get(run_id)
+    if record is None:
+        ui.show_error(f"未找到运行 | Run not found: {run_id}")
+        return
+
+    ui.show_progress(f"正在恢复 {record['ticker']} {record['trade_date']} 的分析 | Resuming {run_id}")
+    try:
+        graph = TradingAgentsGraph(record["analysts"], config=record["config"], debug=False)
+        final_state, decision = graph.resume(run_id)
+    except Exception as e:
+        ui.show_error(f"恢复失败 | Resume failed: {str(e)}")
+        return
+
+    ui.show_success(f"🎉 {record['ticker']} 分析已恢复并完成 | Resumed run completed: {decision}")
+    display_complete_report(final_state)
+    save_to_result_store({
+        "stock_symbol": record["ticker"],
+        "analysis_date": record["trade_date"],
+        "analysts": record["analysts"],
+        "research_depth": record["config"].get("max_debate_rounds"),
+        "llm_provider": record["config"].get("llm_provider"),
+        "llm_model": record["config"].get("deep_think_llm"),
+        "state": final_state,
+        "decision": decision,
+        "run_id": run_id,
+    })
+
+
+@app.command(
+    name="history",
+    help="查询历史分析记录 | Query stored analysis history"
+)
+def history(
+    analysis_id: Optional[str] = typer.Argument(None, help="要查看完整报告的分析ID | Analysis ID to show in full"),
+    ticker: Optional[str] = typer.Option(None, "--ticker", "-t", help="股票代码 | Ticker"),
+    date_from: Optional[str] = typer.Option(None, "--from", help="起始分析日期 YYYY-MM-DD | Earliest analysis date"),
+    date_to: Optional[str] = typer.Option(None, "--to", help="截止分析日期 YYYY-MM-DD | Latest analysis date"),
+    model: Optional[str] = typer.Option(None, "--model", "-m", help="模型名称 | LLM model"),
+    action: Optional[str] = typer.Option(None, "--action", "-a", help="投资决策 (buy/hold/sell) | Decision"),
+    limit: int = typer.Option(20, "--limit", "-n", help="每页条数 | Page size"),
+    cursor: Optional[str] = typer.Option(None, "--cursor", "-c", help="上一页输出的翻页游标 | Cursor printed by the previous page"),
+):
+    """
+    按股票、日期、模型和决策查询已保存的分析
+    List stored analyses by ticker, date, model and decision
+    """
+    store = create_result_store(DEFAULT_CONFIG)
+
+    if analysis_id:
+        results = store.load(analysis_id)
+        if results is None:
+            ui.show_error(f"未找到分析 | Analysis not found: {analysis_id}")
+            return
+        ui.show_success(f"{results.get('stock_symbol')} {results.get('analysis_date')} | {results.get('decision')}")
+        display_complete_report(results.get("state") or {})
+        return
+
+    filters = dict(ticker=ticker, date_from=date_from, date_to=date_to, model=model, action=action)
+    page = store.query(limit=limit, cursor=cursor, **filters)
+    if not page.items:
+        console.print("[yellow]没有符合条件的分析记录 | No matching analyses[/yellow]")
+        return
+
+    history_table = Table(show_header=True, header_style="bold magenta")
+    history_table.add_column("分析ID | Analysis ID", style="cyan")
+    history_table.add_column("股票 | Ticker", style="green")
+    history_table.add_column("日期 | Date")
+    history_table.add_column("模型 | Model")
+    history_table.add_column("决策 | Decision", style="bold")
+    history_table.add_column("目标价 | Target", justify="right")
+    history_table.add_column("保存时间 | Saved At")
+    for item in page.items:
+        target = f"{item['target_price']:.2f}" if item["target_price"] is not None else "-"
+        saved_at = datetime.datetime.fromtimestamp(item["created_at"]).strftime("%Y-%m-%d %H:%M")
+        history_table.add_row(
+            item["analysis_id"], item["ticker"], item["analysis_date"], item["llm_model"] or "-",
+            item["action"] or "-", target, saved_at
+        )
+    console.print(history_table)
+    total = store.count(**filters)
+    console.print(f"[dim]共 {total} 条 | {total} matching analyses[/dim]")
+    if page.next_cursor:
+        console.print(f"[yellow]💡 下一页: tradingagents history --cursor {page.next_cursor} (保持相同筛选条件)[/yellow]")
+    console.print("[yellow]💡 查看完整报告: tradingagents history <analysis_id>[/yellow]")
+
+
+@app.command(
+    name="warm-cache",
+    help="开盘前预热自选股数据缓存 | Warm the data cache for a watchlist before the open"
+)
+def warm_cache(
+    tickers: Optional[str] = typer.Option(None, "--tickers", "-t", help="逗号分隔的股票代码 | Comma-separated tickers"),
+    watchlist: Optional[str] = typer.Option(None, "--watchlist", "-w", help="自选列表文件，每行一个代码 | Watchlist file, one ticker per line"),
+    at: Optional[str] = typer.Option(None, "--at", help="常驻运行，每个工作日在该时刻预热 HH:MM | Run as a scheduler at HH:MM on weekdays"),
+    budget_minutes: Optional[float] = typer.Option(None, "--budget-minutes", "-b", help="单次预热的时间上限（分钟） | Time budget per run in minutes"),
+    report: bool = typer.Option(False, "--report", "-r", help="显示今日首次分析的缓存命中率 | Show today's first-analysis cache hit rate"),
+):
+    """
+    为自选列表预热行情、基本面、新闻和名称缓存
+    Warm bars, fundamentals, news and name caches for a watchlist
+    """
+    from tradingagents.dataflows.cache_warmer import get_lookup_tracker, load_watchlist, run_scheduler, warm_once
+
+    if report:
+        day = datetime.datetime.now().strftime("%Y-%m-%d")
+        rate_table = Table(show_header=True, header_style="bold magenta")
+        rate_table.add_column("数据类型 | Kind", style="cyan")
+        rate_table.add_column("命中 | Hits", justify="right")
+        rate_table.add_column("首次查询 | First Lookups", justify="right")
+        rate_table.add_column("命中率 | Hit Rate", justify="right", style="green")
+        for kind, item in get_lookup_tracker().hit_rate(day).items():
+            rate_table.add_row(kind, str(item["hits"]), str(item["lookups"]), f"{item['rate']:.0%}")
+        console.print(rate_table)
+        return
+
+    symbols = tickers.split(",") if tickers else None
+    budget = budget_minutes * 60 if budget_minutes else None
+    if at:
+        ui.show_progress(f"缓存预热调度已启动，每个工作日 {at} 运行 | Cache warmer scheduled at {at} on weekdays")
+        run_scheduler(at, symbols, watchlist, budget)
+        return
+
+    symbols = load_watchlist(symbols, watchlist)
+    if not symbols:
+        ui.show_error("自选列表为空 | Watchlist is empty: use --tickers, --watchlist or WARMUP_WATCHLIST")
+        return
+
+    ui.show_progress(f"正在预热 {len(symbols)} 只股票 | Warming {len(symbols)} tickers")
+    result = warm_once(symbols, budget)
+    coverage_table = Table(show_header=True, header_style="bold magenta")
+    coverage_table.add_column("数据类型 | Kind", style="cyan")
+    coverage_table.add_column("成功 | OK", justify="right", style="green")
+    coverage_table.add_column("失败 | Failed", justify="right", style="red")
+    coverage_table.add_column("跳过 | Skipped", justify="right")
+    coverage_table.add_column("不支持 | Unsupported", justify="right", style="dim")
+    for kind, counts in result.coverage().items():
+        coverage_table.add_row(kind, str(counts["ok"]), str(counts["failed"]),
+                               str(counts["skipped"]), str(counts["unsupported"]))
+    console.print(coverage_table)
+    ui.show_success(f"覆盖率 {result.coverage_rate:.0%}，数据截止 {result.trade_date}，完成于 {result.finished_at[:19]} | "
+                    f"Coverage {result.coverage_rate:.0%}")
 
 
 @app.command(
@@ -1897,6 +2174,16 @@ def help_chinese():
         "配置设置 | Configuration",
         "查看和配置LLM提供商、API密钥等设置"
     )
+    commands_table.add_row(
+        "analyst-cache",
+        "分析师缓存 | Analyst Cache",
+        "查看或清除分析师报告缓存（analyze --force-refresh 可强制重新分析）"
+    )
+    commands_table.add_row(
+        "resume",
+        "断点恢复 | Resume",
+        "从最后完成的节点继续失败的分析（resume --list 查看可恢复运行）"
+    )
     commands_table.add_row(
         "examples",
         "示例程序 | Examples",
@@ -1942,7 +2229,7 @@ def main():
             # 只在退出码为2（typer的未知命令错误）时提供智能建议
             if e.code == 2 and len(sys.argv) > 1:
                 unknown_command = sys.argv[1]
-                available_commands = ['analyze', 'config', 'version', 'data-config', 'examples', 'test', 'help']
+                available_commands = ['analyze', 'analyst-cache', 'resume', 'config', 'version', 'data-config', 'examples', 'test', 'help']
                 
                 # 使用difflib找到最相似的命令
                 suggestions = get_close_matches(unknown_command, available_commands, n=3, cutoff=0.6)
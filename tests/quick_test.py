@@ -4,10 +4,15 @@
 """
 
 import os
+import shutil
 import sys
+import tempfile
 import traceback
 from datetime import datetime
 
+# 缓存功能测试写入临时目录，避免在项目缓存目录中留下测试数据
+test_cache_dir = tempfile.mkdtemp(prefix="quick_test_cache_")
+
 print("🚀 TradingAgents 集成测试")
 print("=" * 40)
 
@@ -92,7 +97,7 @@ except Exception as e:
 # 测试4：基本功能测试
 print("\n💾 测试缓存基本功能...")
 try:
-    cache = get_cache()
+    cache = StockDataCache(test_cache_dir)
     
     # 测试数据保存
     test_data = f"测试数据 - {datetime.now()}"
@@ -136,7 +141,7 @@ print("\n⚡ 简单性能测试...")
 try:
     import time
     
-    cache = get_cache()
+    cache = StockDataCache(test_cache_dir)
     
     # 保存测试
     start_time = time.time()
@@ -168,7 +173,7 @@ except Exception as e:
 # 测试6：缓存统计
 print("\n📊 缓存统计信息...")
 try:
-    cache = get_cache()
+    cache = StockDataCache(test_cache_dir)
     stats = cache.get_cache_stats()
     
     print("缓存统计:")
@@ -178,6 +183,8 @@ try:
 except Exception as e:
     print(f"❌ 缓存统计失败: {e}")
 
+shutil.rmtree(test_cache_dir, ignore_errors=True)
+
 print("\n" + "=" * 40)
 print("🎉 集成测试完成!")
 print(f"测试时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
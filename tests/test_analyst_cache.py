@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+分析师阶段缓存测试
+验证缓存键、过期策略、失效操作，以及命中缓存时图直接进入辩论阶段
+"""
+
+import json
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from tradingagents.graph.analyst_cache import AnalystReportCache, create_analyst_cache_writer
+from tradingagents.graph.conditional_logic import ConditionalLogic
+from tradingagents.graph.propagation import Propagator
+from tradingagents.graph.setup import GraphSetup
+
+MODEL = "dashscope:qwen-plus"
+
+
+def test_put_get_and_key():
+    """测试缓存键包含股票、日期、分析师、模型和提示词版本"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = AnalystReportCache(temp_dir)
+        cache.put("AAPL", "2025-01-02", "market", MODEL, "market report", [{"name": "get_YFin_data", "content": "rows"}])
+
+        entry = cache.get("AAPL", "2025-01-02", "market", MODEL)
+        assert entry["report"] == "market report"
+        assert entry["tool_outputs"][0]["name"] == "get_YFin_data"
+
+        assert cache.get("AAPL", "2025-01-03", "market", MODEL) is None
+        assert cache.get("AAPL", "2025-01-02", "news", MODEL) is None
+        assert cache.get("AAPL", "2025-01-02", "market", "openai:gpt-4o-mini") is None
+        assert AnalystReportCache(temp_dir, prompt_version="2").get("AAPL", "2025-01-02", "market", MODEL) is None
+
+
+def test_freshness_policy():
+    """测试历史交易日收盘后生成的报告长期有效，未收盘交易日的报告按TTL过期"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = AnalystReportCache(temp_dir, ttl_hours=1)
+        future = (datetime.now() + timedelta(days=2)).strftime("%Y-%m-%d")
+        past = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+
+        for trade_date in (future, past):
+            path = cache.put("600036", trade_date, "news", MODEL, "news report")
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            entry["created_at"] = (datetime.now() - timedelta(hours=2)).isoformat()
+            path.write_text(json.dumps(entry), encoding="utf-8")
+
+        assert cache.get("600036", future, "news", MODEL) is None
+        assert cache.get("600036", past, "news", MODEL)["report"] == "news report"
+
+
+def test_intraday_report_not_permanent():
+    """测试交易日收盘前生成的报告即使交易日已过去也按TTL过期，收盘后生成的长期有效"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = AnalystReportCache(temp_dir, ttl_hours=1)
+        # 600036 收盘时间为北京时间15:00（UTC 07:00）；AAPL 为纽约时间16:00（冬令时UTC 21:00）
+        cases = [
+            ("600036", "2025-01-02", "2025-01-02T06:00:00+00:00", False),
+            ("600036", "2025-01-02", "2025-01-02T07:30:00+00:00", True),
+            ("AAPL", "2025-01-02", "2025-01-02T20:00:00+00:00", False),
+            ("AAPL", "2025-01-02", "2025-01-02T21:30:00+00:00", True),
+        ]
+        for ticker, trade_date, created_at, permanent in cases:
+            path = cache.put(ticker, trade_date, "market", MODEL, "market report")
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            entry["created_at"] = created_at
+            path.write_text(json.dumps(entry), encoding="utf-8")
+            assert (cache.get(ticker, trade_date, "market", MODEL) is not None) == permanent, (ticker, created_at)
+
+
+def test_invalidate():
+    """测试按股票、日期、分析师失效"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = AnalystReportCache(temp_dir)
+        cache.put("AAPL", "2025-01-02", "market", MODEL, "a")
+        cache.put("AAPL", "2025-01-02", "news", MODEL, "b")
+        cache.put("AAPL", "2025-01-03", "market", MODEL, "c")
+        cache.put("0700.HK", "2025-01-02", "market", MODEL, "d")
+
+        assert cache.invalidate(ticker="AAPL", trade_date="2025-01-02", analyst="news") == 1
+        assert cache.invalidate(ticker="AAPL") == 2
+        assert cache.get("0700.HK", "2025-01-02", "market", MODEL)["report"] == "d"
+        assert cache.invalidate() == 1
+        assert cache.get_stats()["entries"] == 0
+
+
+def test_cache_writer():
+    """测试消息清理节点写入报告和工具输出"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = AnalystReportCache(temp_dir)
+        writer = create_analyst_cache_writer(lambda state: {"messages": []}, cache, "fundamentals", MODEL)
+        state = {
+            "company_of_interest": "AAPL",
+            "trade_date": "2025-01-02",
+            "fundamentals_report": "fundamentals report",
+            "messages": [
+                AIMessage(content="", tool_calls=[{"name": "get_stock_fundamentals_unified", "args": {}, "id": "1"}]),
+                ToolMessage(content="PE 30", tool_call_id="1", name="get_stock_fundamentals_unified"),
+            ],
+        }
+        assert writer(state) == {"messages": []}
+        entry = cache.get("AAPL", "2025-01-02", "fundamentals", MODEL)
+        assert entry["report"] == "fundamentals report"
+        assert entry["tool_outputs"] == [{"name": "get_stock_fundamentals_unified", "content": "PE 30"}]
+
+
+class DebateOnlyLLM:
+    """只允许辩论/决策阶段调用的桩LLM，分析师调用会直接报错"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return AIMessage(content="stub decision")
+
+
+def test_cached_reports_skip_analysts():
+    """测试所有报告已缓存时图直接进入辩论阶段"""
+    llm = DebateOnlyLLM()
+    analysts = ["market", "news"]
+    setup = GraphSetup(
+        llm, llm, None,
+        {analyst: (lambda state: {}) for analyst in analysts},
+        None, None, None, None, None,
+        ConditionalLogic(), {},
+    )
+    graph = setup.setup_graph(analysts)
+
+    state = Propagator().create_initial_state("AAPL", "2025-01-02")
+    state["market_report"] = "cached market report"
+    state["news_report"] = "cached news report"
+    final_state = graph.invoke(state, config={"recursion_limit": 100})
+
+    assert final_state["market_report"] == "cached market report"
+    assert final_state["final_trade_decision"] == "stub decision"
+    # Bull + Bear + 研究经理 + 交易员 + 3个风险辩手 + 风险经理
+    assert llm.calls == 8
+
+    router = setup._create_analyst_router(analysts, ["Bull Researcher"])
+    assert router({"market_report": "x", "news_report": ""}) == "News Analyst"
+    assert router({"market_report": "", "news_report": "y"}) == "Market Analyst"
+    assert router({"market_report": "x", "news_report": "y"}) == "Bull Researcher"
+
+
+if __name__ == "__main__":
+    test_put_get_and_key()
+    test_freshness_policy()
+    test_intraday_report_not_permanent()
+    test_invalidate()
+    test_cache_writer()
+    test_cached_reports_skip_analysts()
+    print("✅ 分析师缓存测试通过")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+多股票批量下载测试
+用返回多级列索引DataFrame的假下载函数代替yf.download，验证按分块一次请求、结果按股票拆分、
+失败分块单独记录和重试，以及港股批量获取和美股批量预取写入缓存
+"""
+
+import sys
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tradingagents.dataflows import bulk_download
+from tradingagents.dataflows.bulk_download import BulkDownloader, chunked, split_by_symbol
+
+
+def _frame(symbols, start_date="2024-03-01", end_date="2024-03-08", missing=()):
+    """模拟 yf.download(group_by='ticker') 的结果；missing 中的股票整列为空"""
+    index = pd.bdate_range(start_date, end_date, inclusive="left", name="Date")
+    columns = pd.MultiIndex.from_product([symbols, ["Open", "High", "Low", "Close", "Volume"]])
+    frame = pd.DataFrame(np.random.default_rng(0).uniform(10, 20, (len(index), len(columns))),
+                         index=index, columns=columns)
+    for symbol in missing:
+        frame[symbol] = np.nan
+    return frame
+
+
+class _FakeDownloader:
+    def __init__(self, fail_chunks=1, empty_symbols=()):
+        self.calls = []
+        self.fail_chunks = fail_chunks
+        self.empty_symbols = set(empty_symbols)
+
+    def __call__(self, symbols, start_date, end_date, timeout):
+        self.calls.append(list(symbols))
+        if len(self.calls) <= self.fail_chunks:
+            raise ConnectionError("Too Many Requests")
+        return _frame(symbols, start_date, end_date, missing=[s for s in symbols if s in self.empty_symbols])
+
+
+def test_chunked_dedupes_in_order():
+    """测试分块前按出现顺序去重"""
+    assert chunked(["A", "B", "A", "C", "D"], 2) == [["A", "B"], ["C", "D"]]
+
+
+def test_split_drops_rows_from_other_calendars():
+    """测试拆分时去掉其他股票交易日上的空行，没有数据的股票不出现"""
+    frame = _frame(["AAPL", "0700.HK", "DEAD"], missing=["DEAD"])
+    frame.loc[frame.index[0], "0700.HK"] = np.nan
+    parts = split_by_symbol(frame, ["AAPL", "0700.HK", "DEAD"])
+    assert set(parts) == {"AAPL", "0700.HK"}
+    assert len(parts["0700.HK"]) == len(parts["AAPL"]) - 1
+    assert list(parts["AAPL"].columns) == ["Open", "High", "Low", "Close", "Volume"]
+
+
+def test_one_request_per_chunk_and_retry_failed_chunk():
+    """测试300只股票按50只一块共6次请求，第一块失败后单独重试成功"""
+    symbols = [f"S{i:03d}" for i in range(300)]
+    fake = _FakeDownloader(fail_chunks=1, empty_symbols={"S299"})
+    downloader = BulkDownloader(chunk_size=50, min_interval=0, downloader=fake)
+
+    result = downloader.download(symbols, "2024-03-01", "2024-03-08")
+    assert len(fake.calls) == 6
+    assert result.failed_symbols == symbols[:50]
+    assert result.failures[0].error == "Too Many Requests"
+    assert len(result.data) == 249
+    assert result.empty == ["S299"]
+
+    downloader.retry(result, "2024-03-01", "2024-03-08")
+    assert fake.calls[-1] == symbols[:50]
+    assert result.failures == []
+    assert len(result.data) == 299
+    assert result.requests == 7
+
+
+def test_empty_chunk_is_recorded_as_failure():
+    """测试整块没有数据（被限流时yfinance不抛异常）记为失败分块"""
+    downloader = BulkDownloader(chunk_size=10, min_interval=0,
+                                downloader=lambda symbols, *args: pd.DataFrame())
+    result = downloader.download(["AAPL", "MSFT"], "2024-03-01", "2024-03-08")
+    assert result.failed_symbols == ["AAPL", "MSFT"]
+    assert result.failures[0].error == "no data returned"
+
+    downloader.retry(result, "2024-03-01", "2024-03-08")
+    assert result.failures[0].attempts == 2
+
+
+def test_hk_provider_bulk_matches_single_format():
+    """测试港股批量获取：代码标准化，每只股票的数据格式与单只获取一致"""
+    from tradingagents.dataflows.hk_stock_utils import HKStockProvider
+
+    fake = _FakeDownloader(fail_chunks=0)
+    with mock.patch.object(bulk_download, "yfinance_download", fake):
+        provider = HKStockProvider()
+        provider.min_request_interval = 0
+        result = provider.get_stock_data_bulk(["0700", "9988.HK", "0700.HK"], "2024-03-01", "2024-03-08")
+    assert fake.calls == [["0700.HK", "9988.HK"]]
+    data = result.data["0700.HK"]
+    assert "Date" in data.columns and set(data["Symbol"]) == {"0700.HK"}
+
+
+def test_us_prefetch_skips_cached_and_fills_cache():
+    """测试美股批量预取：已缓存的股票跳过，下载的股票逐只写入缓存"""
+    from tradingagents.dataflows.optimized_us_data import OptimizedUSDataProvider
+
+    saved = {}
+    cache = mock.Mock()
+    cache.find_cached_stock_data.side_effect = lambda symbol, **kwargs: "key" if symbol == "AAPL" else None
+    cache.save_stock_data.side_effect = lambda symbol, data, **kwargs: saved.setdefault(symbol, (data, kwargs))
+
+    fake = _FakeDownloader(fail_chunks=0)
+    with mock.patch("tradingagents.dataflows.optimized_us_data.get_cache", return_value=cache), \
+            mock.patch.object(bulk_download, "yfinance_download", fake):
+        provider = OptimizedUSDataProvider()
+        provider.min_api_interval = 0
+        result = provider.prefetch_stock_data(["aapl", "msft", "nvda"], "2024-03-01", "2024-03-08")
+    assert fake.calls == [["MSFT", "NVDA"]]
+    assert set(result.data) == set(saved) == {"MSFT", "NVDA"}
+    assert saved["MSFT"][1]["data_source"] == "yfinance"
+    assert "MSFT 美股数据分析" in saved["MSFT"][0]
+
+
+def test_yfin_online_bulk_output():
+    """测试 get_YFin_data_online_bulk 的输出与单只获取的CSV格式一致"""
+    from tradingagents.dataflows import interface
+
+    fake = _FakeDownloader(fail_chunks=0, empty_symbols={"DEAD"})
+    with mock.patch.object(bulk_download, "yfinance_download", fake):
+        output = interface.get_YFin_data_online_bulk(["aapl", "DEAD"], "2024-03-01", "2024-03-08")
+    assert output["aapl"].startswith("# Stock data for AAPL from 2024-03-01 to 2024-03-08")
+    assert "Date,Open,High,Low,Close,Volume" in output["aapl"]
+    assert output["DEAD"].startswith("No data found for symbol 'DEAD'")
+
+
+if __name__ == "__main__":
+    test_chunked_dedupes_in_order()
+    test_split_drops_rows_from_other_calendars()
+    test_one_request_per_chunk_and_retry_failed_chunk()
+    test_empty_chunk_is_recorded_as_failure()
+    test_hk_provider_bulk_matches_single_format()
+    test_us_prefetch_skips_cached_and_fills_cache()
+    test_yfin_online_bulk_output()
+    print("✅ 多股票批量下载测试通过")
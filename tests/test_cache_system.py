@@ -8,15 +8,15 @@ import os
 import time
 sys.path.append('..')
 
-def test_cache_manager():
+def test_cache_manager(tmp_path):
     """测试缓存管理器基本功能"""
     print("🔍 测试缓存管理器...")
     
     try:
-        from tradingagents.dataflows.cache_manager import get_cache
+        from tradingagents.dataflows.cache_manager import StockDataCache
         
-        # 获取缓存实例
-        cache = get_cache()
+        # 使用临时目录中的缓存实例，避免在项目缓存目录中留下测试数据
+        cache = StockDataCache(tmp_path)
         print(f"✅ 缓存管理器初始化成功")
         print(f"📁 缓存目录: {cache.cache_dir}")
         
@@ -131,15 +131,15 @@ def test_tdx_cache_integration():
         traceback.print_exc()
         return False
 
-def test_cache_expiration():
+def test_cache_expiration(tmp_path):
     """测试缓存过期机制"""
     print("\n" + "="*50)
     print("🔍 测试缓存过期机制...")
     
     try:
-        from tradingagents.dataflows.cache_manager import get_cache
+        from tradingagents.dataflows.cache_manager import StockDataCache
         
-        cache = get_cache()
+        cache = StockDataCache(tmp_path)
         
         # 保存测试数据
         test_data = "测试过期数据"
@@ -191,14 +191,19 @@ if __name__ == "__main__":
     print("🚀 开始缓存系统测试")
     print("="*50)
     
+    import tempfile
+    from pathlib import Path
+
     # 测试基本功能
-    result1 = test_cache_manager()
+    with tempfile.TemporaryDirectory() as tmp:
+        result1 = test_cache_manager(Path(tmp))
     
     # 测试通达信集成
     result2 = test_tdx_cache_integration()
     
     # 测试过期机制
-    result3 = test_cache_expiration()
+    with tempfile.TemporaryDirectory() as tmp:
+        result3 = test_cache_expiration(Path(tmp))
     
     print("\n" + "="*50)
     print("🎯 测试总结:")
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+开盘前缓存预热测试
+用假的预热函数和分析记录代替真实数据源，验证按最近使用次数排序、按数据源分道限流、
+覆盖率报告（含不支持的数据类型）、时间预算用尽后的跳过，以及首次查询命中率的记录（按数据层的一次请求记录）
+"""
+
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tradingagents.dataflows import cache_warmer
+from tradingagents.dataflows.cache_warmer import (
+    MARKET_A, MARKET_US, CacheWarmer, LookupTracker, Warmer, load_watchlist, next_run_time, usage_priority,
+)
+from tradingagents.graph.result_store import ResultPage
+
+
+class _FakeStore:
+    """按每页2条返回分析记录"""
+
+    def __init__(self, tickers):
+        self.items = [{"ticker": t, "created_at": float(i)} for i, t in enumerate(tickers)]
+
+    def query(self, date_from=None, limit=200, cursor=None):
+        start = int(cursor or 0)
+        end = start + 2
+        return ResultPage(self.items[start:end], str(end) if end < len(self.items) else None)
+
+
+def test_usage_priority():
+    """测试按最近分析次数排序（跨页统计），次数相同时最近分析的在前，未分析过的保持原顺序"""
+    store = _FakeStore(["AAPL", "000001", "AAPL", "TSLA", "000001", "AAPL"])
+    ordered = usage_priority(["MSFT", "tsla", "000001", "NVDA", "AAPL"], store=store)
+    assert ordered == ["AAPL", "000001", "tsla", "MSFT", "NVDA"]
+
+
+def test_lanes_rate_limit_and_priority():
+    """测试同一数据源内按优先级串行且遵守最小间隔，不同数据源并发"""
+    calls = []
+    lock = threading.Lock()
+
+    def single(ticker, trade_date):
+        with lock:
+            calls.append(("slow", ticker, time.monotonic()))
+
+    def batch(tickers, trade_date):
+        with lock:
+            calls.append(("batch", tuple(tickers), time.monotonic()))
+        return {t: None for t in tickers}
+
+    warmers = [
+        Warmer("bars", frozenset({MARKET_A}), "slow", single),
+        Warmer("bars", frozenset({MARKET_US}), "fast", batch, batch=True),
+    ]
+    store = _FakeStore(["600519", "600519", "000001"])
+    warmer = CacheWarmer(["000001", "AAPL", "000002", "600519", "MSFT"], warmers=warmers,
+                         min_intervals={"slow": 0.05}, usage_store=store)
+    report = warmer.run("2024-03-08")
+
+    slow = [c for c in calls if c[0] == "slow"]
+    assert [c[1] for c in slow] == ["600519", "000001", "000002"]
+    assert all(b[2] - a[2] >= 0.045 for a, b in zip(slow, slow[1:]))
+    # 美股一次批量请求，且不等待A股的数据源
+    batch_calls = [c for c in calls if c[0] == "batch"]
+    assert batch_calls[0][1] == ("AAPL", "MSFT") and batch_calls[0][2] < slow[-1][2]
+    assert report.coverage()["bars"]["ok"] == 5
+
+
+def test_coverage_failures_and_unsupported():
+    """测试失败和不支持的数据类型计入覆盖率报告"""
+    def flaky(ticker, trade_date):
+        if ticker == "000002":
+            raise RuntimeError("❌ 数据获取失败")
+
+    warmers = [Warmer("bars", frozenset({MARKET_A}), "tdx", flaky)]
+    report = CacheWarmer(["000001", "000002", "AAPL"], warmers=warmers, prioritize=False).run("2024-03-08")
+    coverage = report.coverage()
+    assert coverage["bars"] == {"ok": 1, "failed": 1, "skipped": 0, "unsupported": 1}
+    assert coverage["news"]["unsupported"] == 3
+    assert report.coverage_rate == 0.5
+    failed = [r for r in report.results if r.status == "failed"]
+    assert failed[0].ticker == "000002" and "数据获取失败" in failed[0].error
+    assert report.oldest_warm_age() is not None
+    assert "覆盖率 50%" in report.summary()
+
+
+def test_budget_skips_remaining_tasks():
+    """测试时间预算用尽后剩余任务记为 skipped"""
+    def slow(ticker, trade_date):
+        time.sleep(0.15)
+
+    warmers = [Warmer("fundamentals", frozenset({MARKET_A}), "tdx", slow)]
+    tickers = ["000001", "000002", "000003", "000004"]
+    report = CacheWarmer(tickers, warmers=warmers, prioritize=False,
+                         min_intervals={"tdx": 0.1}, budget_seconds=0.3).run("2024-03-08")
+    counts = report.coverage()["fundamentals"]
+    assert counts["ok"] >= 1 and counts["skipped"] >= 1
+    assert counts["ok"] + counts["skipped"] == 4
+
+
+def test_first_lookup_hit_rate(tmp_path):
+    """测试只记录每天第一次查询，预热线程内的查询不计入"""
+    tracker = LookupTracker(str(tmp_path / "warmup.sqlite3"))
+    now = datetime(2024, 3, 8, 9, 35)
+    with mock.patch.object(cache_warmer, "_tracker", tracker):
+        cache_warmer.record_first_lookup("bars", "000001", hit=True)
+        tracker.record("bars", "000002", False, now)
+        tracker.record("bars", "000002", True, now)
+        tracker.record("news", "000001", True, now)
+
+        warmers = [Warmer("bars", frozenset({MARKET_A}), "tdx",
+                          lambda ticker, trade_date: cache_warmer.record_first_lookup("bars", ticker, False))]
+        CacheWarmer(["000003"], warmers=warmers, prioritize=False).run("2024-03-08")
+
+    rates = tracker.hit_rate("2024-03-08")
+    assert rates["bars"] == {"hits": 0, "lookups": 1, "rate": 0.0}
+    assert rates["all"]["hits"] == 1 and rates["all"]["lookups"] == 2
+    today = tracker.hit_rate(datetime.now().strftime("%Y-%m-%d"))
+    assert today["bars"]["lookups"] == 1
+
+
+def test_us_bars_lookup_recorded_once_per_request(tmp_path):
+    """测试美股行情查完FINNHUB和Yahoo Finance缓存后只记录一次，预热写入的yfinance缓存记为命中"""
+    from tradingagents.dataflows.cache_manager import StockDataCache
+    from tradingagents.dataflows.optimized_us_data import OptimizedUSDataProvider
+
+    tracker = LookupTracker(str(tmp_path / "warmup.sqlite3"))
+    cache = StockDataCache(str(tmp_path / "cache"))
+    cache.save_stock_data("AAPL", "cached bars", "2024-03-01", "2024-03-08", data_source="yfinance")
+    provider = OptimizedUSDataProvider.__new__(OptimizedUSDataProvider)
+    provider.cache = cache
+    with mock.patch.object(cache_warmer, "_tracker", tracker), \
+            mock.patch.dict("os.environ", {"WARMUP_TRACK_LOOKUPS": "true"}):
+        # 底层缓存查找本身不记录
+        assert cache.find_cached_stock_data("MSFT", "2024-03-01", "2024-03-08", data_source="finnhub") is None
+        assert provider.get_stock_data("AAPL", "2024-03-01", "2024-03-08") == "cached bars"
+
+    today = tracker.hit_rate(datetime.now().strftime("%Y-%m-%d"))
+    assert today["bars"] == {"hits": 1, "lookups": 1, "rate": 1.0}
+
+
+def test_warmed_china_news_is_read_by_news_tool(tmp_path):
+    """测试预热写入的A股中文新闻正是统一新闻工具读取的条目：工具不再重新抓取，并记为首次查询命中"""
+    from tradingagents.agents.utils.agent_utils import Toolkit
+    from tradingagents.dataflows import google_news_cache, googlenews_utils
+    from tradingagents.dataflows.google_news_cache import GoogleNewsDayCache
+
+    calls = []
+
+    def scraper(query, start_date, end_date):
+        calls.append((query, start_date, end_date))
+        return [{"title": "平安银行发布年报", "snippet": "", "source": "Test", "link": "https://example.com/1",
+                 "date": "", "published": end_date}], True
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    tracker = LookupTracker(str(tmp_path / "warmup.sqlite3"))
+    with mock.patch.object(google_news_cache, "_cache", GoogleNewsDayCache(str(tmp_path / "news.sqlite3"))), \
+            mock.patch.object(googlenews_utils, "scrape_news", scraper), \
+            mock.patch.object(cache_warmer, "_tracker", tracker), \
+            mock.patch.dict("os.environ", {"WARMUP_TRACK_LOOKUPS": "true", "GOOGLE_NEWS_CACHE_ENABLED": "true"}):
+        warmers = [w for w in cache_warmer.WARMERS if w.kind == "news" and MARKET_A in w.markets]
+        report = CacheWarmer(["000001"], warmers=warmers, prioritize=False).run(today)
+        assert report.coverage()["news"]["ok"] == 1 and len(calls) == 1
+
+        text = Toolkit.get_stock_news_unified.invoke({"ticker": "000001", "curr_date": today})
+
+    assert "平安银行发布年报" in text and "获取失败" not in text
+    assert len(calls) == 1
+    assert tracker.hit_rate(today)["news"] == {"hits": 1, "lookups": 1, "rate": 1.0}
+
+
+def test_watchlist_and_schedule(tmp_path, monkeypatch):
+    """测试自选列表来源优先级和下一次运行时间跳过周末"""
+    path = tmp_path / "watchlist.txt"
+    path.write_text("AAPL  # 苹果\n\n# 注释\n000001\n", encoding="utf-8")
+    monkeypatch.setenv("WARMUP_WATCHLIST", "TSLA, 0700.HK")
+    assert load_watchlist(path=str(path)) == ["AAPL", "000001"]
+    assert load_watchlist() == ["TSLA", "0700.HK"]
+    assert load_watchlist(["NVDA"]) == ["NVDA"]
+
+    friday_evening = datetime(2024, 3, 8, 18, 0)
+    assert next_run_time("08:30", friday_evening) == datetime(2024, 3, 11, 8, 30)
+    assert next_run_time("08:30", datetime(2024, 3, 11, 7, 0)) == datetime(2024, 3, 11, 8, 30)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    test_usage_priority()
+    test_lanes_rate_limit_and_priority()
+    test_coverage_failures_and_unsupported()
+    test_budget_skips_remaining_tasks()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_first_lookup_hit_rate(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_us_bars_lookup_recorded_once_per_request(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_warmed_china_news_is_read_by_news_tool(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp, mock.patch.dict("os.environ", {"WARMUP_WATCHLIST": "TSLA, 0700.HK"}):
+        test_watchlist_and_schedule(Path(tmp), mock.MagicMock(setenv=lambda *args: None))
+    print("✅ 开盘前缓存预热测试通过")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+图检查点与断点恢复测试
+验证失败运行从最后完成的节点继续、成功运行清理检查点、过期运行自动清理
+"""
+
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.messages import AIMessage
+
+from tradingagents.graph.checkpointing import CheckpointManager
+from tradingagents.graph.conditional_logic import ConditionalLogic
+from tradingagents.graph.propagation import Propagator
+from tradingagents.graph.setup import GraphSetup
+
+ANALYSTS = ["market", "news"]
+
+
+class CountingLLM:
+    """计数桩LLM，可在第 fail_on 次调用时抛出一次超时"""
+
+    def __init__(self, fail_on=None):
+        self.calls = 0
+        self.fail_on = fail_on
+
+    def invoke(self, prompt):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise TimeoutError("provider timeout")
+        return AIMessage(content="stub decision")
+
+
+def _build(temp_dir, quick_llm, deep_llm, retention_days=7):
+    manager = CheckpointManager({
+        "data_cache_dir": temp_dir,
+        "checkpoint_retention_days": retention_days,
+    })
+    setup = GraphSetup(
+        quick_llm, deep_llm, None,
+        {analyst: (lambda state: {}) for analyst in ANALYSTS},
+        None, None, None, None, None,
+        ConditionalLogic(), {},
+    )
+    return manager, setup.setup_graph(ANALYSTS, checkpointer=manager.checkpointer)
+
+
+def _initial_state():
+    state = Propagator().create_initial_state("AAPL", "2025-01-02")
+    state["market_report"] = "market report"
+    state["news_report"] = "news report"
+    return state
+
+
+def test_resume_after_risk_judge_failure():
+    """测试风险经理超时后恢复，不重新执行已完成的节点"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        quick_llm = CountingLLM()
+        # 深度模型：第1次为研究经理，第2次为风险经理
+        deep_llm = CountingLLM(fail_on=2)
+        manager, graph = _build(temp_dir, quick_llm, deep_llm)
+
+        run_id = "run-1"
+        manager.start_run(run_id, "AAPL", "2025-01-02", ANALYSTS, {"llm_provider": "dashscope"})
+        args = Propagator().get_graph_args(run_id)
+
+        try:
+            graph.invoke(_initial_state(), **args)
+            assert False, "风险经理应当超时"
+        except TimeoutError as e:
+            manager.fail_run(run_id, str(e))
+
+        assert manager.registry.get(run_id)["status"] == "failed"
+        assert manager.registry.list_runs(status="failed")[0]["analysts"] == ANALYSTS
+        snapshot = graph.get_state(args["config"])
+        assert snapshot.next == ("Risk Judge",)
+        # Bull + Bear + 交易员 + 3个风险辩手
+        assert quick_llm.calls == 6
+
+        final_state = graph.invoke(None, **args)
+        assert final_state["final_trade_decision"] == "stub decision"
+        assert quick_llm.calls == 6
+        assert deep_llm.calls == 3
+
+        manager.finish_run(run_id)
+        assert manager.registry.get(run_id)["status"] == "completed"
+        assert not graph.get_state(args["config"]).values
+
+
+def test_prune_stale_runs():
+    """测试超过保留期的运行及其检查点被清理"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager, graph = _build(temp_dir, CountingLLM(), CountingLLM(fail_on=1))
+        manager.start_run("stale", "AAPL", "2025-01-02", ANALYSTS, {})
+        args = Propagator().get_graph_args("stale")
+        try:
+            graph.invoke(_initial_state(), **args)
+        except TimeoutError as e:
+            manager.fail_run("stale", str(e))
+        assert graph.get_state(args["config"]).values
+
+        manager.retention_days = 0
+        manager.prune()
+        assert manager.registry.get("stale") is None
+        assert not graph.get_state(args["config"]).values
+
+
+def test_web_resume_uses_recorded_settings():
+    """测试网页端恢复时按登记的分析师和配置重建图，而不是使用当前表单的设置"""
+    from web.utils import analysis_runner
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        recorded_config = {"data_cache_dir": temp_dir, "llm_provider": "dashscope", "deep_think_llm": "qwen-max"}
+        CheckpointManager(recorded_config).start_run("run-web", "AAPL", "2025-01-02", ANALYSTS, recorded_config)
+
+        checkouts = []
+
+        class ResumingGraph:
+            run_id = "run-web"
+            ttft_metrics = {}
+
+            def resume(self, run_id, **kwargs):
+                return {"final_trade_decision": "stub decision"}, "BUY"
+
+        @contextmanager
+        def fake_checkout(analysts, config):
+            checkouts.append((analysts, config))
+            yield ResumingGraph()
+
+        form_config = {"data_cache_dir": temp_dir, "data_dir": temp_dir, "results_dir": temp_dir,
+                       "llm_provider": "deepseek", "deep_think_llm": "deepseek-chat"}
+        preparation = mock.Mock(is_valid=True, stock_name="Apple", market_type="US", cache_status="hit")
+        with mock.patch.dict("os.environ", {"DASHSCOPE_API_KEY": "test", "FINNHUB_API_KEY": "test"}), \
+                mock.patch.object(analysis_runner, "TOKEN_TRACKING_ENABLED", False), \
+                mock.patch.object(analysis_runner, "build_analysis_config", return_value=form_config), \
+                mock.patch.object(analysis_runner, "checkout_graph", fake_checkout), \
+                mock.patch("tradingagents.utils.stock_validator.prepare_stock_data", return_value=preparation):
+            results = analysis_runner.run_stock_analysis(
+                "MSFT", "2025-03-01", ["fundamentals"], 1, "deepseek", "deepseek-chat", resume_run_id="run-web"
+            )
+
+        assert checkouts[0][0] == ANALYSTS
+        assert checkouts[0][1]["llm_provider"] == "dashscope"
+        assert results["stock_symbol"] == "AAPL" and results["analysis_date"] == "2025-01-02"
+        assert results["llm_model"] == "qwen-max"
+
+
+if __name__ == "__main__":
+    test_resume_after_risk_judge_failure()
+    test_prune_stale_runs()
+    test_web_resume_uses_recorded_settings()
+    print("✅ 检查点恢复测试通过")
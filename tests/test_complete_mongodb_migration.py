@@ -62,13 +62,13 @@ def test_tdx_stock_name_retrieval():
         return False
 
 def test_mongodb_direct_access():
-    """测试直接从MongoDB获取股票名称"""
+    """测试从代码主表（由MongoDB的stock_basic_info加载）获取股票名称"""
     print("\n" + "=" * 60)
-    print("测试2: 直接MongoDB股票名称获取")
+    print("测试2: 代码主表股票名称获取")
     print("=" * 60)
     
     try:
-        from tradingagents.dataflows.tdx_utils import _get_stock_name_from_mongodb
+        from tradingagents.dataflows.symbol_master import get_symbol_master
         
         test_stocks = [
             '000001',  # 平安银行
@@ -80,13 +80,13 @@ def test_mongodb_direct_access():
             '159919',  # 300ETF
         ]
         
-        print("\n📊 直接MongoDB股票名称获取测试:")
+        print("\n📊 代码主表股票名称获取测试:")
         print("-" * 50)
         
         success_count = 0
         for stock_code in test_stocks:
             try:
-                stock_name = _get_stock_name_from_mongodb(stock_code)
+                stock_name = get_symbol_master().name(stock_code)
                 if stock_name:
                     print(f"✅ {stock_code}: {stock_name}")
                     success_count += 1
@@ -95,11 +95,11 @@ def test_mongodb_direct_access():
             except Exception as e:
                 print(f"❌ {stock_code}: 获取失败 - {e}")
         
-        print(f"\n📈 直接MongoDB访问成功率: {success_count}/{len(test_stocks)} ({success_count/len(test_stocks)*100:.1f}%)")
+        print(f"\n📈 代码主表获取成功率: {success_count}/{len(test_stocks)} ({success_count/len(test_stocks)*100:.1f}%)")
         return success_count >= len(test_stocks) * 0.8  # 80%成功率即可
         
     except Exception as e:
-        print(f"❌ 直接MongoDB访问测试失败: {e}")
+        print(f"❌ 代码主表获取测试失败: {e}")
         return False
 
 def test_agent_utils_stock_mapping():
@@ -110,7 +110,7 @@ def test_agent_utils_stock_mapping():
     
     try:
         # 模拟agent_utils中的股票名称获取逻辑
-        from tradingagents.dataflows.tdx_utils import _get_stock_name_from_mongodb
+        from tradingagents.dataflows.symbol_master import get_symbol_master
         
         test_stocks = [
             '000001',  # 平安银行
@@ -127,7 +127,7 @@ def test_agent_utils_stock_mapping():
                 # 模拟agent_utils.py中的逻辑
                 import re
                 if re.match(r'^\d{6}$', str(ticker)):
-                    company_name = _get_stock_name_from_mongodb(ticker)
+                    company_name = get_symbol_master().name(ticker)
                     if not company_name:
                         company_name = f"股票代码{ticker}"
                     
@@ -243,7 +243,7 @@ def main():
     
     # 执行所有测试
     test_results.append(("MongoDB连接状态", test_mongodb_connection()))
-    test_results.append(("直接MongoDB访问", test_mongodb_direct_access()))
+    test_results.append(("代码主表名称获取", test_mongodb_direct_access()))
     test_results.append(("TongDaXinDataProvider", test_tdx_stock_name_retrieval()))
     test_results.append(("Agent工具映射", test_agent_utils_stock_mapping()))
     test_results.append(("实时数据名称显示", test_real_time_data_with_names()))
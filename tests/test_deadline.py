@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+运行截止时间测试
+验证按剩余时间计算的超时、嵌套截止时间、可取消的等待、截止时间随图节点和数据源线程传递，
+以及超时或取消时中止图运行和放弃后台调用（AKShare保留socket默认超时兜底被放弃的线程）
+"""
+
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import TypedDict
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langgraph.graph import END, START, StateGraph
+
+from tradingagents.dataflows.source_router import HedgedRouter
+from tradingagents.graph.run_events import DeadlineCallbackHandler
+from tradingagents.utils.deadline import (
+    DeadlineExceeded,
+    budget_timeout,
+    call_with_deadline,
+    deadline_sleep,
+    remaining,
+    run_deadline,
+)
+
+
+def test_budget_timeout_and_nesting():
+    """测试超时取默认值与剩余时间的较小者，嵌套时受外层约束"""
+    assert budget_timeout(30) == 30 and remaining() is None
+
+    with run_deadline(10):
+        assert 9 < budget_timeout(30) <= 10
+        assert budget_timeout(5) == 5
+        with run_deadline(100):
+            # 内层更长，仍受外层10秒约束
+            assert remaining() <= 10
+        with run_deadline(2):
+            assert remaining() <= 2
+        assert remaining() > 2
+    assert remaining() is None
+
+    with run_deadline(0):
+        try:
+            budget_timeout(30)
+            assert False, "超过截止时间后不应再发起调用"
+        except DeadlineExceeded as e:
+            assert not e.cancelled
+
+
+def test_sleep_stops_on_deadline_and_cancel():
+    """测试等待超过剩余时间时立即放弃，取消信号立即唤醒等待（外层取消也生效）"""
+    with run_deadline(1):
+        started = time.monotonic()
+        try:
+            deadline_sleep(60)
+            assert False, "等待60秒超过截止时间"
+        except DeadlineExceeded:
+            assert time.monotonic() - started < 0.1
+
+    cancel = threading.Event()
+    with run_deadline(cancel_event=cancel), run_deadline(30):
+        threading.Timer(0.2, cancel.set).start()
+        started = time.monotonic()
+        try:
+            deadline_sleep(10)
+            assert False, "取消后等待应结束"
+        except DeadlineExceeded as e:
+            assert e.cancelled
+            assert time.monotonic() - started < 2
+
+
+def test_deadline_reaches_graph_nodes_and_router_threads():
+    """测试截止时间传递到图节点线程和数据源路由的工作线程，路由请求不超过剩余时间"""
+    seen = {}
+
+    def source(symbol):
+        seen["source"] = remaining()
+        return None
+
+    router = HedgedRouter({"slow": lambda symbol: time.sleep(5), "empty": source}, hedge_delay=0.05, timeout=30)
+
+    class _State(TypedDict):
+        report: str
+
+    def analyst(state):
+        seen["node"] = remaining()
+        started = time.monotonic()
+        result = router.fetch("000001", preferred="slow")
+        seen["fetch_seconds"] = time.monotonic() - started
+        return {"report": result.status.value}
+
+    workflow = StateGraph(_State)
+    workflow.add_node("Market Analyst", analyst)
+    workflow.add_edge(START, "Market Analyst")
+    workflow.add_edge("Market Analyst", END)
+
+    with run_deadline(1):
+        state = workflow.compile().invoke({"report": ""})
+
+    assert seen["node"] is not None and seen["node"] <= 1
+    assert seen["source"] is not None and seen["source"] <= 1
+    assert state["report"] == "empty"
+    assert seen["fetch_seconds"] < 2
+
+
+def test_callback_aborts_graph_and_call_with_deadline():
+    """测试取消后图在下一个节点前中止，后台调用在截止时放弃等待"""
+    cancel = threading.Event()
+    visited = []
+
+    class _State(TypedDict):
+        report: str
+
+    def analyst(state):
+        visited.append("analyst")
+        cancel.set()
+        return {"report": "done"}
+
+    def trader(state):
+        visited.append("trader")
+        return {"report": state["report"]}
+
+    workflow = StateGraph(_State)
+    workflow.add_node("Market Analyst", analyst)
+    workflow.add_node("Trader", trader)
+    workflow.add_edge(START, "Market Analyst")
+    workflow.add_edge("Market Analyst", "Trader")
+    workflow.add_edge("Trader", END)
+
+    with run_deadline(30, cancel_event=cancel):
+        try:
+            workflow.compile().invoke({"report": ""}, config={"callbacks": [DeadlineCallbackHandler()]})
+            assert False, "取消后图应中止"
+        except DeadlineExceeded as e:
+            assert e.cancelled
+    assert visited == ["analyst"]
+
+    with run_deadline(0.5):
+        started = time.monotonic()
+        try:
+            call_with_deadline(time.sleep, 10, timeout=60)
+            assert False, "后台调用应在截止时放弃"
+        except DeadlineExceeded:
+            assert time.monotonic() - started < 2
+    assert call_with_deadline(sum, [1, 2], timeout=5) == 3
+
+
+def test_akshare_keeps_socket_timeout_backstop():
+    """测试AKShare设置socket默认超时兜底，已有默认值时不覆盖"""
+    from tradingagents.dataflows.akshare_utils import AKShareProvider
+
+    provider = AKShareProvider.__new__(AKShareProvider)
+    previous = socket.getdefaulttimeout()
+    try:
+        socket.setdefaulttimeout(None)
+        provider._configure_timeout()
+        assert socket.getdefaulttimeout() == AKShareProvider.CALL_TIMEOUT
+
+        socket.setdefaulttimeout(15)
+        provider._configure_timeout()
+        assert socket.getdefaulttimeout() == 15
+    finally:
+        socket.setdefaulttimeout(previous)
+
+
+if __name__ == "__main__":
+    test_budget_timeout_and_nesting()
+    test_sleep_stops_on_deadline_and_cancel()
+    test_deadline_reaches_graph_nodes_and_router_threads()
+    test_callback_aborts_graph_and_call_with_deadline()
+    test_akshare_keeps_socket_timeout_backstop()
+    print("✅ 运行截止时间测试通过")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+辩论提前结束测试
+验证本地收敛检查（让步、重复、立场稳定）以及终止原因写入状态
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.messages import AIMessage
+from langgraph.graph import StateGraph, START
+
+from tradingagents.agents.utils.agent_states import AgentState
+from tradingagents.graph.conditional_logic import ConditionalLogic
+from tradingagents.graph.debate_convergence import (
+    DebateConvergenceChecker,
+    detect_concession,
+    detect_stance,
+    lexical_overlap,
+    split_arguments,
+)
+from tradingagents.graph.propagation import Propagator
+from tradingagents.graph.setup import GraphSetup
+
+BULL_1 = "Bull Analyst: Revenue growth of 20% and expanding margins make this a clear buy for long term investors."
+BEAR_1 = "Bear Analyst: Valuation is stretched and competition is rising, so investors should sell before margins compress."
+BULL_2 = "Bull Analyst: Again, revenue growth of 20% and expanding margins make this a clear buy for long term investors."
+BEAR_2 = "Bear Analyst: Again, valuation is stretched and competition is rising, so investors should sell before margins compress."
+BEAR_FRESH = "Bear Analyst: The new export restrictions announced this week could cut overseas shipments sharply next quarter."
+
+
+def _debate_state(*arguments):
+    return {
+        "investment_debate_state": {
+            "history": "\n" + "\n".join(arguments),
+            "current_response": arguments[-1],
+            "count": len(arguments),
+        }
+    }
+
+
+def test_helpers():
+    """测试分段、重叠、让步和立场识别"""
+    arguments = split_arguments("\n" + "\n".join([BULL_1, BEAR_1]), ("Bull", "Bear"))
+    assert [speaker for speaker, _ in arguments] == ["Bull", "Bear"]
+
+    assert lexical_overlap(BULL_2, [BULL_1]) > 0.8
+    assert lexical_overlap(BEAR_FRESH, [BEAR_1]) < 0.2
+    assert lexical_overlap("估值偏高，竞争加剧", ["估值偏高，竞争加剧，建议卖出"]) == 1.0
+
+    assert detect_concession("Fair enough, I concede the margin argument.")
+    assert detect_concession("我同意你的判断")
+    assert not detect_concession("I disagree entirely.")
+
+    assert detect_stance(BULL_1) == "buy"
+    assert detect_stance(BEAR_1) == "sell"
+    assert detect_stance("no signal here") is None
+
+
+def test_repetition_ends_debate_early():
+    """测试重复论点时在上限前结束辩论"""
+    logic = ConditionalLogic(max_debate_rounds=5, convergence_checker=DebateConvergenceChecker())
+
+    # 第一轮结束：没有可比较的历史，继续
+    assert logic.debate_termination_reason(_debate_state(BULL_1, BEAR_1)) is None
+    assert logic.should_continue_debate(_debate_state(BULL_1, BEAR_1)) == "Bull Researcher"
+
+    # 轮次中途不检查
+    assert logic.debate_termination_reason(_debate_state(BULL_1, BEAR_1, BULL_2)) is None
+
+    reason = logic.debate_termination_reason(_debate_state(BULL_1, BEAR_1, BULL_2, BEAR_2))
+    assert reason.startswith("converged: repetition")
+    assert logic.should_continue_debate(_debate_state(BULL_1, BEAR_1, BULL_2, BEAR_2)) == "Research Manager"
+    assert logic.should_continue_debate_parallel(_debate_state(BULL_1, BEAR_1, BULL_2, BEAR_2)) == "Research Manager"
+
+    # 有新论点时继续
+    assert logic.debate_termination_reason(_debate_state(BULL_1, BEAR_1, BULL_2, BEAR_FRESH)) is None
+
+
+def test_single_concession_does_not_end_debate():
+    """测试单方一次性的让步措辞（常见于反驳前）不会结束辩论，双方让步或连续两轮让步才算收敛"""
+    checker = DebateConvergenceChecker()
+    bull_concede = "Bull Analyst: You're right about valuation, but 20% revenue growth still supports a buy."
+    bear_concede = "Bear Analyst: 你说得对，增长确实强劲，我承认空头理由已经不充分。"
+
+    # 第一轮即使双方让步也不结束
+    assert checker.check("\n" + "\n".join([bull_concede, bear_concede]), ("Bull", "Bear")) is None
+    # 只有一方在一轮中让步：继续
+    assert checker.check("\n" + "\n".join([BULL_1, BEAR_1, bull_concede, BEAR_FRESH]), ("Bull", "Bear")) is None
+    # 双方同一轮让步
+    reason = checker.check("\n" + "\n".join([BULL_1, BEAR_1, bull_concede, bear_concede]), ("Bull", "Bear"))
+    assert reason.startswith("concession")
+    # 同一方连续两轮让步
+    history = "\n" + "\n".join([BULL_1, BEAR_1, bull_concede, BEAR_FRESH, bull_concede, BEAR_1])
+    assert checker.check(history, ("Bull", "Bear")).startswith("repeated_concession (Bull)")
+
+
+def test_rounds_stay_upper_bound():
+    """测试配置轮数仍然是上限，未配置检查器时行为不变"""
+    logic = ConditionalLogic(max_debate_rounds=1)
+    assert logic.debate_termination_reason(_debate_state(BULL_1, BEAR_1)) == "max_rounds"
+    assert logic.debate_termination_reason(_debate_state(BULL_1)) is None
+
+    logic = ConditionalLogic(max_debate_rounds=2)
+    assert logic.debate_termination_reason(_debate_state(BULL_1, BEAR_1, BULL_2, BEAR_2)) == "max_rounds"
+
+
+class RepeatingLLM:
+    """每次都给出相同论点的桩LLM"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return AIMessage(content="Margins keep expanding, so I stay with my buy view on this stock.")
+
+
+def test_termination_reason_recorded():
+    """测试终止原因写入辩论状态"""
+    llm = RepeatingLLM()
+    logic = ConditionalLogic(5, 5, convergence_checker=DebateConvergenceChecker())
+    setup = GraphSetup(llm, llm, None, {}, None, None, None, None, None, logic, {})
+    workflow = StateGraph(AgentState)
+    setup._add_debate_stages(workflow, START)
+    graph = workflow.compile()
+
+    state = Propagator().create_initial_state("AAPL", "2025-01-02")
+    for key in ("market_report", "sentiment_report", "news_report", "fundamentals_report"):
+        state[key] = f"{key} content"
+    final_state = graph.invoke(state, config={"recursion_limit": 100})
+
+    assert final_state["investment_debate_state"]["count"] == 4
+    assert final_state["investment_debate_state"]["termination_reason"].startswith("converged")
+    assert final_state["risk_debate_state"]["count"] == 6
+    assert final_state["risk_debate_state"]["termination_reason"].startswith("converged")
+    # 2轮投资辩论 + 2轮风险讨论 + 研究经理/交易员/风险经理，而不是 5+5 轮
+    assert llm.calls == 4 + 6 + 3
+
+
+if __name__ == "__main__":
+    test_helpers()
+    test_repetition_ends_debate_early()
+    test_single_concession_does_not_end_debate()
+    test_rounds_stay_upper_bound()
+    test_termination_reason_recorded()
+    print("✅ 辩论提前结束测试通过")
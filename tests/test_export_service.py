@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+报告导出服务测试
+验证内容寻址缓存命中、相同导出只渲染一次、导出失败的传递，以及PDF引擎只探测一次
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from web.utils.export_service import ArtifactCache, ExportService, artifact_key
+
+
+class FakeExporter:
+    """记录渲染次数的导出器替身"""
+
+    TEMPLATE_VERSION = "1"
+    pandoc_available = True
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.renders = []
+        self.probes = 0
+        self._lock = threading.Lock()
+
+    def probe_pdf_engine(self):
+        self.probes += 1
+        return "wkhtmltopdf"
+
+    def render_to_file(self, results, format_type, output_file):
+        with self._lock:
+            self.renders.append(format_type)
+        time.sleep(self.delay)
+        if format_type == 'pdf' and results.get('broken'):
+            raise Exception("PDF generation failed")
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(f"{format_type}:{results['stock_symbol']}")
+
+
+RESULTS = {"stock_symbol": "AAPL", "decision": {"action": "BUY"}, "state": {"market_report": "up"}}
+
+
+def test_key_depends_on_content_format_and_template():
+    """测试缓存键由报告内容、格式和模板版本共同决定"""
+    key = artifact_key(RESULTS, 'docx', '1')
+    assert key == artifact_key(dict(reversed(list(RESULTS.items()))), 'docx', '1')
+    assert key != artifact_key(RESULTS, 'pdf', '1')
+    assert key != artifact_key(RESULTS, 'docx', '2')
+    assert key != artifact_key({**RESULTS, "stock_symbol": "MSFT"}, 'docx', '1')
+
+
+def test_inflight_dedup_and_cache_hit():
+    """测试并发的相同导出只渲染一次，再次导出直接命中缓存"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        exporter = FakeExporter()
+        service = ExportService(exporter, ArtifactCache(temp_dir))
+        try:
+            first = service.submit(RESULTS, 'docx')
+            second = service.submit(RESULTS, 'docx')
+            assert not first.ready
+            first.future.result(timeout=5)
+            assert second.ready and second.read() == b"docx:AAPL"
+
+            started = time.time()
+            third = service.submit(RESULTS, 'docx')
+            assert third.ready and time.time() - started < 0.1
+            assert exporter.renders == ['docx']
+            assert exporter.probes == 1
+        finally:
+            service.shutdown()
+
+
+def test_failure_is_reported_and_not_cached():
+    """测试导出失败通过句柄返回，且不会写入缓存"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        exporter = FakeExporter(delay=0)
+        cache = ArtifactCache(temp_dir)
+        service = ExportService(exporter, cache)
+        try:
+            broken = {**RESULTS, "broken": True}
+            handle = service.submit(broken, 'pdf')
+            try:
+                handle.future.result(timeout=5)
+            except Exception:
+                pass
+            assert handle.failed and "PDF generation failed" in handle.error
+            assert cache.get(handle.key, 'pdf') is None
+            assert list(Path(temp_dir).iterdir()) == []
+        finally:
+            service.shutdown()
+
+
+if __name__ == "__main__":
+    test_key_depends_on_content_format_and_template()
+    test_inflight_dedup_and_cache_hit()
+    test_failure_is_reported_and_not_cached()
+    print("✅ 报告导出服务测试通过")
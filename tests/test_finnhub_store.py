@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Finnhub离线数据存储测试
+验证日期区间查询与直接读取JSON的结果一致、句柄在进程内复用、源数据更新后重新转换，以及回测式重复查询的速度
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tradingagents.dataflows.finnhub_store import StoreCache, get_store_cache, store_path_for
+from tradingagents.dataflows.finnhub_utils import get_data_in_range
+
+START = date(2023, 1, 1)
+
+
+def _write_dataset(data_dir: str, days: int = 500) -> str:
+    rng = random.Random(3)
+    folder = os.path.join(data_dir, "finnhub_data", "news_data")
+    os.makedirs(folder)
+    data = {}
+    for offset in range(days):
+        day = (START + timedelta(days=offset)).isoformat()
+        data[day] = [{"headline": f"News {day} #{i}", "summary": "x" * 200} for i in range(rng.randrange(0, 6))]
+    path = os.path.join(folder, "AAPL_data_formatted.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return path
+
+
+def _windows(count: int = 100):
+    for offset in range(0, count):
+        end = START + timedelta(days=30 + offset * 4)
+        yield (end - timedelta(days=7)).isoformat(), end.isoformat()
+
+
+def test_store_matches_json():
+    """测试各日期窗口的查询结果与直接读取JSON一致（包括空窗口和跨越数据边界的窗口）"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        _write_dataset(data_dir)
+        windows = list(_windows()) + [("2020-01-01", "2020-02-01"), ("2024-05-01", "2026-01-01"), ("2023-03-05", "2023-03-05")]
+        for start, end in windows:
+            with mock.patch.dict(os.environ, {"FINNHUB_STORE_ENABLED": "false"}):
+                expected = get_data_in_range("AAPL", start, end, "news_data", data_dir)
+            with mock.patch.dict(os.environ, {"FINNHUB_STORE_ENABLED": "true"}):
+                assert get_data_in_range("AAPL", start, end, "news_data", data_dir) == expected
+        assert get_data_in_range("MSFT", "2023-01-01", "2023-12-31", "news_data", data_dir) == {}
+        get_store_cache().clear()
+
+
+def test_handles_reused_and_refreshed():
+    """测试存储句柄复用，源JSON更新后重新转换"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = _write_dataset(data_dir, days=30)
+        cache = StoreCache(max_open=1)
+        first = cache.get(path)
+        assert cache.get(path) is first
+        assert os.path.exists(store_path_for(path))
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"2023-01-02": [{"headline": "updated"}]}, f)
+        os.utime(path, (time.time() + 5, time.time() + 5))
+        refreshed = cache.get(path)
+        assert refreshed is not first
+        assert refreshed.range("2023-01-01", "2023-01-31") == {"2023-01-02": [{"headline": "updated"}]}
+        cache.clear()
+
+
+def test_backtest_queries_are_fast():
+    """测试回测中重复的窗口查询远快于每次读取整个JSON"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        _write_dataset(data_dir, days=1500)
+
+        def run(enabled: str) -> float:
+            started = time.perf_counter()
+            with mock.patch.dict(os.environ, {"FINNHUB_STORE_ENABLED": enabled}):
+                for start, end in _windows(200):
+                    get_data_in_range("AAPL", start, end, "news_data", data_dir)
+            return time.perf_counter() - started
+
+        run("true")  # 首次访问时转换
+        assert run("true") * 5 < run("false")
+        get_store_cache().clear()
+
+
+if __name__ == "__main__":
+    test_store_matches_json()
+    test_handles_reused_and_refreshed()
+    test_backtest_queries_are_fast()
+    print("✅ Finnhub离线数据存储测试通过")
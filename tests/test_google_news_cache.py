@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Google新闻按日缓存测试
+用记录调用区间的假抓取函数代替Google搜索，验证连续两天的7日回看只重新抓取仍在变化中的日期、
+交易日与周末的新鲜度策略、不完整的抓取不写入缓存、首次查询按股票代码记录，以及结果日期标签的解析
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tradingagents.dataflows import cache_warmer
+from tradingagents.dataflows.google_news_cache import GoogleNewsDayCache
+from tradingagents.dataflows.googlenews_utils import parse_news_date
+
+# 不把测试中的查询记录到真实的预热统计数据库
+_no_lookup_tracking = mock.patch.dict(os.environ, {"WARMUP_TRACK_LOOKUPS": "false"})
+
+
+class _FakeScraper:
+    """每个日期返回一条新闻，记录被抓取的区间"""
+
+    def __init__(self, complete: bool = True):
+        self.calls = []
+        self.complete = complete
+
+    def __call__(self, query, start_date, end_date):
+        self.calls.append((start_date, end_date))
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        items = []
+        day = start
+        while day <= end:
+            items.append({"title": f"{query} {day}", "snippet": "", "source": "Test",
+                          "link": f"https://example.com/{day}", "date": "", "published": day.isoformat()})
+            day += timedelta(days=1)
+        return items, self.complete
+
+
+def _cache(tmp: str, **kwargs) -> GoogleNewsDayCache:
+    return GoogleNewsDayCache(str(Path(tmp) / "news.sqlite3"), **kwargs)
+
+
+@_no_lookup_tracking
+def test_consecutive_lookbacks_only_scrape_live_days():
+    """测试连续两天的7日回看：第二天只抓取新的一天和昨天（抓取时仍在变化中）"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = _cache(tmp)
+        scraper = _FakeScraper()
+        # 2024-03-13 周三
+        first = cache.fetch("AAPL+stock", "2024-03-06", "2024-03-13", scraper=scraper,
+                            now=datetime(2024, 3, 13, 18, 0))
+        assert scraper.calls == [("2024-03-06", "2024-03-13")]
+        assert len(first) == 8
+        assert first[0]["published"] == "2024-03-13"
+
+        scraper.calls.clear()
+        second = cache.fetch("aapl stock", "2024-03-07", "2024-03-14", scraper=scraper,
+                             now=datetime(2024, 3, 14, 18, 0))
+        assert scraper.calls == [("2024-03-13", "2024-03-14")]
+        assert [item["published"] for item in second] == [
+            (date(2024, 3, 14) - timedelta(days=i)).isoformat() for i in range(8)
+        ]
+
+        # 同一天内、TTL之内再次请求不抓取
+        scraper.calls.clear()
+        cache.fetch("AAPL+stock", "2024-03-07", "2024-03-14", scraper=scraper,
+                    now=datetime(2024, 3, 14, 18, 30))
+        assert scraper.calls == []
+
+
+def test_freshness_policy():
+    """测试新鲜度：定稿日期永久有效，交易日按短TTL过期，周末按长TTL过期"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = _cache(tmp, live_ttl_minutes=60, closed_ttl_minutes=360, settle_days=1)
+        now = datetime(2024, 3, 16, 12, 0)  # 周六
+        # 次日抓取的结果已定稿
+        assert cache.is_fresh(date(2024, 3, 14), datetime(2024, 3, 15, 0, 5), now)
+        # 当天抓取的周五新闻：超过1小时即过期
+        assert not cache.is_fresh(date(2024, 3, 15), datetime(2024, 3, 15, 20, 0), datetime(2024, 3, 15, 21, 30))
+        assert cache.is_fresh(date(2024, 3, 15), datetime(2024, 3, 15, 20, 0), datetime(2024, 3, 15, 20, 30))
+        # 周六当天的新闻：3小时内仍有效，7小时后过期
+        assert cache.is_fresh(date(2024, 3, 16), datetime(2024, 3, 16, 9, 0), now)
+        assert not cache.is_fresh(date(2024, 3, 16), datetime(2024, 3, 16, 5, 0), now)
+
+
+@_no_lookup_tracking
+def test_incomplete_scrape_is_not_cached():
+    """测试被截止时间中断的抓取照常返回结果，但不写入缓存"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = _cache(tmp)
+        now = datetime(2024, 3, 13, 18, 0)
+        partial = _FakeScraper(complete=False)
+        assert len(cache.fetch("TSLA", "2024-03-10", "2024-03-12", scraper=partial, now=now)) == 3
+        assert cache.load("TSLA", [date(2024, 3, 11)]) == {}
+
+        scraper = _FakeScraper()
+        cache.fetch("TSLA", "2024-03-10", "2024-03-12", scraper=scraper, now=now)
+        assert scraper.calls == [("2024-03-10", "2024-03-12")]
+
+
+@_no_lookup_tracking
+def test_future_days_are_not_scraped():
+    """测试今天之后的日期不抓取"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = _cache(tmp)
+        scraper = _FakeScraper()
+        cache.fetch("MSFT", "2024-03-12", "2024-03-20", scraper=scraper, now=datetime(2024, 3, 13, 9, 0))
+        assert scraper.calls == [("2024-03-12", "2024-03-13")]
+
+
+def test_first_lookup_records_ticker():
+    """测试首次查询按股票代码记录（get_google_news 传入的是用 "+" 连接的查询）"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = _cache(tmp)
+        tracker = cache_warmer.LookupTracker(str(Path(tmp) / "warmup.sqlite3"))
+        with mock.patch.object(cache_warmer, "_tracker", tracker), \
+                mock.patch.dict(os.environ, {"WARMUP_TRACK_LOOKUPS": "true"}):
+            cache.fetch("AAPL+STOCK", "2024-03-12", "2024-03-13", scraper=_FakeScraper())
+            cache.fetch("000001+股票", "2024-03-12", "2024-03-13", scraper=_FakeScraper())
+        with sqlite3.connect(tracker.path) as conn:
+            symbols = {row[0] for row in conn.execute("SELECT symbol FROM first_lookups WHERE kind = 'news'")}
+        assert symbols == {"AAPL", "000001"}
+
+
+def test_parse_news_date():
+    """测试结果日期标签的解析"""
+    now = datetime(2024, 3, 13, 10, 0)
+    assert parse_news_date("3 hours ago", now) == "2024-03-13"
+    assert parse_news_date("12 hours ago", now) == "2024-03-12"
+    assert parse_news_date("2 days ago", now) == "2024-03-11"
+    assert parse_news_date("1 week ago", now) == "2024-03-06"
+    assert parse_news_date("Jan 5, 2024", now) == "2024-01-05"
+    assert parse_news_date("5 Jan 2024", now) == "2024-01-05"
+    assert parse_news_date("", now) is None
+
+
+if __name__ == "__main__":
+    test_consecutive_lookbacks_only_scrape_live_days()
+    test_freshness_policy()
+    test_incomplete_scrape_is_not_cached()
+    test_future_days_are_not_scraped()
+    test_first_lookup_records_ticker()
+    test_parse_news_date()
+    print("✅ Google新闻按日缓存测试通过")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+图复用池测试
+验证相同配置复用已构建的图、不同配置互不混用、借出期间独占、归还时重置运行状态，以及空闲上限、过期回收和预热
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tradingagents.graph.graph_pool import GraphPool, config_fingerprint
+
+
+class _FakeGraph:
+    def __init__(self, analysts, config):
+        self.analysts = analysts
+        self.config = config
+        self.run_id = None
+        self.resets = 0
+
+    def reset_run_state(self):
+        self.run_id = None
+        self.resets += 1
+
+
+class _Factory:
+    def __init__(self):
+        self.built = []
+        self._lock = threading.Lock()
+
+    def __call__(self, analysts, config):
+        graph = _FakeGraph(analysts, config)
+        with self._lock:
+            self.built.append(graph)
+        return graph
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+CONFIG = {"llm_provider": "dashscope", "deep_think_llm": "qwen-max", "max_debate_rounds": 1}
+
+
+def test_reuse_and_reset():
+    """测试相同配置复用同一个图，归还时清理运行状态"""
+    factory = _Factory()
+    pool = GraphPool(factory)
+
+    with pool.checkout(["market", "news"], CONFIG) as graph:
+        graph.run_id = "run-1"
+    with pool.checkout(["news", "market"], dict(CONFIG)) as again:
+        assert again is graph
+        assert again.run_id is None and again.resets == 1
+
+    assert len(factory.built) == 1
+    assert pool.get_stats()["hits"] == 1 and pool.get_stats()["misses"] == 1
+
+
+def test_configs_are_isolated_and_checkout_is_exclusive():
+    """测试不同配置各自构建，同时借出的图互不共享"""
+    factory = _Factory()
+    pool = GraphPool(factory)
+    assert config_fingerprint(["market"], CONFIG) != config_fingerprint(["market"], {**CONFIG, "max_debate_rounds": 2})
+
+    with pool.checkout(["market"], CONFIG) as first, pool.checkout(["market"], CONFIG) as second:
+        assert first is not second
+    with pool.checkout(["market"], {**CONFIG, "deep_think_llm": "qwen-plus"}) as other:
+        assert other.config["deep_think_llm"] == "qwen-plus"
+    assert len(factory.built) == 3
+
+
+def test_max_idle_ttl_and_prewarm():
+    """测试空闲数量上限、过期回收和预热"""
+    factory = _Factory()
+    clock = _Clock()
+    pool = GraphPool(factory, max_idle_per_key=2, idle_ttl=60, clock=clock)
+
+    assert pool.prewarm(["market"], CONFIG, count=5) == 2
+    assert pool.prewarm(["market"], CONFIG, count=2) == 0
+    assert pool.get_stats()["idle"] == 2
+
+    with pool.checkout(["market"], CONFIG), pool.checkout(["market"], CONFIG), pool.checkout(["market"], CONFIG):
+        pass
+    # 三个图归还，只保留两个空闲
+    assert len(factory.built) == 3
+    assert pool.get_stats()["idle"] == 2
+
+    clock.now = 61
+    assert pool.evict_idle() == 2
+    assert pool.get_stats()["idle"] == 0 and pool.get_stats()["keys"] == 0
+    with pool.checkout(["market"], CONFIG):
+        pass
+    assert len(factory.built) == 4
+
+
+if __name__ == "__main__":
+    test_reuse_and_reset()
+    test_configs_are_isolated_and_checkout_is_exclusive()
+    test_max_idle_ttl_and_prewarm()
+    print("✅ 图复用池测试通过")
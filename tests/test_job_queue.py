@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Web分析任务队列测试
+验证准入控制、优先级、按用户并发上限、排队位置、取消，工作进程的崩溃隔离和超时终止，
+以及线程模式下取消后跑完的分析不再写入进度和结果
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from web.utils.job_queue import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    AnalysisJobQueue,
+    AnalysisWorkerPool,
+    QueueFullError,
+)
+
+
+def _queue(temp_dir, **kwargs):
+    return AnalysisJobQueue(os.path.join(temp_dir, "jobs.db"), **kwargs)
+
+
+def test_admission_control():
+    """测试全局排队上限和每用户上限"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        queue = _queue(temp_dir, max_queued=3, per_user_queued=2)
+        queue.submit("a1", "alice", {})
+        queue.submit("a2", "alice", {})
+        try:
+            queue.submit("a3", "alice", {})
+            assert False, "每用户上限应拒绝"
+        except QueueFullError:
+            pass
+        queue.submit("b1", "bob", {})
+        try:
+            queue.submit("c1", "carol", {})
+            assert False, "全局上限应拒绝"
+        except QueueFullError:
+            pass
+        assert queue.get("a3") is None
+
+
+def test_priority_position_and_per_user_running():
+    """测试优先级排序、排队位置和每用户运行上限"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        queue = _queue(temp_dir, per_user_running=1)
+        assert queue.submit("low", "alice", {}, priority=PRIORITY_LOW) == 0
+        assert queue.submit("normal", "alice", {}) == 0
+        assert queue.submit("high", "bob", {}, priority=PRIORITY_HIGH) == 0
+        assert queue.position("low") == 2
+
+        assert queue.claim_next()["job_id"] == "high"
+        assert queue.claim_next()["job_id"] == "normal"
+        # alice 已有运行中的任务，低优先级任务需等待
+        assert queue.claim_next() is None
+        assert queue.position("low") == 0
+
+        queue.finish("normal", "completed")
+        assert queue.claim_next()["job_id"] == "low"
+        assert queue.position("low") is None
+
+
+def test_cancel_queued():
+    """测试取消排队任务和请求取消运行中任务"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        queue = _queue(temp_dir)
+        queue.submit("j1", "alice", {})
+        queue.submit("j2", "bob", {})
+        assert queue.cancel("j2")
+        assert queue.get("j2")["status"] == "cancelled"
+
+        queue.claim_next()
+        assert queue.cancel("j1")
+        assert queue.get("j1")["cancel_requested"] == 1
+        assert not queue.cancel("missing")
+
+
+def _crash(job, db_path):
+    os._exit(3)
+
+
+def _hang(job, db_path):
+    time.sleep(60)
+
+
+def _complete(job, db_path):
+    AnalysisJobQueue(db_path).finish(job["job_id"], "completed")
+
+
+def _wait_for(predicate, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def test_worker_pool_isolation():
+    """测试工作进程崩溃、超时和取消不影响调度进程"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        queue = _queue(temp_dir, per_user_running=5)
+        queue.submit("crash", "alice", {})
+        pool = AnalysisWorkerPool(queue, max_workers=1, poll_interval=0.1, target=_crash)
+        pool.start()
+        try:
+            assert _wait_for(lambda: queue.get("crash")["status"] == "failed")
+            assert "exited with code 3" in queue.get("crash")["error"]
+
+            pool.target = _hang
+            pool.job_timeout = 1
+            queue.submit("hang", "alice", {})
+            assert _wait_for(lambda: queue.get("hang")["status"] == "failed")
+            assert "Timed out" in queue.get("hang")["error"]
+
+            pool.job_timeout = 3600
+            queue.submit("cancel", "alice", {})
+            assert _wait_for(lambda: queue.get("cancel")["status"] == "running")
+            queue.cancel("cancel")
+            assert _wait_for(lambda: queue.get("cancel")["status"] == "cancelled")
+
+            pool.target = _complete
+            queue.submit("ok", "alice", {})
+            assert _wait_for(lambda: queue.get("ok")["status"] == "completed")
+            assert _wait_for(lambda: not pool.running_jobs())
+        finally:
+            pool.stop()
+
+
+def _slow_complete(job, db_path):
+    time.sleep(1)
+    AnalysisJobQueue(db_path).finish(job["job_id"], "completed")
+
+
+def test_thread_worker_mode():
+    """测试线程模式：任务在本进程内运行，取消后迟到的结果被忽略"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        queue = _queue(temp_dir, per_user_running=5)
+        pool = AnalysisWorkerPool(queue, max_workers=1, poll_interval=0.1, target=_complete, mode="thread")
+        pool.start()
+        try:
+            queue.submit("ok", "alice", {})
+            assert _wait_for(lambda: queue.get("ok")["status"] == "completed")
+            assert queue.get("ok")["worker_pid"] == os.getpid()
+
+            pool.target = _slow_complete
+            queue.submit("cancel", "alice", {})
+            queue.submit("next", "alice", {})
+            assert _wait_for(lambda: queue.get("cancel")["status"] == "running")
+            queue.cancel("cancel")
+            assert _wait_for(lambda: queue.get("cancel")["status"] == "cancelled")
+            # 被放弃的线程仍占用名额，结束后下一个任务才开始
+            assert _wait_for(lambda: queue.get("next")["status"] == "completed")
+            assert queue.get("cancel")["status"] == "cancelled"
+        finally:
+            pool.stop()
+
+
+class _FakeTracker:
+    """记录进度状态变化的假进度跟踪器"""
+
+    instances = {}
+
+    def __init__(self, analysis_id, **kwargs):
+        self.statuses = []
+        self.progress_data = {"status": "running"}
+        _FakeTracker.instances[analysis_id] = self
+
+    @classmethod
+    def attach(cls, analysis_id):
+        return cls.instances.get(analysis_id)
+
+    def update_progress(self, message, step=None):
+        pass
+
+    update_stream = handle_graph_event = update_progress
+
+    def mark_completed(self, message, results=None):
+        self.statuses.append("completed")
+        self.progress_data["status"] = "completed"
+
+    def mark_failed(self, error):
+        self.statuses.append("failed")
+        self.progress_data["status"] = "failed"
+
+
+def test_abandoned_thread_result_is_ignored():
+    """测试线程模式下取消的任务即使分析照常跑完，也不把进度改回完成、不保存结果"""
+    from web.utils import analysis_runner, async_progress_tracker, job_queue
+
+    def run_to_completion(**kwargs):
+        # 不经过截止时间检查，取消信号无法中断
+        time.sleep(1)
+        return {"success": True}
+
+    params = {"analysts": ["market"], "research_depth": 1, "llm_provider": "dashscope"}
+    with tempfile.TemporaryDirectory() as temp_dir, \
+            mock.patch.object(analysis_runner, "run_stock_analysis", run_to_completion), \
+            mock.patch.object(async_progress_tracker, "AsyncProgressTracker", _FakeTracker), \
+            mock.patch.object(job_queue, "_store_result") as store_result:
+        queue = _queue(temp_dir, per_user_running=5)
+        pool = AnalysisWorkerPool(queue, max_workers=1, poll_interval=0.1, mode="thread")
+        pool.start()
+        try:
+            queue.submit("cancel", "alice", params)
+            assert _wait_for(lambda: queue.get("cancel")["status"] == "running")
+            queue.cancel("cancel")
+            assert _wait_for(lambda: queue.get("cancel")["status"] == "cancelled")
+            assert _wait_for(lambda: not pool._abandoned and not pool.running_jobs())
+            time.sleep(0.2)
+        finally:
+            pool.stop()
+        assert queue.get("cancel")["status"] == "cancelled"
+        assert _FakeTracker.instances["cancel"].statuses == ["failed"]
+        store_result.assert_not_called()
+
+
+if __name__ == "__main__":
+    test_admission_control()
+    test_priority_position_and_per_user_running()
+    test_cancel_queued()
+    test_worker_pool_isolation()
+    test_thread_worker_mode()
+    test_abandoned_thread_result_is_ignored()
+    print("✅ 任务队列测试通过")
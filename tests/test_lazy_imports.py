@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+按需导入测试
+验证导入 tradingagents 不超过时间预算、数据源库和LLM SDK在首次使用时才加载，以及数据库并行检测
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# 冷启动导入时间预算（秒），可通过环境变量放宽以适应较慢的机器
+IMPORT_BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", 1.5))
+
+HEAVY_MODULES = [
+    "yfinance", "akshare", "openai", "chromadb", "dashscope", "bs4", "pandas",
+    "langchain_openai", "langchain_anthropic", "langchain_google_genai",
+]
+
+
+def _import_in_fresh_process(statement: str) -> dict:
+    """在新进程中执行导入，返回耗时和已加载的重量级模块"""
+    code = (
+        "import json, sys, time\n"
+        "started = time.perf_counter()\n"
+        f"{statement}\n"
+        "elapsed = time.perf_counter() - started\n"
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=project_root, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_import_time_budget():
+    """测试导入核心包和数据源包在时间预算内，且不加载任何数据源库或SDK"""
+    for statement in ("import tradingagents", "import tradingagents.dataflows", "import tradingagents.graph"):
+        result = _import_in_fresh_process(statement)
+        assert result["elapsed"] < IMPORT_BUDGET_SECONDS, f"{statement}: {result['elapsed']:.2f}s"
+        assert result["heavy"] == [], f"{statement} 加载了 {result['heavy']}"
+
+
+def test_vendor_sdks_load_on_demand():
+    """测试导入图模块不加载SDK，选择提供商或访问数据源函数时才加载"""
+    result = _import_in_fresh_process("import tradingagents.graph.trading_graph")
+    assert result["heavy"] == []
+
+    result = _import_in_fresh_process(
+        "from tradingagents.llm_adapters import load_chat_model_class\n"
+        "load_chat_model_class('anthropic')"
+    )
+    assert result["heavy"] == ["langchain_anthropic"]
+
+    result = _import_in_fresh_process("from tradingagents.dataflows import get_YFin_data, YFinanceUtils")
+    assert "yfinance" in result["heavy"] and "chromadb" not in result["heavy"]
+
+
+def test_database_probes_run_in_parallel():
+    """测试MongoDB和Redis的可用性检测并行执行"""
+    from tradingagents.config.database_manager import DatabaseManager
+
+    class _SlowProbes(DatabaseManager):
+        def _detect_mongodb(self):
+            time.sleep(0.5)
+            return True, "ok"
+
+        def _detect_redis(self):
+            time.sleep(0.5)
+            return False, "down"
+
+        def _initialize_connections(self):
+            pass
+
+    started = time.perf_counter()
+    manager = _SlowProbes()
+    assert time.perf_counter() - started < 0.9
+    assert manager.mongodb_available and not manager.redis_available
+    assert manager.get_cache_backend() == "mongodb"
+
+
+if __name__ == "__main__":
+    test_import_time_budget()
+    test_vendor_sdks_load_on_demand()
+    test_database_probes_run_in_parallel()
+    print("✅ 按需导入测试通过")
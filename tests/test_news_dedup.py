@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+新闻近似去重测试
+验证标题略有差异的中英文转载被合并、不同新闻保持独立、聚合器记录来源数和节省的token，以及大批量聚类的耗时
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tradingagents.dataflows.news_dedup import cluster_near_duplicates, dedupe_news, shingles
+from tradingagents.dataflows.realtime_news_utils import NewsItem, RealtimeNewsAggregator
+
+# 1万条新闻聚类的时间预算（秒），可通过环境变量放宽以适应较慢的机器
+DEDUP_BUDGET_SECONDS = float(os.getenv("DEDUP_BUDGET_SECONDS", 1.0))
+
+
+def test_near_duplicates_cluster():
+    """测试中英文转载的标题差异（标点、全角、个别词）被合并，不同新闻保持独立"""
+    texts = [
+        "Apple shares rise after strong iPhone sales beat Wall Street expectations",
+        "Apple shares rise after strong iPhone sales beat Wall Street expectations - Reuters",
+        "平安银行2024年净利润同比增长15%，资产质量保持稳定",
+        "Tesla recalls 200,000 vehicles over rear camera software issue",
+        "APPLE SHARES RISE AFTER STRONG IPHONE SALES BEAT WALL STREET EXPECTATIONS!",
+        "平安银行：2024年净利润同比增长15%，资产质量保持稳定",
+        "",
+    ]
+    clusters = cluster_near_duplicates(texts)
+    assert clusters == [[0, 1, 4], [2, 5], [3], [6]]
+    assert "平安" in shingles(texts[2]) and "wall street" in shingles(texts[0])
+
+
+def test_aggregator_keeps_one_per_cluster():
+    """测试聚合器每簇保留优先级最高的来源，记录来源数和节省的token"""
+    now = datetime.now()
+
+    def item(title, source):
+        return NewsItem(title=title, content="Quarterly revenue grew 12% year over year.", source=source,
+                        publish_time=now, url="", urgency="medium", relevance_score=1.0)
+
+    news = [
+        item("Apple beats earnings estimates on services growth", "FinnHub"),
+        item("Apple beats earnings estimates on services growth", "NewsAPI"),
+        item("Apple beats earnings estimates on services growth.", "Alpha Vantage"),
+        item("Microsoft announces new Azure data centers in Europe", "FinnHub"),
+    ]
+    aggregator = RealtimeNewsAggregator()
+    unique = aggregator._deduplicate_news(news)
+
+    assert [n.source for n in unique] == ["FinnHub", "FinnHub"]
+    assert unique[0].source_count == 3 and unique[0].duplicate_sources == ["NewsAPI", "Alpha Vantage"]
+    assert aggregator.last_dedup_stats.items_in == 4 and aggregator.last_dedup_stats.items_out == 2
+    assert aggregator.last_dedup_stats.tokens_saved > 0
+    assert "共3条报道" in aggregator.format_news_report(unique, "AAPL")
+
+
+def test_clustering_10k_items_within_budget():
+    """测试1万条（5千条新闻各一条转载）在时间预算内聚类，且绝大多数转载被合并"""
+    rng = random.Random(0)
+    vocabulary = [f"w{i}" for i in range(3000)]
+    originals = [" ".join(rng.choices(vocabulary, k=14)) for _ in range(5000)]
+    texts = []
+    for text in originals:
+        words = text.split()
+        words[rng.randrange(len(words))] = "update"
+        texts.extend([text, " ".join(words)])
+
+    dedupe_news(texts[:10], str)  # 预热
+    started = time.perf_counter()
+    clusters, stats = dedupe_news(texts, str)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < DEDUP_BUDGET_SECONDS, f"{elapsed:.2f}s"
+    assert stats.items_out < 5100
+    assert stats.tokens_saved > 0
+
+
+if __name__ == "__main__":
+    test_near_duplicates_cluster()
+    test_aggregator_keeps_one_per_cluster()
+    test_clustering_10k_items_within_budget()
+    print("✅ 新闻近似去重测试通过")
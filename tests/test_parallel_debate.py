@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+并行辩论模式测试
+使用桩LLM对比串行/并行辩论拓扑的墙钟时间，并验证历史合并顺序确定
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.messages import AIMessage
+from langgraph.graph import StateGraph, START
+
+from tradingagents.agents.utils.agent_states import AgentState
+from tradingagents.graph.conditional_logic import ConditionalLogic
+from tradingagents.graph.propagation import Propagator
+from tradingagents.graph.setup import GraphSetup
+
+LLM_LATENCY = 0.2
+DEBATE_ROUNDS = 2
+
+
+class SleepyLLM:
+    """固定延迟的桩LLM，模拟一次远程调用"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def invoke(self, prompt):
+        time.sleep(self.latency)
+        return AIMessage(content="stub argument")
+
+
+def _build_debate_graph(parallel):
+    llm = SleepyLLM(LLM_LATENCY)
+    setup = GraphSetup(
+        llm,
+        llm,
+        None,
+        {},
+        None,
+        None,
+        None,
+        None,
+        None,
+        ConditionalLogic(DEBATE_ROUNDS, DEBATE_ROUNDS),
+        {"parallel_debate": parallel},
+    )
+    workflow = StateGraph(AgentState)
+    setup._add_debate_stages(workflow, START)
+    return workflow.compile()
+
+
+def _initial_state():
+    state = Propagator().create_initial_state("AAPL", "2025-01-02")
+    for key in ("market_report", "sentiment_report", "news_report", "fundamentals_report"):
+        state[key] = f"{key} content"
+    return state
+
+
+def _run(parallel):
+    graph = _build_debate_graph(parallel)
+    start = time.perf_counter()
+    final_state = graph.invoke(_initial_state(), config={"recursion_limit": 100})
+    return final_state, time.perf_counter() - start
+
+
+def test_parallel_debate_same_transcript_size():
+    """测试并行模式产生相同数量的发言"""
+    sequential_state, _ = _run(parallel=False)
+    parallel_state, _ = _run(parallel=True)
+
+    for key, speakers in (("investment_debate_state", 2), ("risk_debate_state", 3)):
+        assert sequential_state[key]["count"] == speakers * DEBATE_ROUNDS
+        assert parallel_state[key]["count"] == speakers * DEBATE_ROUNDS
+        assert parallel_state[key]["history"].count("\n") == speakers * DEBATE_ROUNDS
+
+    assert parallel_state["final_trade_decision"] == "stub argument"
+
+
+def test_parallel_debate_merge_order():
+    """测试同一轮的历史按固定顺序合并"""
+    parallel_state, _ = _run(parallel=True)
+
+    invest_history = parallel_state["investment_debate_state"]["history"].strip().split("\n")
+    assert [line.split(":")[0] for line in invest_history] == ["Bull Analyst", "Bear Analyst"] * DEBATE_ROUNDS
+
+    risk_history = parallel_state["risk_debate_state"]["history"].strip().split("\n")
+    assert [line.split(":")[0] for line in risk_history] == [
+        "Risky Analyst", "Safe Analyst", "Neutral Analyst"
+    ] * DEBATE_ROUNDS
+
+
+def test_parallel_debate_benchmark():
+    """基准测试：并行模式每轮只付出一次LLM延迟"""
+    _, sequential_time = _run(parallel=False)
+    _, parallel_time = _run(parallel=True)
+
+    print(f"⏱️ 串行辩论: {sequential_time:.2f}s, 并行辩论: {parallel_time:.2f}s")
+
+    # 串行: (2+3)*轮数 次辩手调用 + 3 次管理者/交易员调用
+    # 并行: 2*轮数 次辩手延迟 + 3 次管理者/交易员调用
+    assert sequential_time >= (5 * DEBATE_ROUNDS + 3) * LLM_LATENCY
+    assert parallel_time < (2 * DEBATE_ROUNDS + 3 + 2) * LLM_LATENCY
+    assert parallel_time < sequential_time
+
+
+if __name__ == "__main__":
+    test_parallel_debate_same_transcript_size()
+    test_parallel_debate_merge_order()
+    test_parallel_debate_benchmark()
+    print("✅ 并行辩论测试通过")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+进度事件测试
+验证进度写入会唤醒等待方、跨进程的文件写入能被发现，以及空闲等待几乎不占用CPU
+"""
+
+import os
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from web.utils.progress_events import (
+    current_version,
+    progress_file_path,
+    publish_progress,
+    wait_for_progress_update,
+)
+
+
+def _in_temp_dir(test):
+    def wrapper():
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.chdir(temp_dir)
+            os.makedirs("data")
+            try:
+                test()
+            finally:
+                os.chdir(cwd)
+    wrapper.__name__ = test.__name__
+    wrapper.__doc__ = test.__doc__
+    return wrapper
+
+
+@_in_temp_dir
+def test_publish_wakes_waiter():
+    """测试同进程发布立即唤醒等待方"""
+    seen = current_version("job-a")
+    assert wait_for_progress_update("job-a", None, 5) == seen
+
+    threading.Timer(0.2, publish_progress, args=("job-a",)).start()
+    started = time.monotonic()
+    version = wait_for_progress_update("job-a", seen, 5)
+    assert version is not None and version != seen
+    assert time.monotonic() - started < 1.0
+
+
+@_in_temp_dir
+def test_file_write_from_other_process():
+    """测试没有进程内事件时，通过进度文件的修改时间发现其他进程的写入"""
+    seen = current_version("job-b")
+
+    def write():
+        with open(progress_file_path("job-b"), "w", encoding="utf-8") as f:
+            f.write("{}")
+
+    threading.Timer(0.2, write).start()
+    version = wait_for_progress_update("job-b", seen, 5)
+    assert version is not None and version[1] is not None
+
+
+@_in_temp_dir
+def test_idle_wait_cpu():
+    """测试空闲等待的CPU开销：超时返回None，且远低于定时重读进度"""
+    publish_progress("job-c")
+    seen = current_version("job-c")
+
+    cpu_started = time.process_time()
+    assert wait_for_progress_update("job-c", seen, 1.0) is None
+    idle_cpu = time.process_time() - cpu_started
+
+    # 每个切片只有一次 os.stat，1秒内的CPU时间应在毫秒级
+    assert idle_cpu < 0.05, f"idle watcher used {idle_cpu * 1000:.1f}ms CPU"
+
+
+@_in_temp_dir
+def test_auto_refresh_does_not_block_page():
+    """测试自动刷新在片段中短暂等待，页面脚本不会被阻塞到心跳间隔"""
+    from streamlit.testing.v1 import AppTest
+
+    app_source = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {str(project_root)!r})
+        sys.path.insert(0, {str(project_root / "web")!r})
+        import streamlit as st
+        from components.async_progress_display import _wait_for_change_and_rerun
+        from web.utils.progress_events import current_version
+
+        _wait_for_change_and_rerun("job-d", current_version("job-d"))
+        st.write("PAGE-RENDERED")
+    """)
+    with open("app.py", "w", encoding="utf-8") as f:
+        f.write(app_source)
+
+    started = time.monotonic()
+    at = AppTest.from_file(os.path.abspath("app.py"), default_timeout=30).run()
+    assert not at.exception
+    assert [m.value for m in at.markdown] == ["PAGE-RENDERED"]
+    assert time.monotonic() - started < 5
+
+
+if __name__ == "__main__":
+    test_publish_wakes_waiter()
+    test_file_write_from_other_process()
+    test_idle_wait_cpu()
+    test_auto_refresh_does_not_block_page()
+    print("✅ 进度事件测试通过")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+进度存储测试
+验证Redis只写入变化的字段、步骤列表只推送一次、分析结果单独存储并按引用读取，以及文件存储的结果分离
+"""
+
+import fnmatch
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from web.utils import progress_events
+from web.utils.async_progress_tracker import (
+    AsyncProgressTracker,
+    get_latest_analysis_id,
+    get_progress_by_id,
+    progress_result_path,
+)
+
+
+class RecordingRedis:
+    """最小的内存Redis替身，记录每次写入的字段"""
+
+    def __init__(self):
+        self.data = {}
+        self.writes = []
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+    def hset(self, key, mapping):
+        self.writes.append(("hset", key, sorted(mapping)))
+        self.data.setdefault(key, {}).update(mapping)
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    def rpush(self, key, *values):
+        self.writes.append(("rpush", key, len(values)))
+        self.data.setdefault(key, []).extend(values)
+
+    def lrange(self, key, start, end):
+        return list(self.data.get(key, []))
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def setex(self, key, ttl, value):
+        self.writes.append(("setex", key, len(value)))
+        self.data[key] = value
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+
+    def expire(self, key, ttl):
+        pass
+
+    def publish(self, channel, message):
+        pass
+
+    def scan_iter(self, match, count=None):
+        return [key for key in self.data if fnmatch.fnmatch(key, match)]
+
+
+class _Pipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+def _with_redis(client):
+    progress_events._redis_client = client
+
+
+def test_redis_delta_writes_and_result_reference():
+    """测试Redis增量写入与结果引用"""
+    redis_client = RecordingRedis()
+    _with_redis(redis_client)
+    try:
+        tracker = AsyncProgressTracker("delta_test", ["market"], 1, "dashscope")
+        steps_pushes = [w for w in redis_client.writes if w[0] == "rpush"]
+        assert len(steps_pushes) == 1
+
+        redis_client.writes.clear()
+        tracker.update_progress("📊 开始市场分析")
+        hsets = [w for w in redis_client.writes if w[0] == "hset"]
+        assert len(hsets) == 1
+        # 只写入变化的标量字段，不重写步骤和静态字段
+        assert "steps" not in hsets[0][2]
+        assert "start_time" not in hsets[0][2]
+        assert "analysis_id" not in hsets[0][2]
+        assert not [w for w in redis_client.writes if w[0] == "rpush"]
+
+        results = {"stock_symbol": "AAPL", "state": {"market_report": "x" * 10000}}
+        redis_client.writes.clear()
+        tracker.mark_completed("✅ 分析完成", results=results)
+        setex = [w for w in redis_client.writes if w[0] == "setex"]
+        assert len(setex) == 1 and setex[0][1] == "progress:delta_test:result"
+        assert all("raw_results" not in w[2] for w in redis_client.writes if w[0] == "hset")
+
+        # 完成后的进度更新不会再写入结果
+        redis_client.writes.clear()
+        tracker.update_stream("Market Analyst", "tail")
+        tracker._last_stream_save = 0.0
+        tracker.update_stream("Market Analyst", "tail")
+        assert not [w for w in redis_client.writes if w[0] == "setex"]
+
+        progress = get_progress_by_id("delta_test")
+        assert progress["status"] == "completed"
+        assert progress["steps"] == tracker.analysis_steps
+        assert progress["raw_results"] == results
+        assert "raw_results" not in get_progress_by_id("delta_test", include_results=False)
+        assert get_latest_analysis_id() == "delta_test"
+    finally:
+        _with_redis(None)
+
+
+def test_file_store_keeps_results_separate():
+    """测试文件存储：进度文件紧凑且不包含结果"""
+    _with_redis(None)
+    progress_events._redis_checked_at = float("inf")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.chdir(temp_dir)
+        try:
+            tracker = AsyncProgressTracker("file_test", ["market"], 1, "dashscope")
+            tracker.mark_completed("✅ 分析完成", results={"stock_symbol": "000001"})
+
+            with open("./data/progress_file_test.json", encoding="utf-8") as f:
+                raw = f.read()
+            assert "\n" not in raw
+            assert "raw_results\"" not in raw
+            assert json.loads(raw)["raw_results_ref"] == progress_result_path("file_test")
+
+            assert get_progress_by_id("file_test")["raw_results"] == {"stock_symbol": "000001"}
+            assert get_latest_analysis_id() == "file_test"
+        finally:
+            os.chdir(cwd)
+            progress_events._redis_checked_at = None
+
+
+if __name__ == "__main__":
+    test_redis_delta_writes_and_result_reference()
+    test_file_store_keeps_results_separate()
+    print("✅ 进度存储测试通过")
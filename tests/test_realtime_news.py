@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+实时新闻并发获取测试
+用可配置延迟的本地HTTP服务模拟各新闻源，验证并发获取的总耗时约等于最慢的按时返回的数据源、
+超过截止时间的数据源被跳过，以及共享会话复用keep-alive连接
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tradingagents.dataflows.http_sessions import close_http_sessions
+from tradingagents.dataflows.realtime_news_utils import RealtimeNewsAggregator
+
+
+class _FakeNewsServer:
+    """本地新闻源：按配置的延迟返回固定的新闻，并统计TCP连接数"""
+
+    def __init__(self, latency: float, payload):
+        self.latency = latency
+        self.connections = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                server.connections += 1
+
+            def do_GET(self):
+                time.sleep(server.latency)
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _servers(finnhub_latency, alpha_latency, newsapi_latency):
+    now = datetime.now()
+    finnhub = _FakeNewsServer(finnhub_latency, [
+        {"headline": "AAPL earnings beat expectations", "summary": "Apple reported", "source": "Reuters",
+         "datetime": int(now.timestamp()), "url": "https://example.com/1"},
+    ])
+    alpha = _FakeNewsServer(alpha_latency, {"feed": [
+        {"title": "Apple launches new product line", "summary": "launch", "source": "Bloomberg",
+         "time_published": now.strftime("%Y%m%dT%H%M%S"), "url": "https://example.com/2"},
+    ]})
+    newsapi = _FakeNewsServer(newsapi_latency, {"articles": [
+        {"title": "AAPL shares rally in early trading", "description": "rally", "source": {"name": "CNBC"},
+         "publishedAt": now.isoformat(), "url": "https://example.com/3"},
+    ]})
+    return finnhub, alpha, newsapi
+
+
+def _aggregator(finnhub, alpha, newsapi, source_timeout):
+    endpoints = {"finnhub": finnhub.url, "alpha_vantage": alpha.url, "newsapi": newsapi.url}
+    return RealtimeNewsAggregator(endpoints=endpoints, source_timeout=source_timeout)
+
+
+_KEYS = {"FINNHUB_API_KEY": "test", "ALPHA_VANTAGE_API_KEY": "test", "NEWSAPI_KEY": "test"}
+
+
+def test_sources_fetched_concurrently():
+    """测试三个各需0.4秒的新闻源并发获取，总耗时远小于三者之和"""
+    servers = _servers(0.4, 0.4, 0.4)
+    try:
+        with mock.patch.dict(os.environ, _KEYS):
+            aggregator = _aggregator(*servers, source_timeout=5)
+            started = time.perf_counter()
+            news = aggregator.get_realtime_stock_news("AAPL", hours_back=6)
+            elapsed = time.perf_counter() - started
+        assert len(news) == 3
+        assert elapsed < 0.9, f"并发获取耗时 {elapsed:.2f}s，串行约1.2s"
+    finally:
+        for server in servers:
+            server.close()
+        close_http_sessions()
+
+
+def test_slow_source_is_skipped_at_deadline():
+    """测试超过截止时间的新闻源被跳过，用其余数据源的结果组装"""
+    servers = _servers(0.05, 3.0, 0.05)
+    try:
+        with mock.patch.dict(os.environ, _KEYS):
+            aggregator = _aggregator(*servers, source_timeout=0.5)
+            started = time.perf_counter()
+            news = aggregator.get_realtime_stock_news("AAPL", hours_back=6)
+            elapsed = time.perf_counter() - started
+        assert elapsed < 1.5
+        assert {item.source for item in news} == {"Reuters", "CNBC"}
+        assert aggregator.last_latencies["alpha_vantage"] is None
+        assert aggregator.last_latencies["finnhub"] < 0.5
+    finally:
+        for server in servers:
+            server.close()
+        close_http_sessions()
+
+
+def test_sessions_reuse_connections():
+    """测试重复获取时复用keep-alive连接，不为每次请求新建连接"""
+    servers = _servers(0.0, 0.0, 0.0)
+    try:
+        with mock.patch.dict(os.environ, _KEYS):
+            aggregator = _aggregator(*servers, source_timeout=5)
+            for _ in range(5):
+                aggregator.get_realtime_stock_news("AAPL", hours_back=6)
+        assert all(server.connections == 1 for server in servers), [s.connections for s in servers]
+    finally:
+        for server in servers:
+            server.close()
+        close_http_sessions()
+
+
+if __name__ == "__main__":
+    test_sources_fetched_concurrently()
+    test_slow_source_is_skipped_at_deadline()
+    test_sessions_reuse_connections()
+    print("✅ 实时新闻并发获取测试通过")
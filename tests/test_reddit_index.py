@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Reddit数据索引测试
+验证Aho-Corasick多模式匹配、索引查询结果与逐行扫描一致、源文件变化后增量重建（包括进程内共享索引在访问时刷新），
+以及索引不可用时回退到扫描
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tradingagents.dataflows import reddit_index
+from tradingagents.dataflows.reddit_index import AhoCorasick, RedditIndex, company_matcher
+from tradingagents.dataflows.reddit_utils import fetch_top_from_category
+
+DAYS = ["2024-05-01", "2024-05-02", "2024-05-03"]
+TITLES = [
+    "Apple earnings call tonight", "Thoughts on Nvidia guidance?", "Why I sold my TSMC shares",
+    "Facebook rebrand one year later", "Index funds vs stock picking", "JP Morgan raises targets",
+    "Micron memory pricing", "Weekly discussion thread",
+]
+
+
+def _timestamp(day: str, hour: int) -> float:
+    return datetime.strptime(day, "%Y-%m-%d").replace(hour=hour, tzinfo=timezone.utc).timestamp()
+
+
+def _write_corpus(root: str, posts_per_file: int = 60):
+    rng = random.Random(7)
+    for category, files in (("company_news", ["stocks.jsonl", "investing.jsonl"]), ("global_news", ["worldnews.jsonl"])):
+        os.makedirs(os.path.join(root, category))
+        for data_file in files:
+            with open(os.path.join(root, category, data_file), "w", encoding="utf-8") as f:
+                for _ in range(posts_per_file):
+                    f.write(json.dumps({
+                        "created_utc": _timestamp(rng.choice(DAYS), rng.randrange(24)),
+                        "title": rng.choice(TITLES),
+                        "selftext": rng.choice(["", "Long post about AMD and Intel", "no tickers here"]),
+                        "url": f"https://reddit.com/{rng.randrange(10 ** 6)}",
+                        "ups": rng.randrange(50),
+                    }) + "\n")
+                f.write("\n")
+
+
+def _fetch_both(root, category, day, limit, query=None):
+    with mock.patch.dict(os.environ, {"REDDIT_INDEX_ENABLED": "false"}):
+        scanned = fetch_top_from_category(category, day, limit, query, data_path=root)
+    with mock.patch.dict(os.environ, {"REDDIT_INDEX_ENABLED": "true"}):
+        indexed = fetch_top_from_category(category, day, limit, query, data_path=root)
+    return scanned, indexed
+
+
+def test_aho_corasick_matches_all_aliases():
+    """测试多模式匹配：重叠模式、失败指针跳转、大小写不敏感"""
+    matcher = AhoCorasick({"he": {"A"}, "she": {"B"}, "his": {"C"}, "hers": {"D"}})
+    assert matcher.search("uSHErs") == {"A", "B", "D"}
+    assert matcher.search("ahishers") == {"A", "B", "C", "D"}
+    assert matcher.search("xyz") == set()
+
+    companies = company_matcher()
+    assert {"META", "TSM", "JPM"} <= companies.search("Facebook and TSMC beat JP Morgan")
+    # 与原来的正则匹配一致：按子串匹配
+    assert "AAPL" in companies.search("pineapple juice")
+
+
+def test_index_matches_scan():
+    """测试索引查询与逐行扫描返回相同的帖子和顺序（全局新闻和按公司过滤）"""
+    with tempfile.TemporaryDirectory() as root:
+        _write_corpus(root)
+        reddit_index._indexes.clear()
+        for day in DAYS + ["2024-06-01"]:
+            for category, query in (("global_news", None), ("company_news", "AAPL"), ("company_news", "META"),
+                                    ("company_news", "AMD"), ("company_news", "TSM")):
+                scanned, indexed = _fetch_both(root, category, day, 10, query)
+                assert indexed == scanned, (category, query, day)
+        assert os.path.exists(os.path.join(root, reddit_index.INDEX_FILENAME))
+        reddit_index._indexes.clear()
+
+
+def test_incremental_rebuild_and_fallback():
+    """测试只重建变化的文件，回看多天时索引查询远快于扫描，索引不可用时回退到扫描"""
+    with tempfile.TemporaryDirectory() as root:
+        _write_corpus(root, posts_per_file=2000)
+        index = RedditIndex(root)
+        assert index.build() == 3
+        assert index.build() == 0
+
+        path = os.path.join(root, "company_news", "stocks.jsonl")
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"created_utc": _timestamp(DAYS[0], 1), "title": "Apple to the moon",
+                                "selftext": "", "url": "u", "ups": 10 ** 6}) + "\n")
+        assert index.build() == 1
+        top = index.top_posts("company_news", DAYS[0], 1, "AAPL")
+        assert top["stocks.jsonl"][0]["title"] == "Apple to the moon"
+
+        reddit_index._indexes.clear()
+        scanned, indexed = _fetch_both(root, "company_news", DAYS[1], 10, "AAPL")
+        assert indexed == scanned
+
+        def lookback(enabled):
+            started = time.perf_counter()
+            with mock.patch.dict(os.environ, {"REDDIT_INDEX_ENABLED": enabled}):
+                for day in DAYS:
+                    fetch_top_from_category("company_news", day, 10, "AAPL", data_path=root)
+            return time.perf_counter() - started
+
+        assert lookback("true") * 5 < lookback("false")
+
+        with mock.patch.object(reddit_index, "get_reddit_index", side_effect=reddit_index.sqlite3.OperationalError("readonly")):
+            assert fetch_top_from_category("company_news", DAYS[1], 10, "AAPL", data_path=root) == scanned
+        reddit_index._indexes.clear()
+
+
+def test_shared_index_refreshes_on_access():
+    """测试进程内共享的索引在文件追加、新增、删除后下次访问时重建，未变化时不重建"""
+    with tempfile.TemporaryDirectory() as root:
+        _write_corpus(root, posts_per_file=20)
+        reddit_index._indexes.clear()
+        index = reddit_index.get_reddit_index(root)
+        assert index.refresh() == 0
+
+        path = os.path.join(root, "company_news", "stocks.jsonl")
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"created_utc": _timestamp(DAYS[0], 1), "title": "Apple to the moon",
+                                "selftext": "", "url": "u", "ups": 10 ** 6}) + "\n")
+        with mock.patch.object(index, "build", wraps=index.build) as build:
+            assert reddit_index.get_reddit_index(root) is index
+            reddit_index.get_reddit_index(root)
+        assert build.call_count == 1
+        top = index.top_posts("company_news", DAYS[0], 1, "AAPL")
+        assert top["stocks.jsonl"][0]["title"] == "Apple to the moon"
+
+        with open(os.path.join(root, "company_news", "wallstreetbets.jsonl"), "w", encoding="utf-8") as f:
+            f.write(json.dumps({"created_utc": _timestamp(DAYS[0], 2), "title": "Nvidia calls",
+                                "selftext": "", "url": "w", "ups": 5}) + "\n")
+        os.remove(os.path.join(root, "company_news", "investing.jsonl"))
+        top = reddit_index.get_reddit_index(root).top_posts("company_news", DAYS[0], 1, "NVDA")
+        assert "wallstreetbets.jsonl" in top
+        assert "investing.jsonl" not in reddit_index.get_reddit_index(root).top_posts("company_news", DAYS[0], 5)
+        reddit_index._indexes.clear()
+
+
+if __name__ == "__main__":
+    test_aho_corasick_matches_all_aliases()
+    test_index_matches_scan()
+    test_incremental_rebuild_and_fallback()
+    test_shared_index_refreshes_on_access()
+    print("✅ Reddit数据索引测试通过")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+分析结果存储测试
+验证保存与按条件查询、游标分页不重复不遗漏、报告正文压缩存储并按需加载，以及覆盖保存和删除
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tradingagents.graph.result_store import SQLiteResultStore, create_result_store
+
+
+def _results(ticker, date, action="Buy", model="qwen-plus", report="report"):
+    return {
+        "stock_symbol": ticker,
+        "analysis_date": date,
+        "analysts": ["market", "news"],
+        "research_depth": 3,
+        "llm_provider": "dashscope",
+        "llm_model": model,
+        "state": {"market_report": report, "messages": [object()]},
+        "decision": {"action": action, "confidence": 0.8, "target_price": "12.5"},
+        "success": True,
+    }
+
+
+def test_save_query_and_lazy_load():
+    """测试保存、过滤查询和按需加载完整结果"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = SQLiteResultStore(os.path.join(temp_dir, "results.db"))
+        store.save(_results("600036", "2025-03-03", report="招商银行" * 5000), analysis_id="a1")
+        store.save(_results("600036", "2025-04-01", action="Sell"), analysis_id="a2")
+        store.save(_results("aapl", "2025-03-10", model="deepseek-chat"), analysis_id="a3")
+
+        march = store.query(ticker="600036", date_from="2025-03-01", date_to="2025-03-31")
+        assert [item["analysis_id"] for item in march.items] == ["a1"]
+        assert march.next_cursor is None
+
+        item = march.items[0]
+        assert item["action"] == "BUY" and item["target_price"] == 12.5
+        assert item["analysts"] == ["market", "news"]
+        assert "state" not in item
+        # 重复文本压缩后远小于原文
+        assert item["body_size"] < len("招商银行" * 5000)
+
+        assert [i["analysis_id"] for i in store.query(ticker="AAPL").items] == ["a3"]
+        assert [i["analysis_id"] for i in store.query(action="sell").items] == ["a2"]
+        assert store.count(model="qwen-plus") == 2
+        assert store.distinct("ticker") == ["600036", "AAPL"]
+
+        loaded = store.load("a1")
+        assert loaded["state"]["market_report"] == "招商银行" * 5000
+        assert "messages" not in loaded["state"]
+        assert store.load("missing") is None
+
+
+def test_cursor_pagination():
+    """测试游标分页按新到旧遍历全部记录且不重复"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = SQLiteResultStore(os.path.join(temp_dir, "results.db"))
+        for i in range(45):
+            store.save(_results("000001" if i % 3 else "AAPL", f"2025-01-{i % 28 + 1:02d}"), analysis_id=f"r{i}")
+
+        seen, cursor = [], None
+        while True:
+            page = store.query(limit=20, cursor=cursor)
+            seen.extend(item["analysis_id"] for item in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert seen == [f"r{i}" for i in reversed(range(45))]
+
+        first = store.query(ticker="AAPL", limit=10)
+        second = store.query(ticker="AAPL", limit=10, cursor=first.next_cursor)
+        assert len(first.items) == 10 and len(second.items) == 5
+        assert second.next_cursor is None
+        assert not {i["analysis_id"] for i in first.items} & {i["analysis_id"] for i in second.items}
+
+
+def test_overwrite_and_delete():
+    """测试同一ID覆盖保存和删除"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = create_result_store({"data_cache_dir": temp_dir})
+        store.save(_results("AAPL", "2025-01-02", action="Hold"), analysis_id="same")
+        store.save(_results("AAPL", "2025-01-02", action="Buy"), analysis_id="same")
+        assert store.count() == 1
+        assert store.get_summary("same")["action"] == "BUY"
+
+        assert store.delete("same")
+        assert store.count() == 0 and store.load("same") is None
+        assert not store.delete("same")
+
+
+if __name__ == "__main__":
+    test_save_query_and_lazy_load()
+    test_cursor_pagination()
+    test_overwrite_and_delete()
+    print("✅ 分析结果存储测试通过")
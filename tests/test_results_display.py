@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+结果展示测试
+验证详细报告只渲染当前打开的标签页、决策摘要的显示值，以及长序列图表降采样保留极值
+"""
+
+import os
+import sys
+import tempfile
+import textwrap
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "web"))
+
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+APP_SOURCE = textwrap.dedent(f"""
+    import sys
+    sys.path.insert(0, {str(project_root)!r})
+    sys.path.insert(0, {str(project_root / "web")!r})
+    import streamlit as st
+    from components.results_display import render_results
+    from utils.analysis_runner import format_analysis_results
+
+    if 'results' not in st.session_state:
+        st.session_state.results = format_analysis_results({{
+            "stock_symbol": "600036", "analysis_date": "2025-03-03", "analysts": ["market", "news"],
+            "research_depth": 3, "llm_model": "qwen-plus", "success": True,
+            "decision": {{"action": "BUY", "confidence": 0.7, "risk_score": 0.2, "target_price": 40, "reasoning": "r"}},
+            "state": {{"market_report": "MARKET-BODY", "news_report": "NEWS-BODY"}},
+        }})
+    render_results(st.session_state.results)
+""")
+
+
+def test_only_open_tab_is_rendered():
+    """测试详细报告只渲染打开的标签页"""
+    from streamlit.testing.v1 import AppTest
+
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False, encoding="utf-8") as f:
+        f.write(APP_SOURCE)
+    try:
+        at = AppTest.from_file(f.name, default_timeout=60).run()
+    finally:
+        os.unlink(f.name)
+    assert not at.exception
+
+    bodies = [m.value for m in at.markdown if m.value.endswith("-BODY")]
+    assert bodies == ["MARKET-BODY"]
+    assert len(at.tabs) == 6
+
+    metrics = {m.label: m.value for m in at.metric}
+    assert metrics["Investment Decision"] == "Buy"
+    assert metrics["Target Price"] == "¥40.00"
+
+
+def test_tabs_fall_back_on_older_streamlit():
+    """测试旧版Streamlit的 st.tabs 不支持 key/on_change 时退回普通标签页"""
+    from components import results_display
+
+    calls = []
+
+    def legacy_tabs(tabs):
+        calls.append(list(tabs))
+        return [object() for _ in tabs]
+
+    with mock.patch.object(results_display.st, "tabs", legacy_tabs):
+        assert not results_display._tabs_track_state()
+        tabs = results_display._report_tabs(["A", "B"], analysis_key="k")
+    assert calls == [["A", "B"]] and len(tabs) == 2
+    # 没有 open 属性时所有标签页都会渲染
+    assert all(getattr(tab, "open", None) is None for tab in tabs)
+
+
+def test_downsample_keeps_extremes():
+    """测试降采样限制点数并保留最高点和最低点"""
+    from utils.ui_utils import downsample_frame
+
+    prices = np.random.default_rng(0).standard_normal(100000).cumsum()
+    frame = pd.DataFrame({"date": pd.date_range("2000-01-01", periods=len(prices), freq="h"), "price": prices})
+
+    reduced = downsample_frame(frame, "price", max_points=500)
+    assert len(reduced) <= 500
+    assert reduced["price"].max() == frame["price"].max()
+    assert reduced["price"].min() == frame["price"].min()
+    assert reduced["date"].is_monotonic_increasing
+    assert reduced.iloc[0]["date"] == frame.iloc[0]["date"] and reduced.iloc[-1]["date"] == frame.iloc[-1]["date"]
+
+    short = frame.head(10)
+    assert downsample_frame(short, "price") is short
+
+
+if __name__ == "__main__":
+    test_only_open_tab_is_rendered()
+    test_tabs_fall_back_on_older_streamlit()
+    test_downsample_keeps_extremes()
+    print("✅ 结果展示测试通过")
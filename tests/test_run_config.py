@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+运行配置隔离测试
+验证每次运行的配置绑定在上下文中、并发运行互不覆盖、图节点线程继承运行配置，以及Toolkit实例配置独立
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import TypedDict
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langgraph.graph import END, START, StateGraph
+
+from tradingagents.dataflows.config import get_config, get_data_dir, use_config
+
+
+def test_use_config_scopes_and_restores():
+    """测试运行配置只在作用域内生效，进程默认配置不变"""
+    default_online = get_config()["online_tools"]
+    with use_config({"online_tools": not default_online, "data_dir": "/tmp/run_data"}) as run_config:
+        assert get_config()["online_tools"] is (not default_online)
+        assert get_data_dir() == "/tmp/run_data"
+        # 未覆盖的键来自进程默认配置
+        assert run_config["results_dir"] == get_config()["results_dir"]
+        # 返回副本，调用方修改不影响运行配置
+        get_config()["online_tools"] = "mutated"
+        assert get_config()["online_tools"] is (not default_online)
+    assert get_config()["online_tools"] is default_online
+
+
+class _State(TypedDict, total=False):
+    market: str
+    news: str
+
+
+def _build_graph():
+    def market(state):
+        time.sleep(0.01)
+        return {"market": get_config()["llm_provider"]}
+
+    def news(state):
+        time.sleep(0.01)
+        return {"news": get_config()["llm_provider"]}
+
+    workflow = StateGraph(_State)
+    workflow.add_node("market", market)
+    workflow.add_node("news", news)
+    # 两个节点并行执行（在LangGraph的线程池中运行）
+    workflow.add_edge(START, "market")
+    workflow.add_edge(START, "news")
+    workflow.add_edge("market", END)
+    workflow.add_edge("news", END)
+    return workflow.compile()
+
+
+def test_concurrent_runs_keep_their_config():
+    """测试同一进程内并发运行的图节点各自读到本次运行的配置"""
+    graph = _build_graph()
+    results = {}
+
+    def run(provider):
+        outcomes = []
+        with use_config({"llm_provider": provider}):
+            for _ in range(5):
+                outcomes.append(graph.invoke({}))
+        results[provider] = outcomes
+
+    threads = [threading.Thread(target=run, args=(p,)) for p in ("dashscope", "deepseek", "google")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for provider, outcomes in results.items():
+        assert all(o == {"market": provider, "news": provider} for o in outcomes)
+
+
+def test_toolkit_instances_are_isolated():
+    """测试Toolkit实例配置互不影响，也不修改类级默认配置"""
+    from tradingagents.agents.utils.agent_utils import Toolkit
+
+    default_online = Toolkit._config["online_tools"]
+    offline = Toolkit(config={"online_tools": False})
+    online = Toolkit(config={"online_tools": True})
+    assert offline.config["online_tools"] is False
+    assert online.config["online_tools"] is True
+    assert Toolkit._config["online_tools"] is default_online
+    assert Toolkit().config["online_tools"] is default_online
+
+
+if __name__ == "__main__":
+    test_use_config_scopes_and_restores()
+    test_concurrent_runs_keep_their_config()
+    test_toolkit_instances_are_isolated()
+    print("✅ 运行配置隔离测试通过")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+图运行事件测试
+验证节点开始/结束、工具调用和token计数事件，事件只送达本次运行的回调，以及进度跟踪器对事件的处理
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import TypedDict
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+from langgraph.graph import END, START, StateGraph
+
+from tradingagents.graph.run_events import (
+    LLM_END,
+    NODE_END,
+    NODE_START,
+    TOOL_END,
+    TOOL_START,
+    GraphEvent,
+    GraphEventEmitter,
+)
+
+
+class _State(TypedDict):
+    report: str
+
+
+@tool
+def get_stock_market_data_unified(ticker: str) -> str:
+    """Return market data for a ticker"""
+    return f"{ticker} data"
+
+
+def _build_graph(ticker):
+    llm = GenericFakeChatModel(messages=iter([AIMessage(
+        content="report",
+        usage_metadata={"input_tokens": 12, "output_tokens": 5, "total_tokens": 17},
+    )]))
+
+    def analyst(state):
+        get_stock_market_data_unified.invoke({"ticker": ticker})
+        return {"report": llm.invoke("analyze").content}
+
+    def trader(state):
+        return {"report": state["report"] + " -> trade"}
+
+    workflow = StateGraph(_State)
+    workflow.add_node("Market Analyst", analyst)
+    workflow.add_node("Trader", trader)
+    workflow.add_edge(START, "Market Analyst")
+    workflow.add_edge("Market Analyst", "Trader")
+    workflow.add_edge("Trader", END)
+    return workflow.compile()
+
+
+def test_emitter_event_sequence():
+    """测试节点、工具和LLM事件的类型与顺序"""
+    events = []
+    _build_graph("AAPL").invoke({"report": ""}, config={"callbacks": [GraphEventEmitter(events.append)]})
+
+    assert [(e.type, e.node) for e in events] == [
+        (NODE_START, "Market Analyst"),
+        (TOOL_START, "Market Analyst"),
+        (TOOL_END, "Market Analyst"),
+        (LLM_END, "Market Analyst"),
+        (NODE_END, "Market Analyst"),
+        (NODE_START, "Trader"),
+        (NODE_END, "Trader"),
+    ]
+    tool_end = events[2]
+    assert tool_end.name == "get_stock_market_data_unified" and tool_end.duration >= 0
+    assert (events[3].input_tokens, events[3].output_tokens) == (12, 5)
+
+
+def test_concurrent_runs_are_isolated():
+    """测试并发运行时每个回调只收到自己运行的事件"""
+    received = {"AAPL": [], "MSFT": []}
+
+    def run(ticker):
+        emitter = GraphEventEmitter(received[ticker].append)
+        _build_graph(ticker).invoke({"report": ""}, config={"callbacks": [emitter]})
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in received]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for events in received.values():
+        assert len([e for e in events if e.type == NODE_START]) == 2
+        assert len([e for e in events if e.type == LLM_END]) == 1
+
+
+def test_tracker_applies_events():
+    """测试进度跟踪器根据事件推进步骤并记录耗时和token"""
+    from web.utils import progress_events
+    from web.utils.async_progress_tracker import AsyncProgressTracker
+
+    progress_events._redis_checked_at = float("inf")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.chdir(temp_dir)
+        try:
+            tracker = AsyncProgressTracker("events_test", ["market"], 2, "dashscope")
+            tracker.handle_graph_event(GraphEvent(NODE_START, "Bull Researcher"))
+            step = tracker.progress_data['current_step']
+            assert "多头观点" in tracker.analysis_steps[step]["name"]
+
+            tracker.handle_graph_event(GraphEvent(TOOL_START, "Bull Researcher", name="get_stock_market_data_unified"))
+            assert tracker.progress_data['current_step_description'] == "正在获取市场数据和技术指标..."
+            tracker.handle_graph_event(GraphEvent(LLM_END, "Bull Researcher", input_tokens=10, output_tokens=4))
+            tracker.handle_graph_event(GraphEvent(LLM_END, "Bull Researcher", input_tokens=1, output_tokens=1))
+            tracker.handle_graph_event(GraphEvent(NODE_END, "Bull Researcher", duration=2.5))
+
+            # 早先节点的事件不会让进度倒退
+            tracker.handle_graph_event(GraphEvent(NODE_START, "Market Analyst"))
+            assert tracker.progress_data['current_step'] == step
+
+            from web.utils.async_progress_tracker import get_progress_by_id
+            saved = get_progress_by_id("events_test")
+            assert saved['token_usage'] == {'input': 11, 'output': 5}
+            assert saved['node_durations'] == {"Bull Researcher": 2.5}
+        finally:
+            os.chdir(cwd)
+            progress_events._redis_checked_at = None
+
+
+if __name__ == "__main__":
+    test_emitter_event_sequence()
+    test_concurrent_runs_are_isolated()
+    test_tracker_applies_events()
+    print("✅ 图运行事件测试通过")
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+数据源路由测试
+使用注入延迟和错误的假数据源，验证慢数据源触发对冲请求、失败立即切换、熔断与半开恢复、按延迟排序、等待时不空转、超时结果只记录一次，以及带状态的结果
+"""
+
+import functools
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pandas as pd
+
+from tradingagents.dataflows.source_router import FetchStatus, HedgedRouter, SourceHealth
+
+
+def _frame(close=10.0):
+    return pd.DataFrame({"date": ["2025-01-02", "2025-01-03"], "close": [close - 1, close]})
+
+
+def _source(delay=0.0, error=None, frame=None, calls=None):
+    def fetch(symbol, start_date, end_date):
+        if calls is not None:
+            calls.append(symbol)
+        time.sleep(delay)
+        if error:
+            raise error
+        return _frame() if frame is None else frame
+    return fetch
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_slow_primary_is_hedged():
+    """测试主数据源超过对冲等待时间后请求下一个数据源，先返回者胜出"""
+    router = HedgedRouter({"tushare": _source(delay=2.0), "akshare": _source(delay=0.05)},
+                          hedge_delay=0.1, min_hedge_delay=0.05)
+    started = time.perf_counter()
+    result = router.fetch("600036", "2025-01-01", "2025-01-31", preferred="tushare")
+    assert time.perf_counter() - started < 1.0
+    assert result.ok and result.source == "akshare"
+    assert list(result.frame["close"]) == [9.0, 10.0]
+
+
+def test_failure_switches_immediately_and_empty_is_typed():
+    """测试失败立即切换；所有数据源都没有数据时返回EMPTY而不是错误文本"""
+    router = HedgedRouter({"tushare": _source(error=ConnectionError("down")), "akshare": _source(delay=0.01)},
+                          hedge_delay=5)
+    started = time.perf_counter()
+    result = router.fetch("000001", None, None, preferred="tushare")
+    assert time.perf_counter() - started < 1.0
+    assert result.source == "akshare" and result.status == FetchStatus.OK
+    assert router.health["tushare"].consecutive_failures == 1
+
+    empty = HedgedRouter({"akshare": _source(frame=pd.DataFrame()), "baostock": _source(error=ValueError("x"))})
+    result = empty.fetch("999999", None, None, preferred="akshare")
+    assert result.status == FetchStatus.EMPTY and result.source == "akshare"
+
+
+def test_circuit_breaker_skips_and_recovers():
+    """测试连续失败后熔断跳过该数据源，冷却后半开探测成功即恢复"""
+    clock = _Clock()
+    calls = []
+    failing = {"error": RuntimeError("500")}
+
+    def flaky(symbol, start_date, end_date):
+        calls.append(symbol)
+        if failing["error"]:
+            raise failing["error"]
+        return _frame()
+
+    router = HedgedRouter({"tushare": flaky, "akshare": _source()}, failure_threshold=3, cooldown=60, clock=clock)
+    for _ in range(3):
+        assert router.fetch("600036", None, None, preferred="tushare").source == "akshare"
+    assert router.health["tushare"].state == SourceHealth.OPEN
+    assert router.rank("tushare") == ["akshare"]
+
+    router.fetch("600036", None, None, preferred="tushare")
+    assert len(calls) == 3
+
+    clock.now = 61
+    failing["error"] = None
+    result = router.fetch("600036", None, None, preferred="tushare")
+    assert result.source == "tushare" and len(calls) == 4
+    assert router.health["tushare"].state == SourceHealth.CLOSED
+
+
+def test_ranking_learns_latency_and_timeout():
+    """测试按延迟EWMA排序和p95对冲时间，以及全部超时时在截止时间内返回"""
+    router = HedgedRouter({"slow": _source(delay=0.05), "fast": _source()}, hedge_delay=5)
+    for _ in range(5):
+        router.fetch("AAPL", None, None, preferred="slow")
+        router.fetch("AAPL", None, None, preferred="fast")
+    assert router.rank() == ["fast", "slow"]
+    assert router.health["slow"].p95() < 0.5
+
+    hung = HedgedRouter({"a": _source(delay=3), "b": _source(delay=3)}, hedge_delay=0.05, min_hedge_delay=0.05)
+    started = time.perf_counter()
+    result = hung.fetch("600036", None, None, timeout=0.3)
+    assert time.perf_counter() - started < 1.0
+    assert result.status == FetchStatus.TIMEOUT
+
+
+def test_waiting_does_not_spin_and_timeouts_recorded_once():
+    """测试所有数据源都已发出后等待不占用CPU；截止时仍未返回的数据源只按超时记录一次"""
+    router = HedgedRouter({"slow": _source(delay=1.0)}, hedge_delay=0.1, min_hedge_delay=0.05)
+    wall, cpu = time.perf_counter(), time.process_time()
+    assert router.fetch("600036", None, None, timeout=5).ok
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    assert wall >= 0.9 and cpu < wall * 0.2, f"CPU {cpu:.2f}s / 墙钟 {wall:.2f}s"
+
+    router = HedgedRouter({"a": _source(delay=0.6), "b": _source(delay=0.6)}, hedge_delay=0.05, min_hedge_delay=0.05)
+    wall, cpu = time.perf_counter(), time.process_time()
+    assert router.fetch("600036", None, None, timeout=0.3).status == FetchStatus.TIMEOUT
+    assert time.process_time() - cpu < (time.perf_counter() - wall) * 0.2
+    # 等超时的请求返回后，统计中仍只有那一次超时
+    time.sleep(0.6)
+    for name in ("a", "b"):
+        health = router.health[name]
+        assert health.consecutive_failures == 1 and health.latency_ewma is None
+
+
+def test_manager_formats_winning_frame():
+    """测试数据源管理器只格式化胜出的数据，全部失败时说明原因"""
+    from tradingagents.dataflows.data_source_manager import ChinaDataSource, DataSourceManager
+
+    manager = DataSourceManager()
+    manager.current_source = ChinaDataSource.BAOSTOCK
+    manager._router = HedgedRouter({"baostock": _source(error=TimeoutError("slow")), "akshare": _source()})
+    text = manager.get_stock_data("600036", "2025-01-01", "2025-01-31")
+    assert "数据来源: akshare" in text and "数据条数: 2条" in text
+
+    manager._router = HedgedRouter({"baostock": _source(error=TimeoutError("slow"))})
+    text = manager.get_stock_data("600036", "2025-01-01", "2025-01-31")
+    assert text.startswith("❌") and "TimeoutError" in text
+
+
+def test_real_adapters_report_vendor_failures():
+    """测试真实的Tushare/AKShare适配器在数据商报错或超时时计为故障，熔断器打开"""
+    from tradingagents.dataflows.akshare_utils import AKShareProvider
+    from tradingagents.dataflows.data_source_manager import ChinaDataSource, DataSourceManager
+    from tradingagents.dataflows.tushare_adapter import TushareDataAdapter
+    from tradingagents.dataflows.tushare_utils import TushareProvider
+
+    tushare_provider = TushareProvider.__new__(TushareProvider)
+    tushare_provider.connected = True
+    tushare_provider.api = mock.Mock(daily=mock.Mock(side_effect=ConnectionError("tushare down")))
+    tushare = TushareDataAdapter.__new__(TushareDataAdapter)
+    tushare.provider, tushare.enable_cache, tushare.cache_manager = tushare_provider, False, None
+
+    def hung_hist(**kwargs):
+        time.sleep(0.5)
+        return _frame()
+
+    akshare = AKShareProvider.__new__(AKShareProvider)
+    akshare.connected = True
+    akshare.ak = mock.Mock(stock_zh_a_hist=hung_hist)
+    akshare.CALL_TIMEOUT = 0.1
+
+    manager = DataSourceManager()
+    manager._router = HedgedRouter(
+        {source.value: functools.partial(manager._fetch_source, source)
+         for source in (ChinaDataSource.TUSHARE, ChinaDataSource.AKSHARE)},
+        failure_threshold=2, hedge_delay=5,
+    )
+    with mock.patch("tradingagents.dataflows.tushare_adapter.get_tushare_adapter", return_value=tushare), \
+            mock.patch("tradingagents.dataflows.akshare_utils.get_akshare_provider", return_value=akshare):
+        for _ in range(2):
+            result = manager.get_stock_data_result("600036", "2025-01-01", "2025-01-31")
+            assert not result.ok
+        # AKShare 的调用超时记为 TIMEOUT 而不是没有数据
+        timeout_result = manager.router._call("akshare", ("600036", "2025-01-01", "2025-01-31"))
+        assert timeout_result.status == FetchStatus.TIMEOUT
+
+    health = manager.router.health
+    assert health["tushare"].state == SourceHealth.OPEN and health["tushare"].error_ewma > 0
+    assert health["akshare"].state == SourceHealth.OPEN
+    assert result.status in (FetchStatus.ERROR, FetchStatus.TIMEOUT)
+
+
+if __name__ == "__main__":
+    test_slow_primary_is_hedged()
+    test_failure_switches_immediately_and_empty_is_typed()
+    test_circuit_breaker_skips_and_recovers()
+    test_ranking_learns_latency_and_timeout()
+    test_waiting_does_not_spin_and_timeouts_recorded_once()
+    test_manager_formats_winning_frame()
+    test_real_adapters_report_vendor_failures()
+    print("✅ 数据源路由测试通过")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+股票代码主表测试
+用注入的数据源代替MongoDB，验证代码/名称/拼音首字母前缀搜索、模糊匹配、批量代码→名称解析、
+按 updated_at 的增量刷新、search_stocks 保持原来的返回字段，以及在约一万只股票的全市场规模上查询保持在亚毫秒级
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tradingagents.dataflows import symbol_master
+from tradingagents.dataflows.symbol_master import (
+    MARKET_A, MARKET_HK, SymbolMaster, normalize_code, pinyin_initials,
+)
+
+
+def _master(records, **kwargs) -> SymbolMaster:
+    master = SymbolMaster(loader=lambda since: records, refresh_interval=0, **kwargs)
+    master.refresh()
+    return master
+
+
+def test_normalize_code():
+    """测试代码规范化：港股补齐5位，A股保留6位，美股大写"""
+    assert normalize_code("0700.HK") == ("00700", MARKET_HK)
+    assert normalize_code("700") == ("00700", MARKET_HK)
+    assert normalize_code("000001.SZ") == ("000001", MARKET_A)
+    assert normalize_code("aapl") == ("AAPL", "美股")
+
+
+def test_prefix_pinyin_and_fuzzy_search():
+    """测试代码前缀、名称前缀、拼音首字母和模糊匹配"""
+    master = _master([
+        {"code": "000001", "name": "平安银行"},
+        {"code": "601318", "name": "中国平安"},
+        {"code": "600036", "name": "招商银行"},
+        {"code": "000002", "name": "万科A"},
+    ], include_builtin=False)
+
+    assert [s.code for s in master.search("00000")] == ["000001", "000002"]
+    assert master.search("平安")[0].name == "平安银行"
+    assert {s.name for s in master.search("平安")} == {"平安银行", "中国平安"}
+    assert [s.name for s in master.search("pa")] == ["平安银行"]
+    assert [s.name for s in master.search("zgpa")] == ["中国平安"]
+    # 多音字：银行 → yh
+    assert [s.name for s in master.search("zsyh")] == ["招商银行"]
+    assert [s.name for s in master.search("wka")] == ["万科A"]
+    # 完全匹配的代码排在最前
+    assert master.search("601318")[0].name == "中国平安"
+    assert master.search("银行", market=MARKET_A, limit=1)[0].name in {"平安银行", "招商银行"}
+    assert master.search("") == []
+
+
+def test_pinyin_initials():
+    """测试拼音首字母推算"""
+    assert "payh" in pinyin_initials("平安银行")
+    assert pinyin_initials("贵州茅台") == ["gzmt"]
+    assert pinyin_initials("宁德时代") == ["ndsd"]
+
+
+def test_bulk_names_and_builtin_lists():
+    """测试批量代码→名称解析，内置港股/美股列表可直接解析"""
+    master = _master([{"code": "300750", "name": "宁德时代"}])
+    assert master.names(["300750", "0700.HK", "AAPL", "999999"]) == {
+        "300750": "宁德时代", "0700.HK": "腾讯控股", "AAPL": "苹果公司", "999999": None,
+    }
+    assert master.get("aapl").english_name == "Apple"
+
+
+def test_incremental_refresh():
+    """测试增量刷新：只请求上次之后更新的记录，名称变化后重建索引"""
+    calls = []
+    batches = [
+        [{"code": "600519", "name": "贵州茅台", "updated_at": "2024-01-01T00:00:00"}],
+        [{"code": "600519", "name": "茅台股份", "updated_at": "2024-02-01T00:00:00"}],
+    ]
+
+    def loader(since):
+        calls.append(since)
+        return batches.pop(0) if batches else []
+
+    master = SymbolMaster(loader=loader, refresh_interval=0, include_builtin=False)
+    assert master.refresh() == 1
+    assert master.refresh() == 1
+    assert master.refresh() == 0
+    assert calls == [None, "2024-01-01T00:00:00", "2024-02-01T00:00:00"]
+    assert master.name("600519") == "茅台股份"
+    assert [s.code for s in master.search("mtgf")] == ["600519"]
+
+
+def test_full_universe_query_latency():
+    """测试约一万只股票时的查询延迟"""
+    rng = random.Random(0)
+    chars = [bytes([b1, b2]).decode("gb2312") for b1 in range(0xB0, 0xD7) for b2 in range(0xA1, 0xFF)]
+    records = [{"code": f"{rng.choice(['00', '30', '60', '68'])}{i:04d}",
+                "name": "".join(rng.choice(chars) for _ in range(4))} for i in range(6000)]
+    records += [{"code": f"{i:05d}.HK", "name": "".join(rng.choice(chars) for _ in range(4))} for i in range(3000)]
+    master = _master(records)
+    assert len(master) > 8000
+
+    queries = ["pa", "平安", "6000", "00700", "银行", "zgpa", "aapl", "中国", "茅台", "xyz"]
+    started = time.perf_counter()
+    for _ in range(50):
+        for query in queries:
+            master.search(query)
+    per_query = (time.perf_counter() - started) / (50 * len(queries))
+    assert per_query < 0.001, f"平均查询耗时 {per_query * 1000:.3f}ms"
+
+
+def test_name_lookups_use_master():
+    """测试港股名称和英文公司名从代码主表解析"""
+    from tradingagents.dataflows.chinese_finance_utils import ChineseFinanceDataAggregator
+    from tradingagents.dataflows.improved_hk_utils import ImprovedHKStockProvider
+
+    master = _master([{"code": "09999.HK", "name": "网易"}])
+    with mock.patch.object(symbol_master, "_master", master):
+        provider = ImprovedHKStockProvider()
+        provider.cache = {}
+        assert provider.get_company_name("0700.HK") == "腾讯控股"
+        assert provider.get_company_name("9999.HK") == "网易"
+        aggregator = ChineseFinanceDataAggregator.__new__(ChineseFinanceDataAggregator)
+        assert aggregator._get_company_chinese_name("tsla") == "Tesla"
+        assert aggregator._get_company_chinese_name("000001") is None
+
+
+def test_search_stocks_keeps_listing_fields():
+    """测试 search_stocks 返回 stock_basic_info 原来的字段且默认不截断结果"""
+    from tradingagents.api.stock_api import search_stocks
+
+    records = [{"_id": i, "code": f"60{i:04d}", "name": f"平安{i}号", "market": "上海", "category": "A股",
+                "source": "tdx_api", "updated_at": "2024-01-01T00:00:00"} for i in range(80)]
+    master = _master(records)
+    with mock.patch.object(symbol_master, "_master", master):
+        results = search_stocks("平安")
+        assert len([r for r in results if r.get("source") == "tdx_api"]) == 80
+        assert results[0] == {key: value for key, value in records[0].items() if key != "_id"}
+        assert len(search_stocks("平安", limit=5)) == 5
+        builtin = search_stocks("00700")[0]
+        assert builtin == {"code": "00700", "name": "腾讯控股", "market": MARKET_HK, "category": ""}
+
+
+def test_short_query_ignores_single_shared_character():
+    """测试只有一个相同字的名称不算匹配：默认返回包含关键词的全部股票，指定条数时模糊补充也要求至少两个相同片段"""
+    from tradingagents.api.stock_api import search_stocks
+
+    names = ["平安银行", "中国平安", "安井食品", "安琪酵母", "平高电气", "西安旅游", "长安汽车"]
+    master = _master([{"code": f"60{i:04d}", "name": name} for i, name in enumerate(names)],
+                     include_builtin=False)
+    with mock.patch.object(symbol_master, "_master", master):
+        assert [r["name"] for r in search_stocks("平安")] == ["平安银行", "中国平安"]
+    assert {s.name for s in master.search("平安", limit=20)} == {"平安银行", "中国平安"}
+    assert {s.name for s in master.search("安", limit=20)} == {"中国平安", "安井食品", "安琪酵母", "西安旅游", "长安汽车", "平安银行"}
+
+
+if __name__ == "__main__":
+    test_normalize_code()
+    test_prefix_pinyin_and_fuzzy_search()
+    test_pinyin_initials()
+    test_bulk_names_and_builtin_lists()
+    test_incremental_refresh()
+    test_full_universe_query_latency()
+    test_name_lookups_use_master()
+    test_search_stocks_keeps_listing_fields()
+    test_short_query_ignores_single_shared_character()
+    print("✅ 股票代码主表测试通过")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+流式token输出测试
+验证节流批量推送、按节点转发token以及首token延迟（TTFT）记录
+"""
+
+import sys
+from pathlib import Path
+from typing import TypedDict
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, START, StateGraph
+
+from tradingagents.graph.token_streaming import (
+    TTFTRecorder,
+    TokenStreamThrottle,
+    stream_with_tokens,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_throttle_batches_tokens():
+    """测试节流：间隔内的token合并推送，切换节点时先推送上一节点"""
+    clock = FakeClock()
+    received = []
+    throttle = TokenStreamThrottle(lambda node, text: received.append((node, text)), 0.25, clock)
+
+    throttle.add("Market Analyst", "a")  # 首个token立即推送
+    throttle.add("Market Analyst", "b")
+    throttle.add("Market Analyst", "c")
+    clock.now += 0.3
+    throttle.add("Market Analyst", "d")
+    throttle.add("News Analyst", "e")
+    throttle.flush()
+
+    assert received == [
+        ("Market Analyst", "a"),
+        ("Market Analyst", "bcd"),
+        ("News Analyst", "e"),
+    ]
+
+
+class _State(TypedDict):
+    report: str
+
+
+def _build_graph(llm):
+    def analyst(state):
+        return {"report": llm.invoke("analyze").content}
+
+    workflow = StateGraph(_State)
+    workflow.add_node("Market Analyst", analyst)
+    workflow.add_edge(START, "Market Analyst")
+    workflow.add_edge("Market Analyst", END)
+    return workflow.compile()
+
+
+def test_tokens_forwarded_per_node():
+    """测试token按节点转发，状态块与 stream_mode="values" 一致，并记录TTFT"""
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content="Revenue grew strongly this quarter")]))
+    graph = _build_graph(llm)
+
+    received = []
+    recorder = TTFTRecorder()
+    chunks = list(stream_with_tokens(
+        graph,
+        {"report": ""},
+        {"stream_mode": "values", "config": {"recursion_limit": 10}},
+        on_tokens=lambda node, text: received.append((node, text)),
+        min_interval=0.0,
+        ttft_recorder=recorder,
+    ))
+
+    assert chunks[-1]["report"] == "Revenue grew strongly this quarter"
+    assert len(received) > 1
+    assert {node for node, _ in received} == {"Market Analyst"}
+    assert "".join(text for _, text in received) == "Revenue grew strongly this quarter"
+
+    summary = recorder.summary()
+    assert summary["Market Analyst"]["count"] == 1
+    assert summary["Market Analyst"]["avg_s"] >= 0
+
+
+def test_without_callback_matches_values_stream():
+    """测试未提供回调时只输出状态块"""
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content="hold")]))
+    chunks = list(stream_with_tokens(
+        _build_graph(llm), {"report": ""}, {"stream_mode": "values", "config": {}}
+    ))
+    assert [c["report"] for c in chunks] == ["", "hold"]
+
+
+if __name__ == "__main__":
+    test_throttle_batches_tokens()
+    test_tokens_forwarded_per_node()
+    test_without_callback_matches_values_stream()
+    print("✅ 流式token输出测试通过")
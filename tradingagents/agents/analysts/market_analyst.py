@@ -1,6 +1,4 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.agents import create_react_agent, AgentExecutor
-from langchain import hub
 import time
 import json
 import traceback
@@ -225,7 +223,9 @@ Report format should include:
 ## Investment Advice"""
 
             try:
-                # 创建ReAct Agent
+                # 创建ReAct Agent（langchain.agents 只在这条路径上用到，按需导入）
+                from langchain import hub
+                from langchain.agents import create_react_agent, AgentExecutor
                 prompt = hub.pull("hwchase17/react")
                 agent = create_react_agent(llm, tools, prompt)
                 agent_executor = AgentExecutor(
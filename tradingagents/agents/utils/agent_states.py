@@ -1,7 +1,6 @@
 from typing import Annotated, Sequence
 from datetime import date, timedelta, datetime
 from typing_extensions import TypedDict, Optional
-from langchain_openai import ChatOpenAI
 from tradingagents.agents import *
 from langgraph.prebuilt import ToolNode
 from langgraph.graph import END, StateGraph, START, MessagesState
@@ -11,6 +10,17 @@ from tradingagents.utils.logging_init import get_logger
 logger = get_logger("default")
 
 
+def merge_round_responses(left: dict, right: dict) -> dict:
+    """Reducer for simultaneous debate rounds.
+
+    Debaters of the same round write concurrently, each contributing
+    ``{speaker: argument}``; the round join node resets the buffer with ``None``.
+    """
+    if right is None:
+        return {}
+    return {**(left or {}), **right}
+
+
 # Researcher team state
 class InvestDebateState(TypedDict):
     bull_history: Annotated[
@@ -23,6 +33,9 @@ class InvestDebateState(TypedDict):
     current_response: Annotated[str, "Latest response"]  # Last response
     judge_decision: Annotated[str, "Final judge decision"]  # Last response
     count: Annotated[int, "Length of the current conversation"]  # Conversation length
+    termination_reason: Annotated[
+        str, "Why the debate ended (max_rounds or converged: ...)"
+    ]
 
 
 # Risk management team state
@@ -49,6 +62,9 @@ class RiskDebateState(TypedDict):
     ]  # Last response
     judge_decision: Annotated[str, "Judge's decision"]
     count: Annotated[int, "Length of the current conversation"]  # Conversation length
+    termination_reason: Annotated[
+        str, "Why the discussion ended (max_rounds or converged: ...)"
+    ]
 
 
 class AgentState(MessagesState):
@@ -70,6 +86,9 @@ class AgentState(MessagesState):
         InvestDebateState, "Current state of the debate on if to invest or not"
     ]
     investment_plan: Annotated[str, "Plan generated by the Analyst"]
+    invest_round_responses: Annotated[
+        dict, merge_round_responses
+    ]  # Pending arguments of the current simultaneous debate round
 
     trader_investment_plan: Annotated[str, "Plan generated by the Trader"]
 
@@ -77,4 +96,7 @@ class AgentState(MessagesState):
     risk_debate_state: Annotated[
         RiskDebateState, "Current state of the debate on evaluating risk"
     ]
+    risk_round_responses: Annotated[
+        dict, merge_round_responses
+    ]  # Pending arguments of the current simultaneous risk round
     final_trade_decision: Annotated[str, "Final decision made by the Risk Analysts"]
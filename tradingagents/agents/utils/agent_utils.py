@@ -6,10 +6,8 @@ from langchain_core.messages import RemoveMessage
 from langchain_core.tools import tool
 from datetime import date, timedelta, datetime
 import functools
-import pandas as pd
 import os
 from dateutil.relativedelta import relativedelta
-from langchain_openai import ChatOpenAI
 import tradingagents.dataflows.interface as interface
 from tradingagents.default_config import DEFAULT_CONFIG
 from langchain_core.messages import HumanMessage
@@ -40,21 +38,21 @@ def create_msg_delete():
 
 
 class Toolkit:
+    # 类级配置只作为默认值；每个实例持有自己的配置，并发的分析互不影响
     _config = DEFAULT_CONFIG.copy()
 
     @classmethod
     def update_config(cls, config):
-        """Update the class-level configuration."""
+        """Update the class-level default configuration (affects new toolkits only)."""
         cls._config.update(config)
 
     @property
     def config(self):
-        """Access the configuration."""
-        return self._config
+        """Access this toolkit's configuration."""
+        return self._instance_config
 
     def __init__(self, config=None):
-        if config:
-            self.update_config(config)
+        self._instance_config = {**self._config, **(config or {})}
 
     @staticmethod
     @tool
@@ -728,6 +726,7 @@ class Toolkit:
 
         try:
             from tradingagents.utils.stock_utils import StockUtils
+            from tradingagents.dataflows.cache_warmer import NEWS_LOOKBACK_DAYS
             from datetime import datetime, timedelta
 
             # 自动识别股票类型
@@ -992,6 +991,7 @@ class Toolkit:
 
         try:
             from tradingagents.utils.stock_utils import StockUtils
+            from tradingagents.dataflows.cache_warmer import NEWS_LOOKBACK_DAYS
             from datetime import datetime, timedelta
 
             # 自动识别股票类型
@@ -1002,9 +1002,9 @@ class Toolkit:
 
             logger.info(f"📰 [统一新闻工具] 股票类型: {market_info['market_name']}")
 
-            # 计算新闻查询的日期范围
+            # 计算新闻查询的日期范围（与开盘前缓存预热的回看天数一致）
             end_date = datetime.strptime(curr_date, '%Y-%m-%d')
-            start_date = end_date - timedelta(days=7)
+            start_date = end_date - timedelta(days=NEWS_LOOKBACK_DAYS)
             start_date_str = start_date.strftime('%Y-%m-%d')
 
             result_data = []
@@ -1023,7 +1023,7 @@ class Toolkit:
                         search_query = f"{ticker} 港股"
 
                     from tradingagents.dataflows.interface import get_google_news
-                    news_data = get_google_news(search_query, curr_date)
+                    news_data = get_google_news(search_query, curr_date, look_back_days=NEWS_LOOKBACK_DAYS)
                     result_data.append(f"## 中文新闻\n{news_data}")
                 except Exception as e:
                     result_data.append(f"## 中文新闻\n获取失败: {e}")
@@ -1,16 +1,17 @@
-import chromadb
-from chromadb.config import Settings
-from openai import OpenAI
-import dashscope
-from dashscope import TextEmbedding
 import os
 import threading
 from typing import Dict, Optional
 
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
+from tradingagents.utils.lazy_import import lazy_module
 logger = get_logger("agents.utils.memory")
 
+# chromadb、openai、dashscope 导入耗时较长，首次创建记忆库或计算嵌入时才加载
+chromadb = lazy_module("chromadb")
+openai = lazy_module("openai")
+dashscope = lazy_module("dashscope")
+
 
 class ChromaDBManager:
     """单例ChromaDB管理器，避免并发创建集合的冲突"""
@@ -32,6 +33,7 @@ class ChromaDBManager:
         if not self._initialized:
             try:
                 # 使用更兼容的ChromaDB配置
+                from chromadb.config import Settings
                 settings = Settings(
                     allow_reset=True,
                     anonymized_telemetry=False,
@@ -149,7 +151,7 @@ class FinancialSituationMemory:
                 self.embedding = "text-embedding-3-small"
                 openai_key = os.getenv('OPENAI_API_KEY')
                 if openai_key:
-                    self.client = OpenAI(
+                    self.client = openai.OpenAI(
                         api_key=openai_key,
                         base_url=config.get("backend_url", "https://api.openai.com/v1")
                     )
@@ -159,7 +161,7 @@ class FinancialSituationMemory:
                     deepseek_key = os.getenv('DEEPSEEK_API_KEY')
                     if deepseek_key:
                         try:
-                            self.client = OpenAI(
+                            self.client = openai.OpenAI(
                                 api_key=deepseek_key,
                                 base_url="https://api.deepseek.com"
                             )
@@ -201,10 +203,10 @@ class FinancialSituationMemory:
                 logger.info(f"💡 系统将继续运行，但不会保存或检索历史记忆")
         elif config["backend_url"] == "http://localhost:11434/v1":
             self.embedding = "nomic-embed-text"
-            self.client = OpenAI(base_url=config["backend_url"])
+            self.client = openai.OpenAI(base_url=config["backend_url"])
         else:
             self.embedding = "text-embedding-3-small"
-            self.client = OpenAI(base_url=config["backend_url"])
+            self.client = openai.OpenAI(base_url=config["backend_url"])
 
         # 使用单例ChromaDB管理器
         self.chroma_manager = ChromaDBManager()
@@ -231,7 +233,7 @@ class FinancialSituationMemory:
                     return [0.0] * 1024  # 返回空向量
 
                 # 尝试调用DashScope API
-                response = TextEmbedding.call(
+                response = dashscope.TextEmbedding.call(
                     model=self.embedding,
                     input=text
                 )
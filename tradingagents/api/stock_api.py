@@ -120,41 +120,36 @@ def get_stock_data(stock_code: str, start_date: str = None, end_date: str = None
     service = get_stock_data_service()
     return service.get_stock_data_with_fallback(stock_code, start_date, end_date)
 
-def search_stocks(keyword: str) -> List[Dict[str, Any]]:
+def search_stocks(keyword: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     根据关键词搜索股票
     
+    支持代码/名称前缀、拼音首字母（如 'pa' → 平安）和模糊匹配，
+    在进程内的股票代码主表上查询，不再每次获取完整的股票列表
+    
     Args:
-        keyword: 搜索关键词（股票代码或名称的一部分）
+        keyword: 搜索关键词（股票代码、名称的一部分或拼音首字母）
+        limit: 最多返回的条数（不足时用模糊匹配补充），None 表示返回代码或名称包含关键词的全部股票
     
     Returns:
-        List[Dict]: 匹配的股票信息列表
+        List[Dict]: 匹配的股票信息列表（与 get_all_stocks 的记录字段相同，按匹配程度排序）
     
     Example:
         >>> results = search_stocks('平安')
         >>> for stock in results:
         logger.info(f"{stock["code']}: {stock['name']}")
     """
-    all_stocks = get_all_stocks()
-    
-    if not all_stocks or (len(all_stocks) == 1 and 'error' in all_stocks[0]):
-        return all_stocks
-    
-    # 搜索匹配的股票
-    matches = []
-    keyword_lower = keyword.lower()
-    
-    for stock in all_stocks:
-        if 'error' in stock:
-            continue
-            
-        code = stock.get('code', '').lower()
-        name = stock.get('name', '').lower()
-        
-        if keyword_lower in code or keyword_lower in name:
-            matches.append(stock)
-    
-    return matches
+    from tradingagents.dataflows.symbol_master import get_symbol_master
+
+    master = get_symbol_master()
+    if not master.has_listing:
+        # MongoDB中没有股票列表时，用数据服务（含通达信降级）获取一次并载入主表
+        all_stocks = get_all_stocks()
+        if not all_stocks or (len(all_stocks) == 1 and 'error' in all_stocks[0]):
+            return all_stocks
+        master.update(all_stocks)
+
+    return [master.record(symbol.code) for symbol in master.search(keyword, limit=limit)]
 
 def get_market_summary() -> Dict[str, Any]:
     """
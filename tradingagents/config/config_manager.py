@@ -6,6 +6,7 @@
 
 import json
 import os
+import threading
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
@@ -77,9 +78,10 @@ class ConfigManager:
         # 加载.env文件（保持向后兼容）
         self._load_env_file()
 
-        # 初始化MongoDB存储（如果可用）
-        self.mongodb_storage = None
-        self._init_mongodb_storage()
+        # MongoDB存储在首次使用时才连接（见 mongodb_storage），导入本模块不做网络探测
+        self._mongodb_storage = None
+        self._mongodb_storage_checked = False
+        self._mongodb_lock = threading.Lock()
 
         self._init_default_configs()
 
@@ -107,6 +109,21 @@ class ConfigManager:
             return os.getenv(env_key, "")
         return ""
     
+    @property
+    def mongodb_storage(self):
+        """MongoDB存储（首次访问时初始化，结果缓存）"""
+        if not self._mongodb_storage_checked:
+            with self._mongodb_lock:
+                if not self._mongodb_storage_checked:
+                    self._init_mongodb_storage()
+                    self._mongodb_storage_checked = True
+        return self._mongodb_storage
+
+    @mongodb_storage.setter
+    def mongodb_storage(self, storage):
+        self._mongodb_storage = storage
+        self._mongodb_storage_checked = True
+
     def _init_mongodb_storage(self):
         """初始化MongoDB存储"""
         if not MONGODB_AVAILABLE:
@@ -121,20 +138,20 @@ class ConfigManager:
             connection_string = os.getenv("MONGODB_CONNECTION_STRING")
             database_name = os.getenv("MONGODB_DATABASE_NAME", "tradingagents")
             
-            self.mongodb_storage = MongoDBStorage(
+            self._mongodb_storage = MongoDBStorage(
                 connection_string=connection_string,
                 database_name=database_name
             )
             
-            if self.mongodb_storage.is_connected():
+            if self._mongodb_storage.is_connected():
                 logger.info("✅ MongoDB存储已启用")
             else:
-                self.mongodb_storage = None
+                self._mongodb_storage = None
                 logger.warning("⚠️ MongoDB连接失败，将使用JSON文件存储")
 
         except Exception as e:
             logger.error(f"❌ MongoDB初始化失败: {e}", exc_info=True)
-            self.mongodb_storage = None
+            self._mongodb_storage = None
 
     def _init_default_configs(self):
         """初始化默认配置"""
@@ -7,6 +7,8 @@
 
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Any, Optional, Tuple
 
@@ -153,9 +155,14 @@ class DatabaseManager:
     def _detect_databases(self):
         """检测所有数据库"""
         self.logger.info("开始检测数据库可用性...")
-        
-        # 检测MongoDB
-        mongodb_available, mongodb_msg = self._detect_mongodb()
+
+        # MongoDB和Redis并行检测，总等待时间取两者中较长的超时而不是相加
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="db-probe") as executor:
+            mongodb_future = executor.submit(self._detect_mongodb)
+            redis_future = executor.submit(self._detect_redis)
+            mongodb_available, mongodb_msg = mongodb_future.result()
+            redis_available, redis_msg = redis_future.result()
+
         self.mongodb_available = mongodb_available
         
         if mongodb_available:
@@ -163,8 +170,6 @@ class DatabaseManager:
         else:
             self.logger.info(f"❌ MongoDB: {mongodb_msg}")
         
-        # 检测Redis
-        redis_available, redis_msg = self._detect_redis()
         self.redis_available = redis_available
         
         if redis_available:
@@ -329,14 +334,17 @@ class DatabaseManager:
         return cleared_count
 
 
-# 全局数据库管理器实例
+# 全局数据库管理器实例（首次使用时才检测数据库，结果在进程内缓存）
 _database_manager = None
+_database_manager_lock = threading.Lock()
 
 def get_database_manager() -> DatabaseManager:
     """获取全局数据库管理器实例"""
     global _database_manager
     if _database_manager is None:
-        _database_manager = DatabaseManager()
+        with _database_manager_lock:
+            if _database_manager is None:
+                _database_manager = DatabaseManager()
     return _database_manager
 
 def is_mongodb_available() -> bool:
@@ -10,12 +10,16 @@ import warnings
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.deadline import DeadlineExceeded, call_with_deadline
 logger = get_logger('agents')
 warnings.filterwarnings('ignore')
 
 class AKShareProvider:
     """AKShare数据提供器"""
 
+    # 单次AKShare调用的默认超时（秒），有运行截止时间时取二者较小值
+    CALL_TIMEOUT = 60
+
     def __init__(self):
         """初始化AKShare提供器"""
         try:
@@ -38,8 +42,11 @@ class AKShareProvider:
             import requests
             import socket
 
-            # 设置更长的超时时间
-            socket.setdefaulttimeout(60)  # 60秒超时
+            # 每次调用通过 call_with_deadline 按剩余时间限制等待，但超时后被放弃的工作线程仍阻塞在socket上；
+            # 保留socket默认超时作为兜底，使挂起的连接在 CALL_TIMEOUT 内报错、线程随之退出。
+            # 只影响未显式设置超时的socket（LLM客户端都有自己的请求超时），已有默认值时不覆盖
+            if socket.getdefaulttimeout() is None:
+                socket.setdefaulttimeout(self.CALL_TIMEOUT)
 
             # 如果AKShare使用requests，设置默认超时
             if hasattr(requests, 'adapters'):
@@ -59,15 +66,21 @@ class AKShareProvider:
                 session.mount("http://", adapter)
                 session.mount("https://", adapter)
 
-                logger.info(f"🔧 AKShare超时配置完成: 60秒超时，3次重试")
+                logger.info(f"🔧 AKShare超时配置完成: 单次调用最多{self.CALL_TIMEOUT}秒（不超过剩余时间），3次重试")
 
         except Exception as e:
             logger.error(f"⚠️ AKShare超时配置失败: {e}")
             logger.info(f"🔧 使用默认超时设置")
     
-    def get_stock_data(self, symbol: str, start_date: str = None, end_date: str = None) -> Optional[pd.DataFrame]:
-        """获取股票历史数据"""
+    def get_stock_data(self, symbol: str, start_date: str = None, end_date: str = None,
+                       raise_errors: bool = False) -> Optional[pd.DataFrame]:
+        """获取股票历史数据
+
+        raise_errors 为True时失败和超时抛出异常而不是返回None（供数据源路由统计故障）
+        """
         if not self.connected:
+            if raise_errors:
+                raise ConnectionError("AKShare未安装")
             return None
         
         try:
@@ -78,7 +91,9 @@ class AKShareProvider:
                 symbol = symbol.replace('.SZ', '').replace('.SS', '')
             
             # 获取数据
-            data = self.ak.stock_zh_a_hist(
+            data = call_with_deadline(
+                self.ak.stock_zh_a_hist,
+                timeout=self.CALL_TIMEOUT,
                 symbol=symbol,
                 period="daily",
                 start_date=start_date.replace('-', '') if start_date else "20240101",
@@ -90,6 +105,8 @@ class AKShareProvider:
             
         except Exception as e:
             logger.error(f"❌ AKShare获取股票数据失败: {e}")
+            if raise_errors:
+                raise
             return None
     
     def get_stock_info(self, symbol: str) -> Dict[str, Any]:
@@ -99,7 +116,7 @@ class AKShareProvider:
         
         try:
             # 获取股票基本信息
-            stock_list = self.ak.stock_info_a_code_name()
+            stock_list = call_with_deadline(self.ak.stock_info_a_code_name, timeout=self.CALL_TIMEOUT)
             stock_info = stock_list[stock_list['code'] == symbol]
             
             if not stock_info.empty:
@@ -141,42 +158,22 @@ class AKShareProvider:
             start_date_formatted = start_date.replace('-', '') if start_date else "20240101"
             end_date_formatted = end_date.replace('-', '') if end_date else "20241231"
 
-            # 使用AKShare获取港股历史数据（带超时保护）
-            import threading
-
-            result = [None]
-            exception = [None]
-
-            def fetch_hist_data():
-                try:
-                    result[0] = self.ak.stock_hk_hist(
-                        symbol=hk_symbol,
-                        period="daily",
-                        start_date=start_date_formatted,
-                        end_date=end_date_formatted,
-                        adjust=""
-                    )
-                except Exception as e:
-                    exception[0] = e
-
-            # 启动线程
-            thread = threading.Thread(target=fetch_hist_data)
-            thread.daemon = True
-            thread.start()
-
-            # 等待60秒
-            thread.join(timeout=60)
-
-            if thread.is_alive():
-                # 超时了
-                logger.warning(f"⚠️ AKShare港股历史数据获取超时（60秒）: {symbol}")
-                raise Exception(f"AKShare港股历史数据获取超时（60秒）: {symbol}")
-            elif exception[0]:
-                # 有异常
-                raise exception[0]
-            else:
-                # 成功
-                data = result[0]
+            # 使用AKShare获取港股历史数据（带超时保护，不超过运行剩余时间）
+            try:
+                data = call_with_deadline(
+                    self.ak.stock_hk_hist,
+                    timeout=self.CALL_TIMEOUT,
+                    symbol=hk_symbol,
+                    period="daily",
+                    start_date=start_date_formatted,
+                    end_date=end_date_formatted,
+                    adjust=""
+                )
+            except DeadlineExceeded:
+                raise
+            except TimeoutError:
+                logger.warning(f"⚠️ AKShare港股历史数据获取超时: {symbol}")
+                raise Exception(f"AKShare港股历史数据获取超时: {symbol}")
 
             if not data.empty:
                 # 数据预处理
@@ -233,38 +230,14 @@ class AKShareProvider:
             logger.info(f"🇭🇰 AKShare获取港股信息: {hk_symbol}")
 
             # 尝试获取港股实时行情数据来获取基本信息
-            # 使用线程超时包装（兼容Windows）
-            import threading
-            import time
-
-
-            result = [None]
-            exception = [None]
-
-            def fetch_data():
-                try:
-                    result[0] = self.ak.stock_hk_spot_em()
-                except Exception as e:
-                    exception[0] = e
-
-            # 启动线程
-            thread = threading.Thread(target=fetch_data)
-            thread.daemon = True
-            thread.start()
-
-            # 等待60秒
-            thread.join(timeout=60)
-
-            if thread.is_alive():
-                # 超时了
-                logger.warning(f"⚠️ AKShare港股信息获取超时（60秒），使用备用方案")
-                raise Exception("AKShare港股信息获取超时（60秒）")
-            elif exception[0]:
-                # 有异常
-                raise exception[0]
-            else:
-                # 成功
-                spot_data = result[0]
+            # 带超时保护（兼容Windows），不超过运行剩余时间
+            try:
+                spot_data = call_with_deadline(self.ak.stock_hk_spot_em, timeout=self.CALL_TIMEOUT)
+            except DeadlineExceeded:
+                raise
+            except TimeoutError:
+                logger.warning(f"⚠️ AKShare港股信息获取超时，使用备用方案")
+                raise Exception("AKShare港股信息获取超时")
 
             # 查找对应的股票信息
             if not spot_data.empty:
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+多股票批量下载
+港股和美股行情原来每个代码单独调用一次 yf.Ticker().history()，并强制间隔1~2秒，
+为300只股票的自选列表预热数据需要10分钟以上，大部分时间都在等待。yfinance（及多数数据商）支持一次请求多个代码，
+这里把代码列表按数据商的批量上限分块，每块一次请求，再把结果拆分为按股票的数据交给缓存层；
+失败的分块单独记录，可以只重试这些分块。
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.deadline import DeadlineExceeded, budget_timeout, deadline_sleep
+logger = get_logger('agents')
+
+# Yahoo Finance单次请求的代码数上限（可用 BULK_DOWNLOAD_CHUNK_SIZE 调整）
+DEFAULT_CHUNK_SIZE = 50
+# 相邻两次批量请求的最小间隔（秒）
+DEFAULT_MIN_INTERVAL = 1.0
+
+
+def chunked(symbols: Sequence[str], size: int) -> List[List[str]]:
+    """按出现顺序去重后分块"""
+    unique = list(dict.fromkeys(symbols))
+    return [unique[i:i + size] for i in range(0, len(unique), size)]
+
+
+def split_by_symbol(frame: Optional[pd.DataFrame], symbols: Sequence[str]) -> Dict[str, pd.DataFrame]:
+    """把批量下载的结果（列为 (代码, 字段) 的多级索引）拆分为每只股票一个DataFrame
+
+    不同市场的交易日不同，某只股票在其他股票交易日上的行全为空，拆分时去掉；没有任何数据的股票不出现在结果中
+    """
+    if frame is None or frame.empty:
+        return {}
+    result: Dict[str, pd.DataFrame] = {}
+    multi_level = isinstance(frame.columns, pd.MultiIndex)
+    for symbol in symbols:
+        if multi_level:
+            if symbol not in frame.columns.get_level_values(0):
+                continue
+            data = frame[symbol]
+        elif len(symbols) == 1:
+            data = frame
+        else:
+            continue
+        data = data.dropna(how='all')
+        if not data.empty:
+            result[symbol] = data.copy()
+    return result
+
+
+def yfinance_download(symbols: List[str], start_date: str, end_date: str, timeout: float) -> pd.DataFrame:
+    """一次请求下载多只股票的日线（字段与 Ticker.history() 一致：复权价格、分红和拆股）"""
+    import yfinance as yf
+
+    return yf.download(
+        symbols,
+        start=start_date,
+        end=end_date,
+        group_by='ticker',
+        auto_adjust=True,
+        actions=True,
+        threads=False,
+        progress=False,
+        timeout=timeout,
+    )
+
+
+@dataclass
+class ChunkFailure:
+    """下载失败的一个分块"""
+    symbols: List[str]
+    error: str
+    attempts: int = 1
+
+
+@dataclass
+class BulkResult:
+    """一次批量下载的结果"""
+    data: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    # 请求成功但没有返回数据的代码（退市、代码错误或区间内无交易）
+    empty: List[str] = field(default_factory=list)
+    failures: List[ChunkFailure] = field(default_factory=list)
+    requests: int = 0
+
+    @property
+    def failed_symbols(self) -> List[str]:
+        return [symbol for failure in self.failures for symbol in failure.symbols]
+
+
+class BulkDownloader:
+    """按分块批量下载行情
+
+    Args:
+        chunk_size: 每次请求的代码数，默认读取 BULK_DOWNLOAD_CHUNK_SIZE
+        min_interval: 相邻两次请求的最小间隔（秒）
+        downloader: (代码列表, 开始日期, 结束日期, 超时) -> 多级列索引的DataFrame，默认使用 yf.download
+        timeout: 单次请求超时（秒），受本次分析剩余时间限制
+    """
+
+    def __init__(self, chunk_size: int = None, min_interval: float = DEFAULT_MIN_INTERVAL,
+                 downloader: Callable[..., pd.DataFrame] = None, timeout: float = 60):
+        self.chunk_size = chunk_size or int(os.getenv("BULK_DOWNLOAD_CHUNK_SIZE", DEFAULT_CHUNK_SIZE))
+        self.min_interval = min_interval
+        self.downloader = downloader or yfinance_download
+        self.timeout = timeout
+        self._last_request = 0.0
+
+    def _wait_for_rate_limit(self):
+        wait = self.min_interval - (time.time() - self._last_request)
+        if wait > 0:
+            deadline_sleep(wait)
+        self._last_request = time.time()
+
+    def download(self, symbols: Sequence[str], start_date: str, end_date: str) -> BulkResult:
+        """下载全部代码，每个分块一次请求；失败的分块记录在 result.failures 中"""
+        result = BulkResult()
+        self._download_chunks(chunked(symbols, self.chunk_size), start_date, end_date, result, attempts=1)
+        logger.info(
+            f"📦 [批量下载] {len(result.data)}/{len(set(symbols))} 只股票成功，"
+            f"{result.requests} 次请求，{len(result.failures)} 个分块失败"
+        )
+        return result
+
+    def retry(self, result: BulkResult, start_date: str, end_date: str) -> BulkResult:
+        """逐个重试 result 中失败的分块，成功的数据合并进 result，仍失败的分块保留（尝试次数加一）"""
+        pending, result.failures = result.failures, []
+        for failure in pending:
+            self._download_chunks([failure.symbols], start_date, end_date, result, attempts=failure.attempts + 1)
+        return result
+
+    def _download_chunks(self, chunks: List[List[str]], start_date: str, end_date: str,
+                         result: BulkResult, attempts: int):
+        for position, chunk in enumerate(chunks):
+            try:
+                self._wait_for_rate_limit()
+                result.requests += 1
+                frame = self.downloader(chunk, start_date, end_date, budget_timeout(self.timeout))
+            except DeadlineExceeded as e:
+                # 剩余分块也记为失败，留待下次重试
+                logger.warning(f"⏱️ [批量下载] 停止: {e}")
+                for remaining in chunks[position:]:
+                    result.failures.append(ChunkFailure(remaining, str(e), attempts))
+                return
+            except Exception as e:
+                logger.error(f"❌ [批量下载] 分块失败 ({len(chunk)} 只: {chunk[0]}...): {e}")
+                result.failures.append(ChunkFailure(chunk, str(e), attempts))
+                continue
+
+            per_symbol = split_by_symbol(frame, chunk)
+            if not per_symbol:
+                # 整块都没有数据通常是被限流或请求失败（yfinance只记录错误不抛出），按失败处理
+                result.failures.append(ChunkFailure(chunk, "no data returned", attempts))
+                continue
+            result.data.update(per_symbol)
+            result.empty.extend(symbol for symbol in chunk if symbol not in per_symbol)
+
+
+def bulk_download(symbols: Sequence[str], start_date: str, end_date: str, retries: int = 1,
+                  downloader: Callable[..., pd.DataFrame] = None) -> BulkResult:
+    """批量下载并对失败的分块重试 retries 次"""
+    bulk = BulkDownloader(downloader=downloader)
+    result = bulk.download(symbols, start_date, end_date)
+    for _ in range(retries):
+        if not result.failures:
+            break
+        bulk.retry(result, start_date, end_date)
+    return result
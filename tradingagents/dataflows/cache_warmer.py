@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+开盘前缓存预热
+每天早上每只股票的第一次分析要承担全部冷数据获取（行情、基本面、新闻、名称），而这正是大家集中开始点击的时候。
+这里在开盘前为自选列表预热工具会用到的各类数据：按最近的分析次数排序优先预热常用股票，
+按数据源分道并发（同一数据源内按最小间隔串行，遵守限流），完成后报告覆盖率和新鲜度。
+
+效果指标是"首次分析缓存命中率"：缓存层记录每只股票每天第一次查询某类数据时是否命中，
+预热是否有效看的是这个比例。
+
+单独运行：python -m tradingagents.dataflows.cache_warmer [--tickers AAPL,000001] [--at 08:30]
+命令行子命令：python -m cli.main warm-cache
+"""
+
+import argparse
+import json
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.deadline import DeadlineExceeded, check_deadline, deadline_sleep, run_deadline
+logger = get_logger('agents')
+
+MARKET_A = 'A股'
+MARKET_HK = '港股'
+MARKET_US = '美股'
+
+# 各数据源相邻两次请求的最小间隔（秒）；Google新闻抓取自带每页2~6秒的随机等待
+DEFAULT_MIN_INTERVALS = {
+    'tdx': 0.5,
+    'yfinance': 1.0,
+    'google': 0.0,
+    'local': 0.0,
+}
+# 行情和新闻的预热区间（与分析工具的默认回看一致）
+BARS_LOOKBACK_DAYS = 30
+NEWS_LOOKBACK_DAYS = 7
+# 按最近多少天的分析次数排序
+USAGE_LOOKBACK_DAYS = 14
+
+
+# ---------------------------------------------------------------------------
+# 首次查询命中率
+# ---------------------------------------------------------------------------
+
+class LookupTracker:
+    """记录每只股票每天第一次查询某类数据时缓存是否命中"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._recorded = set()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS first_lookups (
+                    day TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    hit INTEGER NOT NULL,
+                    looked_up_at TEXT NOT NULL,
+                    PRIMARY KEY (day, kind, symbol)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS warm_runs (
+                    id INTEGER PRIMARY KEY,
+                    started_at TEXT NOT NULL,
+                    report TEXT NOT NULL
+                );
+                """
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def record(self, kind: str, symbol: str, hit: bool, now: datetime = None):
+        """只保留当天的第一次查询（之后的查询在进程内直接跳过，不再访问数据库）"""
+        now = now or datetime.now()
+        key = (now.strftime('%Y-%m-%d'), kind, str(symbol).upper())
+        if key in self._recorded:
+            return
+        with self._lock:
+            if key in self._recorded:
+                return
+            self._recorded.add(key)
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR IGNORE INTO first_lookups (day, kind, symbol, hit, looked_up_at) VALUES (?, ?, ?, ?, ?)",
+                    (*key, int(hit), now.isoformat()),
+                )
+                conn.commit()
+
+    def hit_rate(self, day: str) -> Dict[str, Dict[str, float]]:
+        """某天首次查询的命中情况：{数据类型: {hits, lookups, rate}}，'all' 为合计"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT kind, SUM(hit), COUNT(*) FROM first_lookups WHERE day = ? GROUP BY kind", (day,)
+            ).fetchall()
+        result = {kind: {'hits': hits, 'lookups': total, 'rate': hits / total} for kind, hits, total in rows}
+        hits = sum(item['hits'] for item in result.values())
+        total = sum(item['lookups'] for item in result.values())
+        result['all'] = {'hits': hits, 'lookups': total, 'rate': hits / total if total else 0.0}
+        return result
+
+    def save_report(self, report: 'WarmupReport'):
+        with self._connect() as conn:
+            conn.execute("INSERT INTO warm_runs (started_at, report) VALUES (?, ?)",
+                         (report.started_at, json.dumps(report.to_dict(), ensure_ascii=False)))
+            conn.commit()
+
+
+# 预热线程内的查询不计入首次查询（否则预热本身的未命中会被记为当天的首次查询）
+_warming = contextvars.ContextVar('cache_warming', default=False)
+
+_tracker: Optional[LookupTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_lookup_tracker() -> LookupTracker:
+    """进程内共享的记录器，路径默认为 data_cache_dir/cache_warmup.sqlite3"""
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                from .config import get_config
+                path = os.getenv("WARMUP_DB_PATH") or os.path.join(
+                    get_config()["data_cache_dir"], "cache_warmup.sqlite3"
+                )
+                _tracker = LookupTracker(path)
+    return _tracker
+
+
+def record_first_lookup(kind: str, symbol: str, hit: bool):
+    """缓存层调用：记录一次查询（只有当天第一次会写入）。记录失败不影响查询本身"""
+    if _warming.get() or os.getenv("WARMUP_TRACK_LOOKUPS", "true").lower() != "true":
+        return
+    try:
+        get_lookup_tracker().record(kind, symbol, hit)
+    except Exception as e:
+        logger.debug(f"🔥 [缓存预热] 记录首次查询失败: {e}")
+
+
+# ---------------------------------------------------------------------------
+# 各类数据的预热函数
+# ---------------------------------------------------------------------------
+
+def _window(trade_date: str, days: int):
+    end = datetime.strptime(trade_date, '%Y-%m-%d')
+    return (end - timedelta(days=days)).strftime('%Y-%m-%d'), trade_date
+
+
+def _check_text(result: str):
+    """数据层失败时多数返回带 ❌ 的文本而不抛异常"""
+    if not result or '❌' in result:
+        raise RuntimeError((result or 'empty result').strip().splitlines()[0][:200])
+
+
+def _warm_names(tickers: List[str], trade_date: str) -> Dict[str, Optional[str]]:
+    from .symbol_master import get_symbol_master
+    names = get_symbol_master().names(tickers)
+    return {ticker: None if name else 'unknown symbol' for ticker, name in names.items()}
+
+
+def _warm_china_bars(ticker: str, trade_date: str):
+    from .optimized_china_data import get_china_stock_data_cached
+    _check_text(get_china_stock_data_cached(ticker, *_window(trade_date, BARS_LOOKBACK_DAYS)))
+
+
+def _warm_china_fundamentals(ticker: str, trade_date: str):
+    from .optimized_china_data import get_china_fundamentals_cached
+    _check_text(get_china_fundamentals_cached(ticker))
+
+
+def _warm_us_bars(tickers: List[str], trade_date: str) -> Dict[str, Optional[str]]:
+    from .optimized_us_data import get_optimized_us_data_provider
+    result = get_optimized_us_data_provider().prefetch_stock_data(tickers, *_window(trade_date, BARS_LOOKBACK_DAYS))
+    errors = {symbol: failure.error for failure in result.failures for symbol in failure.symbols}
+    errors.update((symbol, 'no data') for symbol in result.empty)
+    return {ticker: errors.get(ticker.upper()) for ticker in tickers}
+
+
+def _warm_google_news(ticker: str, trade_date: str):
+    from .google_news_cache import get_google_news_cache
+    # 与 get_stock_news_unified 使用的中文新闻查询一致
+    query = f"{ticker} 股票" if _market_of(ticker) == MARKET_A else f"{ticker} 港股"
+    get_google_news_cache().fetch(query, *_window(trade_date, NEWS_LOOKBACK_DAYS))
+
+
+def _warm_finnhub_news(ticker: str, trade_date: str):
+    from .config import get_data_dir
+    from .finnhub_utils import get_data_in_range
+    # 首次读取时把离线数据集转换为按日期索引的存储文件
+    get_data_in_range(ticker, *_window(trade_date, NEWS_LOOKBACK_DAYS), "news_data", get_data_dir())
+
+
+@dataclass(frozen=True)
+class Warmer:
+    """一类数据在某些市场上的预热方式
+
+    batch 为True时 fn(tickers, trade_date) 一次处理全部股票并返回 {股票: 错误或None}；
+    否则 fn(ticker, trade_date) 逐只调用，抛出异常表示失败
+    """
+    kind: str
+    markets: frozenset
+    provider: str
+    fn: Callable
+    batch: bool = False
+
+
+ALL_MARKETS = frozenset({MARKET_A, MARKET_HK, MARKET_US})
+
+WARMERS: List[Warmer] = [
+    Warmer('names', ALL_MARKETS, 'local', _warm_names, batch=True),
+    Warmer('bars', frozenset({MARKET_A}), 'tdx', _warm_china_bars),
+    Warmer('bars', frozenset({MARKET_US}), 'yfinance', _warm_us_bars, batch=True),
+    Warmer('fundamentals', frozenset({MARKET_A}), 'tdx', _warm_china_fundamentals),
+    Warmer('news', frozenset({MARKET_A, MARKET_HK}), 'google', _warm_google_news),
+    Warmer('news', frozenset({MARKET_US}), 'local', _warm_finnhub_news),
+]
+# 报告覆盖率时考虑的数据类型（没有对应预热方式的组合记为 unsupported）
+KINDS = ('names', 'bars', 'fundamentals', 'news')
+
+
+def _market_of(ticker: str) -> str:
+    from tradingagents.utils.stock_utils import StockUtils
+    info = StockUtils.get_market_info(ticker)
+    if info['is_china']:
+        return MARKET_A
+    if info['is_hk']:
+        return MARKET_HK
+    return MARKET_US
+
+
+# ---------------------------------------------------------------------------
+# 预热执行
+# ---------------------------------------------------------------------------
+
+@dataclass
+class WarmTaskResult:
+    ticker: str
+    kind: str
+    market: str
+    status: str  # ok | failed | skipped | unsupported
+    error: str = ''
+    warmed_at: str = ''
+
+
+@dataclass
+class WarmupReport:
+    """一次预热的结果：覆盖率按数据类型统计，新鲜度为数据截止日期和完成时间"""
+    trade_date: str
+    started_at: str
+    finished_at: str = ''
+    tickers: List[str] = field(default_factory=list)
+    results: List[WarmTaskResult] = field(default_factory=list)
+
+    def coverage(self) -> Dict[str, Dict[str, int]]:
+        """{数据类型: {ok, failed, skipped, unsupported}}，'all' 为合计"""
+        result: Dict[str, Dict[str, int]] = {}
+        for item in self.results:
+            counts = result.setdefault(item.kind, Counter())
+            counts[item.status] += 1
+        result['all'] = sum(result.values(), Counter())
+        return {kind: {status: counts.get(status, 0) for status in ('ok', 'failed', 'skipped', 'unsupported')}
+                for kind, counts in result.items()}
+
+    @property
+    def coverage_rate(self) -> float:
+        """成功预热的比例（只计有预热方式的股票和数据类型）"""
+        counts = self.coverage()['all']
+        supported = counts['ok'] + counts['failed'] + counts['skipped']
+        return counts['ok'] / supported if supported else 0.0
+
+    def oldest_warm_age(self, now: datetime = None) -> Optional[float]:
+        """最早完成的预热距今的秒数（数据相对开盘的陈旧程度）"""
+        times = [datetime.fromisoformat(item.warmed_at) for item in self.results if item.warmed_at]
+        if not times:
+            return None
+        return ((now or datetime.now()) - min(times)).total_seconds()
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), 'coverage': self.coverage(), 'coverage_rate': self.coverage_rate}
+
+    def summary(self) -> str:
+        lines = [f"🔥 缓存预热 {self.trade_date}: {len(self.tickers)} 只股票，覆盖率 {self.coverage_rate:.0%}"]
+        for kind, counts in self.coverage().items():
+            if kind != 'all':
+                lines.append(f"  - {kind}: 成功 {counts['ok']}，失败 {counts['failed']}，"
+                             f"跳过 {counts['skipped']}，不支持 {counts['unsupported']}")
+        lines.append(f"  数据截止 {self.trade_date}，完成于 {self.finished_at}")
+        return "\n".join(lines)
+
+
+def usage_priority(tickers: Sequence[str], days: int = USAGE_LOOKBACK_DAYS, store=None,
+                   now: datetime = None) -> List[str]:
+    """按最近 days 天的分析次数（次数相同时按最近一次分析时间）降序排列，未分析过的保持原顺序排在最后"""
+    if store is None:
+        try:
+            from tradingagents.default_config import DEFAULT_CONFIG
+            from tradingagents.graph.result_store import create_result_store
+            store = create_result_store(DEFAULT_CONFIG)
+        except Exception as e:
+            logger.warning(f"⚠️ [缓存预热] 无法读取分析记录，按自选列表顺序预热: {e}")
+            return list(dict.fromkeys(tickers))
+
+    since = ((now or datetime.now()) - timedelta(days=days)).strftime('%Y-%m-%d')
+    counts: Counter = Counter()
+    last_used: Dict[str, float] = {}
+    cursor = None
+    while True:
+        page = store.query(date_from=since, limit=200, cursor=cursor)
+        for item in page.items:
+            ticker = str(item['ticker']).upper()
+            counts[ticker] += 1
+            last_used[ticker] = max(last_used.get(ticker, 0.0), float(item.get('created_at') or 0.0))
+        cursor = page.next_cursor
+        if not cursor:
+            break
+
+    ordered = list(dict.fromkeys(tickers))
+    position = {ticker: i for i, ticker in enumerate(ordered)}
+    return sorted(ordered, key=lambda t: (-counts[t.upper()], -last_used.get(t.upper(), 0.0), position[t]))
+
+
+class _RateLimiter:
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._last = 0.0
+
+    def wait(self):
+        delay = self.min_interval - (time.time() - self._last)
+        if delay > 0:
+            deadline_sleep(delay)
+        self._last = time.time()
+
+
+class CacheWarmer:
+    """为自选列表预热各类数据
+
+    Args:
+        tickers: 自选股票列表
+        warmers: 预热方式，默认 WARMERS
+        min_intervals: 各数据源的最小请求间隔（秒），默认 DEFAULT_MIN_INTERVALS
+        budget_seconds: 本次预热的总时间上限（如开盘前剩余时间），超时后未完成的任务记为 skipped
+        prioritize: 是否按最近的分析次数排序
+    """
+
+    def __init__(self, tickers: Sequence[str], warmers: Sequence[Warmer] = None,
+                 min_intervals: Dict[str, float] = None, budget_seconds: float = None,
+                 prioritize: bool = True, usage_store=None):
+        self.tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+        self.warmers = list(WARMERS if warmers is None else warmers)
+        self.min_intervals = {**DEFAULT_MIN_INTERVALS, **(min_intervals or {})}
+        self.budget_seconds = budget_seconds
+        self.prioritize = prioritize
+        self.usage_store = usage_store
+
+    def plan(self, markets: Dict[str, str]) -> Dict[str, List[tuple]]:
+        """按数据源分道的任务：{数据源: [(预热方式, [股票...]), ...]}，股票按优先级排列"""
+        lanes: Dict[str, List[tuple]] = {}
+        for warmer in self.warmers:
+            tickers = [t for t in self.tickers if markets[t] in warmer.markets]
+            if not tickers:
+                continue
+            batches = [tickers] if warmer.batch else [[t] for t in tickers]
+            lanes.setdefault(warmer.provider, []).extend((warmer, batch) for batch in batches)
+        # 每条道内按股票优先级交错执行，优先让最常用的股票先完成所有数据类型
+        rank = {ticker: i for i, ticker in enumerate(self.tickers)}
+        for tasks in lanes.values():
+            tasks.sort(key=lambda task: min(rank[t] for t in task[1]))
+        return lanes
+
+    def run(self, trade_date: str = None) -> WarmupReport:
+        trade_date = trade_date or datetime.now().strftime('%Y-%m-%d')
+        if self.prioritize:
+            self.tickers = usage_priority(self.tickers, store=self.usage_store)
+        report = WarmupReport(trade_date=trade_date, started_at=datetime.now().isoformat(), tickers=list(self.tickers))
+        markets = {ticker: _market_of(ticker) for ticker in self.tickers}
+        lanes = self.plan(markets)
+        logger.info(f"🔥 [缓存预热] 开始: {len(self.tickers)} 只股票，{sum(len(t) for t in lanes.values())} 个任务，"
+                    f"数据源 {list(lanes)}")
+
+        results: List[WarmTaskResult] = []
+        results_lock = threading.Lock()
+
+        def run_lane(provider: str, tasks: List[tuple]):
+            _warming.set(True)
+            limiter = _RateLimiter(self.min_intervals.get(provider, 0.0))
+            for position, (warmer, batch) in enumerate(tasks):
+                try:
+                    check_deadline()
+                    limiter.wait()
+                    outcome = self._execute(warmer, batch, trade_date)
+                except DeadlineExceeded as e:
+                    logger.warning(f"⏱️ [缓存预热] {provider} 数据源停止: {e}")
+                    skipped = [WarmTaskResult(t, w.kind, markets[t], 'skipped', str(e))
+                               for w, b in tasks[position:] for t in b]
+                    with results_lock:
+                        results.extend(skipped)
+                    return
+                warmed_at = datetime.now().isoformat()
+                with results_lock:
+                    results.extend(
+                        WarmTaskResult(t, warmer.kind, markets[t], 'failed' if error else 'ok',
+                                       error or '', '' if error else warmed_at)
+                        for t, error in outcome.items()
+                    )
+
+        with run_deadline(self.budget_seconds):
+            if lanes:
+                with ThreadPoolExecutor(max_workers=len(lanes), thread_name_prefix="cache-warmer") as executor:
+                    futures = [
+                        executor.submit(contextvars.copy_context().run, run_lane, provider, tasks)
+                        for provider, tasks in lanes.items()
+                    ]
+                    for future in futures:
+                        future.result()
+
+        covered = {(item.ticker, item.kind) for item in results}
+        for ticker in self.tickers:
+            for kind in KINDS:
+                if (ticker, kind) not in covered:
+                    results.append(WarmTaskResult(ticker, kind, markets[ticker], 'unsupported'))
+        rank = {ticker: i for i, ticker in enumerate(self.tickers)}
+        report.results = sorted(results, key=lambda item: (rank[item.ticker], KINDS.index(item.kind)
+                                                           if item.kind in KINDS else len(KINDS)))
+        report.finished_at = datetime.now().isoformat()
+        logger.info(report.summary())
+        return report
+
+    @staticmethod
+    def _execute(warmer: Warmer, batch: List[str], trade_date: str) -> Dict[str, Optional[str]]:
+        if warmer.batch:
+            try:
+                return warmer.fn(batch, trade_date)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                logger.error(f"❌ [缓存预热] {warmer.kind} 批量预热失败: {e}")
+                return {ticker: str(e) for ticker in batch}
+        ticker = batch[0]
+        try:
+            warmer.fn(ticker, trade_date)
+            return {ticker: None}
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ [缓存预热] {ticker} {warmer.kind} 预热失败: {e}")
+            return {ticker: str(e) or type(e).__name__}
+
+
+# ---------------------------------------------------------------------------
+# 自选列表和定时运行
+# ---------------------------------------------------------------------------
+
+def load_watchlist(tickers: Iterable[str] = None, path: str = None) -> List[str]:
+    """自选列表：显式传入的股票 > 文件（每行一个，# 开头为注释）> WARMUP_WATCHLIST（逗号分隔）"""
+    if tickers:
+        return [t.strip() for t in tickers if t.strip()]
+    path = path or os.getenv("WARMUP_WATCHLIST_FILE")
+    if path and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return [line.split('#')[0].strip() for line in f if line.split('#')[0].strip()]
+    return [t.strip() for t in os.getenv("WARMUP_WATCHLIST", "").split(",") if t.strip()]
+
+
+def next_run_time(at: str, now: datetime = None, weekdays_only: bool = True) -> datetime:
+    """下一次运行时间（HH:MM）；默认跳过周末"""
+    now = now or datetime.now()
+    hour, minute = (int(part) for part in at.split(':'))
+    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate <= now:
+        candidate += timedelta(days=1)
+    while weekdays_only and candidate.weekday() >= 5:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+def warm_once(tickers: Sequence[str], budget_seconds: float = None, trade_date: str = None) -> WarmupReport:
+    """预热一次并保存报告"""
+    report = CacheWarmer(tickers, budget_seconds=budget_seconds).run(trade_date)
+    try:
+        get_lookup_tracker().save_report(report)
+    except Exception as e:
+        logger.warning(f"⚠️ [缓存预热] 保存报告失败: {e}")
+    return report
+
+
+def run_scheduler(at: str, tickers: Sequence[str] = None, watchlist_path: str = None,
+                  budget_seconds: float = None, stop_event: threading.Event = None):
+    """常驻运行：每个工作日在 at 时刻预热（每次重新读取自选列表）"""
+    stop_event = stop_event or threading.Event()
+    while not stop_event.is_set():
+        run_at = next_run_time(at)
+        logger.info(f"🔥 [缓存预热] 下次预热: {run_at:%Y-%m-%d %H:%M}")
+        if stop_event.wait((run_at - datetime.now()).total_seconds()):
+            break
+        watchlist = load_watchlist(tickers, watchlist_path)
+        if not watchlist:
+            logger.warning("⚠️ [缓存预热] 自选列表为空，跳过")
+            continue
+        warm_once(watchlist, budget_seconds)
+
+
+def main(argv: Sequence[str] = None):
+    parser = argparse.ArgumentParser(description="开盘前为自选列表预热数据缓存")
+    parser.add_argument("--tickers", help="逗号分隔的股票代码（默认读取 WARMUP_WATCHLIST_FILE 或 WARMUP_WATCHLIST）")
+    parser.add_argument("--watchlist", help="自选列表文件，每行一个代码")
+    parser.add_argument("--at", default=None, help="常驻运行，每个工作日在该时刻（HH:MM）预热；不指定时只运行一次")
+    parser.add_argument("--budget-minutes", type=float, default=None, help="单次预热的时间上限（分钟）")
+    parser.add_argument("--date", default=None, help="交易日期 YYYY-MM-DD（默认今天）")
+    parser.add_argument("--report", action="store_true", help="只显示该日期首次分析的缓存命中率")
+    args = parser.parse_args(argv)
+
+    if args.report:
+        day = args.date or datetime.now().strftime('%Y-%m-%d')
+        for kind, item in get_lookup_tracker().hit_rate(day).items():
+            print(f"{kind}: {item['hits']}/{item['lookups']} ({item['rate']:.0%})")
+        return
+
+    tickers = args.tickers.split(",") if args.tickers else None
+    budget = args.budget_minutes * 60 if args.budget_minutes else None
+    if args.at:
+        run_scheduler(args.at, tickers, args.watchlist, budget)
+        return
+    watchlist = load_watchlist(tickers, args.watchlist)
+    if not watchlist:
+        parser.error("自选列表为空：请指定 --tickers、--watchlist 或设置 WARMUP_WATCHLIST")
+    print(warm_once(watchlist, budget, args.date).summary())
+
+
+if __name__ == "__main__":
+    main()
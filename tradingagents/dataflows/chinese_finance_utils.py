@@ -188,16 +188,10 @@ class ChineseFinanceDataAggregator:
     
     def _get_company_chinese_name(self, ticker: str) -> Optional[str]:
         """Get company Chinese name"""
-        # Simple mapping, can be obtained from database or API
-        name_mapping = {
-            'AAPL': 'Apple',
-            'TSLA': 'Tesla',
-            'NVDA': 'NVIDIA',
-            'MSFT': 'Microsoft',
-            'GOOGL': 'Google',
-            'AMZN': 'Amazon'
-        }
-        return name_mapping.get(ticker.upper())
+        # Resolved from the process-wide symbol master (US tickers carry their English name)
+        from .symbol_master import get_symbol_master
+        symbol = get_symbol_master().get(ticker)
+        return symbol.english_name if symbol and symbol.english_name else None
     
     def _calculate_overall_sentiment(self, news_sentiment: Dict, forum_sentiment: Dict, media_sentiment: Dict) -> Dict:
         """Calculate comprehensive sentiment analysis"""
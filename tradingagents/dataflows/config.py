@@ -1,4 +1,6 @@
 import tradingagents.default_config as default_config
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Dict, Optional
 from tradingagents.config.config_manager import config_manager
 
@@ -6,6 +8,10 @@ from tradingagents.config.config_manager import config_manager
 _config: Optional[Dict] = None
 DATA_DIR: Optional[str] = None
 
+# 当前分析运行的配置：按上下文隔离，同一进程内并发的分析互不覆盖。
+# 线程池/LangGraph节点通过 contextvars 复制上下文继承该配置，未绑定时使用进程默认配置
+_run_config: ContextVar[Optional[Dict]] = ContextVar("tradingagents_run_config", default=None)
+
 
 def initialize_config():
     """Initialize the configuration with default values."""
@@ -39,8 +45,34 @@ def set_config(config: Dict):
         config_manager.set_data_dir(config["data_dir"])
 
 
+@contextmanager
+def use_config(config: Dict):
+    """Bind a run's configuration to the current context.
+
+    Inside the block (and in threads/tasks started from it with a copied
+    context) ``get_config`` returns the process defaults overlaid with
+    ``config``; the process-wide defaults are left untouched.
+    """
+    if _config is None:
+        initialize_config()
+    run_config = {**_config, **config}
+    token = _run_config.set(run_config)
+    try:
+        yield run_config
+    finally:
+        try:
+            _run_config.reset(token)
+        except ValueError:
+            # 生成器在其他上下文中被关闭时无法还原，直接清除
+            _run_config.set(None)
+
+
 def get_config() -> Dict:
-    """Get the current configuration."""
+    """Get the current configuration (the bound run config, else the defaults)."""
+    run_config = _run_config.get()
+    if run_config is not None:
+        return run_config.copy()
+
     if _config is None:
         initialize_config()
 
@@ -59,7 +91,10 @@ def get_config() -> Dict:
 
 
 def get_data_dir() -> str:
-    """获取数据目录路径"""
+    """获取数据目录路径（当前运行配置优先）"""
+    run_config = _run_config.get()
+    if run_config is not None and run_config.get("data_dir"):
+        return run_config["data_dir"]
     return config_manager.get_data_dir()
 
 
@@ -4,6 +4,7 @@
 统一管理中国股票数据源的选择和切换，支持Tushare、AKShare、BaoStock等
 """
 
+import functools
 import os
 import time
 from typing import Dict, List, Optional, Any
@@ -19,6 +20,8 @@ warnings.filterwarnings('ignore')
 from tradingagents.utils.logging_init import setup_dataflow_logging
 logger = setup_dataflow_logging()
 
+from .source_router import FetchResult, FetchStatus, HedgedRouter, router_settings
+
 
 class ChinaDataSource(Enum):
     """中国股票数据源枚举"""
@@ -36,6 +39,7 @@ class DataSourceManager:
         self.default_source = self._get_default_source()
         self.available_sources = self._check_available_sources()
         self.current_source = self.default_source
+        self._router = None
         
         logger.info(f"📊 数据源管理器初始化完成")
         logger.info(f"   默认数据源: {self.default_source.value}")
@@ -162,6 +166,23 @@ class DataSourceManager:
             logger.error(f"❌ TDX适配器导入失败: {e}")
             return None
     
+    @property
+    def router(self) -> HedgedRouter:
+        """可用数据源之间的对冲路由（首次使用时创建）"""
+        if self._router is None:
+            sources = {source.value: functools.partial(self._fetch_source, source)
+                       for source in self.available_sources}
+            self._router = HedgedRouter(sources, **router_settings())
+        return self._router
+
+    def get_stock_data_result(self, symbol: str, start_date: str = None, end_date: str = None) -> FetchResult:
+        """获取股票数据，返回带状态和数据来源的结果
+
+        当前数据源优先；它超过自身p95延迟仍未返回时同时请求下一个数据源，失败时立即切换，
+        连续失败的数据源在冷却期内被跳过
+        """
+        return self.router.fetch(symbol, start_date, end_date, preferred=self.current_source.value)
+
     def get_stock_data(self, symbol: str, start_date: str = None, end_date: str = None) -> str:
         """
         获取股票数据的统一接口
@@ -174,7 +195,6 @@ class DataSourceManager:
         Returns:
             str: 格式化的股票数据
         """
-        # 记录详细的输入参数
         logger.info(f"📊 [数据获取] 开始获取股票数据",
                    extra={
                        'symbol': symbol,
@@ -184,216 +204,76 @@ class DataSourceManager:
                        'event_type': 'data_fetch_start'
                    })
 
-        # 添加详细的股票代码追踪日志
-        logger.info(f"🔍 [股票代码追踪] DataSourceManager.get_stock_data 接收到的股票代码: '{symbol}' (类型: {type(symbol)})")
-        logger.info(f"🔍 [股票代码追踪] 股票代码长度: {len(str(symbol))}")
-        logger.info(f"🔍 [股票代码追踪] 股票代码字符: {list(str(symbol))}")
-        logger.info(f"🔍 [股票代码追踪] 当前数据源: {self.current_source.value}")
-
-        start_time = time.time()
-
-        try:
-            # 根据数据源调用相应的获取方法
-            if self.current_source == ChinaDataSource.TUSHARE:
-                logger.info(f"🔍 [股票代码追踪] 调用 Tushare 数据源，传入参数: symbol='{symbol}'")
-                result = self._get_tushare_data(symbol, start_date, end_date)
-            elif self.current_source == ChinaDataSource.AKSHARE:
-                result = self._get_akshare_data(symbol, start_date, end_date)
-            elif self.current_source == ChinaDataSource.BAOSTOCK:
-                result = self._get_baostock_data(symbol, start_date, end_date)
-            elif self.current_source == ChinaDataSource.TDX:
-                result = self._get_tdx_data(symbol, start_date, end_date)
-            else:
-                result = f"❌ 不支持的数据源: {self.current_source.value}"
-
-            # 记录详细的输出结果
-            duration = time.time() - start_time
-            result_length = len(result) if result else 0
-            is_success = result and "❌" not in result and "错误" not in result
-
-            if is_success:
-                logger.info(f"✅ [数据获取] 成功获取股票数据",
-                           extra={
-                               'symbol': symbol,
-                               'start_date': start_date,
-                               'end_date': end_date,
-                               'data_source': self.current_source.value,
-                               'duration': duration,
-                               'result_length': result_length,
-                               'result_preview': result[:200] + '...' if result_length > 200 else result,
-                               'event_type': 'data_fetch_success'
-                           })
-                return result
-            else:
-                logger.warning(f"⚠️ [数据获取] 数据质量异常，尝试降级到其他数据源",
-                              extra={
-                                  'symbol': symbol,
-                                  'start_date': start_date,
-                                  'end_date': end_date,
-                                  'data_source': self.current_source.value,
-                                  'duration': duration,
-                                  'result_length': result_length,
-                                  'result_preview': result[:200] + '...' if result_length > 200 else result,
-                                  'event_type': 'data_fetch_warning'
-                              })
-
-                # 数据质量异常时也尝试降级到其他数据源
-                fallback_result = self._try_fallback_sources(symbol, start_date, end_date)
-                if fallback_result and "❌" not in fallback_result and "错误" not in fallback_result:
-                    logger.info(f"✅ [数据获取] 降级成功获取数据")
-                    return fallback_result
-                else:
-                    logger.error(f"❌ [数据获取] 所有数据源都无法获取有效数据")
-                    return result  # 返回原始结果（包含错误信息）
-
-        except Exception as e:
-            duration = time.time() - start_time
-            logger.error(f"❌ [数据获取] 异常失败: {e}",
+        result = self.get_stock_data_result(symbol, start_date, end_date)
+        if not result.ok:
+            logger.error(f"❌ [数据获取] 所有数据源都无法获取有效数据",
                         extra={
                             'symbol': symbol,
-                            'start_date': start_date,
-                            'end_date': end_date,
-                            'data_source': self.current_source.value,
-                            'duration': duration,
-                            'error': str(e),
-                            'event_type': 'data_fetch_exception'
-                        }, exc_info=True)
-            return self._try_fallback_sources(symbol, start_date, end_date)
-    
-    def _get_tushare_data(self, symbol: str, start_date: str, end_date: str) -> str:
-        """使用Tushare获取数据"""
-        logger.debug(f"📊 [Tushare] 调用参数: symbol={symbol}, start_date={start_date}, end_date={end_date}")
-
-        # 添加详细的股票代码追踪日志
-        logger.info(f"🔍 [股票代码追踪] _get_tushare_data 接收到的股票代码: '{symbol}' (类型: {type(symbol)})")
-        logger.info(f"🔍 [股票代码追踪] 股票代码长度: {len(str(symbol))}")
-        logger.info(f"🔍 [股票代码追踪] 股票代码字符: {list(str(symbol))}")
-        logger.info(f"🔍 [DataSourceManager详细日志] _get_tushare_data 开始执行")
-        logger.info(f"🔍 [DataSourceManager详细日志] 当前数据源: {self.current_source.value}")
-
-        start_time = time.time()
-        try:
-            from .interface import get_china_stock_data_tushare
-            logger.info(f"🔍 [股票代码追踪] 调用 get_china_stock_data_tushare，传入参数: symbol='{symbol}'")
-            logger.info(f"🔍 [DataSourceManager详细日志] 开始调用interface.get_china_stock_data_tushare...")
-
-            result = get_china_stock_data_tushare(symbol, start_date, end_date)
-
-            duration = time.time() - start_time
-            logger.info(f"🔍 [DataSourceManager详细日志] interface调用完成，耗时: {duration:.3f}秒")
-            logger.info(f"🔍 [股票代码追踪] get_china_stock_data_tushare 返回结果前200字符: {result[:200] if result else 'None'}")
-            logger.info(f"🔍 [DataSourceManager详细日志] 返回结果类型: {type(result)}")
-            logger.info(f"🔍 [DataSourceManager详细日志] 返回结果长度: {len(result) if result else 0}")
-
-            logger.debug(f"📊 [Tushare] 调用完成: 耗时={duration:.2f}s, 结果长度={len(result) if result else 0}")
+                            'data_source': result.source,
+                            'status': result.status.value,
+                            'error': result.error,
+                            'event_type': 'data_fetch_failed'
+                        })
+            reason = f": {result.error}" if result.error else ""
+            return f"❌ 所有数据源都无法获取{symbol}的数据 ({result.source} {result.status.value}{reason})"
+
+        text = self._format_stock_data(symbol, start_date, end_date, result)
+        logger.info(f"✅ [数据获取] 成功获取股票数据",
+                   extra={
+                       'symbol': symbol,
+                       'start_date': start_date,
+                       'end_date': end_date,
+                       'data_source': result.source,
+                       'duration': result.latency,
+                       'result_length': len(text),
+                       'event_type': 'data_fetch_success'
+                   })
+        return text
 
-            return result
-        except Exception as e:
-            duration = time.time() - start_time
-            logger.error(f"❌ [Tushare] 调用失败: {e}, 耗时={duration:.2f}s", exc_info=True)
-            logger.error(f"❌ [DataSourceManager详细日志] 异常类型: {type(e).__name__}")
-            logger.error(f"❌ [DataSourceManager详细日志] 异常信息: {str(e)}")
-            import traceback
-            logger.error(f"❌ [DataSourceManager详细日志] 异常堆栈: {traceback.format_exc()}")
-            raise
-    
-    def _get_akshare_data(self, symbol: str, start_date: str, end_date: str) -> str:
-        """使用AKShare获取数据"""
-        logger.debug(f"📊 [AKShare] 调用参数: symbol={symbol}, start_date={start_date}, end_date={end_date}")
+    def _fetch_source(self, source: ChinaDataSource, symbol: str, start_date: str, end_date: str):
+        """从单个数据源获取行情，返回 DataFrame（或 FetchResult）；失败时抛出异常
 
-        start_time = time.time()
-        try:
-            # 这里需要实现AKShare的统一接口
+        适配器默认吞掉异常返回空结果，这里要求其抛出，使故障和超时计入熔断器与错误率统计
+        """
+        if source == ChinaDataSource.TUSHARE:
+            from .tushare_adapter import get_tushare_adapter
+            return get_tushare_adapter().get_stock_data(symbol, start_date, end_date, raise_errors=True)
+        elif source == ChinaDataSource.AKSHARE:
             from .akshare_utils import get_akshare_provider
-            provider = get_akshare_provider()
-            data = provider.get_stock_data(symbol, start_date, end_date)
-
-            duration = time.time() - start_time
-
-            if data is not None and not data.empty:
-                result = f"股票代码: {symbol}\n"
-                result += f"数据期间: {start_date} 至 {end_date}\n"
-                result += f"数据条数: {len(data)}条\n\n"
-                result += "最新数据:\n"
-                result += data.tail(5).to_string(index=False)
-
-                logger.debug(f"📊 [AKShare] 调用成功: 耗时={duration:.2f}s, 数据条数={len(data)}, 结果长度={len(result)}")
-                return result
-            else:
-                result = f"❌ 未能获取{symbol}的股票数据"
-                logger.warning(f"⚠️ [AKShare] 数据为空: 耗时={duration:.2f}s")
-                return result
-
-        except Exception as e:
-            duration = time.time() - start_time
-            logger.error(f"❌ [AKShare] 调用失败: {e}, 耗时={duration:.2f}s", exc_info=True)
-            return f"❌ AKShare获取{symbol}数据失败: {e}"
-    
-    def _get_baostock_data(self, symbol: str, start_date: str, end_date: str) -> str:
-        """使用BaoStock获取数据"""
-        # 这里需要实现BaoStock的统一接口
-        from .baostock_utils import get_baostock_provider
-        provider = get_baostock_provider()
-        data = provider.get_stock_data(symbol, start_date, end_date)
-        
-        if data is not None and not data.empty:
-            result = f"股票代码: {symbol}\n"
-            result += f"数据期间: {start_date} 至 {end_date}\n"
-            result += f"数据条数: {len(data)}条\n\n"
-            result += "最新数据:\n"
-            result += data.tail(5).to_string(index=False)
-            return result
-        else:
-            return f"❌ 未能获取{symbol}的股票数据"
-    
-    def _get_tdx_data(self, symbol: str, start_date: str, end_date: str) -> str:
-        """使用TDX获取数据 (已弃用)"""
-        logger.warning(f"⚠️ 警告: 正在使用已弃用的TDX数据源")
-        from .tdx_utils import get_china_stock_data
-        return get_china_stock_data(symbol, start_date, end_date)
-    
-    def _try_fallback_sources(self, symbol: str, start_date: str, end_date: str) -> str:
-        """尝试备用数据源 - 避免递归调用"""
-        logger.error(f"🔄 {self.current_source.value}失败，尝试备用数据源...")
-
-        # 备用数据源优先级: Tushare > AKShare > BaoStock > TDX
-        fallback_order = [
-            ChinaDataSource.TUSHARE,
-            ChinaDataSource.AKSHARE,
-            ChinaDataSource.BAOSTOCK,
-            ChinaDataSource.TDX
-        ]
-
-        for source in fallback_order:
-            if source != self.current_source and source in self.available_sources:
-                try:
-                    logger.info(f"🔄 尝试备用数据源: {source.value}")
-
-                    # 直接调用具体的数据源方法，避免递归
-                    if source == ChinaDataSource.TUSHARE:
-                        result = self._get_tushare_data(symbol, start_date, end_date)
-                    elif source == ChinaDataSource.AKSHARE:
-                        result = self._get_akshare_data(symbol, start_date, end_date)
-                    elif source == ChinaDataSource.BAOSTOCK:
-                        result = self._get_baostock_data(symbol, start_date, end_date)
-                    elif source == ChinaDataSource.TDX:
-                        result = self._get_tdx_data(symbol, start_date, end_date)
-                    else:
-                        logger.warning(f"⚠️ 未知数据源: {source.value}")
-                        continue
-
-                    if "❌" not in result:
-                        logger.info(f"✅ 备用数据源{source.value}获取成功")
-                        return result
-                    else:
-                        logger.warning(f"⚠️ 备用数据源{source.value}返回错误结果")
+            return get_akshare_provider().get_stock_data(symbol, start_date, end_date, raise_errors=True)
+        elif source == ChinaDataSource.BAOSTOCK:
+            from .baostock_utils import get_baostock_provider
+            return get_baostock_provider().get_stock_data(symbol, start_date, end_date)
+        elif source == ChinaDataSource.TDX:
+            # TDX只提供格式化文本 (已弃用)
+            logger.warning(f"⚠️ 警告: 正在使用已弃用的TDX数据源")
+            from .tdx_utils import get_china_stock_data
+            text = get_china_stock_data(symbol, start_date, end_date)
+            if not text or text.startswith("❌"):
+                return FetchResult(source.value, FetchStatus.ERROR, error=text)
+            return FetchResult(source.value, FetchStatus.OK, text=text)
+        raise ValueError(f"不支持的数据源: {source.value}")
+
+    def _format_stock_data(self, symbol: str, start_date: str, end_date: str, result: FetchResult) -> str:
+        """把获取到的行情格式化为分析师使用的文本"""
+        if result.text is not None:
+            return result.text
+        data = result.frame
+        if result.source == ChinaDataSource.TUSHARE.value:
+            from .interface import format_china_stock_data
+            from .tushare_adapter import get_tushare_adapter
+            stock_info = get_tushare_adapter().get_stock_info(symbol)
+            stock_name = stock_info.get('name', f'股票{symbol}') if stock_info else f'股票{symbol}'
+            return format_china_stock_data(symbol, data, stock_name, start_date, end_date, "Tushare")
+
+        text = f"股票代码: {symbol}\n"
+        text += f"数据来源: {result.source}\n"
+        text += f"数据期间: {start_date} 至 {end_date}\n"
+        text += f"数据条数: {len(data)}条\n\n"
+        text += "最新数据:\n"
+        text += data.tail(5).to_string(index=False)
+        return text
 
-                except Exception as e:
-                    logger.error(f"❌ 备用数据源{source.value}也失败: {e}")
-                    continue
-        
-        return f"❌ 所有数据源都无法获取{symbol}的数据"
-    
     def get_stock_info(self, symbol: str) -> Dict:
         """获取股票基本信息，支持降级机制"""
         logger.info(f"📊 [股票信息] 开始获取{symbol}基本信息...")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Finnhub离线数据存储
+get_data_in_range 原来每次调用都 json.load 整个 {ticker}_data_formatted.json 再逐个比较日期，
+回测中每个交易日都重复一遍。这里把数据集转换为按日期排序的存储文件：文件头是排好序的日期和偏移量，
+各日期的数据按顺序存放，读取时内存映射整个文件，用二分查找定位日期区间，只解析区间内的数据。
+打开的文件句柄在进程内缓存，源JSON更新后自动重新转换。
+
+命令行批量转换：python -m tradingagents.dataflows.finnhub_store [数据目录]
+"""
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+MAGIC = b"FHSTORE1"
+STORE_SUFFIX = ".fhstore"
+# 进程内最多同时保持打开的存储文件数
+MAX_OPEN_STORES = 64
+
+
+def store_path_for(json_path: str) -> str:
+    return os.path.splitext(json_path)[0] + STORE_SUFFIX
+
+
+def convert_dataset(json_path: str, store_path: str = None) -> str:
+    """把 {日期: [记录...]} 格式的JSON数据集转换为按日期排序的存储文件，返回存储文件路径
+
+    没有记录的日期不写入（查询时本来也会被过滤掉）；先写临时文件再替换，读取方不会看到写了一半的文件
+    """
+    store_path = store_path or store_path_for(json_path)
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    keys: List[str] = []
+    offsets: List[int] = [0]
+    chunks: List[bytes] = []
+    for key in sorted(data):
+        if len(data[key]) == 0:
+            continue
+        chunk = json.dumps(data[key], ensure_ascii=False).encode("utf-8")
+        keys.append(key)
+        chunks.append(chunk)
+        offsets.append(offsets[-1] + len(chunk))
+    header = json.dumps({"keys": keys, "offsets": offsets}).encode("utf-8")
+
+    temp_path = f"{store_path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(temp_path, store_path)
+    logger.debug(f"🗃️ [Finnhub存储] 已转换 {os.path.basename(json_path)}: {len(keys)} 个日期")
+    return store_path
+
+
+class DatasetStore:
+    """一个已转换数据集的只读视图（内存映射）"""
+
+    def __init__(self, store_path: str):
+        self.path = store_path
+        self._file = open(store_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"不是Finnhub存储文件: {store_path}")
+        (header_len,) = struct.unpack_from("<I", self._map, len(MAGIC))
+        header_start = len(MAGIC) + 4
+        header = json.loads(self._map[header_start:header_start + header_len])
+        self.keys: List[str] = header["keys"]
+        self._offsets: List[int] = header["offsets"]
+        self._data_start = header_start + header_len
+
+    def _value(self, i: int) -> Any:
+        start = self._data_start + self._offsets[i]
+        return json.loads(self._map[start:self._data_start + self._offsets[i + 1]])
+
+    def range(self, start_date: str, end_date: str) -> Dict[str, Any]:
+        """start_date <= 日期 <= end_date 的数据，二分查找定位区间"""
+        low = bisect.bisect_left(self.keys, start_date)
+        high = bisect.bisect_right(self.keys, end_date)
+        return {self.keys[i]: self._value(i) for i in range(low, high)}
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class StoreCache:
+    """进程内的存储句柄缓存（LRU）；源JSON比存储文件新时重新转换"""
+
+    def __init__(self, max_open: int = MAX_OPEN_STORES):
+        self.max_open = max_open
+        self._stores: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, json_path: str) -> Optional[DatasetStore]:
+        """返回数据集的存储视图；源文件不存在时返回None"""
+        try:
+            source_mtime = os.stat(json_path).st_mtime
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            cached = self._stores.get(json_path)
+            if cached and cached[0] == source_mtime:
+                self._stores.move_to_end(json_path)
+                return cached[1]
+            if cached:
+                cached[1].close()
+                del self._stores[json_path]
+
+            store_path = store_path_for(json_path)
+            if not os.path.exists(store_path) or os.stat(store_path).st_mtime < source_mtime:
+                convert_dataset(json_path, store_path)
+            store = DatasetStore(store_path)
+            self._stores[json_path] = (source_mtime, store)
+            while len(self._stores) > self.max_open:
+                _, (_, evicted) = self._stores.popitem(last=False)
+                evicted.close()
+            return store
+
+    def clear(self):
+        with self._lock:
+            for _, store in self._stores.values():
+                store.close()
+            self._stores.clear()
+
+
+_cache = StoreCache()
+
+
+def get_store_cache() -> StoreCache:
+    return _cache
+
+
+def convert_all(data_dir: str) -> int:
+    """转换 {data_dir}/finnhub_data 下所有 *_data_formatted.json，返回转换的文件数"""
+    count = 0
+    for root, _, files in os.walk(os.path.join(data_dir, "finnhub_data")):
+        for name in files:
+            if name.endswith("_data_formatted.json"):
+                convert_dataset(os.path.join(root, name))
+                count += 1
+    return count
+
+
+if __name__ == "__main__":
+    import sys
+    from .config import get_data_dir
+
+    directory = sys.argv[1] if len(sys.argv) > 1 else get_data_dir()
+    print(f"✅ Finnhub数据转换完成: {convert_all(directory)} 个文件 ({directory})")
@@ -1,6 +1,8 @@
 import json
 import os
 
+from .finnhub_store import get_store_cache
+
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
@@ -35,6 +37,15 @@ def get_data_in_range(ticker, start_date, end_date, data_type, data_dir, period=
             logger.warning(f"⚠️ [DEBUG] 数据文件不存在: {data_path}")
             logger.warning(f"⚠️ [DEBUG] 请确保已下载相关数据或检查数据目录配置")
             return {}
+
+        if os.getenv("FINNHUB_STORE_ENABLED", "true").lower() == "true":
+            # 按日期排序的内存映射存储：二分查找日期区间，句柄在进程内复用
+            try:
+                store = get_store_cache().get(data_path)
+                if store is not None:
+                    return store.range(start_date, end_date)
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ [Finnhub存储] 存储不可用，直接读取JSON: {e}")
         
         with open(data_path, "r", encoding="utf-8") as f:
             data = json.load(f)
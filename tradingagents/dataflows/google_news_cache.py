@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Google新闻按日缓存
+getNewsData 每次都把整个 [开始, 结束] 区间逐页抓取一遍（每页随机等待2~6秒），
+每天回看7天的分析会把昨天已经抓过的6天再抓一遍。这里把解析后的结构化结果按 (查询, 日期) 保存在SQLite中，
+一次请求只抓取缺失或仍在"变化中"的日期：连续的待抓日期合并为一个区间抓取一次，结果按发布日期分到各天。
+
+新鲜度策略：
+- 抓取时该日已过去至少 settle_days 天 → 结果定稿，永久有效
+- 仍在变化中的交易日（工作日）按 live_ttl_minutes 过期；周末新闻少、变化慢，按 closed_ttl_minutes 过期
+- 今天之后的日期不抓取
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+from .cache_warmer import record_first_lookup
+logger = get_logger('agents')
+
+DEFAULT_LIVE_TTL_MINUTES = 60
+DEFAULT_CLOSED_TTL_MINUTES = 360
+DEFAULT_SETTLE_DAYS = 1
+
+
+def _to_date(value: str) -> date:
+    """yyyy-mm-dd 或 mm/dd/yyyy"""
+    fmt = "%Y-%m-%d" if "-" in value else "%m/%d/%Y"
+    return datetime.strptime(value, fmt).date()
+
+
+def _normalize_query(query: str) -> str:
+    # get_google_news 用 "+" 连接查询词；Google搜索不区分大小写
+    return " ".join(query.replace("+", " ").lower().split())
+
+
+class GoogleNewsDayCache:
+    """按 (查询, 日期) 保存的Google新闻抓取结果"""
+
+    def __init__(self, path: str, live_ttl_minutes: float = DEFAULT_LIVE_TTL_MINUTES,
+                 closed_ttl_minutes: float = DEFAULT_CLOSED_TTL_MINUTES,
+                 settle_days: int = DEFAULT_SETTLE_DAYS):
+        self.path = path
+        self.live_ttl = timedelta(minutes=live_ttl_minutes)
+        self.closed_ttl = timedelta(minutes=closed_ttl_minutes)
+        self.settle_days = settle_days
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS news_days (
+                    query TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    fetched_at TEXT NOT NULL,
+                    items TEXT NOT NULL,
+                    PRIMARY KEY (query, day)
+                ) WITHOUT ROWID
+                """
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def is_fresh(self, day: date, fetched_at: datetime, now: datetime) -> bool:
+        """该日在 fetched_at 抓取的结果此刻是否仍可直接使用"""
+        if fetched_at.date() >= day + timedelta(days=self.settle_days):
+            return True
+        ttl = self.live_ttl if day.weekday() < 5 else self.closed_ttl
+        return now - fetched_at < ttl
+
+    def load(self, query: str, days: List[date]) -> Dict[date, Tuple[datetime, List[dict]]]:
+        """读取已缓存的日期：{日期: (抓取时间, 新闻列表)}"""
+        if not days:
+            return {}
+        keys = [day.isoformat() for day in days]
+        placeholders = ",".join("?" * len(keys))
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT day, fetched_at, items FROM news_days WHERE query = ? AND day IN ({placeholders})",
+                (_normalize_query(query), *keys),
+            ).fetchall()
+        return {
+            date.fromisoformat(day): (datetime.fromisoformat(fetched_at), json.loads(items))
+            for day, fetched_at, items in rows
+        }
+
+    def store(self, query: str, items_by_day: Dict[date, List[dict]], fetched_at: datetime):
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO news_days (query, day, fetched_at, items) VALUES (?, ?, ?, ?)",
+                [
+                    (_normalize_query(query), day.isoformat(), fetched_at.isoformat(),
+                     json.dumps(items, ensure_ascii=False))
+                    for day, items in items_by_day.items()
+                ],
+            )
+            conn.commit()
+
+    def fetch(self, query: str, start_date: str, end_date: str,
+              scraper: Callable = None, now: datetime = None) -> List[dict]:
+        """返回区间内的新闻（新日期在前），只抓取缺失或已过期的日期
+
+        Args:
+            scraper: (query, start, end) -> (新闻列表, 是否完整)，默认 googlenews_utils.scrape_news
+        """
+        if scraper is None:
+            from .googlenews_utils import scrape_news as scraper
+        now = now or datetime.now()
+        start, end = _to_date(start_date), min(_to_date(end_date), now.date())
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+        cached = self.load(query, days)
+        stale = [day for day in days
+                 if day not in cached or not self.is_fresh(day, cached[day][0], now)]
+        results = {day: cached[day][1] for day in days if day in cached}
+        # 查询形如 "000001+股票" 或 "AAPL stock"，规范化后首个词为股票代码
+        terms = _normalize_query(query).split()
+        record_first_lookup("news", terms[0] if terms else query, hit=not stale)
+
+        for run_start, run_end in _contiguous_runs(stale):
+            items, complete = scraper(query, run_start.isoformat(), run_end.isoformat())
+            run_days = _bucket_by_day(items, run_start, run_end)
+            if complete:
+                self.store(query, run_days, now)
+            else:
+                # 抓取被截止时间或失败中断：本次照常使用，但不写入缓存，下次重新抓取
+                logger.warning(f"⚠️ [Google新闻缓存] {query} {run_start}~{run_end} 抓取不完整，不缓存")
+            results.update(run_days)
+
+        logger.info(
+            f"📰 [Google新闻缓存] {query} {start}~{end}: "
+            f"{len(days) - len(stale)} 天命中缓存，抓取 {len(stale)} 天"
+        )
+        return [item for day in sorted(results, reverse=True) for item in results[day]]
+
+
+def _contiguous_runs(days: List[date]) -> List[Tuple[date, date]]:
+    """把有序日期列表合并为连续区间"""
+    runs: List[Tuple[date, date]] = []
+    for day in days:
+        if runs and day == runs[-1][1] + timedelta(days=1):
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+def _bucket_by_day(items: List[dict], start: date, end: date) -> Dict[date, List[dict]]:
+    """按发布日期分到区间内各天（没有结果的日期也保留空列表）；无法识别或超出区间的日期归到区间最后一天"""
+    buckets: Dict[date, List[dict]] = {start + timedelta(days=i): [] for i in range((end - start).days + 1)}
+    for item in items:
+        try:
+            day = date.fromisoformat(item.get("published") or "")
+        except ValueError:
+            day = end
+        buckets[day if start <= day <= end else end].append(item)
+    return buckets
+
+
+_cache: Optional[GoogleNewsDayCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_google_news_cache() -> GoogleNewsDayCache:
+    """进程内共享的缓存，路径默认为 data_cache_dir/google_news.sqlite3"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                from .config import get_config
+                path = os.getenv("GOOGLE_NEWS_CACHE_PATH") or os.path.join(
+                    get_config()["data_cache_dir"], "google_news.sqlite3"
+                )
+                _cache = GoogleNewsDayCache(
+                    path,
+                    live_ttl_minutes=float(os.getenv("GOOGLE_NEWS_LIVE_TTL_MINUTES", DEFAULT_LIVE_TTL_MINUTES)),
+                    settle_days=int(os.getenv("GOOGLE_NEWS_SETTLE_DAYS", DEFAULT_SETTLE_DAYS)),
+                )
+    return _cache
+
+
+def get_news_cached(query: str, start_date: str, end_date: str) -> List[dict]:
+    """getNewsData 的按日缓存版本"""
+    return get_google_news_cache().fetch(query, start_date, end_date)
@@ -1,7 +1,8 @@
 import json
+import re
 import requests
 from bs4 import BeautifulSoup
-from datetime import datetime
+from datetime import datetime, timedelta
 import time
 import random
 from tenacity import (
@@ -14,6 +15,7 @@ from tenacity import (
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.deadline import DeadlineExceeded, budget_timeout, deadline_sleep
 logger = get_logger('agents')
 
 
@@ -26,15 +28,46 @@ def is_rate_limited(response):
     retry=(retry_if_result(is_rate_limited)),
     wait=wait_exponential(multiplier=1, min=4, max=60),
     stop=stop_after_attempt(5),
+    # Backoff waits stop as soon as the run deadline passes or the run is cancelled
+    sleep=deadline_sleep,
 )
 def make_request(url, headers):
     """Make a request with retry logic for rate limiting"""
     # Random delay before each request to avoid detection
-    time.sleep(random.uniform(2, 6))
-    response = requests.get(url, headers=headers)
+    deadline_sleep(random.uniform(2, 6))
+    # Per-request timeout bounded by the remaining run budget
+    response = requests.get(url, headers=headers, timeout=budget_timeout(30))
     return response
 
 
+_RELATIVE_DATE_RE = re.compile(r"(\d+)\s*(min|minute|hour|day|week)s?\s+ago", re.IGNORECASE)
+_RELATIVE_UNITS = {"min": "minutes", "minute": "minutes", "hour": "hours", "day": "days", "week": "weeks"}
+_ABSOLUTE_DATE_FORMATS = ("%b %d, %Y", "%d %b %Y", "%B %d, %Y", "%d %B %Y", "%m/%d/%Y", "%Y-%m-%d")
+
+
+def parse_news_date(text, now=None):
+    """
+    Convert the date label shown on a result ("3 hours ago", "2 days ago", "Jan 5, 2024")
+    to yyyy-mm-dd. Returns None when the label is not recognised.
+    """
+    text = (text or "").strip()
+    now = now or datetime.now()
+    match = _RELATIVE_DATE_RE.search(text)
+    if match:
+        delta = timedelta(**{_RELATIVE_UNITS[match.group(2).lower()]: int(match.group(1))})
+        return (now - delta).strftime("%Y-%m-%d")
+    if text.lower() in ("today", "just now"):
+        return now.strftime("%Y-%m-%d")
+    if text.lower() == "yesterday":
+        return (now - timedelta(days=1)).strftime("%Y-%m-%d")
+    for fmt in _ABSOLUTE_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
 def getNewsData(query, start_date, end_date):
     """
     Scrape Google News search results for a given query and date range.
@@ -42,6 +75,16 @@ def getNewsData(query, start_date, end_date):
     start_date: str - start date in the format yyyy-mm-dd or mm/dd/yyyy
     end_date: str - end date in the format yyyy-mm-dd or mm/dd/yyyy
     """
+    return scrape_news(query, start_date, end_date)[0]
+
+
+def scrape_news(query, start_date, end_date):
+    """
+    Scrape Google News like getNewsData, but also report whether paging ran to the end.
+    Returns (news_results, complete); complete is False when paging stopped on the run
+    deadline or after failed retries, so the results may be missing later pages.
+    Each result carries "published" (yyyy-mm-dd, or None) parsed from its date label.
+    """
     if "-" in start_date:
         start_date = datetime.strptime(start_date, "%Y-%m-%d")
         start_date = start_date.strftime("%m/%d/%Y")
@@ -58,6 +101,7 @@ def getNewsData(query, start_date, end_date):
     }
 
     news_results = []
+    complete = True
     page = 0
     while True:
         offset = page * 10
@@ -89,6 +133,7 @@ def getNewsData(query, start_date, end_date):
                             "snippet": snippet,
                             "date": date,
                             "source": source,
+                            "published": parse_news_date(date),
                         }
                     )
                 except Exception as e:
@@ -105,8 +150,13 @@ def getNewsData(query, start_date, end_date):
 
             page += 1
 
+        except DeadlineExceeded as e:
+            logger.warning(f"Stopped paging Google News: {e}")
+            complete = False
+            break
         except Exception as e:
             logger.error(f"Failed after multiple retries: {e}")
+            complete = False
             break
 
-    return news_results
+    return news_results, complete
@@ -6,12 +6,13 @@
 import pandas as pd
 import yfinance as yf
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 import os
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.deadline import DeadlineExceeded, budget_timeout, deadline_sleep
 logger = get_logger('agents')
 
 
@@ -36,7 +37,7 @@ class HKStockProvider:
         
         if time_since_last_request < self.min_request_interval:
             sleep_time = self.min_request_interval - time_since_last_request
-            time.sleep(sleep_time)
+            deadline_sleep(sleep_time)
         
         self.last_request_time = time.time()
     
@@ -74,7 +75,7 @@ class HKStockProvider:
                     data = ticker.history(
                         start=start_date,
                         end=end_date,
-                        timeout=self.timeout
+                        timeout=budget_timeout(self.timeout)
                     )
                     
                     if not data.empty:
@@ -87,6 +88,8 @@ class HKStockProvider:
                     else:
                         logger.warning(f"⚠️ 港股数据为空: {symbol} (尝试 {attempt + 1}/{self.max_retries})")
                         
+                except DeadlineExceeded:
+                    raise
                 except Exception as e:
                     error_msg = str(e)
                     logger.error(f"❌ 港股数据获取失败 (尝试 {attempt + 1}/{self.max_retries}): {error_msg}")
@@ -95,21 +98,59 @@ class HKStockProvider:
                     if "Rate limited" in error_msg or "Too Many Requests" in error_msg:
                         if attempt < self.max_retries - 1:
                             logger.info(f"⏳ 检测到频率限制，等待{self.rate_limit_wait}秒...")
-                            time.sleep(self.rate_limit_wait)
+                            deadline_sleep(self.rate_limit_wait)
                         else:
                             logger.error(f"❌ 频率限制，跳过重试")
                             break
                     else:
                         if attempt < self.max_retries - 1:
-                            time.sleep(2 ** attempt)  # 指数退避
+                            deadline_sleep(2 ** attempt)  # 指数退避（超过剩余时间时直接放弃）
                     
             logger.error(f"❌ 港股数据获取最终失败: {symbol}")
             return None
 
+        except DeadlineExceeded as e:
+            logger.warning(f"⏱️ 港股数据获取停止: {e}")
+            return None
         except Exception as e:
             logger.error(f"❌ 港股数据获取异常: {e}")
             return None
     
+    def get_stock_data_bulk(self, symbols: List[str], start_date: str = None, end_date: str = None):
+        """
+        批量获取多只港股的历史数据（按分块一次请求多只，不再逐只请求并等待）
+        
+        Args:
+            symbols: 港股代码列表
+            start_date: 开始日期 (YYYY-MM-DD)
+            end_date: 结束日期 (YYYY-MM-DD)
+            
+        Returns:
+            BulkResult: data 为 {标准化代码: 与 get_stock_data 格式相同的DataFrame}，
+                        failures 为失败的分块（可用 BulkDownloader.retry 单独重试）
+        """
+        from .bulk_download import BulkDownloader
+
+        if not end_date:
+            end_date = datetime.now().strftime('%Y-%m-%d')
+        if not start_date:
+            start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
+
+        normalized = [self._normalize_hk_symbol(symbol) for symbol in symbols]
+        logger.info(f"🇭🇰 批量获取港股数据: {len(normalized)}只 ({start_date} 到 {end_date})")
+
+        downloader = BulkDownloader(min_interval=self.min_request_interval, timeout=self.timeout)
+        result = downloader.download(normalized, start_date, end_date)
+        if result.failures:
+            downloader.retry(result, start_date, end_date)
+
+        for symbol, data in result.data.items():
+            # 与单只获取的格式保持一致
+            data = data.reset_index()
+            data['Symbol'] = symbol
+            result.data[symbol] = data
+        return result
+
     def get_stock_info(self, symbol: str) -> Dict[str, Any]:
         """
         获取港股基本信息
@@ -179,7 +220,7 @@ class HKStockProvider:
             ticker = yf.Ticker(symbol)
             
             # 获取最新的历史数据（1天）
-            data = ticker.history(period="1d", timeout=self.timeout)
+            data = ticker.history(period="1d", timeout=budget_timeout(self.timeout))
             
             if not data.empty:
                 latest = data.iloc[-1]
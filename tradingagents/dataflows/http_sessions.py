@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+HTTP会话池
+每个数据源复用一个 requests.Session（keep-alive连接池），避免每次请求重新建立TCP/TLS连接
+"""
+
+import os
+import threading
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+_sessions: Dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+def get_http_session(name: str, headers: Dict[str, str] = None) -> requests.Session:
+    """返回数据源 name 的共享会话，首次调用时创建
+
+    连接池大小由 HTTP_POOL_MAXSIZE 配置（默认10），并发请求同一数据源时复用池中的连接
+    """
+    session = _sessions.get(name)
+    if session is None:
+        with _lock:
+            session = _sessions.get(name)
+            if session is None:
+                pool_size = int(os.getenv("HTTP_POOL_MAXSIZE", 10))
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                if headers:
+                    session.headers.update(headers)
+                _sessions[name] = session
+                logger.debug(f"🔌 [HTTP会话] 创建会话: {name} (pool_maxsize={pool_size})")
+    return session
+
+
+def close_http_sessions():
+    """关闭所有共享会话（测试或进程退出时调用）"""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -1,67 +1,49 @@
-from typing import Annotated, Dict
+from typing import Annotated, Dict, List
 import time
 import os
 from .reddit_utils import fetch_top_from_category
-from .chinese_finance_utils import get_chinese_social_sentiment
-from .googlenews_utils import *
 from .finnhub_utils import get_data_in_range
 
 # 导入统一日志系统
 from tradingagents.utils.logging_init import setup_dataflow_logging
+from tradingagents.utils.lazy_import import lazy_exports, lazy_module, module_available
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 logger = setup_dataflow_logging()
 
-# 导入港股工具
-try:
-    from .hk_stock_utils import get_hk_stock_data, get_hk_stock_info
-    HK_STOCK_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ 港股工具不可用: {e}")
-    HK_STOCK_AVAILABLE = False
-
-# 导入AKShare港股工具
-try:
-    from .akshare_utils import get_hk_stock_data_akshare, get_hk_stock_info_akshare
-    AKSHARE_HK_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ AKShare港股工具不可用: {e}")
-    AKSHARE_HK_AVAILABLE = False
-
-# 尝试导入yfinance相关模块，如果失败则跳过
-try:
-    from .yfin_utils import *
-    YFIN_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ yfinance工具不可用: {e}")
-    YFIN_AVAILABLE = False
-
-try:
-    from .stockstats_utils import *
-    STOCKSTATS_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ stockstats工具不可用: {e}")
-    STOCKSTATS_AVAILABLE = False
+# 数据源库和SDK在首次调用对应函数时才导入（港股、AKShare、yfinance、stockstats、新闻、OpenAI）
+HK_STOCK_AVAILABLE = module_available("yfinance")
+AKSHARE_HK_AVAILABLE = module_available("akshare")
+YFIN_AVAILABLE = module_available("yfinance")
+STOCKSTATS_AVAILABLE = module_available("stockstats")
+YF_AVAILABLE = module_available("yfinance")
+
 from dateutil.relativedelta import relativedelta
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import json
 import os
-import pandas as pd
 from tqdm import tqdm
-from openai import OpenAI
 
-# 尝试导入yfinance，如果失败则设置为None
-try:
-    import yfinance as yf
-    YF_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ yfinance库不可用: {e}")
-    yf = None
-    YF_AVAILABLE = False
-from .config import get_config, set_config, DATA_DIR
+pd = lazy_module("pandas")
+yf = lazy_module("yfinance")
+
+__getattr__ = lazy_exports(__name__, {
+    "get_chinese_social_sentiment": ".chinese_finance_utils",
+    "getNewsData": ".googlenews_utils",
+    "YFinanceUtils": ".yfin_utils",
+    "StockstatsUtils": ".stockstats_utils",
+})
+
+
+from .config import get_config, set_config, get_data_dir
+
+
+def _similar_reports_note(count: int) -> str:
+    """近似重复转载的标注，如 " [+2 similar reports]"，没有转载时为空"""
+    return f" [+{count} similar reports]" if count else ""
 
 
 def get_finnhub_news(
@@ -88,7 +70,7 @@ def get_finnhub_news(
     before = start_date - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    result = get_data_in_range(ticker, before, curr_date, "news_data", DATA_DIR)
+    result = get_data_in_range(ticker, before, curr_date, "news_data", get_data_dir())
 
     if len(result) == 0:
         error_msg = f"⚠️ 无法获取{ticker}的新闻数据 ({before} 到 {curr_date})\n"
@@ -100,15 +82,17 @@ def get_finnhub_news(
         logger.debug(f"📰 [DEBUG] {error_msg}")
         return error_msg
 
+    # 同一通稿的近似重复转载只保留一条
+    from .news_dedup import dedupe_news
+    entries = [(day, entry) for day, data in result.items() for entry in data]
+    clusters, _ = dedupe_news(entries, lambda item: f"{item[1]['headline']}\n{item[1]['summary']}")
+
     combined_result = ""
-    for day, data in result.items():
-        if len(data) == 0:
-            continue
-        for entry in data:
-            current_news = (
-                "### " + entry["headline"] + f" ({day})" + "\n" + entry["summary"]
-            )
-            combined_result += current_news + "\n\n"
+    for (day, entry), duplicates in clusters:
+        current_news = (
+            "### " + entry["headline"] + f" ({day})" + _similar_reports_note(len(duplicates)) + "\n" + entry["summary"]
+        )
+        combined_result += current_news + "\n\n"
 
     return f"## {ticker} News, from {before} to {curr_date}:\n" + str(combined_result)
 
@@ -134,7 +118,7 @@ def get_finnhub_company_insider_sentiment(
     before = date_obj - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    data = get_data_in_range(ticker, before, curr_date, "insider_senti", DATA_DIR)
+    data = get_data_in_range(ticker, before, curr_date, "insider_senti", get_data_dir())
 
     if len(data) == 0:
         return ""
@@ -175,7 +159,7 @@ def get_finnhub_company_insider_transactions(
     before = date_obj - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    data = get_data_in_range(ticker, before, curr_date, "insider_trans", DATA_DIR)
+    data = get_data_in_range(ticker, before, curr_date, "insider_trans", get_data_dir())
 
     if len(data) == 0:
         return ""
@@ -205,7 +189,7 @@ def get_simfin_balance_sheet(
     curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
 ):
     data_path = os.path.join(
-        DATA_DIR,
+        get_data_dir(),
         "fundamental_data",
         "simfin_data_all",
         "balance_sheet",
@@ -252,7 +236,7 @@ def get_simfin_cashflow(
     curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
 ):
     data_path = os.path.join(
-        DATA_DIR,
+        get_data_dir(),
         "fundamental_data",
         "simfin_data_all",
         "cash_flow",
@@ -299,7 +283,7 @@ def get_simfin_income_statements(
     curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
 ):
     data_path = os.path.join(
-        DATA_DIR,
+        get_data_dir(),
         "fundamental_data",
         "simfin_data_all",
         "income_statements",
@@ -348,13 +332,23 @@ def get_google_news(
     before = start_date - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    news_results = getNewsData(query, before, curr_date)
+    if os.getenv("GOOGLE_NEWS_CACHE_ENABLED", "true").lower() == "true":
+        # 按 (查询, 日期) 缓存，只抓取缺失或仍在变化中的日期
+        from .google_news_cache import get_news_cached
+        news_results = get_news_cached(query, before, curr_date)
+    else:
+        from .googlenews_utils import getNewsData
+        news_results = getNewsData(query, before, curr_date)
+
+    # 同一通稿的近似重复转载只保留一条
+    from .news_dedup import dedupe_news
+    clusters, _ = dedupe_news(news_results, lambda news: f"{news['title']}\n{news['snippet']}")
 
     news_str = ""
 
-    for news in news_results:
+    for news, duplicates in clusters:
         news_str += (
-            f"### {news['title']} (source: {news['source']}) \n\n{news['snippet']}\n\n"
+            f"### {news['title']} (source: {news['source']}){_similar_reports_note(len(duplicates))} \n\n{news['snippet']}\n\n"
         )
 
     if len(news_results) == 0:
@@ -394,7 +388,7 @@ def get_reddit_global_news(
             "global_news",
             curr_date_str,
             max_limit_per_day,
-            data_path=os.path.join(DATA_DIR, "reddit_data"),
+            data_path=os.path.join(get_data_dir(), "reddit_data"),
         )
         posts.extend(fetch_result)
         curr_date += relativedelta(days=1)
@@ -452,7 +446,7 @@ def get_reddit_company_news(
             curr_date_str,
             max_limit_per_day,
             ticker,
-            data_path=os.path.join(DATA_DIR, "reddit_data"),
+            data_path=os.path.join(get_data_dir(), "reddit_data"),
         )
         posts.extend(fetch_result)
         curr_date += relativedelta(days=1)
@@ -570,7 +564,7 @@ def get_stock_stats_indicators_window(
         # read from YFin data
         data = pd.read_csv(
             os.path.join(
-                DATA_DIR,
+                get_data_dir(),
                 f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
             )
         )
@@ -623,11 +617,12 @@ def get_stockstats_indicator(
     curr_date = curr_date.strftime("%Y-%m-%d")
 
     try:
+        from .stockstats_utils import StockstatsUtils
         indicator_value = StockstatsUtils.get_stock_stats(
             symbol,
             indicator,
             curr_date,
-            os.path.join(DATA_DIR, "market_data", "price_data"),
+            os.path.join(get_data_dir(), "market_data", "price_data"),
             online=online,
         )
     except Exception as e:
@@ -652,7 +647,7 @@ def get_YFin_data_window(
     # read in data
     data = pd.read_csv(
         os.path.join(
-            DATA_DIR,
+            get_data_dir(),
             f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
         )
     )
@@ -698,6 +693,36 @@ def get_YFin_data_online(
     # Fetch historical data for the specified date range
     data = ticker.history(start=start_date, end=end_date)
 
+    return _format_yfin_csv(symbol, data, start_date, end_date)
+
+
+def get_YFin_data_online_bulk(
+    symbols: Annotated[List[str], "ticker symbols of the companies"],
+    start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
+    end_date: Annotated[str, "End date in yyyy-mm-dd format"],
+) -> Dict[str, str]:
+    """Same output as get_YFin_data_online for many symbols, downloaded in one request per chunk"""
+    if not YF_AVAILABLE or yf is None:
+        return {symbol: "yfinance库不可用，无法获取美股数据" for symbol in symbols}
+
+    datetime.strptime(start_date, "%Y-%m-%d")
+    datetime.strptime(end_date, "%Y-%m-%d")
+
+    from .bulk_download import bulk_download
+    result = bulk_download([symbol.upper() for symbol in symbols], start_date, end_date)
+    errors = {s: failure.error for failure in result.failures for s in failure.symbols}
+
+    output = {}
+    for symbol in symbols:
+        key = symbol.upper()
+        if key in errors:
+            output[symbol] = f"Failed to download data for symbol '{symbol}': {errors[key]}"
+        else:
+            output[symbol] = _format_yfin_csv(symbol, result.data.get(key, pd.DataFrame()), start_date, end_date)
+    return output
+
+
+def _format_yfin_csv(symbol: str, data, start_date: str, end_date: str) -> str:
     # Check if data is empty
     if data.empty:
         return (
@@ -733,7 +758,7 @@ def get_YFin_data(
     # read in data
     data = pd.read_csv(
         os.path.join(
-            DATA_DIR,
+            get_data_dir(),
             f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
         )
     )
@@ -762,6 +787,7 @@ def get_YFin_data(
 
 def get_stock_news_openai(ticker, curr_date):
     config = get_config()
+    from openai import OpenAI
     client = OpenAI(base_url=config["backend_url"])
 
     response = client.responses.create(
@@ -797,6 +823,7 @@ def get_stock_news_openai(ticker, curr_date):
 
 def get_global_news_openai(curr_date):
     config = get_config()
+    from openai import OpenAI
     client = OpenAI(base_url=config["backend_url"])
 
     response = client.responses.create(
@@ -1013,6 +1040,7 @@ def get_fundamentals_openai(ticker, curr_date):
         
         logger.debug(f"📊 [DEBUG] 尝试使用OpenAI获取 {ticker} 的基本面数据...")
         
+        from openai import OpenAI
         client = OpenAI(base_url=config["backend_url"])
 
         response = client.responses.create(
@@ -1060,6 +1088,64 @@ def get_fundamentals_openai(ticker, curr_date):
 
 # ==================== Tushare数据接口 ====================
 
+def format_china_stock_data(ticker: str, data, stock_name: str, start_date: str, end_date: str,
+                            source_label: str) -> str:
+    """把A股日线数据格式化为分析用文本（与TDX兼容的格式）"""
+    # 计算最新价格和涨跌幅
+    latest_data = data.iloc[-1]
+    current_price = f"¥{latest_data['close']:.2f}"
+
+    if len(data) > 1:
+        prev_close = data.iloc[-2]['close']
+        change = latest_data['close'] - prev_close
+        change_pct = (change / prev_close) * 100
+        change_pct_str = f"{change_pct:+.2f}%"
+    else:
+        change_pct_str = "N/A"
+
+    # 格式化成交量 - 修复成交量显示问题
+    volume = 0
+    if 'vol' in latest_data.index:
+        volume = latest_data['vol']
+    elif 'volume' in latest_data.index:
+        volume = latest_data['volume']
+
+    # 处理NaN值
+    if pd.isna(volume):
+        volume = 0
+
+    if volume > 10000:
+        volume_str = f"{volume/10000:.1f}万手"
+    elif volume > 0:
+        volume_str = f"{volume:.0f}手"
+    else:
+        volume_str = "暂无数据"
+
+    # 转换为与TDX兼容的字符串格式
+    result = f"# {ticker} 股票数据分析\n\n"
+    result += f"## 📊 实时行情\n"
+    result += f"- 股票名称: {stock_name}\n"
+    result += f"- 股票代码: {ticker}\n"
+    result += f"- 当前价格: {current_price}\n"
+    result += f"- 涨跌幅: {change_pct_str}\n"
+    result += f"- 成交量: {volume_str}\n"
+    result += f"- 数据来源: {source_label}\n\n"
+    result += f"## 📈 历史数据概览\n"
+    result += f"- 数据期间: {start_date} 至 {end_date}\n"
+    result += f"- 数据条数: {len(data)}条\n"
+
+    if len(data) > 0:
+        period_high = data['high'].max()
+        period_low = data['low'].min()
+        result += f"- 期间最高: ¥{period_high:.2f}\n"
+        result += f"- 期间最低: ¥{period_low:.2f}\n\n"
+
+    result += "## 📋 最新交易数据\n"
+    result += data.tail(5).to_string(index=False)
+
+    return result
+
+
 def get_china_stock_data_tushare(
     ticker: Annotated[str, "中国股票代码，如：000001、600036等"],
     start_date: Annotated[str, "开始日期，格式：YYYY-MM-DD"],
@@ -1095,61 +1181,7 @@ def get_china_stock_data_tushare(
             # 获取股票基本信息
             stock_info = adapter.get_stock_info(ticker)
             stock_name = stock_info.get('name', f'股票{ticker}') if stock_info else f'股票{ticker}'
-
-            # 计算最新价格和涨跌幅
-            latest_data = data.iloc[-1]
-            current_price = f"¥{latest_data['close']:.2f}"
-
-            if len(data) > 1:
-                prev_close = data.iloc[-2]['close']
-                change = latest_data['close'] - prev_close
-                change_pct = (change / prev_close) * 100
-                change_pct_str = f"{change_pct:+.2f}%"
-            else:
-                change_pct_str = "N/A"
-
-            # 格式化成交量 - 修复成交量显示问题
-            volume = 0
-            if 'vol' in latest_data.index:
-                volume = latest_data['vol']
-            elif 'volume' in latest_data.index:
-                volume = latest_data['volume']
-
-            # 处理NaN值
-            import pandas as pd
-            if pd.isna(volume):
-                volume = 0
-
-            if volume > 10000:
-                volume_str = f"{volume/10000:.1f}万手"
-            elif volume > 0:
-                volume_str = f"{volume:.0f}手"
-            else:
-                volume_str = "暂无数据"
-
-            # 转换为与TDX兼容的字符串格式
-            result = f"# {ticker} 股票数据分析\n\n"
-            result += f"## 📊 实时行情\n"
-            result += f"- 股票名称: {stock_name}\n"
-            result += f"- 股票代码: {ticker}\n"
-            result += f"- 当前价格: {current_price}\n"
-            result += f"- 涨跌幅: {change_pct_str}\n"
-            result += f"- 成交量: {volume_str}\n"
-            result += f"- 数据来源: Tushare\n\n"
-            result += f"## 📈 历史数据概览\n"
-            result += f"- 数据期间: {start_date} 至 {end_date}\n"
-            result += f"- 数据条数: {len(data)}条\n"
-
-            if len(data) > 0:
-                period_high = data['high'].max()
-                period_low = data['low'].min()
-                result += f"- 期间最高: ¥{period_high:.2f}\n"
-                result += f"- 期间最低: ¥{period_low:.2f}\n\n"
-
-            result += "## 📋 最新交易数据\n"
-            result += data.tail(5).to_string(index=False)
-
-            return result
+            return format_china_stock_data(ticker, data, stock_name, start_date, end_date, "Tushare")
         else:
             return f"❌ 未能获取{ticker}的股票数据"
 
@@ -1476,6 +1508,7 @@ def get_hk_stock_data_unified(symbol: str, start_date: str = None, end_date: str
         if AKSHARE_HK_AVAILABLE:
             try:
                 logger.info(f"🔄 优先使用AKShare获取港股数据: {symbol}")
+                from .akshare_utils import get_hk_stock_data_akshare
                 result = get_hk_stock_data_akshare(symbol, start_date, end_date)
                 if result and "❌" not in result:
                     logger.info(f"✅ AKShare港股数据获取成功: {symbol}")
@@ -1489,6 +1522,7 @@ def get_hk_stock_data_unified(symbol: str, start_date: str = None, end_date: str
         if HK_STOCK_AVAILABLE:
             try:
                 logger.info(f"🔄 使用Yahoo Finance备用方案获取港股数据: {symbol}")
+                from .hk_stock_utils import get_hk_stock_data
                 result = get_hk_stock_data(symbol, start_date, end_date)
                 if result and "❌" not in result:
                     logger.info(f"✅ Yahoo Finance港股数据获取成功: {symbol}")
@@ -1533,6 +1567,7 @@ def get_hk_stock_info_unified(symbol: str) -> Dict:
         if AKSHARE_HK_AVAILABLE:
             try:
                 logger.info(f"🔄 优先使用AKShare获取港股信息: {symbol}")
+                from .akshare_utils import get_hk_stock_info_akshare
                 result = get_hk_stock_info_akshare(symbol)
                 if result and 'error' not in result and not result.get('name', '').startswith('港股'):
                     logger.info(f"✅ AKShare成功获取港股信息: {symbol} -> {result.get('name', 'N/A')}")
@@ -1546,6 +1581,7 @@ def get_hk_stock_info_unified(symbol: str) -> Dict:
         if HK_STOCK_AVAILABLE:
             try:
                 logger.info(f"🔄 使用Yahoo Finance备用方案获取港股信息: {symbol}")
+                from .hk_stock_utils import get_hk_stock_info
                 result = get_hk_stock_info(symbol)
                 if result and 'error' not in result and not result.get('name', '').startswith('港股'):
                     logger.info(f"✅ Yahoo Finance成功获取港股信息: {symbol} -> {result.get('name', 'N/A')}")
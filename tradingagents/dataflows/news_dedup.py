@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+新闻近似去重
+同一条通稿经FinnHub、NewsAPI、Google News和中文门户转载后标题略有差异，逐条交给新闻分析师会重复消耗token。
+这里对规范化后的标题+摘要做MinHash（中文按字二元组、英文按词二元组切分），用LSH分桶找出候选对，
+估计相似度达到阈值的合并为一簇，每簇保留一条代表并记录转载来源数
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# 每批参与签名计算的片段数，限制中间矩阵的内存（批大小 × num_perm × 8字节）
+_BATCH_SHINGLES = 1 << 16
+_CJK_RE = re.compile(r"[\u3400-\u9fff\uf900-\ufaff]+")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_MASK32 = 0xFFFFFFFF
+
+
+def normalize_text(text: str) -> str:
+    """全角转半角并统一小写（标点和空白在切分时忽略）"""
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def shingles(text: str) -> List[str]:
+    """切分为相似度比较的片段：中文连续字串取字二元组，英文和数字取相邻词二元组"""
+    text = normalize_text(text)
+    result = []
+    for run in _CJK_RE.findall(text):
+        if len(run) == 1:
+            result.append(run)
+        result.extend(run[i:i + 2] for i in range(len(run) - 1))
+    words = _WORD_RE.findall(text)
+    if len(words) == 1:
+        result.append(words[0])
+    result.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return result
+
+
+class MinHasher:
+    """批量计算MinHash签名并用LSH分桶
+
+    Args:
+        num_perm: 签名长度（哈希排列数）
+        bands: LSH分带数，每带 num_perm // bands 行；相似度为J的两条文本成为候选对的概率约为 1-(1-J^r)^b
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        rng = np.random.default_rng(seed)
+        # multiply-shift 哈希族：(a*h + b) mod 2^64 的高32位，a 取奇数
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def signatures(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """返回 (签名矩阵, 是否有可比较片段)；没有片段的文本签名为全最大值，不参与分桶"""
+        hashes: List[int] = []
+        counts = np.zeros(len(texts), dtype=np.int64)
+        for i, text in enumerate(texts):
+            # 进程内哈希即可：签名只在一次聚类内比较，不持久化
+            parts = {hash(part) & _MASK32 for part in shingles(text)}
+            counts[i] = len(parts)
+            hashes.extend(parts)
+
+        signatures = np.full((len(texts), self.num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+        has_shingles = counts > 0
+        if not hashes:
+            return signatures, has_shingles
+        values = np.asarray(hashes, dtype=np.uint64)
+        rows = np.flatnonzero(has_shingles)
+        starts = np.concatenate(([0], np.cumsum(counts[rows])[:-1]))
+        ends = starts + counts[rows]
+        first = 0
+        while first < len(rows):
+            # 按片段数分批，每批至少一条文本
+            last = max(int(np.searchsorted(ends, starts[first] + _BATCH_SHINGLES, side="right")), first + 1)
+            low, high = starts[first], ends[last - 1]
+            # 排列在行、片段在列，按列分段取最小值时内存连续
+            block = self._a[:, None] * values[None, low:high]
+            block += self._b[:, None]
+            block >>= np.uint64(32)
+            signatures[rows[first:last]] = np.minimum.reduceat(block, starts[first:last] - low, axis=1).T
+            first = last
+        return signatures, has_shingles
+
+    def candidate_pairs(self, signatures: np.ndarray, active: np.ndarray) -> np.ndarray:
+        """同一分带签名相同的文本两两成为候选对，返回形如 (n, 2) 的下标数组"""
+        rows = self.num_perm // self.bands
+        indices = np.flatnonzero(active)
+        if len(indices) < 2:
+            return np.empty((0, 2), dtype=np.int64)
+        # 每带的行合并为一个64位键（乘法溢出即取模，只用于分桶）
+        weights = np.arange(1, rows + 1, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+        active_signatures = signatures[indices].astype(np.uint64)
+        pairs = []
+        for band in range(self.bands):
+            block = active_signatures[:, band * rows:(band + 1) * rows]
+            keys = (block * weights).sum(axis=1, dtype=np.uint64)
+            order = np.argsort(keys, kind="stable")
+            sorted_keys = keys[order]
+            same = sorted_keys[1:] == sorted_keys[:-1]
+            if not same.any():
+                continue
+            # 每个桶内：相邻成员成对，并与桶首成员成对
+            run_start = np.maximum.accumulate(np.where(np.r_[True, ~same], np.arange(len(keys)), 0))
+            members = np.flatnonzero(same) + 1
+            pairs.append(np.stack([order[members - 1], order[members]], axis=1))
+            pairs.append(np.stack([order[run_start[members]], order[members]], axis=1))
+        if not pairs:
+            return np.empty((0, 2), dtype=np.int64)
+        pairs = np.sort(np.concatenate(pairs), axis=1)
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+        # 两个下标编码为一个整数后去重，比按行去重快得多
+        codes = np.unique(pairs[:, 0] * len(indices) + pairs[:, 1])
+        return indices[np.stack([codes // len(indices), codes % len(indices)], axis=1)]
+
+
+def cluster_near_duplicates(texts: Sequence[str], threshold: float = 0.6,
+                            hasher: MinHasher = None) -> List[List[int]]:
+    """把估计Jaccard相似度不低于 threshold 的文本聚为一簇
+
+    Returns:
+        各簇的下标列表，簇按首个成员的位置排序，簇内保持输入顺序（首个成员作为代表）
+    """
+    hasher = hasher or _default_hasher()
+    signatures, active = hasher.signatures(texts)
+    candidates = hasher.candidate_pairs(signatures, active)
+
+    parent = list(range(len(texts)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    if len(candidates):
+        similarity = (signatures[candidates[:, 0]] == signatures[candidates[:, 1]]).mean(axis=1)
+        for a, b in candidates[similarity >= threshold].tolist():
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                # 以输入位置更靠前的成员为根，代表即优先级最高的来源
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(texts)):
+        clusters.setdefault(find(i), []).append(i)
+    return list(clusters.values())
+
+
+_hasher = None
+
+
+def _default_hasher() -> MinHasher:
+    global _hasher
+    if _hasher is None:
+        _hasher = MinHasher()
+    return _hasher
+
+
+@dataclass
+class DedupStats:
+    """一次去重的效果"""
+    items_in: int
+    items_out: int
+    chars_saved: int
+
+    @property
+    def tokens_saved(self) -> int:
+        # 粗略估算：2字符/token（与LLM适配器的估算一致）
+        return self.chars_saved // 2
+
+
+def dedupe_news(items: Sequence[Any], text: Callable[[Any], str],
+                threshold: float = 0.6) -> Tuple[List[Tuple[Any, List[Any]]], DedupStats]:
+    """近似去重新闻列表
+
+    Args:
+        items: 新闻（按来源优先级排列，簇内靠前的作为代表）
+        text: 取出用于比较和计算节省量的文本（通常是标题+摘要）
+
+    Returns:
+        ([(代表, 被合并的其他新闻), ...], 去重统计)
+    """
+    texts = [text(item) for item in items]
+    clusters = cluster_near_duplicates(texts, threshold)
+    grouped = [(items[members[0]], [items[i] for i in members[1:]]) for members in clusters]
+    chars_saved = sum(len(texts[i]) for members in clusters for i in members[1:])
+    stats = DedupStats(len(items), len(grouped), chars_saved)
+    if stats.items_out < stats.items_in:
+        logger.info(f"🧹 [新闻去重] {stats.items_in} → {stats.items_out} 条，约节省 {stats.tokens_saved} tokens")
+    return grouped, stats
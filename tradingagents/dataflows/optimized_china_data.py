@@ -10,6 +10,7 @@ import random
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from .cache_manager import get_cache
+from .cache_warmer import record_first_lookup
 from .config import get_config
 
 # 导入日志模块
@@ -68,7 +69,9 @@ class OptimizedChinaDataProvider:
                 cached_data = self.cache.load_stock_data(cache_key)
                 if cached_data:
                     logger.info(f"⚡ 从缓存加载A股数据: {symbol}")
+                    record_first_lookup("bars", symbol, hit=True)
                     return cached_data
+            record_first_lookup("bars", symbol, hit=False)
         
         # 缓存未命中，从Tushare数据接口获取
         logger.info(f"🌐 从Tushare数据接口获取数据: {symbol}")
@@ -154,9 +157,11 @@ class OptimizedChinaDataProvider:
                             cached_data = self.cache.load_stock_data(cache_key)
                             if cached_data:
                                 logger.info(f"⚡ 从缓存加载A股基本面数据: {symbol}")
+                                record_first_lookup("fundamentals", symbol, hit=True)
                                 return cached_data
                 except Exception:
                     continue
+            record_first_lookup("fundamentals", symbol, hit=False)
         
         # 缓存未命中，生成基本面分析
         logger.debug(f"🔍 生成A股基本面分析: {symbol}")
@@ -8,10 +8,11 @@ import os
 import time
 import random
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import yfinance as yf
 import pandas as pd
 from .cache_manager import get_cache
+from .cache_warmer import record_first_lookup
 from .config import get_config
 
 # 导入日志模块
@@ -81,7 +82,10 @@ class OptimizedUSDataProvider:
                 cached_data = self.cache.load_stock_data(cache_key)
                 if cached_data:
                     logger.info(f"⚡ 从缓存加载美股数据: {symbol}")
+                    record_first_lookup("bars", symbol, hit=True)
                     return cached_data
+            # FINNHUB和Yahoo Finance缓存都查过后才记为未命中
+            record_first_lookup("bars", symbol, hit=False)
         
         # 缓存未命中，从API获取 - 优先使用FINNHUB
         formatted_data = None
@@ -179,6 +183,50 @@ class OptimizedUSDataProvider:
 
         return formatted_data
     
+    def prefetch_stock_data(self, symbols: List[str], start_date: str, end_date: str,
+                            force_refresh: bool = False):
+        """
+        批量预取多只股票的数据并写入缓存，之后的 get_stock_data 直接命中缓存
+        
+        已有缓存的股票跳过；其余按分块一次请求多只（Yahoo Finance），拆分后逐只格式化并缓存。
+        
+        Args:
+            symbols: 股票代码列表
+            start_date: 开始日期 (YYYY-MM-DD)
+            end_date: 结束日期 (YYYY-MM-DD)
+            force_refresh: 是否忽略已有缓存
+        
+        Returns:
+            BulkResult: 本次下载的结果（不含已命中缓存的股票），failures 为失败的分块
+        """
+        from .bulk_download import BulkDownloader
+
+        pending = []
+        for symbol in dict.fromkeys(s.upper() for s in symbols):
+            if not force_refresh and any(
+                self.cache.find_cached_stock_data(symbol=symbol, start_date=start_date,
+                                                  end_date=end_date, data_source=source)
+                for source in ("finnhub", "yfinance")
+            ):
+                continue
+            pending.append(symbol)
+
+        logger.info(f"📦 批量预取美股数据: {len(pending)}/{len(symbols)}只需要下载 ({start_date} 到 {end_date})")
+        downloader = BulkDownloader(min_interval=self.min_api_interval)
+        result = downloader.download(pending, start_date, end_date)
+        if result.failures:
+            downloader.retry(result, start_date, end_date)
+
+        for symbol, data in result.data.items():
+            self.cache.save_stock_data(
+                symbol=symbol,
+                data=self._format_stock_data(symbol, data, start_date, end_date),
+                start_date=start_date,
+                end_date=end_date,
+                data_source="yfinance"
+            )
+        return result
+
     def _format_stock_data(self, symbol: str, data: pd.DataFrame, 
                           start_date: str, end_date: str) -> str:
         """格式化股票数据为字符串"""
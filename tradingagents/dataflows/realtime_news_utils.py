@@ -4,18 +4,37 @@
 解决新闻滞后性问题
 """
 
-import requests
 import json
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Any, Callable, List, Dict, Optional
 import time
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from .http_sessions import get_http_session
+from .news_dedup import DedupStats, dedupe_news
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.deadline import budget_timeout, remaining
 logger = get_logger('agents')
 
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """新闻数据源共用的线程池，首次使用时创建"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="news-source")
+    return _executor
+
 
 
 @dataclass
@@ -28,12 +47,26 @@ class NewsItem:
     url: str
     urgency: str  # high, medium, low
     relevance_score: float
+    # 近似重复的转载合并后：报道的来源数和其他来源
+    source_count: int = 1
+    duplicate_sources: List[str] = field(default_factory=list)
 
 
 class RealtimeNewsAggregator:
-    """实时新闻聚合器"""
-    
-    def __init__(self):
+    """实时新闻聚合器
+
+    各数据源并发请求，通过共享的keep-alive会话复用连接；每个数据源有自己的截止时间
+    （不超过运行剩余时间），总耗时约等于最慢的按时返回的数据源，而不是各数据源之和
+    """
+
+    # 各数据源的接口地址
+    ENDPOINTS = {
+        'finnhub': "https://finnhub.io/api/v1/company-news",
+        'alpha_vantage': "https://www.alphavantage.co/query",
+        'newsapi': "https://newsapi.org/v2/everything",
+    }
+
+    def __init__(self, endpoints: Dict[str, str] = None, source_timeout: float = None):
         self.headers = {
             'User-Agent': 'TradingAgents-CN/1.0'
         }
@@ -42,34 +75,74 @@ class RealtimeNewsAggregator:
         self.finnhub_key = os.getenv('FINNHUB_API_KEY')
         self.alpha_vantage_key = os.getenv('ALPHA_VANTAGE_API_KEY')
         self.newsapi_key = os.getenv('NEWSAPI_KEY')
+
+        # 接口地址（可替换，如指向测试服务）和单个数据源的截止时间（秒）
+        self.endpoints = {**self.ENDPOINTS, **(endpoints or {})}
+        self.source_timeout = source_timeout if source_timeout is not None else float(os.getenv('NEWS_SOURCE_TIMEOUT', 8))
+        # 最近一次获取中各数据源的耗时（秒），超过截止时间的数据源记为None
+        self.last_latencies: Dict[str, Optional[float]] = {}
+        # 最近一次去重合并的条数和节省的token估算
+        self.last_dedup_stats: Optional[DedupStats] = None
         
     def get_realtime_stock_news(self, ticker: str, hours_back: int = 6) -> List[NewsItem]:
         """
         获取实时股票新闻
-        优先级：专业API > 新闻API > 搜索引擎
+        优先级：专业API > 新闻API > 搜索引擎（各数据源并发请求，按优先级合并结果）
         """
-        all_news = []
-        
-        # 1. FinnHub实时新闻 (最高优先级)
-        finnhub_news = self._get_finnhub_realtime_news(ticker, hours_back)
-        all_news.extend(finnhub_news)
-        
-        # 2. Alpha Vantage新闻
-        av_news = self._get_alpha_vantage_news(ticker, hours_back)
-        all_news.extend(av_news)
-        
+        fetchers = {
+            # 1. FinnHub实时新闻 (最高优先级)
+            'finnhub': self._get_finnhub_realtime_news,
+            # 2. Alpha Vantage新闻
+            'alpha_vantage': self._get_alpha_vantage_news,
+        }
         # 3. NewsAPI (如果配置了)
         if self.newsapi_key:
-            newsapi_news = self._get_newsapi_news(ticker, hours_back)
-            all_news.extend(newsapi_news)
-        
+            fetchers['newsapi'] = self._get_newsapi_news
         # 4. 中文财经新闻源
-        chinese_news = self._get_chinese_finance_news(ticker, hours_back)
-        all_news.extend(chinese_news)
+        fetchers['chinese'] = self._get_chinese_finance_news
+
+        results = self._fetch_concurrently(fetchers, ticker, hours_back)
+        all_news = [item for name in fetchers for item in results.get(name, [])]
         
         # 去重和排序
         unique_news = self._deduplicate_news(all_news)
         return sorted(unique_news, key=lambda x: x.publish_time, reverse=True)
+
+    def _fetch_concurrently(self, fetchers: Dict[str, Callable[..., List[NewsItem]]], *args: Any) -> Dict[str, List[NewsItem]]:
+        """并发调用各数据源，只采用在各自截止时间内返回的结果"""
+        started = time.monotonic()
+        budget = min(self.source_timeout, remaining(self.source_timeout))
+        pending = {}
+        finished_at: Dict[str, float] = {}
+        for name, fetch in fetchers.items():
+            # 工作线程继承运行上下文（截止时间和取消信号）
+            context = contextvars.copy_context()
+            future = _get_executor().submit(context.run, fetch, *args)
+            future.add_done_callback(lambda _, name=name: finished_at.setdefault(name, time.monotonic()))
+            pending[future] = name
+
+        results: Dict[str, List[NewsItem]] = {}
+        self.last_latencies = {name: None for name in fetchers}
+        done, not_done = wait(list(pending), timeout=budget) if pending else (set(), set())
+        for future in done:
+            name = pending[future]
+            self.last_latencies[name] = finished_at.get(name, time.monotonic()) - started
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                logger.error(f"❌ [实时新闻] {name} 获取失败: {e}")
+        for future in not_done:
+            logger.warning(f"⏱️ [实时新闻] {pending[future]} 超过{budget:.1f}秒未返回，使用其他数据源的结果")
+        logger.debug(f"📰 [实时新闻] {len(done)}/{len(pending)} 个数据源按时返回，耗时 {time.monotonic() - started:.2f}s")
+        return results
+
+    def _request_json(self, source: str, params: Dict[str, Any]) -> Any:
+        """通过数据源的共享会话发起请求，超时不超过该数据源的截止时间和运行剩余时间"""
+        session = get_http_session(f"news:{source}")
+        response = session.get(self.endpoints[source], params=params, headers=self.headers,
+                               timeout=budget_timeout(self.source_timeout))
+        response.raise_for_status()
+        return response.json()
     
     def _get_finnhub_realtime_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
         """获取FinnHub实时新闻"""
@@ -82,7 +155,6 @@ class RealtimeNewsAggregator:
             start_time = end_time - timedelta(hours=hours_back)
             
             # FinnHub API调用
-            url = "https://finnhub.io/api/v1/company-news"
             params = {
                 'symbol': ticker,
                 'from': start_time.strftime('%Y-%m-%d'),
@@ -90,10 +162,7 @@ class RealtimeNewsAggregator:
                 'token': self.finnhub_key
             }
             
-            response = requests.get(url, params=params, headers=self.headers)
-            response.raise_for_status()
-            
-            news_data = response.json()
+            news_data = self._request_json('finnhub', params)
             news_items = []
             
             for item in news_data:
@@ -127,7 +196,6 @@ class RealtimeNewsAggregator:
             return []
         
         try:
-            url = "https://www.alphavantage.co/query"
             params = {
                 'function': 'NEWS_SENTIMENT',
                 'tickers': ticker,
@@ -135,10 +203,7 @@ class RealtimeNewsAggregator:
                 'limit': 50
             }
             
-            response = requests.get(url, params=params, headers=self.headers)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._request_json('alpha_vantage', params)
             news_items = []
             
             if 'feed' in data:
@@ -186,7 +251,6 @@ class RealtimeNewsAggregator:
             
             query = f"{ticker} OR {company_names.get(ticker, ticker)}"
             
-            url = "https://newsapi.org/v2/everything"
             params = {
                 'q': query,
                 'language': 'en',
@@ -195,10 +259,7 @@ class RealtimeNewsAggregator:
                 'apiKey': self.newsapi_key
             }
             
-            response = requests.get(url, params=params, headers=self.headers)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._request_json('newsapi', params)
             news_items = []
             
             for item in data.get('articles', []):
@@ -310,19 +371,23 @@ class RealtimeNewsAggregator:
         return 0.3  # 默认相关性
     
     def _deduplicate_news(self, news_items: List[NewsItem]) -> List[NewsItem]:
-        """去重新闻"""
-        seen_titles = set()
+        """去重新闻：标题+摘要近似重复的转载合并为一条，保留优先级最高的来源并记录来源数"""
+        candidates = [item for item in news_items if len(item.title.strip()) > 10]
+        clusters, self.last_dedup_stats = dedupe_news(candidates, lambda item: f"{item.title}\n{item.content}")
+
         unique_news = []
-        
-        for item in news_items:
-            # 简单的标题去重
-            title_key = item.title.lower().strip()
-            if title_key not in seen_titles and len(title_key) > 10:
-                seen_titles.add(title_key)
-                unique_news.append(item)
-        
+        for item, duplicates in clusters:
+            item.source_count = 1 + len(duplicates)
+            item.duplicate_sources = list(dict.fromkeys(d.source for d in duplicates if d.source != item.source))
+            unique_news.append(item)
         return unique_news
     
+    @staticmethod
+    def _format_sources(news: NewsItem) -> str:
+        if news.source_count <= 1:
+            return news.source
+        return f"{news.source}（共{news.source_count}条报道）"
+
     def format_news_report(self, news_items: List[NewsItem], ticker: str) -> str:
         """格式化新闻报告"""
         if not news_items:
@@ -341,14 +406,14 @@ class RealtimeNewsAggregator:
             report += "## 🚨 紧急新闻\n\n"
             for news in high_urgency[:3]:  # 最多显示3条
                 report += f"### {news.title}\n"
-                report += f"**来源**: {news.source} | **时间**: {news.publish_time.strftime('%H:%M')}\n"
+                report += f"**来源**: {self._format_sources(news)} | **时间**: {news.publish_time.strftime('%H:%M')}\n"
                 report += f"{news.content}\n\n"
         
         if medium_urgency:
             report += "## 📢 重要新闻\n\n"
             for news in medium_urgency[:5]:  # 最多显示5条
                 report += f"### {news.title}\n"
-                report += f"**来源**: {news.source} | **时间**: {news.publish_time.strftime('%H:%M')}\n"
+                report += f"**来源**: {self._format_sources(news)} | **时间**: {news.publish_time.strftime('%H:%M')}\n"
                 report += f"{news.content}\n\n"
         
         # 添加时效性说明
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Reddit数据索引
+fetch_top_from_category 原来每查询一天就把类别下所有JSONL文件逐行解析一遍，并对每个帖子逐个正则匹配公司名，
+回看7天就要重复扫描7次。这里一次性建立SQLite索引：帖子按UTC日期分区、按点赞数排序，
+公司类帖子用Aho-Corasick多模式匹配预先提取提及的股票代码，查询变为 (日期, 公司) → 前K条 的索引查找。
+源文件的大小或修改时间变化时只重建该文件的索引。
+
+命令行一次性建立索引：python -m tradingagents.dataflows.reddit_index [reddit_data目录]
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .reddit_utils import ticker_to_company
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+INDEX_FILENAME = ".reddit_index.sqlite3"
+
+
+class AhoCorasick:
+    """多模式子串匹配（不区分大小写）：一次扫描文本找出所有命中的模式对应的标签"""
+
+    def __init__(self, patterns: Dict[str, Set[str]]):
+        """patterns: 模式 -> 命中时返回的标签集合（如别名 -> 股票代码）"""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Set[str]] = [set()]
+        for pattern, labels in patterns.items():
+            node = 0
+            for char in pattern.lower():
+                if char not in self._goto[node]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(set())
+                    self._goto[node][char] = len(self._goto) - 1
+                node = self._goto[node][char]
+            self._out[node] |= set(labels)
+
+        # 按层次计算失败指针，并把失败链上的输出合并到当前节点
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] |= self._out[self._fail[child]]
+
+    def search(self, text: str) -> Set[str]:
+        found: Set[str] = set()
+        node = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for char in text.lower():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                found |= out[node]
+        return found
+
+
+def company_matcher(companies: Dict[str, str] = None) -> AhoCorasick:
+    """按 ticker_to_company 构建匹配器：股票代码本身和 " OR " 分隔的各个公司别名都算提及"""
+    patterns: Dict[str, Set[str]] = {}
+    for ticker, names in (companies or ticker_to_company).items():
+        for term in [*names.split(" OR "), ticker]:
+            if term:
+                patterns.setdefault(term.lower(), set()).add(ticker)
+    return AhoCorasick(patterns)
+
+
+class RedditIndex:
+    """Reddit数据目录的索引，保存在 ``{data_path}/.reddit_index.sqlite3``"""
+
+    def __init__(self, data_path: str, index_path: str = None):
+        self.data_path = data_path
+        self.index_path = index_path or os.path.join(data_path, INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self._matcher: Optional[AhoCorasick] = None
+        # 上次建索引时各JSONL文件的 (size, mtime)，用于访问时快速判断是否需要重建
+        self._snapshot: Optional[Dict[Tuple[str, str], Tuple[int, float]]] = None
+        with self._connect() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS sources (
+                    category TEXT NOT NULL,
+                    file TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    PRIMARY KEY (category, file)
+                );
+                CREATE TABLE IF NOT EXISTS posts (
+                    id INTEGER PRIMARY KEY,
+                    category TEXT NOT NULL,
+                    file TEXT NOT NULL,
+                    line INTEGER NOT NULL,
+                    post_date TEXT NOT NULL,
+                    ups INTEGER NOT NULL,
+                    body BLOB NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS posts_by_day ON posts (category, post_date, file, ups DESC, line);
+                CREATE TABLE IF NOT EXISTS mentions (
+                    ticker TEXT NOT NULL,
+                    post_date TEXT NOT NULL,
+                    post_id INTEGER NOT NULL,
+                    PRIMARY KEY (ticker, post_date, post_id)
+                ) WITHOUT ROWID;
+                """
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @property
+    def matcher(self) -> AhoCorasick:
+        if self._matcher is None:
+            self._matcher = company_matcher()
+        return self._matcher
+
+    def _scan(self, categories: Iterable[str] = None) -> Dict[Tuple[str, str], Tuple[int, float]]:
+        """列出数据目录下的JSONL文件及其 (size, mtime)"""
+        if categories is None:
+            categories = [name for name in os.listdir(self.data_path)
+                          if os.path.isdir(os.path.join(self.data_path, name))]
+        files = {}
+        for category in categories:
+            folder = os.path.join(self.data_path, category)
+            for data_file in sorted(os.listdir(folder)):
+                if data_file.endswith(".jsonl"):
+                    stat = os.stat(os.path.join(folder, data_file))
+                    files[(category, data_file)] = (stat.st_size, stat.st_mtime)
+        return files
+
+    def build(self, categories: Iterable[str] = None) -> int:
+        """为新增或变化的JSONL文件建立索引，删除已不存在文件的索引，返回重建的文件数"""
+        full_scan = categories is None
+        if full_scan:
+            categories = [name for name in os.listdir(self.data_path)
+                          if os.path.isdir(os.path.join(self.data_path, name))]
+        rebuilt = 0
+        with self._lock, self._connect() as conn:
+            indexed = {(row[0], row[1]): (row[2], row[3])
+                       for row in conn.execute("SELECT category, file, size, mtime FROM sources")}
+            current = self._scan(categories)
+            for (category, data_file), (size, mtime) in current.items():
+                if indexed.get((category, data_file)) == (size, mtime):
+                    continue
+                self._index_file(conn, category, data_file, size, mtime)
+                rebuilt += 1
+            for category, data_file in set(indexed) - set(current):
+                if category in categories:
+                    self._drop_file(conn, category, data_file)
+                    conn.execute("DELETE FROM sources WHERE category = ? AND file = ?", (category, data_file))
+            conn.commit()
+            if full_scan:
+                self._snapshot = current
+        if rebuilt:
+            logger.info(f"🗂️ [Reddit索引] 已索引 {rebuilt} 个文件: {self.index_path}")
+        return rebuilt
+
+    def refresh(self) -> int:
+        """只在JSONL文件新增、删除或 size/mtime 变化时重建，返回重建的文件数"""
+        if self._snapshot is not None and self._scan() == self._snapshot:
+            return 0
+        return self.build()
+
+    def _drop_file(self, conn, category: str, data_file: str):
+        conn.execute(
+            "DELETE FROM mentions WHERE post_id IN (SELECT id FROM posts WHERE category = ? AND file = ?)",
+            (category, data_file),
+        )
+        conn.execute("DELETE FROM posts WHERE category = ? AND file = ?", (category, data_file))
+
+    def _index_file(self, conn, category: str, data_file: str, size: int, mtime: float):
+        self._drop_file(conn, category, data_file)
+        match_companies = "company" in category
+        with open(os.path.join(self.data_path, category, data_file), "rb") as f:
+            for line_no, line in enumerate(f):
+                if not line.strip():
+                    continue
+                parsed = json.loads(line)
+                post_date = datetime.utcfromtimestamp(parsed["created_utc"]).strftime("%Y-%m-%d")
+                post = {"title": parsed["title"], "content": parsed["selftext"], "url": parsed["url"]}
+                body = zlib.compress(json.dumps(post, ensure_ascii=False).encode("utf-8"))
+                cursor = conn.execute(
+                    "INSERT INTO posts (category, file, line, post_date, ups, body) VALUES (?, ?, ?, ?, ?, ?)",
+                    (category, data_file, line_no, post_date, parsed["ups"], body),
+                )
+                if match_companies:
+                    # 标题和正文分别匹配，用不会出现在别名中的分隔符隔开
+                    tickers = self.matcher.search(f"{parsed['title']}\x00{parsed['selftext']}")
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO mentions (ticker, post_date, post_id) VALUES (?, ?, ?)",
+                        [(ticker, post_date, cursor.lastrowid) for ticker in tickers],
+                    )
+        conn.execute(
+            "INSERT OR REPLACE INTO sources (category, file, size, mtime) VALUES (?, ?, ?, ?)",
+            (category, data_file, size, mtime),
+        )
+
+    def top_posts(self, category: str, date: str, limit_per_file: int, ticker: str = None) -> Dict[str, List[dict]]:
+        """某天每个文件（子版块）点赞最多的前 limit_per_file 条帖子；ticker 只取提及该公司的帖子"""
+        if ticker and "company" in category:
+            query = (
+                "SELECT file, ups, body FROM ("
+                " SELECT p.file, p.ups, p.body, ROW_NUMBER() OVER (PARTITION BY p.file ORDER BY p.ups DESC, p.line) AS rank"
+                " FROM mentions m JOIN posts p ON p.id = m.post_id"
+                " WHERE m.ticker = ? AND m.post_date = ? AND p.category = ?"
+                ") WHERE rank <= ? ORDER BY file, rank"
+            )
+            params = (ticker, date, category, limit_per_file)
+        else:
+            query = (
+                "SELECT file, ups, body FROM ("
+                " SELECT file, ups, body, ROW_NUMBER() OVER (PARTITION BY file ORDER BY ups DESC, line) AS rank"
+                " FROM posts WHERE category = ? AND post_date = ?"
+                ") WHERE rank <= ? ORDER BY file, rank"
+            )
+            params = (category, date, limit_per_file)
+
+        result: Dict[str, List[dict]] = {}
+        with self._connect() as conn:
+            for data_file, ups, body in conn.execute(query, params):
+                post = json.loads(zlib.decompress(body).decode("utf-8"))
+                post.update(upvotes=ups, posted_date=date)
+                result.setdefault(data_file, []).append(post)
+        return result
+
+
+_indexes: Dict[str, RedditIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_reddit_index(data_path: str) -> RedditIndex:
+    """进程内共享的索引（每个数据目录一个），首次使用时建立，之后每次访问时重建有变化的文件"""
+    key = os.path.abspath(data_path)
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = RedditIndex(data_path)
+                index.build()
+                _indexes[key] = index
+                return index
+    index.refresh()
+    return index
+
+
+if __name__ == "__main__":
+    import sys
+    from .config import get_data_dir
+
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(get_data_dir(), "reddit_data")
+    count = RedditIndex(path).build()
+    print(f"✅ Reddit索引完成: {count} 个文件已更新 ({path})")
@@ -6,6 +6,11 @@ from contextlib import contextmanager
 from typing import Annotated
 import os
 import re
+import sqlite3
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
 
 ticker_to_company = {
     "AAPL": "Apple",
@@ -74,6 +79,17 @@ def fetch_top_from_category(
         os.listdir(os.path.join(base_path, category))
     )
 
+    if os.getenv("REDDIT_INDEX_ENABLED", "true").lower() == "true":
+        # 预建索引：按 (日期, 公司) 直接查找，不再逐行解析所有文件
+        from .reddit_index import get_reddit_index
+        try:
+            top_posts = get_reddit_index(base_path).top_posts(category, date, limit_per_subreddit, query)
+            for data_file in os.listdir(os.path.join(base_path, category)):
+                all_content.extend(top_posts.get(data_file, []))
+            return all_content
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ [Reddit索引] 索引不可用，逐行扫描数据文件: {e}")
+
     for data_file in os.listdir(os.path.join(base_path, category)):
         # check if data_file is a .jsonl file
         if not data_file.endswith(".jsonl"):
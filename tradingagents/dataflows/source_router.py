@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+数据源路由
+按各数据源的延迟和错误率排序、用熔断器跳过近期连续失败的数据源，并在主数据源超过其p95延迟仍未返回时
+对冲请求下一个数据源，先成功者胜出。数据源返回带状态的 FetchResult，不再通过检查返回文本判断成败
+"""
+
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.deadline import remaining
+logger = get_logger('agents')
+
+
+class FetchStatus(Enum):
+    """数据获取结果状态"""
+    OK = "ok"
+    EMPTY = "empty"  # 数据源正常响应但没有数据
+    ERROR = "error"
+    TIMEOUT = "timeout"
+
+
+@dataclass
+class FetchResult:
+    """一次数据获取的结果"""
+    source: str
+    status: FetchStatus
+    frame: Any = None  # pandas.DataFrame
+    text: Optional[str] = None  # 只能返回文本的数据源（如TDX）
+    error: Optional[str] = None
+    latency: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == FetchStatus.OK
+
+
+def to_fetch_result(source: str, value: Any) -> FetchResult:
+    """把数据源适配器的返回值转换为 FetchResult"""
+    if isinstance(value, FetchResult):
+        return value
+    if value is None:
+        return FetchResult(source, FetchStatus.EMPTY)
+    if getattr(value, "empty", False):
+        return FetchResult(source, FetchStatus.EMPTY, frame=value)
+    return FetchResult(source, FetchStatus.OK, frame=value)
+
+
+class SourceHealth:
+    """单个数据源的健康统计：延迟和错误率的EWMA、最近延迟的p95，以及熔断器
+
+    连续失败 failure_threshold 次后熔断，冷却 cooldown 秒内不再路由到该数据源；
+    冷却结束后半开放行一个请求，成功则恢复，失败则重新熔断。
+    没有数据（EMPTY）不计为数据源故障。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, alpha: float = 0.3, failure_threshold: int = 3, cooldown: float = 60,
+                 window: int = 50, clock: Callable[[], float] = time.monotonic):
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.latency_ewma: Optional[float] = None
+        self.error_ewma = 0.0
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._latencies = deque(maxlen=window)
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.cooldown:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        """熔断时拒绝；半开时只放行一个探测请求"""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, result: FetchResult):
+        with self._lock:
+            failed = result.status in (FetchStatus.ERROR, FetchStatus.TIMEOUT)
+            if not failed:
+                self._latencies.append(result.latency)
+                self.latency_ewma = result.latency if self.latency_ewma is None else (
+                    self.alpha * result.latency + (1 - self.alpha) * self.latency_ewma)
+            self.error_ewma = self.alpha * (1.0 if failed else 0.0) + (1 - self.alpha) * self.error_ewma
+            self._probing = False
+            if failed:
+                self.consecutive_failures += 1
+                if self.opened_at is not None or self.consecutive_failures >= self.failure_threshold:
+                    self.opened_at = self.clock()
+            else:
+                self.consecutive_failures = 0
+                self.opened_at = None
+
+    def p95(self) -> Optional[float]:
+        with self._lock:
+            if len(self._latencies) < 5:
+                return None
+            ordered = sorted(self._latencies)
+            return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def score(self, default_latency: float) -> float:
+        """路由排序分数，越小越优先"""
+        latency = default_latency if self.latency_ewma is None else self.latency_ewma
+        return latency * (1 + 4 * self.error_ewma)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "latency_ewma": self.latency_ewma,
+            "error_rate": round(self.error_ewma, 3),
+            "p95": self.p95(),
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+class _Attempt:
+    """一次数据源调用的结果只计入统计一次：数据源返回和截止时间判定超时，先发生的一方记录"""
+
+    def __init__(self):
+        self._recorded = False
+        self._lock = threading.Lock()
+
+    def claim(self) -> bool:
+        with self._lock:
+            if self._recorded:
+                return False
+            self._recorded = True
+            return True
+
+
+class HedgedRouter:
+    """在多个数据源之间路由请求
+
+    Args:
+        sources: 数据源名 -> 获取函数 ``fn(*args)``，返回 DataFrame、None 或 FetchResult，失败时抛异常
+        hedge_delay: 数据源还没有足够的延迟样本时使用的对冲等待时间（秒）
+        min_hedge_delay: 对冲等待时间下限，避免对正常的快速请求也发出对冲
+        timeout: 整个请求的截止时间（秒），不超过当前运行的剩余时间
+    """
+
+    def __init__(self, sources: Dict[str, Callable[..., Any]], hedge_delay: float = 3.0,
+                 min_hedge_delay: float = 0.2, timeout: float = 30.0, max_workers: int = 8,
+                 failure_threshold: int = 3, cooldown: float = 60,
+                 clock: Callable[[], float] = time.monotonic):
+        self.sources = dict(sources)
+        self.hedge_delay = hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.timeout = timeout
+        self.clock = clock
+        self.health = {name: SourceHealth(failure_threshold=failure_threshold, cooldown=cooldown, clock=clock)
+                       for name in self.sources}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="data-source")
+
+    def rank(self, preferred: Optional[str] = None) -> List[str]:
+        """可用数据源的尝试顺序：首选数据源在前，其余按延迟和错误率排序，熔断中的数据源排除"""
+        names = sorted(self.sources, key=lambda name: self.health[name].score(self.hedge_delay))
+        if preferred in self.sources:
+            names.remove(preferred)
+            names.insert(0, preferred)
+        return [name for name in names if self.health[name].state != SourceHealth.OPEN]
+
+    def _hedge_after(self, name: str) -> float:
+        p95 = self.health[name].p95()
+        return max(self.min_hedge_delay, self.hedge_delay if p95 is None else p95)
+
+    def _call(self, name: str, args: tuple, attempt: Optional[_Attempt] = None) -> FetchResult:
+        started = time.perf_counter()
+        try:
+            result = to_fetch_result(name, self.sources[name](*args))
+        except Exception as e:
+            status = FetchStatus.TIMEOUT if isinstance(e, TimeoutError) else FetchStatus.ERROR
+            result = FetchResult(name, status, error=f"{type(e).__name__}: {e}")
+        result.latency = time.perf_counter() - started
+        # 对冲中落败的请求也计入统计；已按超过截止时间记录过的不再重复记录
+        if attempt is None or attempt.claim():
+            self.health[name].record(result)
+        return result
+
+    def fetch(self, *args, preferred: Optional[str] = None, timeout: Optional[float] = None) -> FetchResult:
+        """按路由顺序获取数据，返回第一个成功的结果；全部失败时返回最有信息量的失败结果"""
+        order = self.rank(preferred)
+        budget = self.timeout if timeout is None else timeout
+        deadline = self.clock() + min(budget, remaining(budget))
+        pending: Dict[Any, str] = {}
+        attempts: Dict[Any, _Attempt] = {}
+        failures: List[FetchResult] = []
+        hedge_at = None
+
+        def launch_next() -> bool:
+            nonlocal hedge_at
+            while order:
+                name = order.pop(0)
+                if not self.health[name].allow_request():
+                    continue
+                # 数据源线程继承运行上下文（截止时间和取消信号）
+                context = contextvars.copy_context()
+                attempt = _Attempt()
+                future = self._executor.submit(context.run, self._call, name, args, attempt)
+                pending[future] = name
+                attempts[future] = attempt
+                # 没有后续数据源可对冲时一直等到截止时间，不再按对冲时间反复唤醒
+                hedge_at = self.clock() + self._hedge_after(name) if order else None
+                return True
+            hedge_at = None
+            return False
+
+        launch_next()
+        while pending:
+            now = self.clock()
+            if now >= deadline:
+                break
+            wait_until = deadline if hedge_at is None else min(deadline, hedge_at)
+            done, _ = wait(list(pending), timeout=max(wait_until - now, 0), return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.pop(future)
+                result = future.result()
+                if result.ok:
+                    if failures or pending:
+                        logger.info(f"✅ [数据源路由] {result.source} 胜出，耗时 {result.latency:.2f}s")
+                    return result
+                logger.warning(f"⚠️ [数据源路由] {result.source} {result.status.value}: {result.error or '无数据'}")
+                failures.append(result)
+            if done:
+                # 有数据源失败，立即补上下一个
+                launch_next()
+            elif hedge_at is not None and self.clock() >= hedge_at and order:
+                logger.info(f"🔀 [数据源路由] {', '.join(pending.values())} 超过对冲等待时间，同时请求下一个数据源")
+                launch_next()
+
+        for future, name in pending.items():
+            timed_out = FetchResult(name, FetchStatus.TIMEOUT, error="超过截止时间")
+            if attempts[future].claim():
+                self.health[name].record(timed_out)
+            failures.append(timed_out)
+        if not failures:
+            return FetchResult("none", FetchStatus.ERROR, error="没有可用的数据源")
+        # 有数据源正常响应但没有数据时，比超时或异常更能说明问题
+        empty = [result for result in failures if result.status == FetchStatus.EMPTY]
+        return empty[0] if empty else failures[0]
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: health.snapshot() for name, health in self.health.items()}
+
+
+def router_settings() -> Dict[str, float]:
+    """从环境变量读取路由参数"""
+    return {
+        "hedge_delay": float(os.getenv("DATA_SOURCE_HEDGE_DELAY", 3)),
+        "timeout": float(os.getenv("DATA_SOURCE_TIMEOUT", 30)),
+        "failure_threshold": int(os.getenv("DATA_SOURCE_BREAKER_FAILURES", 3)),
+        "cooldown": float(os.getenv("DATA_SOURCE_BREAKER_COOLDOWN", 60)),
+    }
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+股票代码主表
+原来代码和名称的解析分散在各处：search_stocks 每次按键都完整获取一遍股票列表再线性扫描，
+通达信按代码逐个查询MongoDB，港股和美股工具各自维护硬编码的名称映射。
+这里在进程内维护一份代码主表：启动时从 stock_basic_info 加载一次（叠加内置的港股/美股常用列表），
+之后按 updated_at 增量刷新。查询使用排好序的前缀数组（二分查找）和字符n-gram倒排索引，
+支持代码/名称前缀、模糊匹配、中文名称拼音首字母（pa → 平安）和批量代码→名称解析。
+
+拼音首字母优先使用 pypinyin（可选依赖，能处理多音字和生僻字）；未安装时按GB2312一级汉字的拼音排序推算，
+并对常见多音字给出所有读音。
+"""
+
+import bisect
+import itertools
+import os
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+try:
+    import pypinyin
+    PYPINYIN_AVAILABLE = True
+except ImportError:
+    PYPINYIN_AVAILABLE = False
+
+MARKET_A = 'A股'
+MARKET_HK = '港股'
+MARKET_US = '美股'
+
+# 内置常用股票（数据库不可用时也能解析名称；数据库中的记录优先）
+A_SHARE_NAMES = {
+    # 深圳主板
+    '000001': '平安银行',
+    '000002': '万科A',
+    '000858': '五粮液',
+    '000895': '双汇发展',
+
+    # 深圳中小板
+    '002594': '比亚迪',
+    '002415': '海康威视',
+    '002304': '洋河股份',
+
+    # 深圳创业板
+    '300001': '特锐德',
+    '300015': '爱尔眼科',
+    '300059': '东方财富',
+    '300750': '宁德时代',
+
+    # 上海主板
+    '600519': '贵州茅台',
+    '600036': '招商银行',
+    '601398': '工商银行',
+    '601127': '小康股份',
+    '600000': '浦发银行',
+    '601318': '中国平安',
+    '600276': '恒瑞医药',
+    '600887': '伊利股份',
+
+    # 科创板
+    '688981': '中芯国际',
+    '688599': '天合光能',
+}
+
+HK_NAMES = {
+    '00700': '腾讯控股',
+    '00941': '中国移动', '00762': '中国联通', '00728': '中国电信',
+    '00939': '建设银行', '01398': '工商银行', '03988': '中国银行', '00005': '汇丰控股',
+    '01299': '友邦保险', '02318': '中国平安', '02628': '中国人寿',
+    '00857': '中国石油', '00386': '中国石化',
+    '01109': '华润置地', '01997': '九龙仓置业',
+    '09988': '阿里巴巴', '03690': '美团', '01024': '快手', '09618': '京东集团',
+    '01876': '百威亚太', '00291': '华润啤酒',
+    '01093': '石药集团', '00867': '康师傅',
+    '02238': '广汽集团', '01211': '比亚迪',
+    '00753': '中国国航', '00670': '中国东航',
+    '00347': '鞍钢股份',
+    '00902': '华能国际', '00991': '大唐发电',
+}
+
+# 代码 -> (中文名称, 英文名称)
+US_NAMES = {
+    'AAPL': ('苹果公司', 'Apple'),
+    'TSLA': ('特斯拉', 'Tesla'),
+    'NVDA': ('英伟达', 'NVIDIA'),
+    'MSFT': ('微软', 'Microsoft'),
+    'GOOGL': ('谷歌', 'Google'),
+    'AMZN': ('亚马逊', 'Amazon'),
+    'META': ('Meta', 'Meta'),
+    'NFLX': ('奈飞', 'Netflix'),
+}
+
+_SUFFIX_RE = re.compile(r"\.(SZ|SH|SS|BJ|HK)$", re.IGNORECASE)
+_CJK_RE = re.compile(r"[\u3400-\u9fff]")
+_CODE_CHARS_RE = re.compile(r"[0-9a-z]")
+_WORD_RE = re.compile(r"[0-9a-z]+")
+
+
+def normalize_code(code: str) -> Tuple[str, str]:
+    """规范化股票代码，返回 (代码, 市场)：A股6位数字，港股补齐为5位数字，美股大写"""
+    code = str(code).strip().upper()
+    match = _SUFFIX_RE.search(code)
+    suffix = match.group(1) if match else ''
+    code = _SUFFIX_RE.sub('', code)
+    if code.isdigit():
+        if suffix == 'HK' or len(code) <= 5:
+            return code.zfill(5)[-5:], MARKET_HK
+        return code, MARKET_A
+    return code, MARKET_US
+
+
+# GB2312一级汉字按拼音排序：各声母区间的起始区位码
+_GB2312_INITIALS = [
+    (0xB0A1, 'a'), (0xB0C5, 'b'), (0xB2C1, 'c'), (0xB4EE, 'd'), (0xB6EA, 'e'), (0xB7A2, 'f'),
+    (0xB8C1, 'g'), (0xB9FE, 'h'), (0xBBF7, 'j'), (0xBFA6, 'k'), (0xC0AC, 'l'), (0xC2E8, 'm'),
+    (0xC4C3, 'n'), (0xC5B6, 'o'), (0xC5BE, 'p'), (0xC6DA, 'q'), (0xC8BB, 'r'), (0xC8F6, 's'),
+    (0xCBFA, 't'), (0xCDDA, 'w'), (0xCEF4, 'x'), (0xD1B9, 'y'), (0xD4D1, 'z'),
+]
+_GB2312_STARTS = [start for start, _ in _GB2312_INITIALS]
+_GB2312_LEVEL1_END = 0xD7F9
+# 股票名称中常见的多音字及GB2312二级字
+_INITIAL_OVERRIDES = {
+    '行': 'hx', '长': 'cz', '重': 'zc', '乐': 'ly', '厦': 'xs', '藏': 'zc', '朝': 'zc',
+    '单': 'ds', '曾': 'zc', '沈': 's', '蚌': 'b', '番': 'fp', '莞': 'g', '泸': 'l',
+    '浚': 'jx', '珈': 'j', '璞': 'p', '钜': 'j', '铖': 'c', '昇': 's', '晟': 's', '鑫': 'x',
+    '淼': 'm', '喆': 'z', '琦': 'q', '骅': 'h', '垚': 'y', '翊': 'y', '昊': 'h',
+}
+
+
+def _char_initials(char: str) -> str:
+    """单个汉字可能的拼音首字母（多音字返回多个），无法识别时返回空串"""
+    if char in _INITIAL_OVERRIDES:
+        return _INITIAL_OVERRIDES[char]
+    if PYPINYIN_AVAILABLE:
+        readings = pypinyin.pinyin(char, style=pypinyin.Style.FIRST_LETTER, heteronym=True)[0]
+        return ''.join(dict.fromkeys(r.lower() for r in readings if r.isalpha()))
+    try:
+        raw = char.encode('gb2312')
+    except UnicodeEncodeError:
+        return ''
+    if len(raw) != 2:
+        return ''
+    position = raw[0] << 8 | raw[1]
+    if not _GB2312_STARTS[0] <= position <= _GB2312_LEVEL1_END:
+        return ''
+    return _GB2312_INITIALS[bisect.bisect_right(_GB2312_STARTS, position) - 1][1]
+
+
+def pinyin_initials(name: str, max_variants: int = 4) -> List[str]:
+    """名称的拼音首字母串（如 平安银行 → payh），多音字组合最多 max_variants 种；字母数字原样保留"""
+    choices = []
+    for char in name.lower():
+        if _CODE_CHARS_RE.match(char):
+            choices.append(char)
+        elif _CJK_RE.match(char):
+            initials = _char_initials(char)
+            if initials:
+                choices.append(initials)
+    if not choices:
+        return []
+    return [''.join(parts) for parts in itertools.islice(itertools.product(*choices), max_variants)]
+
+
+def _grams(text: str) -> List[str]:
+    """模糊匹配用的片段：汉字取单字，字母数字取相邻二元组（单个字符时取其本身）"""
+    text = text.lower()
+    grams = _CJK_RE.findall(text)
+    for run in _WORD_RE.findall(text):
+        if len(run) == 1:
+            grams.append(run)
+        grams.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return grams
+
+
+@dataclass(frozen=True)
+class Symbol:
+    """主表中的一只股票"""
+    code: str
+    name: str
+    market: str
+    english_name: str = ''
+    category: str = ''
+
+    def to_dict(self) -> Dict[str, str]:
+        return asdict(self)
+
+
+class _SymbolIndex:
+    """某一时刻主表的只读索引；主表变化时整体重建后替换，查询无需加锁"""
+
+    def __init__(self, symbols: Dict[str, Symbol]):
+        self.symbols: List[Symbol] = sorted(symbols.values(), key=lambda s: (s.market, s.code))
+        self.by_code: Dict[str, int] = {s.code: i for i, s in enumerate(self.symbols)}
+        code_keys, name_keys, pinyin_keys = [], [], []
+        grams: Dict[str, set] = {}
+        self.gram_counts: List[int] = []
+        for i, symbol in enumerate(self.symbols):
+            code = symbol.code.lower()
+            code_keys.append((code, i))
+            if symbol.market == MARKET_HK:
+                code_keys.append((code.lstrip('0'), i))
+            for name in {symbol.name.lower(), symbol.english_name.lower()} - {''}:
+                name_keys.append((name, i))
+            for initials in pinyin_initials(symbol.name):
+                pinyin_keys.append((initials, i))
+            # 代码只做前缀匹配：数字二元组区分度太低，模糊匹配只看名称
+            symbol_grams = set(_grams(f"{symbol.name} {symbol.english_name}"))
+            self.gram_counts.append(len(symbol_grams))
+            for gram in symbol_grams:
+                grams.setdefault(gram, set()).add(i)
+        self.prefix_arrays = [sorted(set(keys)) for keys in (code_keys, name_keys, pinyin_keys)]
+        self.grams: Dict[str, Tuple[int, ...]] = {gram: tuple(ids) for gram, ids in grams.items()}
+
+    def prefix(self, keys: List[Tuple[str, int]], prefix: str, limit: int) -> Iterable[int]:
+        """以 prefix 开头的键对应的下标（按键排序），二分查找定位起点"""
+        start = bisect.bisect_left(keys, (prefix, -1))
+        for key, i in keys[start:start + limit]:
+            if not key.startswith(prefix):
+                break
+            yield i
+
+    def fuzzy(self, query: str, limit: int, threshold: float, min_shared: int = 2) -> List[int]:
+        """按共有片段的Dice系数排序的下标
+
+        至少共有 min_shared 个片段（查询本身更短时为全部片段），
+        避免短查询只因一个相同的字就匹配到不相关的名称（"平安" 不应匹配 "西安旅游"）
+        """
+        query_grams = set(_grams(query))
+        if not query_grams:
+            return []
+        hits = Counter()
+        for gram in query_grams:
+            hits.update(self.grams.get(gram, ()))
+        required = min(min_shared, len(query_grams))
+        scored = [
+            (2 * count / (len(query_grams) + self.gram_counts[i]), i)
+            for i, count in hits.items() if count >= required
+        ]
+        scored = [item for item in scored if item[0] >= threshold]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [i for _, i in scored[:limit]]
+
+
+def _load_stock_basic_info(since: Optional[str]) -> List[dict]:
+    """从MongoDB的 stock_basic_info 读取股票（since 之后更新的记录，None 表示全部）"""
+    try:
+        from tradingagents.config.database_manager import get_database_manager
+        manager = get_database_manager()
+        client = manager.get_mongodb_client()
+        if client is None:
+            return []
+        collection = client[manager.mongodb_config["database"]]['stock_basic_info']
+        query = {'updated_at': {'$gt': since}} if since else {}
+        return list(collection.find(query, {'_id': 0}))
+    except Exception as e:
+        logger.warning(f"⚠️ [代码主表] 读取stock_basic_info失败: {e}")
+        return []
+
+
+class SymbolMaster:
+    """进程内的股票代码主表
+
+    Args:
+        loader: (since) -> 记录列表，每条记录包含 code、name，可选 market、english_name、category、updated_at；
+                since 为上次加载的最大 updated_at（首次为None）。默认读取MongoDB的 stock_basic_info
+        refresh_interval: 增量刷新间隔（秒），0 表示不自动刷新
+    """
+
+    def __init__(self, loader: Callable[[Optional[str]], List[dict]] = _load_stock_basic_info,
+                 refresh_interval: float = 3600, include_builtin: bool = True):
+        self._loader = loader
+        self.refresh_interval = refresh_interval
+        self._symbols: Dict[str, Symbol] = {}
+        # 数据源的原始记录（search_stocks 按原来的字段返回）
+        self._records: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._watermark: Optional[str] = None
+        self._last_refresh = 0.0
+        # 是否已有来自数据源（而不只是内置列表）的记录
+        self.has_listing = False
+        if include_builtin:
+            self._symbols.update(_builtin_symbols())
+        self._index = _SymbolIndex(self._symbols)
+
+    def __len__(self) -> int:
+        return len(self._index.symbols)
+
+    def update(self, records: Iterable[dict]) -> int:
+        """新增或更新记录并重建索引，返回变化的记录数"""
+        changed = 0
+        with self._lock:
+            for record in records:
+                if not record.get('code') or not record.get('name') or 'error' in record:
+                    continue
+                code, market = normalize_code(record['code'])
+                current = self._symbols.get(code)
+                symbol = Symbol(
+                    code=code,
+                    name=str(record['name']).strip(),
+                    market=market,
+                    english_name=record.get('english_name') or (current.english_name if current else ''),
+                    category=record.get('category') or (current.category if current else ''),
+                )
+                updated_at = record.get('updated_at')
+                if updated_at is not None:
+                    updated_at = updated_at.isoformat() if hasattr(updated_at, 'isoformat') else str(updated_at)
+                    if self._watermark is None or updated_at > self._watermark:
+                        self._watermark = updated_at
+                self._records[code] = {key: value for key, value in record.items() if key != '_id'}
+                if current != symbol:
+                    self._symbols[code] = symbol
+                    changed += 1
+            if changed:
+                self.has_listing = True
+                self._index = _SymbolIndex(self._symbols)
+        return changed
+
+    def refresh(self) -> int:
+        """从数据源增量加载自上次以来更新的记录，返回变化的记录数"""
+        started = time.perf_counter()
+        records = self._loader(self._watermark)
+        self._last_refresh = time.time()
+        changed = self.update(records)
+        if changed:
+            logger.info(
+                f"📇 [代码主表] 更新 {changed} 条，共 {len(self)} 只股票 "
+                f"({(time.perf_counter() - started) * 1000:.0f}ms)"
+            )
+        return changed
+
+    def maybe_refresh(self):
+        """超过刷新间隔时在后台线程增量刷新，不阻塞当前查询"""
+        if not self.refresh_interval or time.time() - self._last_refresh < self.refresh_interval:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="symbol-master-refresh", daemon=True).start()
+
+    def get(self, code: str) -> Optional[Symbol]:
+        index = self._index
+        i = index.by_code.get(normalize_code(code)[0])
+        return index.symbols[i] if i is not None else None
+
+    def record(self, code: str) -> Optional[dict]:
+        """数据源中该股票的原始记录（stock_basic_info 的字段）；内置列表中的股票只有 code、name、market、category"""
+        symbol = self.get(code)
+        if symbol is None:
+            return None
+        record = self._records.get(symbol.code)
+        if record is not None:
+            return dict(record)
+        return {'code': symbol.code, 'name': symbol.name, 'market': symbol.market, 'category': symbol.category}
+
+    def name(self, code: str, default: Optional[str] = None) -> Optional[str]:
+        symbol = self.get(code)
+        return symbol.name if symbol else default
+
+    def names(self, codes: Iterable[str]) -> Dict[str, Optional[str]]:
+        """批量代码→名称，未知代码为None"""
+        return {code: self.name(code) for code in codes}
+
+    def search(self, query: str, limit: Optional[int] = 20, market: str = None,
+               fuzzy_threshold: float = 0.3) -> List[Symbol]:
+        """按代码、名称、拼音首字母前缀搜索，不足 limit 条时用模糊匹配补充
+
+        排序：代码完全匹配 → 代码前缀 → 名称前缀 → 拼音首字母前缀 → 模糊匹配（相似度降序）。
+        limit 为 None 时返回全部匹配：用代码/名称包含查询词的结果代替模糊匹配
+        """
+        query = query.strip()
+        if not query:
+            return []
+        index = self._index
+        unlimited = limit is None
+        if unlimited:
+            limit = len(index.symbols)
+        # 有市场过滤时多取一些候选
+        budget = limit * 4 if market else limit
+        ordered: List[int] = []
+        # 纯数字少于4位时按前缀处理（"6" 不应精确命中港股00006）
+        if not query.isdigit() or len(query) >= 4:
+            exact = index.by_code.get(normalize_code(query)[0])
+            if exact is not None:
+                ordered.append(exact)
+        prefix = query.lower()
+        for keys in index.prefix_arrays:
+            ordered.extend(index.prefix(keys, prefix, budget))
+        if unlimited:
+            ordered.extend(
+                i for i, symbol in enumerate(index.symbols)
+                if prefix in symbol.code.lower() or prefix in symbol.name.lower()
+                or prefix in symbol.english_name.lower()
+            )
+        elif len(set(ordered)) < budget:
+            ordered.extend(index.fuzzy(query, budget, fuzzy_threshold))
+
+        results: List[Symbol] = []
+        seen = set()
+        for i in ordered:
+            symbol = index.symbols[i]
+            if i in seen or (market and symbol.market != market):
+                continue
+            seen.add(i)
+            results.append(symbol)
+            if len(results) >= limit:
+                break
+        return results
+
+
+def _builtin_symbols() -> Dict[str, Symbol]:
+    symbols = {code: Symbol(code, name, MARKET_A) for code, name in A_SHARE_NAMES.items()}
+    symbols.update((code, Symbol(code, name, MARKET_HK)) for code, name in HK_NAMES.items())
+    symbols.update(
+        (code, Symbol(code, name, MARKET_US, english_name=english)) for code, (name, english) in US_NAMES.items()
+    )
+    return symbols
+
+
+_master: Optional[SymbolMaster] = None
+_master_lock = threading.Lock()
+
+
+def get_symbol_master() -> SymbolMaster:
+    """进程内共享的代码主表：首次调用时加载，之后按 SYMBOL_MASTER_REFRESH_SECONDS 在后台增量刷新"""
+    global _master
+    if _master is None:
+        with _master_lock:
+            if _master is None:
+                master = SymbolMaster(refresh_interval=float(os.getenv("SYMBOL_MASTER_REFRESH_SECONDS", 3600)))
+                master.refresh()
+                _master = master
+    else:
+        _master.maybe_refresh()
+    return _master
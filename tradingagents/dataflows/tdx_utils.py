@@ -159,7 +159,7 @@ class TongDaXinDataProvider:
     def _get_stock_name(self, stock_code: str) -> str:
         """
         获取股票名称
-        优先级：缓存 -> MongoDB -> 常用股票映射 -> API获取（仅深圳市场） -> 默认格式
+        优先级：代码主表（stock_basic_info + 常用股票） -> 缓存 -> API获取（仅深圳市场） -> 默认格式
         Args:
             stock_code: 股票代码
         Returns:
@@ -167,22 +167,16 @@ class TongDaXinDataProvider:
         """
         global _stock_name_cache
         
-        # 首先检查缓存
+        # 首先查进程内的代码主表（一次性加载，不再逐个查询MongoDB）
+        from .symbol_master import get_symbol_master
+        master_name = get_symbol_master().name(stock_code)
+        if master_name:
+            return master_name
+        
+        # 检查缓存
         if stock_code in _stock_name_cache:
             return _stock_name_cache[stock_code]
         
-        # 优先从MongoDB获取
-        mongodb_name = _get_stock_name_from_mongodb(stock_code)
-        if mongodb_name:
-            _stock_name_cache[stock_code] = mongodb_name
-            return mongodb_name
-        
-        # 检查常用股票映射表
-        if stock_code in _common_stock_names:
-            name = _common_stock_names[stock_code]
-            _stock_name_cache[stock_code] = name
-            return name
-        
         # 如果API不可用，直接返回默认格式
         if not self.connected:
             if not self.connect():
@@ -553,58 +547,8 @@ def _get_mongodb_connection():
     
     return _mongodb_client, _mongodb_db
 
-def _get_stock_name_from_mongodb(stock_code: str) -> Optional[str]:
-    """从MongoDB获取股票名称"""
-    try:
-        client, db = _get_mongodb_connection()
-        if db is None:
-            return None
-        
-        collection = db['stock_basic_info']
-        stock_info = collection.find_one({'code': stock_code})
-        
-        if stock_info and 'name' in stock_info:
-            return stock_info['name'].strip()
-        
-        return None
-        
-    except Exception as e:
-        logger.error(f"⚠️ 从MongoDB获取股票名称失败: {e}")
-        return None
-
-# 精简的常用股票名称映射（仅包含最常见的股票）
-_common_stock_names = {
-    # 深圳主板
-    '000001': '平安银行',
-    '000002': '万科A',
-    '000858': '五粮液',
-    '000895': '双汇发展',
-    
-    # 深圳中小板
-    '002594': '比亚迪',
-    '002415': '海康威视',
-    '002304': '洋河股份',
-    
-    # 深圳创业板
-    '300001': '特锐德',
-    '300015': '爱尔眼科',
-    '300059': '东方财富',
-    '300750': '宁德时代',
-    
-    # 上海主板
-    '600519': '贵州茅台',
-    '600036': '招商银行',
-    '601398': '工商银行',
-    '601127': '小康股份',
-    '600000': '浦发银行',
-    '601318': '中国平安',
-    '600276': '恒瑞医药',
-    '600887': '伊利股份',
-    
-    # 科创板
-    '688981': '中芯国际',
-    '688599': '天合光能',
-}
+# 常用股票映射已并入代码主表，保留旧名称供现有引用使用
+from .symbol_master import A_SHARE_NAMES as _common_stock_names
 
 def get_tdx_provider() -> TongDaXinDataProvider:
     """获取通达信数据提供器实例"""
@@ -69,7 +69,7 @@ class TushareDataAdapter:
             logger.error("❌ Tushare不可用")
     
     def get_stock_data(self, symbol: str, start_date: str = None, end_date: str = None, 
-                      data_type: str = "daily") -> pd.DataFrame:
+                      data_type: str = "daily", raise_errors: bool = False) -> pd.DataFrame:
         """
         获取股票数据
         
@@ -78,12 +78,15 @@ class TushareDataAdapter:
             start_date: 开始日期
             end_date: 结束日期
             data_type: 数据类型 ("daily", "realtime")
+            raise_errors: 失败时抛出异常而不是返回空DataFrame（供数据源路由统计故障）
             
         Returns:
             DataFrame: 股票数据
         """
         if not self.provider or not self.provider.connected:
             logger.error("❌ Tushare数据源不可用")
+            if raise_errors:
+                raise ConnectionError("Tushare数据源不可用")
             return pd.DataFrame()
 
         try:
@@ -96,7 +99,7 @@ class TushareDataAdapter:
 
             if data_type == "daily":
                 logger.info(f"🔍 [股票代码追踪] 调用 _get_daily_data，传入参数: symbol='{symbol}'")
-                return self._get_daily_data(symbol, start_date, end_date)
+                return self._get_daily_data(symbol, start_date, end_date, raise_errors=raise_errors)
             elif data_type == "realtime":
                 return self._get_realtime_data(symbol)
             else:
@@ -105,9 +108,12 @@ class TushareDataAdapter:
                 
         except Exception as e:
             logger.error(f"❌ 获取{symbol}数据失败: {e}")
+            if raise_errors:
+                raise
             return pd.DataFrame()
     
-    def _get_daily_data(self, symbol: str, start_date: str = None, end_date: str = None) -> pd.DataFrame:
+    def _get_daily_data(self, symbol: str, start_date: str = None, end_date: str = None,
+                        raise_errors: bool = False) -> pd.DataFrame:
         """获取日线数据"""
 
         # 记录详细的调用信息
@@ -157,7 +163,7 @@ class TushareDataAdapter:
 
         import time
         provider_start_time = time.time()
-        data = self.provider.get_stock_daily(symbol, start_date, end_date)
+        data = self.provider.get_stock_daily(symbol, start_date, end_date, raise_errors=raise_errors)
         provider_duration = time.time() - provider_start_time
 
         logger.info(f"🔍 [TushareAdapter详细日志] Provider调用完成，耗时: {provider_duration:.3f}秒")
@@ -146,7 +146,8 @@ class TushareProvider:
             logger.error(f"❌ 获取股票列表失败: {e}")
             return pd.DataFrame()
     
-    def get_stock_daily(self, symbol: str, start_date: str = None, end_date: str = None) -> pd.DataFrame:
+    def get_stock_daily(self, symbol: str, start_date: str = None, end_date: str = None,
+                        raise_errors: bool = False) -> pd.DataFrame:
         """
         获取股票日线数据
         
@@ -154,6 +155,7 @@ class TushareProvider:
             symbol: 股票代码（如：000001.SZ）
             start_date: 开始日期（YYYYMMDD）
             end_date: 结束日期（YYYYMMDD）
+            raise_errors: 失败时抛出异常而不是返回空DataFrame（供数据源路由统计故障）
             
         Returns:
             DataFrame: 日线数据
@@ -166,6 +168,8 @@ class TushareProvider:
 
         if not self.connected:
             logger.error(f"❌ [Tushare详细日志] Tushare未连接，无法获取数据")
+            if raise_errors:
+                raise ConnectionError("Tushare未连接")
             return pd.DataFrame()
 
         try:
@@ -273,6 +277,8 @@ class TushareProvider:
             logger.error(f"❌ [Tushare详细日志] 异常信息: {str(e)}")
             import traceback
             logger.error(f"❌ [Tushare详细日志] 异常堆栈: {traceback.format_exc()}")
+            if raise_errors:
+                raise
             return pd.DataFrame()
     
     def get_stock_info(self, symbol: str) -> Dict:
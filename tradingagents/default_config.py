@@ -17,6 +17,23 @@ DEFAULT_CONFIG = {
     "max_debate_rounds": 1,
     "max_risk_discuss_rounds": 1,
     "max_recur_limit": 100,
+    "parallel_debate": False,  # 同一轮辩手并发发言（每轮只需一次LLM延迟）
+    "debate_early_stop": True,  # 辩论收敛（让步/重复/立场稳定）时提前结束，轮数仍为上限
+    "debate_overlap_threshold": 0.6,  # 判定"重复论点"的词汇重叠阈值
+    "debate_min_rounds": 2,  # 提前结束前至少完成的辩论轮数
+    # Analyst stage cache settings
+    "analyst_cache_enabled": True,  # 复用 (股票, 日期, 分析师, 模型, 提示词版本) 的分析师报告
+    "analyst_cache_ttl_hours": 24,  # 仅对当日及未来交易日生效，历史交易日永久有效
+    # Checkpoint settings
+    "checkpoint_enabled": True,  # 每个节点完成后持久化状态，失败后可按 run_id 恢复
+    "checkpoint_backend": "sqlite",  # sqlite | mongodb（MongoDB不可用时回退到SQLite）
+    "checkpoint_retention_days": 7,  # 未完成运行的检查点保留天数，成功运行立即清理
+    # Result store settings
+    "result_store_enabled": True,  # 完成的分析写入可按股票/日期/模型/决策检索的结果库
+    "result_store_backend": "sqlite",  # sqlite | mongodb（MongoDB不可用时回退到SQLite）
+    "result_store_path": None,  # SQLite文件路径，默认 data_cache_dir/results/analysis_results.db
+    # Streaming settings
+    "token_stream_interval": 0.25,  # 流式token推送到前端的最小间隔（秒）
     # Tool settings
     "online_tools": True,
 
@@ -1,16 +1,20 @@
 # TradingAgents/graph/__init__.py
 
-from .trading_graph import TradingAgentsGraph
-from .conditional_logic import ConditionalLogic
-from .setup import GraphSetup
-from .propagation import Propagator
-from .reflection import Reflector
-from .signal_processing import SignalProcessor
-
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
+from tradingagents.utils.lazy_import import lazy_exports
 logger = get_logger("default")
 
+# 按需导入：只用到结果存储、检查点等子模块时不加载整个图（LLM SDK、agents、数据源）
+__getattr__ = lazy_exports(__name__, {
+    "TradingAgentsGraph": ".trading_graph",
+    "ConditionalLogic": ".conditional_logic",
+    "GraphSetup": ".setup",
+    "Propagator": ".propagation",
+    "Reflector": ".reflection",
+    "SignalProcessor": ".signal_processing",
+})
+
 __all__ = [
     "TradingAgentsGraph",
     "ConditionalLogic",
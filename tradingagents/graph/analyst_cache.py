@@ -0,0 +1,192 @@
+# TradingAgents/graph/analyst_cache.py
+
+import hashlib
+import json
+import re
+from datetime import datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# 导入统一日志系统
+from tradingagents.utils.logging_init import get_logger
+logger = get_logger("default")
+
+
+# 分析师提示词版本：修改任一分析师的提示词或工具集时递增，旧缓存自动失效
+ANALYST_PROMPT_VERSION = "1"
+
+# 分析师类型 -> 状态中的报告字段
+ANALYST_REPORT_KEYS = {
+    "market": "market_report",
+    "social": "sentiment_report",
+    "news": "news_report",
+    "fundamentals": "fundamentals_report",
+}
+
+
+# 各市场收盘时间（交易所时区, 当地收盘时刻, 时区数据缺失时使用的固定UTC偏移）
+MARKET_CLOSE = {
+    "china_a": ("Asia/Shanghai", time(15, 0), 8),
+    "hong_kong": ("Asia/Hong_Kong", time(16, 10), 8),
+    "us": ("America/New_York", time(16, 0), -5),
+}
+
+
+def market_close(ticker: str, trade_day) -> datetime:
+    """交易日收盘时刻（带时区）；无法识别市场时按最晚收盘的美股处理"""
+    from tradingagents.utils.stock_utils import StockUtils
+
+    market = StockUtils.identify_stock_market(ticker or "").value
+    zone_name, close_time, utc_offset = MARKET_CLOSE.get(market, MARKET_CLOSE["us"])
+    try:
+        from zoneinfo import ZoneInfo
+        zone = ZoneInfo(zone_name)
+    except Exception:
+        # Windows等系统可能没有时区数据库；美股使用冬令时偏移（收盘时刻偏晚，不会误判为收盘后）
+        zone = timezone(timedelta(hours=utc_offset))
+    return datetime.combine(trade_day, close_time, tzinfo=zone)
+
+
+class AnalystReportCache:
+    """分析师阶段缓存
+
+    按 (股票代码, 交易日期, 分析师类型, 模型, 提示词版本) 持久化分析师报告及其工具输出，
+    同一股票和日期重新分析（调整研究深度、风险轮数或决策模型）时可直接进入辩论阶段。
+    在交易日收盘后生成的报告数据不会再变化，长期有效；收盘前（盘中或未来交易日）生成的报告按 ttl_hours 过期。
+    """
+
+    def __init__(self, cache_dir: str, ttl_hours: float = 24, prompt_version: str = ANALYST_PROMPT_VERSION):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_hours = ttl_hours
+        self.prompt_version = prompt_version
+
+    @staticmethod
+    def _safe(value: str) -> str:
+        return re.sub(r"[^0-9A-Za-z.\-]", "_", str(value))
+
+    def _entry_path(self, ticker: str, trade_date: str, analyst: str, model: str) -> Path:
+        params = f"{ticker}|{trade_date}|{analyst}|{model}|{self.prompt_version}"
+        digest = hashlib.md5(params.encode()).hexdigest()[:12]
+        return self.cache_dir / f"{self._safe(ticker)}_{self._safe(trade_date)}_{analyst}_{digest}.json"
+
+    def _is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """交易日收盘后生成的报告永久有效，收盘前生成的按TTL判断"""
+        created_at = datetime.fromisoformat(entry["created_at"])
+        try:
+            trade_day = datetime.strptime(str(entry["trade_date"])[:10], "%Y-%m-%d").date()
+        except (KeyError, ValueError):
+            trade_day = None
+        if trade_day is not None:
+            # created_at 为本地时间，转换为带时区时间后与交易所收盘时刻比较
+            created_aware = created_at if created_at.tzinfo else created_at.astimezone()
+            if created_aware >= market_close(entry.get("ticker"), trade_day):
+                return True
+        return datetime.now(created_at.tzinfo) - created_at < timedelta(hours=self.ttl_hours)
+
+    def get(self, ticker: str, trade_date: str, analyst: str, model: str) -> Optional[Dict[str, Any]]:
+        """读取有效的缓存条目，不存在或已过期时返回None"""
+        path = self._entry_path(ticker, trade_date, analyst, model)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ [分析师缓存] 读取失败，忽略: {path.name} - {e}")
+            return None
+        if not entry.get("report") or not self._is_fresh(entry):
+            return None
+        return entry
+
+    def put(
+        self,
+        ticker: str,
+        trade_date: str,
+        analyst: str,
+        model: str,
+        report: str,
+        tool_outputs: Optional[List[Dict[str, str]]] = None,
+    ) -> Path:
+        """保存一个分析师的报告及工具输出"""
+        entry = {
+            "ticker": ticker,
+            "trade_date": str(trade_date),
+            "analyst": analyst,
+            "model": model,
+            "prompt_version": self.prompt_version,
+            "report": report,
+            "tool_outputs": tool_outputs or [],
+            "created_at": datetime.now().isoformat(),
+        }
+        path = self._entry_path(ticker, trade_date, analyst, model)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        tmp_path.replace(path)
+        logger.info(f"💾 [分析师缓存] 已保存: {ticker} {trade_date} {analyst} ({model})")
+        return path
+
+    def invalidate(self, ticker: str = None, trade_date: str = None, analyst: str = None) -> int:
+        """删除匹配的缓存条目，参数为空表示不限，返回删除数量"""
+        removed = 0
+        for path in self.cache_dir.glob("*.json"):
+            if ticker is not None and not path.name.startswith(f"{self._safe(ticker)}_"):
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except Exception:
+                entry = {}
+            if trade_date is not None and entry.get("trade_date") != str(trade_date):
+                continue
+            if analyst is not None and entry.get("analyst") != analyst:
+                continue
+            path.unlink(missing_ok=True)
+            removed += 1
+        logger.info(f"🗑️ [分析师缓存] 已失效 {removed} 个条目 (ticker={ticker}, date={trade_date}, analyst={analyst})")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """缓存统计信息"""
+        files = list(self.cache_dir.glob("*.json"))
+        return {
+            "cache_dir": str(self.cache_dir),
+            "entries": len(files),
+            "total_size_mb": round(sum(f.stat().st_size for f in files) / (1024 * 1024), 2),
+        }
+
+
+def analyst_cache_model(config: Dict[str, Any]) -> str:
+    """分析师使用的模型标识（分析师都使用快速思考模型）"""
+    return f"{config.get('llm_provider', '')}:{config.get('quick_think_llm', '')}"
+
+
+def create_analyst_cache_writer(
+    clear_node: Callable, cache: AnalystReportCache, analyst_type: str, model: str
+) -> Callable:
+    """包装分析师的消息清理节点：清理前把报告和工具输出写入缓存"""
+    report_key = ANALYST_REPORT_KEYS[analyst_type]
+
+    def write_and_clear(state) -> dict:
+        report = state.get(report_key, "")
+        if report:
+            tool_outputs = [
+                {"name": getattr(m, "name", "") or "", "content": str(m.content)}
+                for m in state["messages"]
+                if getattr(m, "type", "") == "tool"
+            ]
+            try:
+                cache.put(
+                    state["company_of_interest"],
+                    state["trade_date"],
+                    analyst_type,
+                    model,
+                    report,
+                    tool_outputs,
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ [分析师缓存] 保存失败: {analyst_type} - {e}")
+        return clear_node(state)
+
+    return write_and_clear
@@ -0,0 +1,181 @@
+# TradingAgents/graph/checkpointing.py
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+# 导入统一日志系统
+from tradingagents.utils.logging_init import get_logger
+logger = get_logger("default")
+
+try:
+    from langgraph.checkpoint.sqlite import SqliteSaver
+    SQLITE_CHECKPOINT_AVAILABLE = True
+except ImportError:
+    SQLITE_CHECKPOINT_AVAILABLE = False
+
+try:
+    from langgraph.checkpoint.mongodb import MongoDBSaver
+    MONGODB_CHECKPOINT_AVAILABLE = True
+except ImportError:
+    MONGODB_CHECKPOINT_AVAILABLE = False
+
+
+class RunRegistry:
+    """分析运行登记表（SQLite）
+
+    记录每次运行的 run_id、股票、日期、分析师和配置，用于断点恢复时重建图，
+    以及清理已完成或过期运行的检查点。
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS analysis_runs (
+                run_id TEXT PRIMARY KEY,
+                ticker TEXT NOT NULL,
+                trade_date TEXT NOT NULL,
+                analysts TEXT NOT NULL,
+                config TEXT NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def register(self, run_id: str, ticker: str, trade_date: str, analysts: List[str], config: Dict[str, Any]):
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analysis_runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, ticker, str(trade_date), json.dumps(analysts),
+                 json.dumps(config, ensure_ascii=False, default=str), "running", None, now, now),
+            )
+            self._conn.commit()
+
+    def mark(self, run_id: str, status: str, error: str = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE analysis_runs SET status = ?, error = ?, updated_at = ? WHERE run_id = ?",
+                (status, error, datetime.now().isoformat(), run_id),
+            )
+            self._conn.commit()
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM analysis_runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list_runs(self, status: str = None, limit: int = 20) -> List[Dict[str, Any]]:
+        query = "SELECT * FROM analysis_runs"
+        params: tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY updated_at DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, params + (limit,)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def runs_before(self, before: datetime) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT run_id FROM analysis_runs WHERE updated_at < ?", (before.isoformat(),)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def delete(self, run_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM analysis_runs WHERE run_id = ?", (run_id,))
+            self._conn.commit()
+
+    @staticmethod
+    def _to_dict(row) -> Dict[str, Any]:
+        keys = ["run_id", "ticker", "trade_date", "analysts", "config", "status", "error", "created_at", "updated_at"]
+        record = dict(zip(keys, row))
+        record["analysts"] = json.loads(record["analysts"])
+        record["config"] = json.loads(record["config"])
+        return record
+
+
+class CheckpointManager:
+    """图检查点管理器
+
+    为 LangGraph 提供持久化检查点（默认本地SQLite，可选MongoDB），
+    运行失败后可通过 run_id 从最后完成的节点继续。成功完成的运行会立即清理检查点，
+    未完成的运行在 checkpoint_retention_days 天后清理。
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.backend = config.get("checkpoint_backend", "sqlite").lower()
+        self.retention_days = config.get("checkpoint_retention_days", 7)
+        checkpoint_dir = config.get("checkpoint_dir") or os.path.join(
+            config["data_cache_dir"], "checkpoints"
+        )
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        db_path = os.path.join(checkpoint_dir, "checkpoints.db")
+
+        self.registry = RunRegistry(db_path)
+        self.checkpointer = self._create_checkpointer(db_path)
+        if self.checkpointer is not None:
+            self.prune()
+
+    def _create_checkpointer(self, db_path: str):
+        if self.backend == "mongodb":
+            if not MONGODB_CHECKPOINT_AVAILABLE:
+                logger.warning("⚠️ [检查点] langgraph-checkpoint-mongodb 未安装，回退到SQLite")
+            else:
+                try:
+                    from tradingagents.config.database_manager import get_database_manager
+
+                    db_manager = get_database_manager()
+                    client = db_manager.get_mongodb_client()
+                    if client is None:
+                        raise RuntimeError("MongoDB不可用")
+                    logger.info(f"💾 [检查点] 使用MongoDB检查点存储")
+                    return MongoDBSaver(client, db_name=db_manager.mongodb_config["database"])
+                except Exception as e:
+                    logger.warning(f"⚠️ [检查点] MongoDB检查点初始化失败，回退到SQLite: {e}")
+
+        if not SQLITE_CHECKPOINT_AVAILABLE:
+            logger.warning("⚠️ [检查点] langgraph-checkpoint-sqlite 未安装，断点恢复不可用")
+            return None
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        logger.info(f"💾 [检查点] 使用SQLite检查点存储: {db_path}")
+        return SqliteSaver(conn)
+
+    def start_run(self, run_id: str, ticker: str, trade_date: str, analysts: List[str], config: Dict[str, Any]):
+        self.registry.register(run_id, ticker, trade_date, analysts, config)
+
+    def finish_run(self, run_id: str):
+        """运行成功：删除检查点，只保留登记记录"""
+        self._delete_checkpoints(run_id)
+        self.registry.mark(run_id, "completed")
+
+    def fail_run(self, run_id: str, error: str):
+        self.registry.mark(run_id, "failed", error)
+
+    def prune(self):
+        """清理超过保留期的运行及其检查点"""
+        cutoff = datetime.now() - timedelta(days=self.retention_days)
+        stale = self.registry.runs_before(cutoff)
+        for run_id in stale:
+            self._delete_checkpoints(run_id)
+            self.registry.delete(run_id)
+        if stale:
+            logger.info(f"🧹 [检查点] 已清理 {len(stale)} 个过期运行的检查点")
+
+    def _delete_checkpoints(self, run_id: str):
+        try:
+            self.checkpointer.delete_thread(run_id)
+        except Exception as e:
+            logger.warning(f"⚠️ [检查点] 删除检查点失败: {run_id} - {e}")
@@ -1,7 +1,12 @@
 # TradingAgents/graph/conditional_logic.py
 
+from typing import Optional
+
 from tradingagents.agents.utils.agent_states import AgentState
 
+from .debate_convergence import DebateConvergenceChecker
+from .parallel_debate import INVEST_SPEAKERS, RISK_SPEAKERS
+
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
 logger = get_logger("default")
@@ -10,10 +15,23 @@ logger = get_logger("default")
 class ConditionalLogic:
     """Handles conditional logic for determining graph flow."""
 
-    def __init__(self, max_debate_rounds=1, max_risk_discuss_rounds=1):
-        """Initialize with configuration parameters."""
+    def __init__(
+        self,
+        max_debate_rounds=1,
+        max_risk_discuss_rounds=1,
+        convergence_checker: Optional[DebateConvergenceChecker] = None,
+    ):
+        """Initialize with configuration parameters.
+
+        Args:
+            max_debate_rounds: Upper bound of bull/bear rounds
+            max_risk_discuss_rounds: Upper bound of risky/safe/neutral rounds
+            convergence_checker: Optional checker that ends a debate early once
+                the debaters converge; configured rounds stay an upper bound
+        """
         self.max_debate_rounds = max_debate_rounds
         self.max_risk_discuss_rounds = max_risk_discuss_rounds
+        self.convergence_checker = convergence_checker
 
     def should_continue_market(self, state: AgentState):
         """Determine if market analysis should continue."""
@@ -55,12 +73,34 @@ class ConditionalLogic:
             return "tools_fundamentals"
         return "Msg Clear Fundamentals"
 
+    def debate_termination_reason(self, state: AgentState) -> Optional[str]:
+        """Reason to end the bull/bear debate now, or None to continue."""
+        debate_state = state["investment_debate_state"]
+        if debate_state["count"] >= 2 * self.max_debate_rounds:
+            return "max_rounds"
+        return self._check_convergence(debate_state, INVEST_SPEAKERS)
+
+    def risk_termination_reason(self, state: AgentState) -> Optional[str]:
+        """Reason to end the risk discussion now, or None to continue."""
+        risk_debate_state = state["risk_debate_state"]
+        if risk_debate_state["count"] >= 3 * self.max_risk_discuss_rounds:
+            return "max_rounds"
+        return self._check_convergence(risk_debate_state, RISK_SPEAKERS)
+
+    def _check_convergence(self, debate_state, speakers) -> Optional[str]:
+        """Run the convergence check at round boundaries only."""
+        if self.convergence_checker is None:
+            return None
+        count = debate_state.get("count", 0)
+        if count == 0 or count % len(speakers) != 0:
+            return None
+        reason = self.convergence_checker.check(debate_state.get("history", ""), speakers)
+        return f"converged: {reason}" if reason else None
+
     def should_continue_debate(self, state: AgentState) -> str:
         """Determine if debate should continue."""
 
-        if (
-            state["investment_debate_state"]["count"] >= 2 * self.max_debate_rounds
-        ):  # 3 rounds of back-and-forth between 2 agents
+        if self.debate_termination_reason(state):
             return "Research Manager"
         if state["investment_debate_state"]["current_response"].startswith("Bull"):
             return "Bear Researcher"
@@ -68,12 +108,22 @@ class ConditionalLogic:
 
     def should_continue_risk_analysis(self, state: AgentState) -> str:
         """Determine if risk analysis should continue."""
-        if (
-            state["risk_debate_state"]["count"] >= 3 * self.max_risk_discuss_rounds
-        ):  # 3 rounds of back-and-forth between 3 agents
+        if self.risk_termination_reason(state):
             return "Risk Judge"
         if state["risk_debate_state"]["latest_speaker"].startswith("Risky"):
             return "Safe Analyst"
         if state["risk_debate_state"]["latest_speaker"].startswith("Safe"):
             return "Neutral Analyst"
         return "Risky Analyst"
+
+    def should_continue_debate_parallel(self, state: AgentState):
+        """Determine if a simultaneous bull/bear round should follow."""
+        if self.debate_termination_reason(state):
+            return "Research Manager"
+        return ["Bull Researcher", "Bear Researcher"]
+
+    def should_continue_risk_analysis_parallel(self, state: AgentState):
+        """Determine if a simultaneous risky/safe/neutral round should follow."""
+        if self.risk_termination_reason(state):
+            return "Risk Judge"
+        return ["Risky Analyst", "Safe Analyst", "Neutral Analyst"]
@@ -0,0 +1,151 @@
+# TradingAgents/graph/debate_convergence.py
+
+import re
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+# 导入统一日志系统
+from tradingagents.utils.logging_init import get_logger
+logger = get_logger("default")
+
+
+_LATIN_WORD = re.compile(r"[a-z0-9]+")
+_CJK_RUN = re.compile(r"[一-鿿]+")
+
+_CONCESSION_PATTERNS = [
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"\bi (?:now )?concede\b",
+        r"\bi (?:fully |now )?agree with (?:the |my |your )?(?:bull|bear|risky|safe|neutral|aggressive|conservative|colleague|opponent|point)",
+        r"\byou(?:'re| are) (?:absolutely |completely )?right\b",
+        r"我(?:完全)?同意(?:你|您|对方)",
+        r"我承认",
+        r"你说得对",
+        r"认同(?:你|您|对方)的观点",
+    )
+]
+
+_STANCE_PATTERNS = {
+    "buy": re.compile(r"\b(?:buy|bullish|accumulate)\b|买入|增持|看多", re.IGNORECASE),
+    "sell": re.compile(r"\b(?:sell|bearish|reduce)\b|卖出|减持|看空", re.IGNORECASE),
+    "hold": re.compile(r"\b(?:hold|wait)\b|持有|观望", re.IGNORECASE),
+}
+
+
+def split_arguments(history: str, speakers: Sequence[str]) -> List[Tuple[str, str]]:
+    """Split a debate history into ``(speaker, argument)`` pairs, oldest first."""
+    pattern = re.compile(
+        r"(?:^|\n)(%s) Analyst:" % "|".join(re.escape(s) for s in speakers)
+    )
+    matches = list(pattern.finditer(history or ""))
+    arguments = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(history)
+        arguments.append((match.group(1), history[match.end():end].strip()))
+    return arguments
+
+
+def shingles(text: str) -> Set[str]:
+    """Word bigrams for latin text plus character bigrams for CJK runs."""
+    text = (text or "").lower()
+    words = _LATIN_WORD.findall(text)
+    result = {f"{a} {b}" for a, b in zip(words, words[1:])}
+    for run in _CJK_RUN.findall(text):
+        result.update(run[i:i + 2] for i in range(len(run) - 1))
+    return result
+
+
+def lexical_overlap(argument: str, prior: Sequence[str]) -> float:
+    """Share of the argument's shingles that already appeared in ``prior``."""
+    new = shingles(argument)
+    if not new:
+        return 0.0
+    seen: Set[str] = set()
+    for text in prior:
+        seen |= shingles(text)
+    return len(new & seen) / len(new)
+
+
+def detect_concession(argument: str) -> bool:
+    """Whether the argument explicitly concedes to another debater."""
+    return any(p.search(argument or "") for p in _CONCESSION_PATTERNS)
+
+
+def detect_stance(argument: str) -> Optional[str]:
+    """Dominant buy/sell/hold stance of an argument, None when undecidable."""
+    counts = {
+        stance: len(p.findall(argument or "")) for stance, p in _STANCE_PATTERNS.items()
+    }
+    best = max(counts, key=counts.get)
+    if counts[best] == 0 or list(counts.values()).count(counts[best]) > 1:
+        return None
+    return best
+
+
+class DebateConvergenceChecker:
+    """Cheap, local convergence check for multi-round debates.
+
+    Evaluated at round boundaries only, and never before ``min_rounds``
+    complete rounds; needs no LLM call. A debate is considered converged when
+    every debater concedes in the same round or one debater concedes in two
+    consecutive rounds (a single "you're right" usually precedes a rebuttal),
+    when every debater mostly repeats their own earlier arguments, or when
+    every debater keeps the same stance while substantially repeating themselves.
+    """
+
+    def __init__(self, overlap_threshold: float = 0.6, stance_overlap_threshold: float = 0.35,
+                 min_rounds: int = 2):
+        self.overlap_threshold = overlap_threshold
+        self.stance_overlap_threshold = stance_overlap_threshold
+        self.min_rounds = max(min_rounds, 1)
+
+    def check(self, history: str, speakers: Sequence[str]) -> Optional[str]:
+        """Return a termination reason if the debate converged, otherwise None."""
+        arguments = split_arguments(history, speakers)
+        n = len(speakers)
+        if len(arguments) < n * self.min_rounds or len(arguments) % n != 0:
+            return None
+
+        last_round = arguments[-n:]
+        earlier = arguments[:-n]
+
+        conceding = [speaker for speaker, text in last_round if detect_concession(text)]
+        conceded_before = {speaker for speaker, text in arguments[-2 * n:-n] if detect_concession(text)}
+        if len(conceding) == n:
+            return f"concession ({', '.join(conceding)})"
+        repeated = [speaker for speaker in conceding if speaker in conceded_before]
+        if repeated:
+            return f"repeated_concession ({', '.join(repeated)})"
+
+        if not earlier:
+            return None
+
+        overlaps: Dict[str, float] = {}
+        stable_stances = True
+        for speaker, text in last_round:
+            own_prior = [t for s, t in earlier if s == speaker]
+            overlaps[speaker] = lexical_overlap(text, own_prior)
+            previous_stance = detect_stance(own_prior[-1]) if own_prior else None
+            stance = detect_stance(text)
+            if stance is None or stance != previous_stance:
+                stable_stances = False
+
+        detail = ", ".join(f"{s} {v:.2f}" for s, v in overlaps.items())
+        if all(v >= self.overlap_threshold for v in overlaps.values()):
+            return f"repetition ({detail})"
+        if stable_stances and all(v >= self.stance_overlap_threshold for v in overlaps.values()):
+            return f"stance_stable ({detail})"
+        return None
+
+
+def create_termination_recorder(node, reason_fn, debate_key: str):
+    """Wrap a judge node so the debate's termination reason lands in state."""
+
+    def record_termination(state) -> dict:
+        reason = reason_fn(state) or "max_rounds"
+        if reason != "max_rounds":
+            logger.info(f"🛑 [辩论提前结束] {debate_key}: {reason}")
+        update = node(state)
+        update[debate_key] = {**update[debate_key], "termination_reason": reason}
+        return update
+
+    return record_termination
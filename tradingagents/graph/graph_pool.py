@@ -0,0 +1,163 @@
+# TradingAgents/graph/graph_pool.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 导入统一日志系统
+from tradingagents.utils.logging_init import get_logger
+logger = get_logger("default")
+
+
+def config_fingerprint(selected_analysts: List[str], config: Dict[str, Any]) -> str:
+    """图的配置指纹：提供商、模型、深度、分析师等任一不同都对应不同的图"""
+    content = json.dumps(
+        {"analysts": sorted(selected_analysts), "config": config},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()[:16]
+
+
+def _build_graph(selected_analysts: List[str], config: Dict[str, Any]):
+    from tradingagents.graph.trading_graph import TradingAgentsGraph
+
+    return TradingAgentsGraph(selected_analysts, config=config, debug=False)
+
+
+class GraphPool:
+    """预构建 TradingAgentsGraph 的复用池
+
+    构建一个图需要创建LLM客户端、五个ChromaDB记忆库、工具节点并编译StateGraph，
+    耗时数秒。池按配置指纹保存空闲的图：每次运行独占借出一个，运行结束后清理
+    运行状态并归还；相同配置的下一次分析直接复用。每个指纹最多保留
+    max_idle_per_key 个空闲图，空闲超过 idle_ttl 秒的图被回收。
+    """
+
+    def __init__(self, factory: Callable = None, max_idle_per_key: int = 2, idle_ttl: float = 1800,
+                 clock: Callable[[], float] = time.monotonic):
+        self.factory = factory or _build_graph
+        self.max_idle_per_key = max_idle_per_key
+        self.idle_ttl = idle_ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._idle: Dict[str, List[Tuple[Any, float]]] = {}
+        self._stats = {"hits": 0, "misses": 0, "evicted": 0}
+        self._reaper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _take_idle(self, key: str):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self._stats["hits"] += 1
+                return idle.pop()[0]
+            self._stats["misses"] += 1
+            return None
+
+    @contextmanager
+    def checkout(self, selected_analysts: List[str], config: Dict[str, Any]):
+        """独占借出一个与配置匹配的图，退出时重置并归还"""
+        key = config_fingerprint(selected_analysts, config)
+        graph = self._take_idle(key)
+        if graph is None:
+            started = time.time()
+            graph = self.factory(list(selected_analysts), config)
+            logger.info(f"🔧 [图复用池] 新建图 {key}，耗时 {time.time() - started:.2f}s")
+        else:
+            logger.info(f"♻️ [图复用池] 复用预构建的图 {key}")
+        try:
+            yield graph
+        finally:
+            self._release(key, graph)
+
+    def _release(self, key: str, graph):
+        reset = getattr(graph, "reset_run_state", None)
+        if reset is not None:
+            reset()
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_key:
+                idle.append((graph, self.clock()))
+        self.evict_idle()
+
+    def prewarm(self, selected_analysts: List[str], config: Dict[str, Any], count: int = 1) -> int:
+        """预先构建图放入池中，返回新建的数量"""
+        key = config_fingerprint(selected_analysts, config)
+        with self._lock:
+            missing = min(count, self.max_idle_per_key) - len(self._idle.get(key, []))
+        built = 0
+        for _ in range(max(missing, 0)):
+            graph = self.factory(list(selected_analysts), config)
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) >= self.max_idle_per_key:
+                    break
+                idle.append((graph, self.clock()))
+            built += 1
+        if built:
+            logger.info(f"🔥 [图复用池] 已预热 {built} 个图: {key} ({', '.join(selected_analysts)})")
+        return built
+
+    def evict_idle(self) -> int:
+        """回收空闲超过 idle_ttl 秒的图"""
+        cutoff = self.clock() - self.idle_ttl
+        evicted = 0
+        with self._lock:
+            for key in list(self._idle):
+                fresh = [(graph, since) for graph, since in self._idle[key] if since >= cutoff]
+                evicted += len(self._idle[key]) - len(fresh)
+                if fresh:
+                    self._idle[key] = fresh
+                else:
+                    del self._idle[key]
+            self._stats["evicted"] += evicted
+        if evicted:
+            logger.info(f"🧹 [图复用池] 回收空闲图 {evicted} 个")
+        return evicted
+
+    def start_reaper(self, interval: float = None):
+        """后台定期回收空闲的图"""
+        if self._reaper and self._reaper.is_alive():
+            return
+        interval = interval or max(self.idle_ttl / 4, 1)
+
+        def reap():
+            while not self._stop.wait(interval):
+                self.evict_idle()
+
+        self._stop.clear()
+        self._reaper = threading.Thread(target=reap, name="graph-pool-reaper", daemon=True)
+        self._reaper.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def clear(self):
+        with self._lock:
+            self._idle.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            idle = sum(len(graphs) for graphs in self._idle.values())
+            return dict(self._stats, idle=idle, keys=len(self._idle))
+
+
+_pool: Optional[GraphPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_graph_pool() -> GraphPool:
+    """进程级图复用池（由环境变量配置）"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = GraphPool(
+                max_idle_per_key=int(os.getenv("GRAPH_POOL_MAX_IDLE", 2)),
+                idle_ttl=float(os.getenv("GRAPH_POOL_IDLE_TTL", 1800)),
+            )
+            _pool.start_reaper()
+        return _pool
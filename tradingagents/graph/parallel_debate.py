@@ -0,0 +1,98 @@
+# TradingAgents/graph/parallel_debate.py
+
+from typing import Callable, Dict, Any
+
+# 导入统一日志系统
+from tradingagents.utils.logging_init import get_logger
+logger = get_logger("default")
+
+
+# 同一轮内历史合并的固定顺序，保证并行模式下的结果与调度顺序无关
+INVEST_SPEAKERS = ("Bull", "Bear")
+RISK_SPEAKERS = ("Risky", "Safe", "Neutral")
+
+
+def create_parallel_turn(
+    node: Callable, speaker: str, debate_key: str, response_field: str, round_key: str
+) -> Callable:
+    """Wrap a debater node so it can run concurrently with the other debaters.
+
+    The wrapped node still builds its prompt from the state as of the previous
+    round, but instead of rewriting the shared debate state it only publishes
+    its argument to the round buffer; the join node merges the round.
+    """
+
+    def parallel_turn(state) -> dict:
+        update = node(state)
+        argument = update[debate_key][response_field]
+        return {round_key: {speaker: argument}}
+
+    return parallel_turn
+
+
+def create_invest_round_join() -> Callable:
+    """Create the join node that merges one simultaneous bull/bear round."""
+
+    def invest_round_join(state) -> dict:
+        debate_state = state["investment_debate_state"]
+        responses = state.get("invest_round_responses") or {}
+
+        new_debate_state: Dict[str, Any] = dict(debate_state)
+        history = debate_state.get("history", "")
+        round_arguments = []
+        for speaker in INVEST_SPEAKERS:
+            argument = responses.get(speaker)
+            if not argument:
+                continue
+            history_key = f"{speaker.lower()}_history"
+            history += "\n" + argument
+            new_debate_state[history_key] = debate_state.get(history_key, "") + "\n" + argument
+            round_arguments.append(argument)
+
+        new_debate_state["history"] = history
+        # 下一轮双方看到的"最新发言"是上一轮的完整记录
+        new_debate_state["current_response"] = "\n".join(round_arguments)
+        new_debate_state["count"] = debate_state["count"] + len(round_arguments)
+
+        logger.debug(f"🔀 [并行辩论] 投资辩论轮次合并完成，发言数: {len(round_arguments)}, 累计: {new_debate_state['count']}")
+        return {
+            "investment_debate_state": new_debate_state,
+            "invest_round_responses": None,
+        }
+
+    return invest_round_join
+
+
+def create_risk_round_join() -> Callable:
+    """Create the join node that merges one simultaneous risky/safe/neutral round."""
+
+    def risk_round_join(state) -> dict:
+        risk_debate_state = state["risk_debate_state"]
+        responses = state.get("risk_round_responses") or {}
+
+        new_risk_debate_state: Dict[str, Any] = dict(risk_debate_state)
+        history = risk_debate_state.get("history", "")
+        spoken = 0
+        for speaker in RISK_SPEAKERS:
+            argument = responses.get(speaker)
+            if not argument:
+                continue
+            prefix = speaker.lower()
+            history += "\n" + argument
+            new_risk_debate_state[f"{prefix}_history"] = (
+                risk_debate_state.get(f"{prefix}_history", "") + "\n" + argument
+            )
+            new_risk_debate_state[f"current_{prefix}_response"] = argument
+            new_risk_debate_state["latest_speaker"] = speaker
+            spoken += 1
+
+        new_risk_debate_state["history"] = history
+        new_risk_debate_state["count"] = risk_debate_state["count"] + spoken
+
+        logger.debug(f"🔀 [并行辩论] 风险讨论轮次合并完成，发言数: {spoken}, 累计: {new_risk_debate_state['count']}")
+        return {
+            "risk_debate_state": new_risk_debate_state,
+            "risk_round_responses": None,
+        }
+
+    return risk_round_join
@@ -1,6 +1,6 @@
 # TradingAgents/graph/propagation.py
 
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
@@ -45,9 +45,19 @@ class Propagator:
             "news_report": "",
         }
 
-    def get_graph_args(self) -> Dict[str, Any]:
-        """Get arguments for the graph invocation."""
+    def get_graph_args(self, run_id: str = None, callbacks: List = None) -> Dict[str, Any]:
+        """Get arguments for the graph invocation.
+
+        Args:
+            run_id: Checkpoint thread id; required when the graph has a checkpointer
+            callbacks: Callback handlers bound to this run only
+        """
+        config = {"recursion_limit": self.max_recur_limit}
+        if run_id:
+            config["configurable"] = {"thread_id": run_id}
+        if callbacks:
+            config["callbacks"] = list(callbacks)
         return {
             "stream_mode": "values",
-            "config": {"recursion_limit": self.max_recur_limit},
+            "config": config,
         }
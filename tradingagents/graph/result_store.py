@@ -0,0 +1,357 @@
+# TradingAgents/graph/result_store.py
+
+import json
+import os
+import sqlite3
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# 导入统一日志系统
+from tradingagents.utils.logging_init import get_logger
+logger = get_logger("default")
+
+
+# 列表查询返回的摘要字段（不含报告正文）
+SUMMARY_FIELDS = (
+    "analysis_id", "ticker", "analysis_date", "created_at", "llm_provider", "llm_model",
+    "research_depth", "analysts", "action", "confidence", "target_price", "risk_score", "body_size",
+)
+MAX_PAGE_SIZE = 200
+
+
+@dataclass
+class ResultPage:
+    """一页历史分析摘要；next_cursor 为 None 表示没有更多结果"""
+
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def _number(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def summarize_results(results: Dict[str, Any], analysis_id: str = None) -> Dict[str, Any]:
+    """从一次分析结果中提取可索引的摘要字段"""
+    decision = results.get("decision") or {}
+    if not isinstance(decision, dict):
+        decision = {"action": str(decision)}
+    analysts = results.get("analysts") or []
+    return {
+        "analysis_id": analysis_id or results.get("run_id") or uuid.uuid4().hex,
+        "ticker": str(results.get("stock_symbol", "")).strip().upper(),
+        "analysis_date": str(results.get("analysis_date", ""))[:10],
+        "created_at": time.time(),
+        "llm_provider": results.get("llm_provider") or "",
+        "llm_model": results.get("llm_model") or "",
+        "research_depth": str(results.get("research_depth", "")),
+        "analysts": list(analysts),
+        "action": str(decision.get("action") or "").strip().upper(),
+        "confidence": _number(decision.get("confidence")),
+        "target_price": _number(decision.get("target_price")),
+        "risk_score": _number(decision.get("risk_score")),
+    }
+
+
+def compress_results(results: Dict[str, Any]) -> bytes:
+    # 中间消息（工具调用往来）不属于报告，其余非JSON对象按字符串保存
+    state = results.get("state")
+    if isinstance(state, dict) and "messages" in state:
+        results = dict(results, state={k: v for k, v in state.items() if k != "messages"})
+    return zlib.compress(json.dumps(results, ensure_ascii=False, default=str).encode("utf-8"), 6)
+
+
+def decompress_results(body: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(body).decode("utf-8"))
+
+
+class SQLiteResultStore:
+    """分析结果存储（SQLite）
+
+    摘要行和压缩后的报告正文分表保存：列表查询只扫描带索引的摘要表，
+    正文在 load() 时才读取并解压。分页使用自增主键做游标（keyset），
+    翻到第几页的耗时都与总记录数无关。
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS analysis_results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    analysis_id TEXT NOT NULL UNIQUE,
+                    ticker TEXT NOT NULL,
+                    analysis_date TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    llm_provider TEXT,
+                    llm_model TEXT,
+                    research_depth TEXT,
+                    analysts TEXT,
+                    action TEXT,
+                    confidence REAL,
+                    target_price REAL,
+                    risk_score REAL,
+                    body_size INTEGER
+                )"""
+            )
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS analysis_result_bodies (
+                    id INTEGER PRIMARY KEY,
+                    body BLOB NOT NULL
+                )"""
+            )
+            # 每个过滤条件一个 (列, id) 复合索引，过滤和倒序分页都走索引
+            for column in ("ticker", "analysis_date", "llm_model", "action"):
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_results_{column} ON analysis_results ({column}, id)"
+                )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_results_ticker_date ON analysis_results (ticker, analysis_date, id)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # 每次调用使用独立的短连接，可在线程和进程间安全使用
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def save(self, results: Dict[str, Any], analysis_id: str = None) -> str:
+        """保存一次分析结果，返回 analysis_id（同一ID重复保存会覆盖）"""
+        summary = summarize_results(results, analysis_id)
+        body = compress_results(results)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM analysis_result_bodies WHERE id IN "
+                             "(SELECT id FROM analysis_results WHERE analysis_id = ?)", (summary["analysis_id"],))
+                conn.execute("DELETE FROM analysis_results WHERE analysis_id = ?", (summary["analysis_id"],))
+                cursor = conn.execute(
+                    "INSERT INTO analysis_results (analysis_id, ticker, analysis_date, created_at, llm_provider, "
+                    "llm_model, research_depth, analysts, action, confidence, target_price, risk_score, body_size) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (summary["analysis_id"], summary["ticker"], summary["analysis_date"], summary["created_at"],
+                     summary["llm_provider"], summary["llm_model"], summary["research_depth"],
+                     json.dumps(summary["analysts"]), summary["action"], summary["confidence"],
+                     summary["target_price"], summary["risk_score"], len(body)),
+                )
+                conn.execute("INSERT INTO analysis_result_bodies (id, body) VALUES (?, ?)",
+                             (cursor.lastrowid, body))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        logger.info(f"💾 [结果存储] 已保存 {summary['ticker']} {summary['analysis_date']} 的分析: "
+                    f"{summary['analysis_id']} ({len(body) / 1024:.1f}KB)")
+        return summary["analysis_id"]
+
+    @staticmethod
+    def _where(ticker=None, date_from=None, date_to=None, model=None, action=None):
+        clauses, params = [], []
+        if ticker:
+            clauses.append("ticker = ?")
+            params.append(ticker.strip().upper())
+        if date_from:
+            clauses.append("analysis_date >= ?")
+            params.append(str(date_from)[:10])
+        if date_to:
+            clauses.append("analysis_date <= ?")
+            params.append(str(date_to)[:10])
+        if model:
+            clauses.append("llm_model = ?")
+            params.append(model)
+        if action:
+            clauses.append("action = ?")
+            params.append(action.strip().upper())
+        return clauses, params
+
+    def query(self, ticker: str = None, date_from: str = None, date_to: str = None, model: str = None,
+              action: str = None, limit: int = 20, cursor: str = None) -> ResultPage:
+        """按条件倒序（最新在前）分页列出分析摘要
+
+        cursor 传入上一页返回的 next_cursor 以获取下一页。
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        clauses, params = self._where(ticker, date_from, date_to, model, action)
+        if cursor:
+            clauses.append("id < ?")
+            params.append(int(cursor))
+        sql = f"SELECT id, {', '.join(SUMMARY_FIELDS)} FROM analysis_results"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id DESC LIMIT ?"
+        with self._connect() as conn:
+            rows = conn.execute(sql, params + [limit + 1]).fetchall()
+
+        next_cursor = str(rows[limit - 1]["id"]) if len(rows) > limit else None
+        return ResultPage([self._to_dict(row) for row in rows[:limit]], next_cursor)
+
+    def count(self, ticker: str = None, date_from: str = None, date_to: str = None,
+              model: str = None, action: str = None) -> int:
+        clauses, params = self._where(ticker, date_from, date_to, model, action)
+        sql = "SELECT COUNT(*) FROM analysis_results"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self._connect() as conn:
+            return conn.execute(sql, params).fetchone()[0]
+
+    def distinct(self, column: str) -> List[str]:
+        """某个索引列的全部取值（用于筛选下拉框）"""
+        if column not in ("ticker", "llm_model", "action"):
+            raise ValueError(f"不支持的列: {column}")
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT DISTINCT {column} FROM analysis_results WHERE {column} != '' ORDER BY {column}"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_summary(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(SUMMARY_FIELDS)} FROM analysis_results WHERE analysis_id = ?", (analysis_id,)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def load(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """读取并解压完整分析结果"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT b.body FROM analysis_results r JOIN analysis_result_bodies b ON b.id = r.id "
+                "WHERE r.analysis_id = ?", (analysis_id,)
+            ).fetchone()
+        return decompress_results(row[0]) if row else None
+
+    def delete(self, analysis_id: str) -> bool:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM analysis_result_bodies WHERE id IN "
+                         "(SELECT id FROM analysis_results WHERE analysis_id = ?)", (analysis_id,))
+            deleted = conn.execute("DELETE FROM analysis_results WHERE analysis_id = ?", (analysis_id,)).rowcount
+            conn.execute("COMMIT")
+        return deleted > 0
+
+    @staticmethod
+    def _to_dict(row) -> Dict[str, Any]:
+        record = {key: row[key] for key in SUMMARY_FIELDS}
+        record["analysts"] = json.loads(record["analysts"] or "[]")
+        return record
+
+
+class MongoResultStore:
+    """分析结果存储（MongoDB）
+
+    与 SQLiteResultStore 接口一致：摘要集合按条件建立 (字段, _id) 复合索引，
+    压缩正文存放在单独集合中，分页以 ObjectId 为游标。
+    """
+
+    def __init__(self, database):
+        from pymongo import ASCENDING, DESCENDING
+
+        self.results = database["analysis_results"]
+        self.bodies = database["analysis_result_bodies"]
+        self.results.create_index("analysis_id", unique=True)
+        for column in ("ticker", "analysis_date", "llm_model", "action"):
+            self.results.create_index([(column, ASCENDING), ("_id", DESCENDING)])
+        self.results.create_index([("ticker", ASCENDING), ("analysis_date", ASCENDING), ("_id", DESCENDING)])
+
+    def save(self, results: Dict[str, Any], analysis_id: str = None) -> str:
+        from bson import Binary
+
+        summary = summarize_results(results, analysis_id)
+        body = compress_results(results)
+        summary["body_size"] = len(body)
+        self.results.delete_one({"analysis_id": summary["analysis_id"]})
+        self.results.insert_one(dict(summary))
+        self.bodies.replace_one({"_id": summary["analysis_id"]},
+                                {"_id": summary["analysis_id"], "body": Binary(body)}, upsert=True)
+        logger.info(f"💾 [结果存储] 已保存 {summary['ticker']} {summary['analysis_date']} 的分析到MongoDB: "
+                    f"{summary['analysis_id']}")
+        return summary["analysis_id"]
+
+    @staticmethod
+    def _filter(ticker=None, date_from=None, date_to=None, model=None, action=None) -> Dict[str, Any]:
+        spec: Dict[str, Any] = {}
+        if ticker:
+            spec["ticker"] = ticker.strip().upper()
+        if date_from or date_to:
+            spec["analysis_date"] = {}
+            if date_from:
+                spec["analysis_date"]["$gte"] = str(date_from)[:10]
+            if date_to:
+                spec["analysis_date"]["$lte"] = str(date_to)[:10]
+        if model:
+            spec["llm_model"] = model
+        if action:
+            spec["action"] = action.strip().upper()
+        return spec
+
+    def query(self, ticker: str = None, date_from: str = None, date_to: str = None, model: str = None,
+              action: str = None, limit: int = 20, cursor: str = None) -> ResultPage:
+        from bson import ObjectId
+
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        spec = self._filter(ticker, date_from, date_to, model, action)
+        if cursor:
+            spec["_id"] = {"$lt": ObjectId(cursor)}
+        docs = list(self.results.find(spec).sort("_id", -1).limit(limit + 1))
+        next_cursor = str(docs[limit - 1]["_id"]) if len(docs) > limit else None
+        return ResultPage([self._to_dict(doc) for doc in docs[:limit]], next_cursor)
+
+    def count(self, ticker: str = None, date_from: str = None, date_to: str = None,
+              model: str = None, action: str = None) -> int:
+        return self.results.count_documents(self._filter(ticker, date_from, date_to, model, action))
+
+    def distinct(self, column: str) -> List[str]:
+        if column not in ("ticker", "llm_model", "action"):
+            raise ValueError(f"不支持的列: {column}")
+        return sorted(value for value in self.results.distinct(column) if value)
+
+    def get_summary(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        doc = self.results.find_one({"analysis_id": analysis_id})
+        return self._to_dict(doc) if doc else None
+
+    def load(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        doc = self.bodies.find_one({"_id": analysis_id})
+        return decompress_results(bytes(doc["body"])) if doc else None
+
+    def delete(self, analysis_id: str) -> bool:
+        self.bodies.delete_one({"_id": analysis_id})
+        return self.results.delete_one({"analysis_id": analysis_id}).deleted_count > 0
+
+    @staticmethod
+    def _to_dict(doc) -> Dict[str, Any]:
+        return {key: doc.get(key) for key in SUMMARY_FIELDS}
+
+
+def create_result_store(config: Dict[str, Any]):
+    """根据配置创建结果存储（默认本地SQLite，可选MongoDB，不可用时回退到SQLite）"""
+    backend = config.get("result_store_backend", "sqlite").lower()
+    if backend == "mongodb":
+        try:
+            from tradingagents.config.database_manager import get_database_manager
+
+            db_manager = get_database_manager()
+            client = db_manager.get_mongodb_client()
+            if client is None:
+                raise RuntimeError("MongoDB不可用")
+            logger.info("💾 [结果存储] 使用MongoDB结果存储")
+            return MongoResultStore(client[db_manager.mongodb_config["database"]])
+        except Exception as e:
+            logger.warning(f"⚠️ [结果存储] MongoDB结果存储初始化失败，回退到SQLite: {e}")
+
+    db_path = config.get("result_store_path") or os.path.join(
+        config["data_cache_dir"], "results", "analysis_results.db"
+    )
+    return SQLiteResultStore(db_path)
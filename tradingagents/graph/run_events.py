@@ -0,0 +1,147 @@
+# TradingAgents/graph/run_events.py
+
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# 导入统一日志系统
+from tradingagents.utils.logging_init import get_logger
+from tradingagents.utils.deadline import check_deadline
+logger = get_logger("default")
+
+
+NODE_START = "node_start"
+NODE_END = "node_end"
+NODE_ERROR = "node_error"
+TOOL_START = "tool_start"
+TOOL_END = "tool_end"
+LLM_END = "llm_end"
+
+
+@dataclass
+class GraphEvent:
+    """A typed progress event emitted while a graph run executes."""
+
+    type: str
+    node: str
+    name: str = ""
+    duration: Optional[float] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    timestamp: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+EventCallback = Callable[[GraphEvent], None]
+
+
+def _usage(response) -> Dict[str, int]:
+    """Token counts of an LLM result: message usage metadata, else llm_output"""
+    for generations in response.generations or []:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return {"input": usage.get("input_tokens", 0), "output": usage.get("output_tokens", 0)}
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    return {
+        "input": token_usage.get("prompt_tokens", 0),
+        "output": token_usage.get("completion_tokens", 0),
+    }
+
+
+class GraphEventEmitter(BaseCallbackHandler):
+    """LangGraph callback that turns one run's execution into ``GraphEvent``s.
+
+    Bind one emitter per run (it is passed in the run's config callbacks), so
+    ``on_event`` only ever sees that run's nodes, tool calls and LLM calls.
+    """
+
+    def __init__(self, on_event: EventCallback, clock: Callable[[], float] = time.monotonic):
+        self.on_event = on_event
+        self.clock = clock
+        self._nodes: Dict[UUID, tuple] = {}
+        self._tools: Dict[UUID, tuple] = {}
+        self._llms: Dict[UUID, str] = {}
+
+    def _emit(self, event: GraphEvent):
+        try:
+            self.on_event(event)
+        except Exception as e:
+            logger.warning(f"⚠️ [运行事件] 回调失败: {e}")
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        # 只关注图节点本身，忽略节点内部的子链
+        if node and kwargs.get("name") == node:
+            self._nodes[run_id] = (node, self.clock())
+            self._emit(GraphEvent(NODE_START, node))
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs):
+        started = self._nodes.pop(run_id, None)
+        if started:
+            node, start = started
+            self._emit(GraphEvent(NODE_END, node, duration=self.clock() - start))
+
+    def on_chain_error(self, error, *, run_id: UUID, **kwargs):
+        started = self._nodes.pop(run_id, None)
+        if started:
+            node, start = started
+            self._emit(GraphEvent(NODE_ERROR, node, name=str(error)[:200], duration=self.clock() - start))
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node", "")
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        self._tools[run_id] = (node, name, self.clock())
+        self._emit(GraphEvent(TOOL_START, node, name=name))
+
+    def _tool_finished(self, run_id: UUID):
+        started = self._tools.pop(run_id, None)
+        if started:
+            node, name, start = started
+            self._emit(GraphEvent(TOOL_END, node, name=name, duration=self.clock() - start))
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs):
+        self._tool_finished(run_id)
+
+    def on_tool_error(self, error, *, run_id: UUID, **kwargs):
+        self._tool_finished(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata=None, **kwargs):
+        self._llms[run_id] = (metadata or {}).get("langgraph_node", "")
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, metadata=None, **kwargs):
+        self._llms[run_id] = (metadata or {}).get("langgraph_node", "")
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        node = self._llms.pop(run_id, "")
+        usage = _usage(response)
+        self._emit(GraphEvent(LLM_END, node, input_tokens=usage["input"], output_tokens=usage["output"]))
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs):
+        self._llms.pop(run_id, None)
+
+
+class DeadlineCallbackHandler(BaseCallbackHandler):
+    """Stop a run once its deadline passes or it is cancelled.
+
+    Checks the run deadline (``tradingagents.utils.deadline``) before every
+    node, LLM call and tool call, and on every streamed LLM token, so a
+    cancelled streaming call stops at its next token. ``raise_error`` makes
+    the ``DeadlineExceeded`` abort the graph instead of being logged.
+    """
+
+    raise_error = True
+
+    def _check(self, *args: Any, **kwargs: Any) -> None:
+        check_deadline()
+
+    on_chain_start = _check
+    on_llm_start = _check
+    on_chat_model_start = _check
+    on_tool_start = _check
+    on_llm_new_token = _check
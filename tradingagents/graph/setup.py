@@ -1,7 +1,7 @@
 # TradingAgents/graph/setup.py
 
 from typing import Dict, Any
-from langchain_openai import ChatOpenAI
+from langchain_core.language_models import BaseChatModel
 from langgraph.graph import END, StateGraph, START
 from langgraph.prebuilt import ToolNode
 
@@ -9,7 +9,19 @@ from tradingagents.agents import *
 from tradingagents.agents.utils.agent_states import AgentState
 from tradingagents.agents.utils.agent_utils import Toolkit
 
+from .analyst_cache import (
+    ANALYST_REPORT_KEYS,
+    AnalystReportCache,
+    analyst_cache_model,
+    create_analyst_cache_writer,
+)
 from .conditional_logic import ConditionalLogic
+from .debate_convergence import create_termination_recorder
+from .parallel_debate import (
+    create_parallel_turn,
+    create_invest_round_join,
+    create_risk_round_join,
+)
 
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
@@ -21,8 +33,8 @@ class GraphSetup:
 
     def __init__(
         self,
-        quick_thinking_llm: ChatOpenAI,
-        deep_thinking_llm: ChatOpenAI,
+        quick_thinking_llm: BaseChatModel,
+        deep_thinking_llm: BaseChatModel,
         toolkit: Toolkit,
         tool_nodes: Dict[str, ToolNode],
         bull_memory,
@@ -33,6 +45,7 @@ class GraphSetup:
         conditional_logic: ConditionalLogic,
         config: Dict[str, Any] = None,
         react_llm = None,
+        analyst_cache: AnalystReportCache = None,
     ):
         """Initialize with required components."""
         self.quick_thinking_llm = quick_thinking_llm
@@ -47,9 +60,10 @@ class GraphSetup:
         self.conditional_logic = conditional_logic
         self.config = config or {}
         self.react_llm = react_llm
+        self.analyst_cache = analyst_cache
 
     def setup_graph(
-        self, selected_analysts=["market", "social", "news", "fundamentals"]
+        self, selected_analysts=["market", "social", "news", "fundamentals"], checkpointer=None
     ):
         """Set up and compile the agent workflow graph.
 
@@ -59,6 +73,8 @@ class GraphSetup:
                 - "social": Social media analyst
                 - "news": News analyst
                 - "fundamentals": Fundamentals analyst
+            checkpointer: Optional LangGraph checkpointer that persists state
+                after every node so a failed run can be resumed
         """
         if len(selected_analysts) == 0:
             raise ValueError("Trading Agents Graph Setup Error: no analysts selected!")
@@ -136,29 +152,17 @@ class GraphSetup:
             delete_nodes["fundamentals"] = create_msg_delete()
             tool_nodes["fundamentals"] = self.tool_nodes["fundamentals"]
 
-        # Create researcher and manager nodes
-        bull_researcher_node = create_bull_researcher(
-            self.quick_thinking_llm, self.bull_memory
-        )
-        bear_researcher_node = create_bear_researcher(
-            self.quick_thinking_llm, self.bear_memory
-        )
-        research_manager_node = create_research_manager(
-            self.deep_thinking_llm, self.invest_judge_memory
-        )
-        trader_node = create_trader(self.quick_thinking_llm, self.trader_memory)
-
-        # Create risk analysis nodes
-        risky_analyst = create_risky_debator(self.quick_thinking_llm)
-        neutral_analyst = create_neutral_debator(self.quick_thinking_llm)
-        safe_analyst = create_safe_debator(self.quick_thinking_llm)
-        risk_manager_node = create_risk_manager(
-            self.deep_thinking_llm, self.risk_manager_memory
-        )
-
         # Create workflow
         workflow = StateGraph(AgentState)
 
+        # Persist each analyst's report before its messages are cleared
+        if self.analyst_cache is not None:
+            model = analyst_cache_model(self.config)
+            for analyst_type in analyst_nodes:
+                delete_nodes[analyst_type] = create_analyst_cache_writer(
+                    delete_nodes[analyst_type], self.analyst_cache, analyst_type, model
+                )
+
         # Add analyst nodes to the graph
         for analyst_type, node in analyst_nodes.items():
             workflow.add_node(f"{analyst_type.capitalize()} Analyst", node)
@@ -167,20 +171,15 @@ class GraphSetup:
             )
             workflow.add_node(f"tools_{analyst_type}", tool_nodes[analyst_type])
 
-        # Add other nodes
-        workflow.add_node("Bull Researcher", bull_researcher_node)
-        workflow.add_node("Bear Researcher", bear_researcher_node)
-        workflow.add_node("Research Manager", research_manager_node)
-        workflow.add_node("Trader", trader_node)
-        workflow.add_node("Risky Analyst", risky_analyst)
-        workflow.add_node("Neutral Analyst", neutral_analyst)
-        workflow.add_node("Safe Analyst", safe_analyst)
-        workflow.add_node("Risk Judge", risk_manager_node)
-
         # Define edges
-        # Start with the first analyst
-        first_analyst = selected_analysts[0]
-        workflow.add_edge(START, f"{first_analyst.capitalize()} Analyst")
+        # Start with the first analyst whose report is not already in the state
+        # (reports restored from the analyst cache are skipped)
+        debate_entry = self._debate_entry_nodes()
+        workflow.add_conditional_edges(
+            START,
+            self._create_analyst_router(selected_analysts, debate_entry),
+            [f"{a.capitalize()} Analyst" for a in selected_analysts] + debate_entry,
+        )
 
         # Connect analysts in sequence
         for i, analyst_type in enumerate(selected_analysts):
@@ -196,14 +195,122 @@ class GraphSetup:
             )
             workflow.add_edge(current_tools, current_analyst)
 
-            # Connect to next analyst or to Bull Researcher if this is the last analyst
-            if i < len(selected_analysts) - 1:
-                next_analyst = f"{selected_analysts[i+1].capitalize()} Analyst"
-                workflow.add_edge(current_clear, next_analyst)
-            else:
-                workflow.add_edge(current_clear, "Bull Researcher")
+            # Connect to the next pending analyst; the last one hands off to the researchers
+            remaining = selected_analysts[i + 1:]
+            workflow.add_conditional_edges(
+                current_clear,
+                self._create_analyst_router(remaining, debate_entry),
+                [f"{a.capitalize()} Analyst" for a in remaining] + debate_entry,
+            )
+
+        # Add researcher, trader and risk management stages
+        self._add_debate_stages(workflow)
+
+        # Compile and return
+        return workflow.compile(checkpointer=checkpointer)
 
-        # Add remaining edges
+    def _debate_entry_nodes(self):
+        """Nodes that start the researcher debate."""
+        if self.config.get("parallel_debate", False):
+            return ["Bull Researcher", "Bear Researcher"]
+        return ["Bull Researcher"]
+
+    def _create_analyst_router(self, analysts, debate_entry):
+        """Route to the first analyst without a report, else to the debate."""
+
+        def route(state):
+            for analyst_type in analysts:
+                if not state.get(ANALYST_REPORT_KEYS[analyst_type]):
+                    return f"{analyst_type.capitalize()} Analyst"
+            return debate_entry if len(debate_entry) > 1 else debate_entry[0]
+
+        return route
+
+    def _add_debate_stages(self, workflow: StateGraph, upstream: str = None):
+        """Add researcher debate, trader and risk debate stages after ``upstream``.
+
+        When ``upstream`` is None the caller routes into ``_debate_entry_nodes()``.
+
+        With ``config["parallel_debate"]`` enabled, every debater of a round
+        answers concurrently to the state of the previous round and the
+        arguments are merged in a fixed speaker order by a join node, so one
+        round costs a single LLM latency instead of two (or three).
+        """
+        # Create researcher and manager nodes
+        bull_researcher_node = create_bull_researcher(
+            self.quick_thinking_llm, self.bull_memory
+        )
+        bear_researcher_node = create_bear_researcher(
+            self.quick_thinking_llm, self.bear_memory
+        )
+        research_manager_node = create_research_manager(
+            self.deep_thinking_llm, self.invest_judge_memory
+        )
+        trader_node = create_trader(self.quick_thinking_llm, self.trader_memory)
+
+        # Create risk analysis nodes
+        risky_analyst = create_risky_debator(self.quick_thinking_llm)
+        neutral_analyst = create_neutral_debator(self.quick_thinking_llm)
+        safe_analyst = create_safe_debator(self.quick_thinking_llm)
+        risk_manager_node = create_risk_manager(
+            self.deep_thinking_llm, self.risk_manager_memory
+        )
+
+        if self.config.get("parallel_debate", False):
+            logger.info(f"🔀 使用并行辩论模式（同轮辩手并发发言）")
+            self._add_parallel_debates(
+                workflow,
+                upstream,
+                bull_researcher_node,
+                bear_researcher_node,
+                risky_analyst,
+                safe_analyst,
+                neutral_analyst,
+            )
+        else:
+            self._add_sequential_debates(
+                workflow,
+                upstream,
+                bull_researcher_node,
+                bear_researcher_node,
+                risky_analyst,
+                safe_analyst,
+                neutral_analyst,
+            )
+
+        workflow.add_node(
+            "Research Manager",
+            create_termination_recorder(
+                research_manager_node,
+                self.conditional_logic.debate_termination_reason,
+                "investment_debate_state",
+            ),
+        )
+        workflow.add_node("Trader", trader_node)
+        workflow.add_node(
+            "Risk Judge",
+            create_termination_recorder(
+                risk_manager_node,
+                self.conditional_logic.risk_termination_reason,
+                "risk_debate_state",
+            ),
+        )
+
+        workflow.add_edge("Research Manager", "Trader")
+        workflow.add_edge("Risk Judge", END)
+
+    def _add_sequential_debates(
+        self, workflow, upstream, bull, bear, risky, safe, neutral
+    ):
+        """Wire the strictly alternating Bull → Bear and Risky → Safe → Neutral debates."""
+        workflow.add_node("Bull Researcher", bull)
+        workflow.add_node("Bear Researcher", bear)
+        workflow.add_node("Risky Analyst", risky)
+        workflow.add_node("Neutral Analyst", neutral)
+        workflow.add_node("Safe Analyst", safe)
+
+        if upstream is not None:
+            workflow.add_edge(upstream, "Bull Researcher")
         workflow.add_conditional_edges(
             "Bull Researcher",
             self.conditional_logic.should_continue_debate,
@@ -220,7 +327,6 @@ class GraphSetup:
                 "Research Manager": "Research Manager",
             },
         )
-        workflow.add_edge("Research Manager", "Trader")
         workflow.add_edge("Trader", "Risky Analyst")
         workflow.add_conditional_edges(
             "Risky Analyst",
@@ -247,7 +353,56 @@ class GraphSetup:
             },
         )
 
-        workflow.add_edge("Risk Judge", END)
+    def _add_parallel_debates(
+        self, workflow, upstream, bull, bear, risky, safe, neutral
+    ):
+        """Wire simultaneous debate rounds joined by deterministic merge nodes."""
+        invest_speakers = {
+            "Bull Researcher": ("Bull", bull),
+            "Bear Researcher": ("Bear", bear),
+        }
+        for node_name, (speaker, node) in invest_speakers.items():
+            workflow.add_node(
+                node_name,
+                create_parallel_turn(
+                    node,
+                    speaker,
+                    "investment_debate_state",
+                    "current_response",
+                    "invest_round_responses",
+                ),
+            )
+            if upstream is not None:
+                workflow.add_edge(upstream, node_name)
+        workflow.add_node("Debate Round Join", create_invest_round_join())
+        workflow.add_edge(list(invest_speakers), "Debate Round Join")
+        workflow.add_conditional_edges(
+            "Debate Round Join",
+            self.conditional_logic.should_continue_debate_parallel,
+            list(invest_speakers) + ["Research Manager"],
+        )
 
-        # Compile and return
-        return workflow.compile()
+        risk_speakers = {
+            "Risky Analyst": ("Risky", risky),
+            "Safe Analyst": ("Safe", safe),
+            "Neutral Analyst": ("Neutral", neutral),
+        }
+        for node_name, (speaker, node) in risk_speakers.items():
+            workflow.add_node(
+                node_name,
+                create_parallel_turn(
+                    node,
+                    speaker,
+                    "risk_debate_state",
+                    f"current_{speaker.lower()}_response",
+                    "risk_round_responses",
+                ),
+            )
+            workflow.add_edge("Trader", node_name)
+        workflow.add_node("Risk Round Join", create_risk_round_join())
+        workflow.add_edge(list(risk_speakers), "Risk Round Join")
+        workflow.add_conditional_edges(
+            "Risk Round Join",
+            self.conditional_logic.should_continue_risk_analysis_parallel,
+            list(risk_speakers) + ["Risk Judge"],
+        )
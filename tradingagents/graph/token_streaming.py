@@ -0,0 +1,150 @@
+# TradingAgents/graph/token_streaming.py
+
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessageChunk
+
+# 导入统一日志系统
+from tradingagents.utils.logging_init import get_logger
+logger = get_logger("default")
+
+
+TokenCallback = Callable[[str, str], None]
+
+
+class TokenStreamThrottle:
+    """Buffers streamed tokens per node and flushes them at a bounded rate.
+
+    ``on_tokens(node, text)`` receives every token exactly once, batched so
+    front ends refresh at most once per ``min_interval`` seconds. The first
+    tokens of a node are pushed immediately; switching nodes always flushes
+    the previous node's buffer first.
+    """
+
+    def __init__(self, on_tokens: TokenCallback, min_interval: float = 0.25,
+                 clock: Callable[[], float] = time.monotonic):
+        self.on_tokens = on_tokens
+        self.min_interval = min_interval
+        self.clock = clock
+        self._node: Optional[str] = None
+        self._buffer: List[str] = []
+        self._last_flush = float("-inf")
+
+    def add(self, node: str, text: str):
+        if node != self._node:
+            self.flush()
+            self._node = node
+            # 每个节点的首批token立即推送
+            self._last_flush = float("-inf")
+        self._buffer.append(text)
+        if self.clock() - self._last_flush >= self.min_interval:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            text = "".join(self._buffer)
+            self._buffer = []
+            try:
+                self.on_tokens(self._node, text)
+            except Exception as e:
+                logger.warning(f"⚠️ [流式输出] 回调失败: {e}")
+        self._last_flush = self.clock()
+
+
+class TTFTRecorder(BaseCallbackHandler):
+    """Records time-to-first-token for every LLM call, keyed by graph node."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.samples: List[Dict[str, Any]] = []
+        self._pending: Dict[UUID, tuple] = {}
+
+    def _start(self, run_id: UUID, metadata: Optional[Dict[str, Any]]):
+        node = (metadata or {}).get("langgraph_node", "unknown")
+        self._pending[run_id] = (node, self.clock())
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata=None, **kwargs):
+        self._start(run_id, metadata)
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, metadata=None, **kwargs):
+        self._start(run_id, metadata)
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs):
+        pending = self._pending.pop(run_id, None)
+        if pending is None:
+            return
+        node, started = pending
+        ttft = self.clock() - started
+        self.samples.append({"node": node, "ttft": ttft})
+        logger.info(f"⏱️ [TTFT] {node}: {ttft:.2f}s", extra={
+            "event_type": "llm_ttft", "node": node, "ttft": ttft,
+        })
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        self._pending.pop(run_id, None)
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs):
+        self._pending.pop(run_id, None)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-node TTFT statistics: call count, mean and max seconds."""
+        by_node: Dict[str, List[float]] = {}
+        for sample in self.samples:
+            by_node.setdefault(sample["node"], []).append(sample["ttft"])
+        return {
+            node: {
+                "count": len(values),
+                "avg_s": round(sum(values) / len(values), 3),
+                "max_s": round(max(values), 3),
+            }
+            for node, values in by_node.items()
+        }
+
+
+def _chunk_text(message: AIMessageChunk) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    # 多模态/分块内容只取文本
+    return "".join(
+        part.get("text", "") for part in content
+        if isinstance(part, dict) and part.get("type") == "text"
+    )
+
+
+def stream_with_tokens(
+    graph,
+    input_state,
+    args: Dict[str, Any],
+    on_tokens: Optional[TokenCallback] = None,
+    min_interval: float = 0.25,
+    ttft_recorder: Optional[TTFTRecorder] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Stream full-state chunks while forwarding LLM tokens as they arrive.
+
+    Runs the graph with ``stream_mode=["values", "messages"]``; the state
+    chunks are yielded exactly as ``stream_mode="values"`` would, and the
+    token chunks go to ``on_tokens(node, text)`` through a throttle.
+    """
+    config = dict(args.get("config", {}))
+    if ttft_recorder is not None:
+        config["callbacks"] = list(config.get("callbacks") or []) + [ttft_recorder]
+    stream_args = {**args, "config": config, "stream_mode": ["values", "messages"]}
+
+    throttle = TokenStreamThrottle(on_tokens, min_interval) if on_tokens else None
+    for mode, payload in graph.stream(input_state, **stream_args):
+        if mode == "messages":
+            message, metadata = payload
+            if throttle is not None and isinstance(message, AIMessageChunk):
+                text = _chunk_text(message)
+                if text:
+                    throttle.add(metadata.get("langgraph_node", ""), text)
+        else:
+            if throttle is not None:
+                throttle.flush()
+            yield payload
+    if throttle is not None:
+        throttle.flush()
@@ -3,13 +3,11 @@
 import os
 from pathlib import Path
 import json
+import uuid
 from datetime import date
 from typing import Dict, Any, Tuple, List, Optional
 
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain_google_genai import ChatGoogleGenerativeAI
-from tradingagents.llm_adapters import ChatDashScope, ChatDashScopeOpenAI
+from tradingagents.llm_adapters import load_chat_model_class
 
 from langgraph.prebuilt import ToolNode
 
@@ -28,11 +26,20 @@ from tradingagents.agents.utils.agent_states import (
     InvestDebateState,
     RiskDebateState,
 )
-from tradingagents.dataflows.interface import set_config
+from tradingagents.dataflows.config import use_config
 
+from .analyst_cache import (
+    ANALYST_REPORT_KEYS,
+    AnalystReportCache,
+    analyst_cache_model,
+)
+from .checkpointing import CheckpointManager
 from .conditional_logic import ConditionalLogic
+from .debate_convergence import DebateConvergenceChecker
 from .setup import GraphSetup
+from .token_streaming import TTFTRecorder, stream_with_tokens
 from .propagation import Propagator
+from .run_events import DeadlineCallbackHandler, GraphEventEmitter
 from .reflection import Reflector
 from .signal_processing import SignalProcessor
 
@@ -56,8 +63,7 @@ class TradingAgentsGraph:
         self.debug = debug
         self.config = config or DEFAULT_CONFIG
 
-        # Update the interface's config
-        set_config(self.config)
+        # 配置只在本实例的运行期间生效（见 _run_scope），不修改进程级默认配置
 
         # Create necessary directories
         os.makedirs(
@@ -67,13 +73,17 @@ class TradingAgentsGraph:
 
         # Initialize LLMs
         temp = self.config.get("temperature", 0.7)
+        # 只导入选中提供商的SDK
         if self.config["llm_provider"].lower() == "openai" or self.config["llm_provider"] == "ollama" or self.config["llm_provider"] == "openrouter":
+            ChatOpenAI = load_chat_model_class("openai")
             self.deep_thinking_llm = ChatOpenAI(model=self.config["deep_think_llm"], base_url=self.config["backend_url"], temperature=temp)
             self.quick_thinking_llm = ChatOpenAI(model=self.config["quick_think_llm"], base_url=self.config["backend_url"], temperature=temp)
         elif self.config["llm_provider"].lower() == "anthropic":
+            ChatAnthropic = load_chat_model_class("anthropic")
             self.deep_thinking_llm = ChatAnthropic(model=self.config["deep_think_llm"], base_url=self.config["backend_url"], temperature=temp)
             self.quick_thinking_llm = ChatAnthropic(model=self.config["quick_think_llm"], base_url=self.config["backend_url"], temperature=temp)
         elif self.config["llm_provider"].lower() == "google":
+            ChatGoogleGenerativeAI = load_chat_model_class("google")
             google_api_key = os.getenv('GOOGLE_API_KEY')
             self.deep_thinking_llm = ChatGoogleGenerativeAI(
                 model=self.config["deep_think_llm"],
@@ -93,6 +103,7 @@ class TradingAgentsGraph:
               "阿里百炼" in self.config["llm_provider"]):
             # 使用 OpenAI 兼容适配器，支持原生 Function Calling
             logger.info(f"🔧 使用阿里百炼 OpenAI 兼容适配器 (支持原生工具调用)")
+            ChatDashScopeOpenAI = load_chat_model_class("dashscope")
             self.deep_thinking_llm = ChatDashScopeOpenAI(
                 model=self.config["deep_think_llm"],
                 temperature=temp,
@@ -106,7 +117,7 @@ class TradingAgentsGraph:
         elif (self.config["llm_provider"].lower() == "deepseek" or
               "deepseek" in self.config["llm_provider"].lower()):
             # DeepSeek V3配置 - 使用支持token统计的适配器
-            from tradingagents.llm_adapters.deepseek_adapter import ChatDeepSeek
+            ChatDeepSeek = load_chat_model_class("deepseek")
 
 
             deepseek_api_key = os.getenv('DEEPSEEK_API_KEY')
@@ -157,8 +168,26 @@ class TradingAgentsGraph:
         # Create tool nodes
         self.tool_nodes = self._create_tool_nodes()
 
+        # 分析师阶段缓存（同一股票/日期重跑时直接进入辩论阶段）
+        self.analyst_cache = None
+        if self.config.get("analyst_cache_enabled", True):
+            self.analyst_cache = AnalystReportCache(
+                os.path.join(self.config["data_cache_dir"], "analyst_reports"),
+                ttl_hours=self.config.get("analyst_cache_ttl_hours", 24),
+            )
+
         # Initialize components
-        self.conditional_logic = ConditionalLogic()
+        convergence_checker = None
+        if self.config.get("debate_early_stop", True):
+            convergence_checker = DebateConvergenceChecker(
+                overlap_threshold=self.config.get("debate_overlap_threshold", 0.6),
+                min_rounds=self.config.get("debate_min_rounds", 2),
+            )
+        self.conditional_logic = ConditionalLogic(
+            max_debate_rounds=self.config.get("max_debate_rounds", 1),
+            max_risk_discuss_rounds=self.config.get("max_risk_discuss_rounds", 1),
+            convergence_checker=convergence_checker,
+        )
         self.graph_setup = GraphSetup(
             self.quick_thinking_llm,
             self.deep_thinking_llm,
@@ -172,9 +201,10 @@ class TradingAgentsGraph:
             self.conditional_logic,
             self.config,
             getattr(self, 'react_llm', None),
+            analyst_cache=self.analyst_cache,
         )
 
-        self.propagator = Propagator()
+        self.propagator = Propagator(self.config.get("max_recur_limit", 100))
         self.reflector = Reflector(self.quick_thinking_llm)
         self.signal_processor = SignalProcessor(self.quick_thinking_llm)
 
@@ -182,9 +212,31 @@ class TradingAgentsGraph:
         self.curr_state = None
         self.ticker = None
         self.log_states_dict = {}  # date to full state dict
+        self.run_id = None
+        self.ttft_metrics = {}  # node -> time-to-first-token stats of the last run
+
+        # 持久化检查点（失败后可通过 run_id 断点恢复）
+        self.checkpoint_manager = None
+        checkpointer = None
+        if self.config.get("checkpoint_enabled", True):
+            try:
+                self.checkpoint_manager = CheckpointManager(self.config)
+                checkpointer = self.checkpoint_manager.checkpointer
+            except Exception as e:
+                logger.warning(f"⚠️ [检查点] 初始化失败，断点恢复不可用: {e}")
+                self.checkpoint_manager = None
 
         # Set up the graph
-        self.graph = self.graph_setup.setup_graph(selected_analysts)
+        self.selected_analysts = list(selected_analysts)
+        self.graph = self.graph_setup.setup_graph(selected_analysts, checkpointer=checkpointer)
+
+    def reset_run_state(self):
+        """Clear per-run state so the graph can be reused for another analysis."""
+        self.curr_state = None
+        self.ticker = None
+        self.log_states_dict = {}
+        self.run_id = None
+        self.ttft_metrics = {}
 
     def _create_tool_nodes(self) -> Dict[str, ToolNode]:
         """Create tool nodes for different data sources."""
@@ -233,8 +285,42 @@ class TradingAgentsGraph:
             ),
         }
 
-    def propagate(self, company_name, trade_date):
-        """Run the trading agents graph for a company on a specific date."""
+    def create_initial_state(self, company_name, trade_date, force_refresh=False):
+        """Create the initial state, restoring cached analyst reports.
+
+        Analysts whose report is restored from the analyst cache are skipped
+        by the graph. ``force_refresh`` ignores the cache and re-runs them;
+        their fresh reports overwrite the cached entries.
+        """
+        init_agent_state = self.propagator.create_initial_state(company_name, trade_date)
+        if self.analyst_cache is None or force_refresh:
+            return init_agent_state
+
+        model = analyst_cache_model(self.config)
+        cached = []
+        for analyst_type in self.selected_analysts:
+            entry = self.analyst_cache.get(company_name, str(trade_date), analyst_type, model)
+            if entry:
+                init_agent_state[ANALYST_REPORT_KEYS[analyst_type]] = entry["report"]
+                cached.append(analyst_type)
+        if cached:
+            logger.info(f"♻️ [分析师缓存] 命中 {company_name} {trade_date}: {', '.join(cached)}，跳过这些分析师")
+        return init_agent_state
+
+    def propagate(self, company_name, trade_date, force_refresh=False, run_id=None, on_tokens=None, on_event=None):
+        """Run the trading agents graph for a company on a specific date.
+
+        Args:
+            company_name: Ticker to analyze
+            trade_date: Trade date
+            force_refresh: Re-run all analysts even if cached reports exist
+            run_id: Checkpoint run id; generated when omitted. Pass it to
+                ``resume`` to continue a failed run from its last completed node
+            on_tokens: Optional ``callback(node, text)`` receiving LLM output
+                tokens as they stream, throttled to ``token_stream_interval``
+            on_event: Optional ``callback(GraphEvent)`` receiving this run's
+                node start/end, tool call and LLM token-count events
+        """
 
         # 添加详细的接收日志
         logger.debug(f"🔍 [GRAPH DEBUG] ===== TradingAgentsGraph.propagate 接收参数 =====")
@@ -246,36 +332,146 @@ class TradingAgentsGraph:
 
         # Initialize state
         logger.debug(f"🔍 [GRAPH DEBUG] 创建初始状态，传递参数: company_name='{company_name}', trade_date='{trade_date}'")
-        init_agent_state = self.propagator.create_initial_state(
-            company_name, trade_date
+        init_agent_state = self.create_initial_state(
+            company_name, trade_date, force_refresh=force_refresh
         )
         logger.debug(f"🔍 [GRAPH DEBUG] 初始状态中的company_of_interest: '{init_agent_state.get('company_of_interest', 'NOT_FOUND')}'")
         logger.debug(f"🔍 [GRAPH DEBUG] 初始状态中的trade_date: '{init_agent_state.get('trade_date', 'NOT_FOUND')}'")
-        args = self.propagator.get_graph_args()
 
-        if self.debug:
-            # Debug mode with tracing
-            trace = []
-            for chunk in self.graph.stream(init_agent_state, **args):
-                if len(chunk["messages"]) == 0:
+        run_id = self.start_run(company_name, trade_date, run_id)
+
+        return self._run_graph(init_agent_state, run_id, company_name, trade_date, on_tokens=on_tokens, on_event=on_event)
+
+    def start_run(self, company_name, trade_date, run_id=None):
+        """Register a checkpointed run and return its id (None when checkpointing is off)."""
+        if self.checkpoint_manager is None or self.checkpoint_manager.checkpointer is None:
+            self.run_id = None
+            return None
+        run_id = run_id or str(uuid.uuid4())
+        self.checkpoint_manager.start_run(
+            run_id, company_name, str(trade_date), self.selected_analysts, self.config
+        )
+        logger.info(f"💾 [检查点] 运行ID: {run_id}")
+        self.run_id = run_id
+        return run_id
+
+    def stream_run(self, input_state, run_id, on_tokens=None, on_event=None):
+        """Stream graph chunks for a run started with ``start_run``.
+
+        The run is marked failed (checkpoints kept for ``resume``) when the
+        graph raises, and its checkpoints are pruned once the stream completes.
+        ``on_tokens(node, text)`` receives LLM tokens as they stream and
+        ``on_event(GraphEvent)`` the run's node, tool and LLM events.
+        """
+        try:
+            yield from self._stream_graph(input_state, run_id, on_tokens, on_event)
+        except Exception as e:
+            self._fail_run(run_id, e)
+            raise
+        if run_id:
+            self.checkpoint_manager.finish_run(run_id)
+
+    def _fail_run(self, run_id, error):
+        if run_id:
+            self.checkpoint_manager.fail_run(run_id, str(error))
+            logger.error(f"❌ [检查点] 运行失败，可使用 run_id 恢复: {run_id}")
+
+    def resume(self, run_id, on_tokens=None, on_event=None):
+        """Resume a failed or interrupted run from its last completed node.
+
+        Args:
+            run_id: Run id returned by (or logged during) ``propagate``
+
+        Returns:
+            Same ``(final_state, signal)`` tuple as ``propagate``
+        """
+        if self.checkpoint_manager is None or self.checkpoint_manager.checkpointer is None:
+            raise ValueError("Checkpointing is disabled; cannot resume runs")
+
+        snapshot = self.graph.get_state({"configurable": {"thread_id": run_id}})
+        if not snapshot or not snapshot.values:
+            raise ValueError(f"No checkpoint found for run {run_id}")
+
+        values = snapshot.values
+        company_name = values["company_of_interest"]
+        trade_date = values["trade_date"]
+        self.ticker = company_name
+        self.run_id = run_id
+        logger.info(f"🔄 [检查点] 恢复运行 {run_id}: {company_name} {trade_date}，下一节点: {list(snapshot.next)}")
+
+        # 没有待执行节点说明图已跑完，只是后处理失败，直接使用检查点中的最终状态
+        final_state = None if snapshot.next else values
+        return self._run_graph(None, run_id, company_name, trade_date, final_state=final_state,
+                               on_tokens=on_tokens, on_event=on_event)
+
+    def _graph_args(self, run_id, on_event=None):
+        """Graph invocation args: deadline checks, plus an event emitter bound to this run when requested."""
+        callbacks = [DeadlineCallbackHandler()]
+        if on_event is not None:
+            callbacks.append(GraphEventEmitter(on_event))
+        return self.propagator.get_graph_args(run_id, callbacks=callbacks)
+
+    def _stream_graph(self, input_state, run_id, on_tokens=None, on_event=None):
+        """Yield full-state chunks, forwarding streamed tokens and recording TTFT."""
+        recorder = TTFTRecorder()
+        try:
+            with use_config(self.config):
+                yield from stream_with_tokens(
+                    self.graph,
+                    input_state,
+                    self._graph_args(run_id, on_event),
+                    on_tokens=on_tokens,
+                    min_interval=self.config.get("token_stream_interval", 0.25),
+                    ttft_recorder=recorder,
+                )
+        finally:
+            self.ttft_metrics = recorder.summary()
+
+    def _run_graph(self, input_state, run_id, company_name, trade_date, final_state=None, on_tokens=None, on_event=None):
+        """Invoke the graph (fresh input, or None to continue from a checkpoint)."""
+        # 在本次运行的配置上下文中执行：数据接口和工具读取的都是本实例的配置
+        with use_config(self.config):
+            args = self._graph_args(run_id, on_event)
+
+            try:
+                if final_state is not None:
+                    # resume() 时图已执行完毕，只需重新做后处理
                     pass
+                elif on_tokens is not None:
+                    # Token streaming mode
+                    for chunk in self._stream_graph(input_state, run_id, on_tokens, on_event):
+                        final_state = chunk
+                elif self.debug:
+                    # Debug mode with tracing
+                    trace = []
+                    for chunk in self.graph.stream(input_state, **args):
+                        if len(chunk["messages"]) == 0:
+                            pass
+                        else:
+                            chunk["messages"][-1].pretty_print()
+                            trace.append(chunk)
+
+                    final_state = trace[-1]
                 else:
-                    chunk["messages"][-1].pretty_print()
-                    trace.append(chunk)
+                    # Standard mode without tracing
+                    final_state = self.graph.invoke(input_state, **args)
 
-            final_state = trace[-1]
-        else:
-            # Standard mode without tracing
-            final_state = self.graph.invoke(init_agent_state, **args)
+                # Store current state for reflection
+                self.curr_state = final_state
+
+                # Log state
+                self._log_state(trade_date, final_state)
 
-        # Store current state for reflection
-        self.curr_state = final_state
+                signal = self.process_signal(final_state["final_trade_decision"], company_name)
+            except Exception as e:
+                self._fail_run(run_id, e)
+                raise
 
-        # Log state
-        self._log_state(trade_date, final_state)
+            if run_id:
+                self.checkpoint_manager.finish_run(run_id)
 
-        # Return decision and processed signal
-        return final_state, self.process_signal(final_state["final_trade_decision"], company_name)
+            # Return decision and processed signal
+            return final_state, signal
 
     def _log_state(self, trade_date, final_state):
         """Log the final state to a JSON file."""
@@ -296,6 +492,9 @@ class TradingAgentsGraph:
                 "judge_decision": final_state["investment_debate_state"][
                     "judge_decision"
                 ],
+                "termination_reason": final_state["investment_debate_state"].get(
+                    "termination_reason", ""
+                ),
             },
             "trader_investment_decision": final_state["trader_investment_plan"],
             "risk_debate_state": {
@@ -304,6 +503,9 @@ class TradingAgentsGraph:
                 "neutral_history": final_state["risk_debate_state"]["neutral_history"],
                 "history": final_state["risk_debate_state"]["history"],
                 "judge_decision": final_state["risk_debate_state"]["judge_decision"],
+                "termination_reason": final_state["risk_debate_state"].get(
+                    "termination_reason", ""
+                ),
             },
             "investment_plan": final_state["investment_plan"],
             "final_trade_decision": final_state["final_trade_decision"],
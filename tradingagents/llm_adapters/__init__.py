@@ -1,5 +1,31 @@
 # LLM Adapters for TradingAgents
-from .dashscope_adapter import ChatDashScope
-from .dashscope_openai_adapter import ChatDashScopeOpenAI
+# 适配器和各家SDK都按需导入：只有被选中的提供商才会加载对应的模块
+import importlib
 
-__all__ = ["ChatDashScope", "ChatDashScopeOpenAI"]
+from tradingagents.utils.lazy_import import lazy_exports
+
+# 提供商 -> (模块, 聊天模型类)
+LLM_PROVIDERS = {
+    "openai": ("langchain_openai", "ChatOpenAI"),
+    "anthropic": ("langchain_anthropic", "ChatAnthropic"),
+    "google": ("langchain_google_genai", "ChatGoogleGenerativeAI"),
+    "dashscope": ("tradingagents.llm_adapters.dashscope_openai_adapter", "ChatDashScopeOpenAI"),
+    "deepseek": ("tradingagents.llm_adapters.deepseek_adapter", "ChatDeepSeek"),
+}
+
+
+def load_chat_model_class(provider: str):
+    """导入并返回提供商的聊天模型类"""
+    if provider not in LLM_PROVIDERS:
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+    module_name, class_name = LLM_PROVIDERS[provider]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+__getattr__ = lazy_exports(__name__, {
+    "ChatDashScope": ".dashscope_adapter",
+    "ChatDashScopeOpenAI": ".dashscope_openai_adapter",
+    "ChatDeepSeek": ".deepseek_adapter",
+})
+
+__all__ = ["ChatDashScope", "ChatDashScopeOpenAI", "ChatDeepSeek", "LLM_PROVIDERS", "load_chat_model_class"]
@@ -14,6 +14,7 @@ from ..config.config_manager import token_tracker
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.deadline import apply_budget_timeout
 logger = get_logger('agents')
 
 
@@ -33,6 +34,8 @@ class ChatDashScopeOpenAI(ChatOpenAI):
         kwargs.setdefault("model", "qwen-turbo")
         kwargs.setdefault("temperature", 0.1)
         kwargs.setdefault("max_tokens", 2000)
+        # 流式输出时在最后一块返回 token 使用量
+        kwargs.setdefault("stream_usage", True)
         
         # 检查 API 密钥
         if not kwargs.get("api_key"):
@@ -54,6 +57,9 @@ class ChatDashScopeOpenAI(ChatOpenAI):
     def _generate(self, *args, **kwargs):
         """重写生成方法，添加 token 使用量追踪"""
         
+        # 单次请求超时不超过运行剩余时间
+        apply_budget_timeout(kwargs, self.request_timeout)
+
         # 调用父类的生成方法
         result = super()._generate(*args, **kwargs)
         
@@ -86,6 +92,28 @@ class ChatDashScopeOpenAI(ChatOpenAI):
             logger.error(f"⚠️ Token 追踪失败: {track_error}")
         
         return result
+
+    def _stream(self, *args, **kwargs):
+        """重写流式方法：逐块输出，结束后按最后一块的 usage 追踪 token 使用量"""
+        apply_budget_timeout(kwargs, self.request_timeout)
+        usage = None
+        for chunk in super()._stream(*args, **kwargs):
+            if getattr(chunk.message, "usage_metadata", None):
+                usage = chunk.message.usage_metadata
+            yield chunk
+
+        try:
+            if usage and (usage.get("input_tokens") or usage.get("output_tokens")):
+                token_tracker.track_usage(
+                    provider="dashscope",
+                    model_name=self.model_name,
+                    input_tokens=usage.get("input_tokens", 0),
+                    output_tokens=usage.get("output_tokens", 0),
+                    session_id=kwargs.get('session_id', f"dashscope_openai_{hash(str(args))%10000}"),
+                    analysis_type=kwargs.get('analysis_type', 'stock_analysis')
+                )
+        except Exception as track_error:
+            logger.error(f"⚠️ Token 追踪失败: {track_error}")
     
     def bind_tools(
         self,
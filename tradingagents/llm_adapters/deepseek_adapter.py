@@ -4,9 +4,9 @@ DeepSeek LLM适配器，支持Token使用统计
 
 import os
 import time
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
 from langchain_core.messages import BaseMessage, AIMessage, HumanMessage, SystemMessage
-from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
 from langchain_openai import ChatOpenAI
 from langchain_core.callbacks import CallbackManagerForLLMRun
 
@@ -15,6 +15,7 @@ from tradingagents.utils.logging_init import setup_llm_logging
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger, get_logger_manager
+from tradingagents.utils.deadline import apply_budget_timeout
 logger = get_logger('agents')
 logger = setup_llm_logging()
 
@@ -62,6 +63,9 @@ class ChatDeepSeek(ChatOpenAI):
             if not api_key:
                 raise ValueError("DeepSeek API密钥未找到。请设置DEEPSEEK_API_KEY环境变量或传入api_key参数。")
         
+        # 流式输出时在最后一块返回token使用量
+        kwargs.setdefault("stream_usage", True)
+
         # 初始化父类
         super().__init__(
             model=model,
@@ -91,6 +95,8 @@ class ChatDeepSeek(ChatOpenAI):
         # 提取并移除自定义参数，避免传递给父类
         session_id = kwargs.pop('session_id', None)
         analysis_type = kwargs.pop('analysis_type', None)
+        # 单次请求超时不超过运行剩余时间
+        apply_budget_timeout(kwargs, self.request_timeout)
 
         try:
             # 调用父类方法生成响应
@@ -116,42 +122,9 @@ class ChatDeepSeek(ChatOpenAI):
                 logger.info(f"📊 [DeepSeek] 实际token使用: 输入={input_tokens}, 输出={output_tokens}")
             
             # 记录token使用量
-            if TOKEN_TRACKING_ENABLED and (input_tokens > 0 or output_tokens > 0):
-                try:
-                    # 使用提取的参数或生成默认值
-                    if session_id is None:
-                        session_id = f"deepseek_{hash(str(messages))%10000}"
-                    if analysis_type is None:
-                        analysis_type = 'stock_analysis'
-
-                    # 记录使用量
-                    usage_record = token_tracker.track_usage(
-                        provider="deepseek",
-                        model_name=self.model_name,
-                        input_tokens=input_tokens,
-                        output_tokens=output_tokens,
-                        session_id=session_id,
-                        analysis_type=analysis_type
-                    )
-
-                    if usage_record:
-                        if usage_record.cost == 0.0:
-                            logger.warning(f"⚠️ [DeepSeek] 成本计算为0，可能配置有问题")
-                        else:
-                            logger.info(f"💰 [DeepSeek] 本次调用成本: ¥{usage_record.cost:.6f}")
-
-                        # 使用统一日志管理器的Token记录方法
-                        logger_manager = get_logger_manager()
-                        logger_manager.log_token_usage(
-                            logger, "deepseek", self.model_name,
-                            input_tokens, output_tokens, usage_record.cost,
-                            session_id
-                        )
-                    else:
-                        logger.warning(f"⚠️ [DeepSeek] 未创建使用记录")
-
-                except Exception as track_error:
-                    logger.error(f"⚠️ [DeepSeek] Token统计失败: {track_error}", exc_info=True)
+            if session_id is None:
+                session_id = f"deepseek_{hash(str(messages))%10000}"
+            self._track_usage(input_tokens, output_tokens, session_id, analysis_type)
             
             return result
             
@@ -159,6 +132,71 @@ class ChatDeepSeek(ChatOpenAI):
             logger.error(f"❌ [DeepSeek] 调用失败: {e}", exc_info=True)
             raise
     
+    def _track_usage(self, input_tokens: int, output_tokens: int, session_id: str, analysis_type: Optional[str]):
+        """记录token使用量和成本"""
+        if not TOKEN_TRACKING_ENABLED or (input_tokens <= 0 and output_tokens <= 0):
+            return
+        try:
+            if analysis_type is None:
+                analysis_type = 'stock_analysis'
+
+            # 记录使用量
+            usage_record = token_tracker.track_usage(
+                provider="deepseek",
+                model_name=self.model_name,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                session_id=session_id,
+                analysis_type=analysis_type
+            )
+
+            if usage_record:
+                if usage_record.cost == 0.0:
+                    logger.warning(f"⚠️ [DeepSeek] 成本计算为0，可能配置有问题")
+                else:
+                    logger.info(f"💰 [DeepSeek] 本次调用成本: ¥{usage_record.cost:.6f}")
+
+                # 使用统一日志管理器的Token记录方法
+                logger_manager = get_logger_manager()
+                logger_manager.log_token_usage(
+                    logger, "deepseek", self.model_name,
+                    input_tokens, output_tokens, usage_record.cost,
+                    session_id
+                )
+            else:
+                logger.warning(f"⚠️ [DeepSeek] 未创建使用记录")
+
+        except Exception as track_error:
+            logger.error(f"⚠️ [DeepSeek] Token统计失败: {track_error}", exc_info=True)
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        """
+        流式生成聊天响应，结束后按最后一块的usage记录token使用量
+        """
+        session_id = kwargs.pop('session_id', None)
+        analysis_type = kwargs.pop('analysis_type', None)
+        apply_budget_timeout(kwargs, self.request_timeout)
+
+        usage = None
+        for chunk in super()._stream(messages, stop, run_manager, **kwargs):
+            if getattr(chunk.message, "usage_metadata", None):
+                usage = chunk.message.usage_metadata
+            yield chunk
+
+        if usage:
+            input_tokens = usage.get("input_tokens", 0)
+            output_tokens = usage.get("output_tokens", 0)
+            logger.info(f"📊 [DeepSeek] 实际token使用(流式): 输入={input_tokens}, 输出={output_tokens}")
+            if session_id is None:
+                session_id = f"deepseek_{hash(str(messages))%10000}"
+            self._track_usage(input_tokens, output_tokens, session_id, analysis_type)
+    
     def _estimate_input_tokens(self, messages: List[BaseMessage]) -> int:
         """
         估算输入token数量
@@ -16,6 +16,7 @@ from tradingagents.utils.logging_init import setup_llm_logging
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger, get_logger_manager
+from tradingagents.utils.deadline import apply_budget_timeout
 logger = get_logger('agents')
 logger = setup_llm_logging()
 
@@ -115,6 +116,9 @@ class OpenAICompatibleBase(ChatOpenAI):
         # 记录开始时间
         start_time = time.time()
         
+        # 单次请求超时不超过运行剩余时间
+        apply_budget_timeout(kwargs, self.request_timeout)
+
         # 调用父类生成方法
         result = super()._generate(messages, stop, run_manager, **kwargs)
         
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+运行截止时间与取消
+每次分析在运行上下文中携带截止时间和取消信号（ContextVar，随LangGraph节点线程传递）。
+数据接口、HTTP请求和LLM调用按剩余时间设置超时，等待和重试在截止或取消时立即停止
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('default')
+
+
+class DeadlineExceeded(TimeoutError):
+    """运行超过截止时间或被取消"""
+
+    def __init__(self, message: str, cancelled: bool = False):
+        super().__init__(message)
+        self.cancelled = cancelled
+
+
+class Deadline:
+    """一次运行的截止时间和取消信号，嵌套时同时受外层约束"""
+
+    def __init__(self, seconds: Optional[float] = None, cancel_event: Optional[threading.Event] = None,
+                 parent: Optional["Deadline"] = None):
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+        # 没有单独的取消信号时沿用外层的，使外层取消也能唤醒内层的等待
+        self.cancel_event = cancel_event or (parent.cancel_event if parent else threading.Event())
+        self.parent = parent
+
+    def remaining(self) -> Optional[float]:
+        """剩余秒数，没有截止时间时为None"""
+        candidates = []
+        if self.expires_at is not None:
+            candidates.append(self.expires_at - time.monotonic())
+        if self.parent is not None and self.parent.remaining() is not None:
+            candidates.append(self.parent.remaining())
+        return max(min(candidates), 0.0) if candidates else None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def check(self):
+        """已取消或已超过截止时间时抛出 DeadlineExceeded"""
+        if self.cancelled:
+            raise DeadlineExceeded("分析已取消", cancelled=True)
+        if self.remaining() == 0.0:
+            raise DeadlineExceeded("分析超过截止时间")
+
+
+# 后台调用检查截止和取消的间隔（秒）
+_POLL_INTERVAL = 0.2
+
+_current: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("run_deadline", default=None)
+
+
+@contextmanager
+def run_deadline(seconds: Optional[float] = None, cancel_event: Optional[threading.Event] = None):
+    """在作用域内设置运行截止时间和取消信号
+
+    嵌套使用时取更早的截止时间，任一层取消都生效。seconds 为None时只传递取消信号。
+    """
+    deadline = Deadline(seconds, cancel_event, parent=_current.get())
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:
+            # 生成器在其他上下文中结束时无法重置，直接清除
+            _current.set(deadline.parent)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+def remaining(default: Optional[float] = None) -> Optional[float]:
+    """当前运行的剩余秒数；没有截止时间时返回 default"""
+    deadline = _current.get()
+    left = deadline.remaining() if deadline else None
+    return default if left is None else left
+
+
+def check_deadline():
+    """在长耗时操作之间调用：已取消或已超时则抛出 DeadlineExceeded"""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check()
+
+
+def budget_timeout(default: Optional[float], minimum: float = 1.0) -> Optional[float]:
+    """单次调用的超时：默认超时与剩余时间取较小者（不低于 minimum）
+
+    已取消或已超时时抛出 DeadlineExceeded，不再发起调用
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return default
+    deadline.check()
+    left = deadline.remaining()
+    if left is None:
+        return default
+    budget = max(left, minimum)
+    return budget if default is None else min(default, budget)
+
+
+def deadline_sleep(seconds: float):
+    """可取消的等待：等待会超过截止时间时直接抛出 DeadlineExceeded，取消时立即结束"""
+    deadline = _current.get()
+    if deadline is None:
+        time.sleep(seconds)
+        return
+    deadline.check()
+    left = deadline.remaining()
+    if left is not None and seconds >= left:
+        raise DeadlineExceeded(f"等待{seconds:.0f}秒将超过截止时间（剩余{left:.0f}秒）")
+    if deadline.cancel_event.wait(seconds) or deadline.cancelled:
+        raise DeadlineExceeded("分析已取消", cancelled=True)
+
+
+def call_with_deadline(fn: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+    """在后台线程执行不接受超时参数的调用（如AKShare接口），最多等待 min(timeout, 剩余时间)
+
+    超时抛出 TimeoutError，截止或取消时抛出 DeadlineExceeded；放弃等待后后台线程的结果被丢弃
+    """
+    wait_for = budget_timeout(timeout)
+    deadline = _current.get()
+    context = contextvars.copy_context()
+    done = threading.Event()
+    outcome = {}
+
+    def target():
+        try:
+            outcome["value"] = context.run(fn, *args, **kwargs)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            done.set()
+
+    threading.Thread(target=target, daemon=True, name="deadline-call").start()
+    finish_at = None if wait_for is None else time.monotonic() + wait_for
+    while not done.wait(_POLL_INTERVAL):
+        if deadline is not None:
+            deadline.check()
+        if finish_at is not None and time.monotonic() >= finish_at:
+            raise TimeoutError(f"调用超时（{wait_for:.0f}秒）")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("value")
+
+
+def apply_budget_timeout(kwargs: dict, default: Any = None) -> dict:
+    """为单次LLM请求参数设置不超过剩余时间的 timeout；没有运行截止时间时不修改
+
+    default 为模型自身的请求超时（非数值时忽略）
+    """
+    if _current.get() is None:
+        return kwargs
+    if not isinstance(default, (int, float)):
+        default = None
+    kwargs["timeout"] = budget_timeout(default)
+    return kwargs
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+按需导入工具
+数据源库（yfinance、akshare等）和各家LLM SDK导入耗时很长，而一次运行通常只用到其中少数几个。
+这里提供延迟到首次使用时才导入的模块代理、包级延迟导出，以及不导入模块的可用性检查
+"""
+
+import importlib
+import importlib.util
+import sys
+import threading
+import types
+from typing import Any, Callable, Dict
+
+
+def module_available(name: str) -> bool:
+    """检查模块是否已安装（只查找，不导入）"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyModule(types.ModuleType):
+    """模块代理：首次访问属性时才真正导入"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_module(name: str) -> LazyModule:
+    """返回模块代理，例如 ``pd = lazy_module("pandas")``"""
+    return LazyModule(name)
+
+
+def lazy_exports(module_name: str, exports: Dict[str, str], fallbacks: Dict[str, Any] = None) -> Callable[[str], Any]:
+    """生成模块级 ``__getattr__``：访问导出名时才导入其所在的模块
+
+    Args:
+        module_name: 包或模块名（通常传 ``__name__``）
+        exports: 导出名 -> 模块（相对路径，如 ``.interface``）
+        fallbacks: 子模块导入失败时的替代值（如可选依赖缺失时返回None）
+    """
+    fallbacks = fallbacks or {}
+
+    def __getattr__(name: str) -> Any:
+        if name not in exports:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        owner = sys.modules[module_name]
+        try:
+            module = importlib.import_module(exports[name], owner.__package__)
+        except ImportError:
+            if name in fallbacks:
+                return fallbacks[name]
+            raise
+        value = getattr(module, name)
+        # 缓存到包的命名空间，之后的访问不再经过 __getattr__
+        setattr(owner, name, value)
+        return value
+
+    return __getattr__
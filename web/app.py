@@ -29,7 +29,7 @@ from components.header import render_header
 from components.analysis_form import render_analysis_form
 from components.results_display import render_results
 from utils.api_checker import check_api_keys
-from utils.analysis_runner import run_stock_analysis, validate_analysis_params, format_analysis_results
+from utils.analysis_runner import validate_analysis_params, format_analysis_results
 from utils.progress_tracker import SmartStreamlitProgressDisplay, create_smart_progress_callback
 from utils.async_progress_tracker import AsyncProgressTracker
 from components.async_progress_display import display_unified_progress
@@ -570,8 +570,11 @@ def main():
             st.info("Please ensure all dependencies are installed")
         return
     elif page == "📈 History":
-        st.header("📈 History")
-        st.info("History function under development...")
+        try:
+            from modules.analysis_history import render_analysis_history
+            render_analysis_history()
+        except ImportError as e:
+            st.error(f"History page failed to load: {e}")
         return
     elif page == "🔧 System Status":
         st.header("🔧 System Status")
@@ -721,16 +724,6 @@ def main():
                 import uuid
                 analysis_id = f"analysis_{uuid.uuid4().hex[:8]}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
-                # Save analysis ID and form configuration to session state and cookie
-                form_config = st.session_state.get('form_config', {})
-                set_persistent_analysis_id(
-                    analysis_id=analysis_id,
-                    status="running",
-                    stock_symbol=form_data['stock_symbol'],
-                    market_type=form_data.get('market_type', 'US Stocks'),
-                    form_config=form_config
-                )
-
                 # Create asynchronous progress tracker
                 async_tracker = AsyncProgressTracker(
                     analysis_id=analysis_id,
@@ -739,27 +732,60 @@ def main():
                     llm_provider=sidebar_config['llm_provider']
                 )
 
-                # Create progress callback function
-                def progress_callback(message: str, step: int = None, total_steps: int = None):
-                    async_tracker.update_progress(message, step)
-
-                # Display successful start message and loading animation
-                st.success(f"🚀 Analysis started! Analysis ID: {analysis_id}")
-
-                # Add loading animation
-                with st.spinner("🔄 Initializing analysis..."):
-                    time.sleep(1.5)  # Allow user to see feedback
-
-                st.info(f"📊 Analyzing: {form_data.get('market_type', 'US Stocks')} {form_data['stock_symbol']}")
-                st.info("""
-                ⏱️ Page will automatically refresh in 6 seconds...
-
-                📋 **View analysis progress:**
-                After refreshing, please scroll down to the "📊 Stock Analysis" section to view real-time progress
-                """)
+                # Market type normalization for compatibility
+                market_type_map = {
+                    "A-Shares": "A-shares",
+                    "US Stocks": "US stocks",
+                    "HK Stocks": "Hong Kong stocks",
+                    "A股": "A-shares",
+                    "美股": "US stocks",
+                    "港股": "Hong Kong stocks",
+                }
+                normalized_market_type = market_type_map.get(form_data.get('market_type', 'US Stocks'), form_data.get('market_type', 'US Stocks'))
+
+                # Submit to the analysis job queue; a worker process runs it outside the web server
+                from utils.job_queue import get_job_queue, get_worker_pool, PRIORITY_LANES, PRIORITY_NORMAL, QueueFullError
+                if 'queue_user_id' not in st.session_state:
+                    st.session_state.queue_user_id = f"user_{uuid.uuid4().hex[:12]}"
+                job_params = {
+                    'stock_symbol': form_data['stock_symbol'],
+                    'analysis_date': form_data['analysis_date'],
+                    'analysts': form_data['analysts'],
+                    'research_depth': form_data['research_depth'],
+                    'llm_provider': sidebar_config['llm_provider'],
+                    'llm_model': sidebar_config['llm_model'],
+                    'temperature': temperature,
+                    'top_p': top_p,
+                    'max_tokens': max_tokens,
+                    'frequency_penalty': frequency_penalty,
+                    'presence_penalty': presence_penalty,
+                    'market_type': normalized_market_type,
+                    'force_refresh': form_data.get('force_refresh', False),
+                    'resume_run_id': form_data.get('resume_run_id'),
+                }
+                try:
+                    get_worker_pool()
+                    queue_position = get_job_queue().submit(
+                        analysis_id,
+                        st.session_state.queue_user_id,
+                        job_params,
+                        priority=PRIORITY_LANES.get(form_data.get('queue_priority', 'normal'), PRIORITY_NORMAL)
+                    )
+                except QueueFullError as e:
+                    async_tracker.mark_failed(str(e))
+                    st.session_state.analysis_running = False
+                    st.error(f"🚦 {e}")
+                    st.stop()
 
-                # Ensure AsyncProgressTracker has saved initial state
-                time.sleep(0.1)  # Wait 100 milliseconds to ensure data is written
+                # Save analysis ID and form configuration to session state and cookie
+                form_config = st.session_state.get('form_config', {})
+                set_persistent_analysis_id(
+                    analysis_id=analysis_id,
+                    status="running",
+                    stock_symbol=form_data['stock_symbol'],
+                    market_type=form_data.get('market_type', 'US Stocks'),
+                    form_config=form_config
+                )
 
                 # Set analysis status
                 st.session_state.analysis_running = True
@@ -777,69 +803,14 @@ def main():
                 for key in auto_refresh_keys:
                     st.session_state[key] = True
 
-                # Run analysis in background thread (start immediately, no countdown)
-                import threading
+                logger.info(f"📥 [Job queue] Analysis submitted: {analysis_id}, queue position: {queue_position}")
 
-                def run_analysis_in_background():
-                    try:
-                        # Market type normalization for compatibility
-                        market_type_map = {
-                            "A-Shares": "A-shares",
-                            "US Stocks": "US stocks",
-                            "HK Stocks": "Hong Kong stocks",
-                            "A股": "A-shares",
-                            "美股": "US stocks",
-                            "港股": "Hong Kong stocks",
-                        }
-                        normalized_market_type = market_type_map.get(form_data.get('market_type', 'US Stocks'), form_data.get('market_type', 'US Stocks'))
-                        results = run_stock_analysis(
-                            stock_symbol=form_data['stock_symbol'],
-                            analysis_date=form_data['analysis_date'],
-                            analysts=form_data['analysts'],
-                            research_depth=form_data['research_depth'],
-                            llm_provider=sidebar_config['llm_provider'],
-                            llm_model=sidebar_config['llm_model'],
-                            temperature=temperature,
-                            top_p=top_p,
-                            max_tokens=max_tokens,
-                            frequency_penalty=frequency_penalty,
-                            presence_penalty=presence_penalty,
-                            market_type=normalized_market_type,
-                            progress_callback=progress_callback
-                        )
-
-                        # Mark analysis as completed and save results (do not access session state)
-                        async_tracker.mark_completed("✅ Analysis completed successfully!", results=results)
-
-                        logger.info(f"✅ [Analysis completed] Stock analysis completed successfully: {analysis_id}")
-
-                    except Exception as e:
-                        # Mark analysis as failed (do not access session state)
-                        async_tracker.mark_failed(str(e))
-                        logger.error(f"❌ [Analysis failed] {analysis_id}: {e}")
-
-                    finally:
-                        # Unregister thread from tracker
-                        from utils.thread_tracker import unregister_analysis_thread
-                        unregister_analysis_thread(analysis_id)
-                        logger.info(f"🧵 [Thread cleanup] Analysis thread unregistered: {analysis_id}")
-
-                # Start background analysis thread
-                analysis_thread = threading.Thread(target=run_analysis_in_background)
-                analysis_thread.daemon = True  # Set as daemon thread, so it exits when main program exits
-                analysis_thread.start()
-
-                # Register thread to tracker
-                from utils.thread_tracker import register_analysis_thread
-                register_analysis_thread(analysis_id, analysis_thread)
-
-                logger.info(f"🧵 [Background analysis] Analysis thread started: {analysis_id}")
-
-                # Analysis has started in the background, display start message and refresh page
-                st.success("🚀 Analysis started! Running in the background...")
-
-                # Display start message
-                st.info("⏱️ Page will automatically refresh to show analysis progress...")
+                # Analysis is queued, display start message and refresh page
+                if queue_position:
+                    st.success(f"🚀 Analysis queued! {queue_position} analyses ahead of yours. Analysis ID: {analysis_id}")
+                else:
+                    st.success(f"🚀 Analysis started! Analysis ID: {analysis_id}")
+                st.info(f"📊 Analyzing: {form_data.get('market_type', 'US Stocks')} {form_data['stock_symbol']}")
 
                 # Wait 2 seconds for user to see the start message, then refresh page
                 time.sleep(2)
@@ -864,11 +835,21 @@ def main():
 
             # Get progress data for display
             from utils.async_progress_tracker import get_progress_by_id
-            progress_data = get_progress_by_id(current_analysis_id)
+            progress_data = get_progress_by_id(current_analysis_id, include_results=not st.session_state.get('analysis_results'))
 
             # Display analysis info
             if is_running:
-                st.info(f"🔄 Analyzing: {current_analysis_id}")
+                from utils.job_queue import get_job_queue, cancel_analysis
+                queue_position = get_job_queue().position(current_analysis_id)
+                if queue_position is not None:
+                    st.info(f"⏳ Waiting in queue: {queue_position} analyses ahead of {current_analysis_id}")
+                else:
+                    st.info(f"🔄 Analyzing: {current_analysis_id}")
+                if st.button("🛑 Cancel Analysis", key=f"cancel_analysis_{current_analysis_id}"):
+                    if cancel_analysis(current_analysis_id):
+                        st.warning("🛑 Cancellation requested")
+                        time.sleep(1)
+                        st.rerun()
             else:
                 if actual_status == 'completed':
                     st.success(f"✅ Analysis completed: {current_analysis_id}")
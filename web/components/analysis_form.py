@@ -176,6 +176,26 @@ def render_analysis_form():
                 help="Whether to include a detailed risk factor assessment"
             )
             
+            force_refresh = st.checkbox(
+                "Force Refresh Analyst Reports",
+                value=False,
+                help="Ignore cached analyst reports for this stock and date, and re-run all analysts"
+            )
+
+            queue_priority = st.selectbox(
+                "Queue Priority",
+                options=["normal", "high", "low"],
+                format_func=lambda x: {"normal": "Normal", "high": "High", "low": "Low (batch)"}[x],
+                help="Priority lane used when analyses are waiting for a free worker"
+            )
+
+            resume_run_id = st.text_input(
+                "Resume Run ID",
+                value="",
+                placeholder="Run ID of a failed analysis",
+                help="Continue a failed analysis from its last completed step instead of starting over"
+            ).strip()
+
             custom_prompt = st.text_area(
                 "Custom Analysis Requirements",
                 placeholder="Enter specific analysis requirements or focus points...",
@@ -263,7 +283,10 @@ def render_analysis_form():
             'research_depth': research_depth,
             'include_sentiment': include_sentiment,
             'include_risk_assessment': include_risk_assessment,
-            'custom_prompt': custom_prompt
+            'custom_prompt': custom_prompt,
+            'force_refresh': force_refresh,
+            'resume_run_id': resume_run_id or None,
+            'queue_priority': queue_priority
         }
 
         # Save form configuration to cache and persistent storage
@@ -1,18 +1,40 @@
 #!/usr/bin/env python3
 """
 Asynchronous progress display component
-Supports timed refresh, fetching progress status from Redis or file
+Rerenders when a progress event arrives (Redis pub/sub or file change), fetching progress status from Redis or file
 """
 
+import os
 import streamlit as st
 import time
 from typing import Optional, Dict, Any
 from web.utils.async_progress_tracker import get_progress_by_id, format_time
+from web.utils.progress_events import current_version, get_redis_client, wait_for_progress_update
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('async_display')
 
+# 没有进度事件时最长等待的秒数，到期后仍刷新一次以更新已用时间
+PROGRESS_HEARTBEAT_SECONDS = float(os.getenv('PROGRESS_HEARTBEAT_SECONDS', '10'))
+# 进度监听片段的运行间隔，以及每次运行中等待进度事件的最长秒数
+# 等待期间脚本线程被占用、页面不响应交互，因此单次等待保持很短，两次运行之间页面可正常操作
+PROGRESS_WATCH_INTERVAL_SECONDS = 1.0
+PROGRESS_WAIT_SLICE_SECONDS = 0.5
+
+
+@st.fragment(run_every=PROGRESS_WATCH_INTERVAL_SECONDS)
+def _progress_watcher(analysis_id: str, seen_version, started_at: float):
+    """Wait briefly for a progress event; rerun the page once one arrives or the heartbeat passes"""
+    changed = wait_for_progress_update(analysis_id, seen_version, PROGRESS_WAIT_SLICE_SECONDS, get_redis_client())
+    if changed is not None or time.time() - started_at >= PROGRESS_HEARTBEAT_SECONDS:
+        st.rerun()
+
+
+def _wait_for_change_and_rerun(analysis_id: str, seen_version):
+    """Rerun the page when the progress changes (or the heartbeat passes) without blocking it meanwhile"""
+    _progress_watcher(analysis_id, seen_version, time.time())
+
 class AsyncProgressDisplay:
     """Asynchronous progress display component"""
     
@@ -178,14 +200,15 @@ def auto_refresh_progress(display: AsyncProgressDisplay, max_duration: float = 1
             break
         
         # 更新显示
+        seen_version = current_version(display.analysis_id, get_redis_client())
         should_continue = display.update_display()
         
         if not should_continue:
             # 分析完成或失败，停止刷新
             break
         
-        # 等待刷新间隔
-        time.sleep(display.refresh_interval)
+        # 等待下一次进度事件（最长 refresh_interval 秒）
+        wait_for_progress_update(display.analysis_id, seen_version, display.refresh_interval, get_redis_client())
     
     logger.info(f"📊 [Async Display] Auto-refresh ended: {display.analysis_id}")
 
@@ -194,6 +217,8 @@ def streamlit_auto_refresh_progress(analysis_id: str, refresh_interval: int = 2)
     """Streamlit-specific auto-refresh progress display"""
 
     # 获取进度数据
+    # 先记录版本再读取，读取之后的写入会唤醒下方的等待
+    seen_version = current_version(analysis_id, get_redis_client())
     progress_data = get_progress_by_id(analysis_id)
 
     if not progress_data:
@@ -293,9 +318,7 @@ def streamlit_auto_refresh_progress(analysis_id: str, refresh_interval: int = 2)
             default_value = st.session_state.get(auto_refresh_key, True)  # 默认为True
             auto_refresh = st.checkbox("🔄 Auto-refresh", value=default_value, key=auto_refresh_key)
             if auto_refresh and status == 'running':  # 只在运行时自动刷新
-                import time
-                time.sleep(3)  # 等待3秒
-                st.rerun()
+                _wait_for_change_and_rerun(analysis_id, seen_version)
             elif auto_refresh and status in ['completed', 'failed']:
                 # 分析完成后自动关闭自动刷新
                 st.session_state[auto_refresh_key] = False
@@ -303,6 +326,27 @@ def streamlit_auto_refresh_progress(analysis_id: str, refresh_interval: int = 2)
     return status in ['completed', 'failed']
 
 # 新增：静态进度显示（不会触发页面刷新）
+def render_live_output(progress_data: Dict[str, Any]):
+    """Show the tail of the streaming LLM output of the running node"""
+    import streamlit as st
+
+    live_output = progress_data.get('live_output')
+    if progress_data.get('status') == 'running' and live_output and live_output.get('text'):
+        with st.expander(f"📝 Live Output: {live_output.get('node', '')}", expanded=True):
+            st.markdown(live_output['text'])
+
+
+def render_run_stats(progress_data: Dict[str, Any]):
+    """Show token usage and tool call counts reported by the graph run events"""
+    import streamlit as st
+
+    token_usage = progress_data.get('token_usage') or {}
+    tool_calls = progress_data.get('tool_calls') or 0
+    if token_usage or tool_calls:
+        tokens = token_usage.get('input', 0) + token_usage.get('output', 0)
+        st.caption(f"🔢 Tokens: {tokens:,} | 🔧 Tool calls: {tool_calls}")
+
+
 def display_static_progress(analysis_id: str) -> bool:
     """
     Display static progress (does not auto-refresh)
@@ -316,7 +360,9 @@ def display_static_progress(analysis_id: str) -> bool:
         st.session_state[progress_key] = True
 
     # 获取进度数据
-    progress_data = get_progress_by_id(analysis_id)
+    # 先记录版本再读取，读取之后的写入会唤醒下方的等待
+    seen_version = current_version(analysis_id, get_redis_client())
+    progress_data = get_progress_by_id(analysis_id, include_results=False)
 
     if not progress_data:
         st.error("❌ Failed to get analysis progress, please check if the analysis is running")
@@ -372,6 +418,10 @@ def display_static_progress(analysis_id: str) -> bool:
     # 步骤详情
     step_description = progress_data.get('current_step_description', 'Processing...')
     st.write(f"**Current Task**: {step_description}")
+    render_run_stats(progress_data)
+
+    # 流式输出（节点运行中的LLM实时输出）
+    render_live_output(progress_data)
 
     # 状态信息
     last_message = progress_data.get('last_message', '')
@@ -429,9 +479,7 @@ def display_static_progress(analysis_id: str) -> bool:
                 default_value = st.session_state.get(auto_refresh_key, True)  # 默认为True
                 auto_refresh = st.checkbox("🔄 Auto-refresh", value=default_value, key=auto_refresh_key)
                 if auto_refresh and status == 'running':  # 只在运行时自动刷新
-                    import time
-                    time.sleep(3)  # 等待3秒
-                    st.rerun()
+                    _wait_for_change_and_rerun(analysis_id, seen_version)
                 elif auto_refresh and status in ['completed', 'failed']:
                     # 分析完成后自动关闭自动刷新
                     st.session_state[auto_refresh_key] = False
@@ -468,7 +516,9 @@ def display_static_progress_with_controls(analysis_id: str, show_refresh_control
     from web.utils.async_progress_tracker import get_progress_by_id
 
     # 获取进度数据
-    progress_data = get_progress_by_id(analysis_id)
+    # 先记录版本再读取，读取之后的写入会唤醒下方的等待
+    seen_version = current_version(analysis_id, get_redis_client())
+    progress_data = get_progress_by_id(analysis_id, include_results=False)
 
     if not progress_data:
         # 如果没有进度数据，显示默认的准备状态
@@ -485,13 +535,8 @@ def display_static_progress_with_controls(analysis_id: str, show_refresh_control
                 # 获取默认值，如果是新分析则默认为True
                 default_value = st.session_state.get(auto_refresh_key, True)  # 默认为True
                 auto_refresh = st.checkbox("🔄 Auto-refresh", value=default_value, key=auto_refresh_key)
-                if auto_refresh and status == 'running':  # 只在运行时自动刷新
-                    import time
-                    time.sleep(3)  # 等待3秒
-                    st.rerun()
-                elif auto_refresh and status in ['completed', 'failed']:
-                    # 分析完成后自动关闭自动刷新
-                    st.session_state[auto_refresh_key] = False
+                if auto_refresh:  # 等待第一次进度写入
+                    _wait_for_change_and_rerun(analysis_id, seen_version)
 
         return False  # 返回False表示还未完成
 
@@ -545,6 +590,10 @@ def display_static_progress_with_controls(analysis_id: str, show_refresh_control
 
     # 显示当前任务
     st.write(f"**Current Task**: {current_step_description}")
+    render_run_stats(progress_data)
+
+    # 流式输出（节点运行中的LLM实时输出）
+    render_live_output(progress_data)
 
     # 显示当前状态
     status_icon = {
@@ -595,9 +644,7 @@ def display_static_progress_with_controls(analysis_id: str, show_refresh_control
             default_value = st.session_state.get(auto_refresh_key, True)  # 默认为True
             auto_refresh = st.checkbox("🔄 Auto-refresh", value=default_value, key=auto_refresh_key)
             if auto_refresh and status == 'running':  # 只在运行时自动刷新
-                import time
-                time.sleep(3)  # 等待3秒
-                st.rerun()
+                _wait_for_change_and_rerun(analysis_id, seen_version)
             elif auto_refresh and status in ['completed', 'failed']:
                 # 分析完成后自动关闭自动刷新
                 st.session_state[auto_refresh_key] = False
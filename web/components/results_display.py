@@ -2,6 +2,9 @@
 Analysis result display component
 """
 
+import inspect
+import re
+
 import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
@@ -10,6 +13,8 @@ from datetime import datetime
 
 # Import export functionality
 from utils.report_exporter import render_export_buttons
+from utils.analysis_runner import analysis_content_key
+from utils.ui_utils import downsample_frame
 
 # Import logging module
 from tradingagents.utils.logging_manager import get_logger
@@ -48,6 +53,9 @@ def render_results(results):
     decision = results.get('decision', {})
     state = results.get('state', {})
     is_demo = results.get('is_demo', False)
+    if not results.get('analysis_key'):
+        results['analysis_key'] = analysis_content_key(stock_symbol, decision, state)
+    analysis_key = results['analysis_key']
 
     st.markdown("---")
     st.header(f"📊 {stock_symbol} Analysis Results")
@@ -58,15 +66,17 @@ def render_results(results):
         if results.get('demo_reason'):
             with st.expander("View details"):
                 st.text(results['demo_reason'])
+        if results.get('run_id'):
+            st.warning(f"🔄 The analysis can be resumed from its last completed step with Run ID: `{results['run_id']}` (Advanced Options → Resume Run ID)")
 
     # Investment decision summary
-    render_decision_summary(decision, stock_symbol)
+    render_decision_summary(decision, stock_symbol, analysis_key)
 
     # Analysis configuration information
     render_analysis_info(results)
 
     # Detailed analysis report
-    render_detailed_analysis(state)
+    render_detailed_analysis(state, analysis_key)
 
     # Risk warning
     render_risk_warning(is_demo)
@@ -136,174 +146,206 @@ def render_analysis_info(results):
             analyst_list = [analyst_names.get(analyst, analyst) for analyst in analysts]
             st.write(" • ".join(analyst_list))
 
-def render_decision_summary(decision, stock_symbol=None):
+        # Time to first token per graph node (only recorded when streaming)
+        ttft = results.get('ttft') or {}
+        if ttft:
+            st.write("**Time to First Token:**")
+            st.write(" • ".join(f"{node}: {stats['avg_s']:.1f}s" for node, stats in ttft.items()))
+
+ACTION_TRANSLATION = {
+    'BUY': 'Buy',
+    'SELL': 'Sell',
+    'HOLD': 'Hold',
+    '买入': 'Buy',
+    '卖出': 'Sell',
+    '持有': 'Hold'
+}
+
+def _build_decision_view(decision, stock_symbol):
+    """Display strings of the decision summary metrics"""
+    action = decision.get('action', 'N/A')
+    view = {'action': ACTION_TRANSLATION.get(action.upper(), action)}
+
+    confidence = decision.get('confidence', 0)
+    if isinstance(confidence, (int, float)):
+        view['confidence'] = f"{confidence:.1%}"
+        view['confidence_delta'] = f"{confidence-0.5:.1%}" if confidence != 0 else None
+    else:
+        view['confidence'] = str(confidence)
+        view['confidence_delta'] = None
+
+    risk_score = decision.get('risk_score', 0)
+    if isinstance(risk_score, (int, float)):
+        view['risk'] = f"{risk_score:.1%}"
+        view['risk_delta'] = f"{risk_score-0.3:.1%}" if risk_score != 0 else None
+    else:
+        view['risk'] = str(risk_score)
+        view['risk_delta'] = None
+
+    # Determine currency symbol based on stock code
+    currency_symbol = "¥" if stock_symbol and re.match(r'^\d{6}$', str(stock_symbol)) else "$"
+    target_price = decision.get('target_price')
+    if target_price is not None and isinstance(target_price, (int, float)) and target_price > 0:
+        view['price'] = f"{currency_symbol}{target_price:.2f}"
+        view['price_help'] = "AI predicted target price"
+    else:
+        view['price'] = "To be analyzed"
+        view['price_help'] = "Target price requires more detailed analysis to determine"
+    return view
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cached_decision_view(analysis_key, stock_symbol, _decision):
+    # Arguments starting with "_" are not hashed: the entry is keyed by (analysis_key, stock_symbol)
+    return _build_decision_view(_decision, stock_symbol)
+
+def render_decision_summary(decision, stock_symbol=None, analysis_key=None):
     """Render investment decision summary"""
 
     st.subheader("🎯 Investment Decision Summary")
 
+    if analysis_key:
+        view = _cached_decision_view(analysis_key, stock_symbol, decision)
+    else:
+        view = _build_decision_view(decision, stock_symbol)
+
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        action = decision.get('action', 'N/A')
-
-        # Translate English investment suggestions to Chinese
-        action_translation = {
-            'BUY': 'Buy',
-            'SELL': 'Sell',
-            'HOLD': 'Hold',
-            '买入': 'Buy',
-            '卖出': 'Sell',
-            '持有': 'Hold'
-        }
-
-        # Get Chinese investment suggestion
-        chinese_action = action_translation.get(action.upper(), action)
-
-        action_color = {
-            'BUY': 'normal',
-            'SELL': 'inverse',
-            'HOLD': 'off',
-            '买入': 'normal',
-            '卖出': 'inverse',
-            '持有': 'off'
-        }.get(action.upper(), 'normal')
-
         st.metric(
             label="Investment Decision",
-            value=chinese_action,
+            value=view['action'],
             help="Investment suggestion based on AI analysis"
         )
 
     with col2:
-        confidence = decision.get('confidence', 0)
-        if isinstance(confidence, (int, float)):
-            confidence_str = f"{confidence:.1%}"
-            confidence_delta = f"{confidence-0.5:.1%}" if confidence != 0 else None
-        else:
-            confidence_str = str(confidence)
-            confidence_delta = None
-
         st.metric(
             label="Confidence",
-            value=confidence_str,
-            delta=confidence_delta,
+            value=view['confidence'],
+            delta=view['confidence_delta'],
             help="AI's confidence in the analysis result"
         )
 
     with col3:
-        risk_score = decision.get('risk_score', 0)
-        if isinstance(risk_score, (int, float)):
-            risk_str = f"{risk_score:.1%}"
-            risk_delta = f"{risk_score-0.3:.1%}" if risk_score != 0 else None
-        else:
-            risk_str = str(risk_score)
-            risk_delta = None
-
         st.metric(
             label="Risk Score",
-            value=risk_str,
-            delta=risk_delta,
+            value=view['risk'],
+            delta=view['risk_delta'],
             delta_color="inverse",
             help="Investment risk assessment score"
         )
 
     with col4:
-        target_price = decision.get('target_price')
-        logger.debug(f"🔍 [DEBUG] target_price from decision: {target_price}, type: {type(target_price)}")
-        logger.debug(f"🔍 [DEBUG] decision keys: {list(decision.keys()) if isinstance(decision, dict) else 'Not a dict'}")
-
-        # Determine currency symbol based on stock code
-        def is_china_stock(ticker_code):
-            import re
-
-            return re.match(r'^\d{6}$', str(ticker_code)) if ticker_code else False
-
-        is_china = is_china_stock(stock_symbol)
-        currency_symbol = "¥" if is_china else "$"
-
-        # Handle target price display
-        if target_price is not None and isinstance(target_price, (int, float)) and target_price > 0:
-            price_display = f"{currency_symbol}{target_price:.2f}"
-            help_text = "AI predicted target price"
-        else:
-            price_display = "To be analyzed"
-            help_text = "Target price requires more detailed analysis to determine"
-
         st.metric(
             label="Target Price",
-            value=price_display,
-            help=help_text
+            value=view['price'],
+            help=view['price_help']
         )
-    
+
     # Analysis reasoning
     if 'reasoning' in decision and decision['reasoning']:
         with st.expander("🧠 AI Analysis Reasoning", expanded=True):
             st.markdown(decision['reasoning'])
 
-def render_detailed_analysis(state):
-    """Render detailed analysis report"""
-    
+# Analysis report modules, one tab each
+ANALYSIS_MODULES = [
+    {
+        'key': 'market_report',
+        'title': '📈 Market Technical Analysis',
+        'icon': '📈',
+        'description': 'Technical indicators, price trends, support and resistance analysis'
+    },
+    {
+        'key': 'fundamentals_report', 
+        'title': '💰 Fundamental Analysis',
+        'icon': '💰',
+        'description': 'Financial data, valuation levels, profitability analysis'
+    },
+    {
+        'key': 'sentiment_report',
+        'title': '💭 Market Sentiment Analysis', 
+        'icon': '💭',
+        'description': 'Investor sentiment, social media sentiment indicators'
+    },
+    {
+        'key': 'news_report',
+        'title': '📰 News Event Analysis',
+        'icon': '📰', 
+        'description': 'Related news events, market dynamic impact analysis'
+    },
+    {
+        'key': 'risk_assessment',
+        'title': '⚠️ Risk Assessment',
+        'icon': '⚠️',
+        'description': 'Risk factor identification, risk level assessment'
+    },
+    {
+        'key': 'investment_plan',
+        'title': '📋 Investment Suggestion',
+        'icon': '📋',
+        'description': 'Specific investment strategy, position management advice'
+    }
+]
+
+def _build_section_blocks(content):
+    """Display blocks of one report section"""
+    if isinstance(content, str):
+        return [('markdown', content)]
+    if isinstance(content, dict):
+        blocks = []
+        for key, value in content.items():
+            blocks.append(('subheader', key.replace('_', ' ').title()))
+            blocks.append(('write', value))
+        return blocks
+    return [('write', content)]
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cached_section_blocks(analysis_key, section_key, _content):
+    # Keyed by (analysis_key, section_key); the section content itself is not hashed
+    return _build_section_blocks(_content)
+
+def _render_blocks(blocks):
+    for kind, value in blocks:
+        getattr(st, kind)(value)
+
+def _tabs_track_state():
+    """Whether st.tabs accepts key/on_change (and exposes tab.open); older Streamlit releases do not"""
+    try:
+        return "on_change" in inspect.signature(st.tabs).parameters
+    except (TypeError, ValueError):
+        return False
+
+def _report_tabs(labels, analysis_key=None):
+    """Tabs that rerun on switch when supported; plain tabs (every tab rendered) otherwise"""
+    if analysis_key and _tabs_track_state():
+        return st.tabs(labels, key=f"report_tabs_{analysis_key}", on_change="rerun")
+    return st.tabs(labels)
+
+@st.fragment
+def render_detailed_analysis(state, analysis_key=None):
+    """Render detailed analysis report
+
+    Only the open tab is rendered; switching tabs reruns this fragment alone
+    """
+
     st.subheader("📋 Detailed Analysis Report")
-    
-    # Define analysis modules
-    analysis_modules = [
-        {
-            'key': 'market_report',
-            'title': '📈 Market Technical Analysis',
-            'icon': '📈',
-            'description': 'Technical indicators, price trends, support and resistance analysis'
-        },
-        {
-            'key': 'fundamentals_report', 
-            'title': '💰 Fundamental Analysis',
-            'icon': '💰',
-            'description': 'Financial data, valuation levels, profitability analysis'
-        },
-        {
-            'key': 'sentiment_report',
-            'title': '💭 Market Sentiment Analysis', 
-            'icon': '💭',
-            'description': 'Investor sentiment, social media sentiment indicators'
-        },
-        {
-            'key': 'news_report',
-            'title': '📰 News Event Analysis',
-            'icon': '📰', 
-            'description': 'Related news events, market dynamic impact analysis'
-        },
-        {
-            'key': 'risk_assessment',
-            'title': '⚠️ Risk Assessment',
-            'icon': '⚠️',
-            'description': 'Risk factor identification, risk level assessment'
-        },
-        {
-            'key': 'investment_plan',
-            'title': '📋 Investment Suggestion',
-            'icon': '📋',
-            'description': 'Specific investment strategy, position management advice'
-        }
-    ]
-    
-    # Create tabs
-    tabs = st.tabs([f"{module['icon']} {module['title']}" for module in analysis_modules])
-    
-    for i, (tab, module) in enumerate(zip(tabs, analysis_modules)):
+
+    tabs = _report_tabs(
+        [f"{module['icon']} {module['title']}" for module in ANALYSIS_MODULES],
+        analysis_key,
+    )
+
+    for tab, module in zip(tabs, ANALYSIS_MODULES):
+        # open is None when the tabs do not track state: render everything
+        if getattr(tab, 'open', None) is False:
+            continue
         with tab:
-            if module['key'] in state and state[module['key']]:
+            content = state.get(module['key'])
+            if content:
                 st.markdown(f"*{module['description']}*")
-                
-                # Format content for display
-                content = state[module['key']]
-                if isinstance(content, str):
-                    st.markdown(content)
-                elif isinstance(content, dict):
-                    # If it's a dictionary, format for display
-                    for key, value in content.items():
-                        st.subheader(key.replace('_', ' ').title())
-                        st.write(value)
+                if analysis_key:
+                    _render_blocks(_cached_section_blocks(analysis_key, module['key'], content))
                 else:
-                    st.write(content)
+                    _render_blocks(_build_section_blocks(content))
             else:
                 st.info(f"No {module['title']} data available")
 
@@ -335,13 +377,16 @@ def create_price_chart(price_data):
     
     if not price_data:
         return None
-    
+
+    # Long histories are reduced to their per-bucket highs and lows
+    series = downsample_frame(pd.DataFrame({'date': price_data['date'], 'price': price_data['price']}), 'price')
+
     fig = go.Figure()
     
     # Add price line
     fig.add_trace(go.Scatter(
-        x=price_data['date'],
-        y=price_data['price'],
+        x=series['date'],
+        y=series['price'],
         mode='lines',
         name='Stock Price',
         line=dict(color='#1f77b4', width=2)
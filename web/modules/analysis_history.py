@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Analysis history page
+
+Browse stored analyses by ticker, date, model and decision, and reopen any
+past report without re-running it
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.ui_utils import apply_hide_deploy_button_css
+
+from tradingagents.default_config import DEFAULT_CONFIG
+from tradingagents.graph.result_store import create_result_store
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('web')
+
+PAGE_SIZES = [20, 50, 100]
+ALL = "All"
+
+
+@st.cache_resource
+def get_result_store():
+    """Result store shared by all sessions of this server"""
+    return create_result_store(DEFAULT_CONFIG)
+
+
+def _reset_pages():
+    st.session_state.history_cursors = [None]
+
+
+def render_analysis_history():
+    """Render the analysis history page"""
+    apply_hide_deploy_button_css()
+
+    st.markdown("**📈 Stored analyses, newest first**")
+    store = get_result_store()
+    if 'history_cursors' not in st.session_state:
+        _reset_pages()
+
+    with st.sidebar:
+        st.subheader("🔎 Filters")
+        ticker = st.text_input("Ticker", key="history_ticker", on_change=_reset_pages).strip()
+        date_from = st.date_input("Analysis date from", value=None, key="history_date_from", on_change=_reset_pages)
+        date_to = st.date_input("Analysis date to", value=None, key="history_date_to", on_change=_reset_pages)
+        model = st.selectbox("Model", [ALL] + store.distinct("llm_model"), key="history_model", on_change=_reset_pages)
+        action = st.selectbox("Decision", [ALL] + store.distinct("action"), key="history_action", on_change=_reset_pages)
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, key="history_page_size", on_change=_reset_pages)
+
+    filters = dict(
+        ticker=ticker or None,
+        date_from=date_from.isoformat() if date_from else None,
+        date_to=date_to.isoformat() if date_to else None,
+        model=None if model == ALL else model,
+        action=None if action == ALL else action,
+    )
+
+    cursors = st.session_state.history_cursors
+    page = store.query(limit=page_size, cursor=cursors[-1], **filters)
+    total = store.count(**filters)
+
+    if not page.items:
+        st.info("No stored analyses match these filters. Completed analyses are saved here automatically.")
+        return
+
+    rows = [{
+        "Analysis ID": item['analysis_id'],
+        "Ticker": item['ticker'],
+        "Date": item['analysis_date'],
+        "Model": item['llm_model'],
+        "Decision": item['action'],
+        "Confidence": item['confidence'],
+        "Target Price": item['target_price'],
+        "Saved At": datetime.fromtimestamp(item['created_at']).strftime('%Y-%m-%d %H:%M'),
+    } for item in page.items]
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+    first_row = (len(cursors) - 1) * page_size + 1
+    st.caption(f"Showing {first_row}-{first_row + len(page.items) - 1} of {total}")
+    col_prev, col_next, _ = st.columns([1, 1, 4])
+    with col_prev:
+        if st.button("⬅️ Previous", disabled=len(cursors) == 1, use_container_width=True):
+            cursors.pop()
+            st.rerun()
+    with col_next:
+        if st.button("Next ➡️", disabled=page.next_cursor is None, use_container_width=True):
+            cursors.append(page.next_cursor)
+            st.rerun()
+
+    st.markdown("---")
+    labels = {item['analysis_id']: f"{item['ticker']} {item['analysis_date']} · {item['action'] or '-'} · {item['analysis_id']}"
+              for item in page.items}
+    selected = st.selectbox("Open report", list(labels), format_func=labels.get)
+    if st.button("📋 Show Report", type="primary"):
+        st.session_state.history_selected = selected
+
+    selected = st.session_state.get('history_selected')
+    if selected:
+        _render_stored_report(store, selected)
+
+
+def _render_stored_report(store, analysis_id: str):
+    """Load one stored analysis (the report body is only read and decompressed here)"""
+    from utils.analysis_runner import format_analysis_results
+    from components.results_display import render_results
+
+    results = store.load(analysis_id)
+    if results is None:
+        st.warning(f"Analysis {analysis_id} is no longer stored")
+        return
+    logger.info(f"📂 [历史记录] 打开分析: {analysis_id}")
+    formatted_results = format_analysis_results(results)
+    if formatted_results:
+        st.header(f"📋 {results.get('stock_symbol')} · {results.get('analysis_date')}")
+        render_results(formatted_results)
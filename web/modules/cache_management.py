@@ -19,6 +19,8 @@ from utils.ui_utils import apply_hide_deploy_button_css
 
 try:
     from tradingagents.dataflows.cache_manager import get_cache
+    from tradingagents.default_config import DEFAULT_CONFIG
+    from tradingagents.graph.analyst_cache import AnalystReportCache
     from tradingagents.dataflows.optimized_us_data import get_optimized_us_data_provider
     from tradingagents.dataflows.optimized_china_data import get_optimized_china_data_provider
     CACHE_AVAILABLE = True
@@ -74,6 +76,25 @@ def main():
                 cache.clear_old_cache(max_age_days)
             st.success(f"✅ Cleared cache older than {max_age_days} days")
             st.rerun()
+
+        st.markdown("---")
+
+        # Analyst report cache invalidation
+        st.subheader("♻️ Analyst Report Cache")
+        analyst_cache = AnalystReportCache(
+            os.path.join(DEFAULT_CONFIG["data_cache_dir"], "analyst_reports")
+        )
+        st.caption(f"{analyst_cache.get_stats()['entries']} cached analyst reports")
+        invalidate_ticker = st.text_input("Stock symbol (empty = all)", key="analyst_cache_ticker")
+        invalidate_date = st.text_input("Trade date YYYY-MM-DD (empty = all)", key="analyst_cache_date")
+
+        if st.button("🗑️ Invalidate Analyst Reports", type="secondary"):
+            removed = analyst_cache.invalidate(
+                ticker=invalidate_ticker.strip() or None,
+                trade_date=invalidate_date.strip() or None,
+            )
+            st.success(f"✅ Invalidated {removed} analyst report entries")
+            st.rerun()
     
     # Main content area
     col1, col2 = st.columns([1, 1])
@@ -24,7 +24,7 @@ if project_root not in sys.path:
 # Import UI utility functions
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
-from utils.ui_utils import apply_hide_deploy_button_css
+from utils.ui_utils import apply_hide_deploy_button_css, downsample_frame
 
 from tradingagents.config.config_manager import config_manager, token_tracker, UsageRecord
 
@@ -197,8 +197,9 @@ def render_detailed_charts(records: List[UsageRecord], stats: Dict[str, Any]):
         ])
         
         if not df_records.empty:
+            # One point per request: keep the chart bounded for long histories
             fig_scatter = px.scatter(
-                df_records,
+                downsample_frame(df_records, 'cost'),
                 x='total_tokens',
                 y='cost',
                 color='provider',
@@ -4,13 +4,17 @@ Stock analysis execution tool
 
 import sys
 import os
+import json
+import hashlib
 import uuid
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
 
 # Import logging module
 from tradingagents.utils.logging_manager import get_logger, get_logger_manager
+from tradingagents.utils.deadline import DeadlineExceeded
 logger = get_logger('web')
 
 # Add project root directory to Python path
@@ -97,7 +101,127 @@ def extract_risk_assessment(state):
         logger.info(f"Error extracting risk assessment data: {e}")
         return None
 
-def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, llm_provider, llm_model, temperature=0.7, top_p=1.0, max_tokens=1024, frequency_penalty=0.0, presence_penalty=0.0, market_type="US", progress_callback=None):
+GRAPH_POOL_ENABLED = os.getenv('GRAPH_POOL_ENABLED', 'true').lower() == 'true'
+
+@contextmanager
+def checkout_graph(analysts, config):
+    """Exclusive TradingAgentsGraph for one run: from the warm pool, or freshly built"""
+    if GRAPH_POOL_ENABLED:
+        from tradingagents.graph.graph_pool import get_graph_pool
+        with get_graph_pool().checkout(analysts, config) as graph:
+            yield graph
+    else:
+        from tradingagents.graph.trading_graph import TradingAgentsGraph
+        yield TradingAgentsGraph(analysts, config=config, debug=False)
+
+def prewarm_graphs(spec):
+    """Pre-build pooled graphs for the configurations in ``spec``
+
+    ``spec`` lists ``provider/model/depth/analyst+analyst`` entries separated
+    by ``;``, e.g. ``dashscope/qwen-plus/3/market+fundamentals``
+    """
+    from tradingagents.graph.graph_pool import get_graph_pool
+
+    pool = get_graph_pool()
+    for entry in filter(None, (part.strip() for part in spec.split(';'))):
+        try:
+            provider, model, depth, analysts = entry.split('/')
+            config = build_analysis_config(provider, model, int(depth))
+            pool.prewarm(analysts.split('+'), config)
+        except Exception as e:
+            logger.warning(f"⚠️ [图复用池] 预热失败 '{entry}': {e}")
+
+def build_analysis_config(llm_provider, llm_model, research_depth, temperature=0.7, top_p=1.0, max_tokens=1024, frequency_penalty=0.0, presence_penalty=0.0, market_type="US"):
+    """Build the TradingAgentsGraph configuration of a web analysis"""
+    from tradingagents.default_config import DEFAULT_CONFIG
+
+    config = DEFAULT_CONFIG.copy()
+    config["llm_provider"] = llm_provider
+    config["deep_think_llm"] = llm_model
+    config["quick_think_llm"] = llm_model
+    config["temperature"] = temperature
+    config["top_p"] = top_p
+    config["max_tokens"] = max_tokens
+    config["frequency_penalty"] = frequency_penalty
+    config["presence_penalty"] = presence_penalty
+    # Adjust configuration based on research depth
+    if research_depth == 1:  # Level 1 - Quick analysis
+        config["max_debate_rounds"] = 1
+        config["max_risk_discuss_rounds"] = 1
+        # Keep memory enabled as it has minimal overhead but significantly improves analysis quality
+        config["memory_enabled"] = True
+
+        # Use unified tools to avoid various issues with offline tools
+        config["online_tools"] = True  # All markets use unified tools
+        logger.info(f"🔧 [Quick Analysis] {market_type} uses unified tools to ensure correct data sources and stability")
+        if llm_provider == "dashscope":
+            config["quick_think_llm"] = "qwen-turbo"  # Use fastest model
+            config["deep_think_llm"] = "qwen-plus"
+        elif llm_provider == "deepseek":
+            config["quick_think_llm"] = "deepseek-chat"  # DeepSeek has only one model
+            config["deep_think_llm"] = "deepseek-chat"
+    elif research_depth == 2:  # Level 2 - Basic analysis
+        config["max_debate_rounds"] = 1
+        config["max_risk_discuss_rounds"] = 1
+        config["memory_enabled"] = True
+        config["online_tools"] = True
+        if llm_provider == "dashscope":
+            config["quick_think_llm"] = "qwen-plus"
+            config["deep_think_llm"] = "qwen-plus"
+        elif llm_provider == "deepseek":
+            config["quick_think_llm"] = "deepseek-chat"
+            config["deep_think_llm"] = "deepseek-chat"
+    elif research_depth == 3:  # Level 3 - Standard analysis (default)
+        config["max_debate_rounds"] = 1
+        config["max_risk_discuss_rounds"] = 2
+        config["memory_enabled"] = True
+        config["online_tools"] = True
+        if llm_provider == "dashscope":
+            config["quick_think_llm"] = "qwen-plus"
+            config["deep_think_llm"] = "qwen-max"
+        elif llm_provider == "deepseek":
+            config["quick_think_llm"] = "deepseek-chat"
+            config["deep_think_llm"] = "deepseek-chat"
+    elif research_depth == 4:  # Level 4 - Deep analysis
+        config["max_debate_rounds"] = 2
+        config["max_risk_discuss_rounds"] = 2
+        config["memory_enabled"] = True
+        config["online_tools"] = True
+        if llm_provider == "dashscope":
+            config["quick_think_llm"] = "qwen-plus"
+            config["deep_think_llm"] = "qwen-max"
+        elif llm_provider == "deepseek":
+            config["quick_think_llm"] = "deepseek-chat"
+            config["deep_think_llm"] = "deepseek-chat"
+    else:  # Level 5 - Comprehensive analysis
+        config["max_debate_rounds"] = 3
+        config["max_risk_discuss_rounds"] = 3
+        config["memory_enabled"] = True
+        config["online_tools"] = True
+        if llm_provider == "dashscope":
+            config["quick_think_llm"] = "qwen-max"
+            config["deep_think_llm"] = "qwen-max"
+        elif llm_provider == "deepseek":
+            config["quick_think_llm"] = "deepseek-chat"
+            config["deep_think_llm"] = "deepseek-chat"
+
+    # Set different configurations based on LLM provider
+    if llm_provider == "dashscope":
+        config["backend_url"] = "https://dashscope.aliyuncs.com/api/v1"
+    elif llm_provider == "deepseek":
+        config["backend_url"] = "https://api.deepseek.com"
+    elif llm_provider == "google":
+        # Google AI does not require backend_url, use default OpenAI format
+        config["backend_url"] = "https://api.openai.com/v1"
+
+    # Fix path issues
+    config["data_dir"] = str(project_root / "data")
+    config["results_dir"] = str(project_root / "results")
+    config["data_cache_dir"] = str(project_root / "tradingagents" / "dataflows" / "data_cache")
+
+    return config
+
+def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, llm_provider, llm_model, temperature=0.7, top_p=1.0, max_tokens=1024, frequency_penalty=0.0, presence_penalty=0.0, market_type="US", progress_callback=None, force_refresh=False, resume_run_id=None, token_callback=None, event_callback=None):
     """Execute stock analysis
 
     Args:
@@ -113,6 +237,10 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
         frequency_penalty: Frequency penalty
         presence_penalty: Presence penalty
         progress_callback: Progress callback function to update UI status
+        force_refresh: Ignore cached analyst reports and re-run all analysts
+        resume_run_id: Run id of a failed analysis to resume from its last completed step
+        token_callback: Optional callback(node, text) receiving streamed LLM tokens
+        event_callback: Optional callback(GraphEvent) receiving this run's node, tool and LLM events
     """
 
     def update_progress(message, step=None, total_steps=None):
@@ -231,96 +359,15 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
 
     update_progress("Environment variable validation passed")
 
+    run_id = None
     try:
-        # Import necessary modules
-        from tradingagents.graph.trading_graph import TradingAgentsGraph
-        from tradingagents.default_config import DEFAULT_CONFIG
-
         # Create configuration
         update_progress("Configuring analysis parameters...")
-        config = DEFAULT_CONFIG.copy()
-        config["llm_provider"] = llm_provider
-        config["deep_think_llm"] = llm_model
-        config["quick_think_llm"] = llm_model
-        config["temperature"] = temperature
-        config["top_p"] = top_p
-        config["max_tokens"] = max_tokens
-        config["frequency_penalty"] = frequency_penalty
-        config["presence_penalty"] = presence_penalty
-        # Adjust configuration based on research depth
-        if research_depth == 1:  # Level 1 - Quick analysis
-            config["max_debate_rounds"] = 1
-            config["max_risk_discuss_rounds"] = 1
-            # Keep memory enabled as it has minimal overhead but significantly improves analysis quality
-            config["memory_enabled"] = True
-
-            # Use unified tools to avoid various issues with offline tools
-            config["online_tools"] = True  # All markets use unified tools
-            logger.info(f"🔧 [Quick Analysis] {market_type} uses unified tools to ensure correct data sources and stability")
-            if llm_provider == "dashscope":
-                config["quick_think_llm"] = "qwen-turbo"  # Use fastest model
-                config["deep_think_llm"] = "qwen-plus"
-            elif llm_provider == "deepseek":
-                config["quick_think_llm"] = "deepseek-chat"  # DeepSeek has only one model
-                config["deep_think_llm"] = "deepseek-chat"
-        elif research_depth == 2:  # Level 2 - Basic analysis
-            config["max_debate_rounds"] = 1
-            config["max_risk_discuss_rounds"] = 1
-            config["memory_enabled"] = True
-            config["online_tools"] = True
-            if llm_provider == "dashscope":
-                config["quick_think_llm"] = "qwen-plus"
-                config["deep_think_llm"] = "qwen-plus"
-            elif llm_provider == "deepseek":
-                config["quick_think_llm"] = "deepseek-chat"
-                config["deep_think_llm"] = "deepseek-chat"
-        elif research_depth == 3:  # Level 3 - Standard analysis (default)
-            config["max_debate_rounds"] = 1
-            config["max_risk_discuss_rounds"] = 2
-            config["memory_enabled"] = True
-            config["online_tools"] = True
-            if llm_provider == "dashscope":
-                config["quick_think_llm"] = "qwen-plus"
-                config["deep_think_llm"] = "qwen-max"
-            elif llm_provider == "deepseek":
-                config["quick_think_llm"] = "deepseek-chat"
-                config["deep_think_llm"] = "deepseek-chat"
-        elif research_depth == 4:  # Level 4 - Deep analysis
-            config["max_debate_rounds"] = 2
-            config["max_risk_discuss_rounds"] = 2
-            config["memory_enabled"] = True
-            config["online_tools"] = True
-            if llm_provider == "dashscope":
-                config["quick_think_llm"] = "qwen-plus"
-                config["deep_think_llm"] = "qwen-max"
-            elif llm_provider == "deepseek":
-                config["quick_think_llm"] = "deepseek-chat"
-                config["deep_think_llm"] = "deepseek-chat"
-        else:  # Level 5 - Comprehensive analysis
-            config["max_debate_rounds"] = 3
-            config["max_risk_discuss_rounds"] = 3
-            config["memory_enabled"] = True
-            config["online_tools"] = True
-            if llm_provider == "dashscope":
-                config["quick_think_llm"] = "qwen-max"
-                config["deep_think_llm"] = "qwen-max"
-            elif llm_provider == "deepseek":
-                config["quick_think_llm"] = "deepseek-chat"
-                config["deep_think_llm"] = "deepseek-chat"
-
-        # Set different configurations based on LLM provider
-        if llm_provider == "dashscope":
-            config["backend_url"] = "https://dashscope.aliyuncs.com/api/v1"
-        elif llm_provider == "deepseek":
-            config["backend_url"] = "https://api.deepseek.com"
-        elif llm_provider == "google":
-            # Google AI does not require backend_url, use default OpenAI format
-            config["backend_url"] = "https://api.openai.com/v1"
-
-        # Fix path issues
-        config["data_dir"] = str(project_root / "data")
-        config["results_dir"] = str(project_root / "results")
-        config["data_cache_dir"] = str(project_root / "tradingagents" / "dataflows" / "data_cache")
+        config = build_analysis_config(
+            llm_provider, llm_model, research_depth, temperature=temperature, top_p=top_p,
+            max_tokens=max_tokens, frequency_penalty=frequency_penalty,
+            presence_penalty=presence_penalty, market_type=market_type
+        )
 
         # Ensure directories exist
         update_progress("📁 Creating necessary directories...")
@@ -359,18 +406,45 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
 
         logger.debug(f"🔍 [RUNNER DEBUG] Final stock code passed to analysis engine: '{formatted_symbol}'")
 
-        # Initialize trading graph
+        if resume_run_id:
+            # A checkpoint only replays on the graph it was recorded with: rebuild from the run's
+            # stored analysts and config instead of the current form values
+            from tradingagents.graph.checkpointing import CheckpointManager
+
+            record = CheckpointManager(config).registry.get(resume_run_id)
+            if record is None:
+                raise ValueError(f"Run not found: {resume_run_id}")
+            if record["analysts"] != list(analysts) or record["ticker"] != formatted_symbol:
+                logger.info(f"🔄 Resuming {resume_run_id} with its original settings: "
+                            f"{record['ticker']} {record['trade_date']} {record['analysts']}")
+            analysts = record["analysts"]
+            config = record["config"]
+            formatted_symbol = record["ticker"]
+            stock_symbol = record["ticker"]
+            analysis_date = record["trade_date"]
+            llm_provider = config.get("llm_provider", llm_provider)
+            llm_model = config.get("deep_think_llm", llm_model)
+
+        # Initialize trading graph (reused from the warm graph pool when possible)
         update_progress("🔧 Initializing analysis engine...")
-        graph = TradingAgentsGraph(analysts, config=config, debug=False)
-
-        # Execute analysis
-        update_progress(f"📊 Starting analysis of {formatted_symbol} stock, this may take a few minutes...")
-        logger.debug(f"🔍 [RUNNER DEBUG] ===== Calling graph.propagate =====")
-        logger.debug(f"🔍 [RUNNER DEBUG] Parameters passed to graph.propagate:")
-        logger.debug(f"🔍 [RUNNER DEBUG]   symbol: '{formatted_symbol}'")
-        logger.debug(f"🔍 [RUNNER DEBUG]   date: '{analysis_date}'")
+        with checkout_graph(analysts, config) as graph:
+            # Execute analysis
+            update_progress(f"📊 Starting analysis of {formatted_symbol} stock, this may take a few minutes...")
+            logger.debug(f"🔍 [RUNNER DEBUG] ===== Calling graph.propagate =====")
+            logger.debug(f"🔍 [RUNNER DEBUG] Parameters passed to graph.propagate:")
+            logger.debug(f"🔍 [RUNNER DEBUG]   symbol: '{formatted_symbol}'")
+            logger.debug(f"🔍 [RUNNER DEBUG]   date: '{analysis_date}'")
 
-        state, decision = graph.propagate(formatted_symbol, analysis_date)
+            try:
+                if resume_run_id:
+                    update_progress(f"🔄 Resuming run {resume_run_id} from its last completed step...")
+                    state, decision = graph.resume(resume_run_id, on_tokens=token_callback, on_event=event_callback)
+                else:
+                    state, decision = graph.propagate(formatted_symbol, analysis_date, force_refresh=force_refresh, on_tokens=token_callback, on_event=event_callback)
+            finally:
+                # Read run state before the graph is reset and returned to the pool
+                run_id = graph.run_id
+                ttft_metrics = graph.ttft_metrics
 
         # Debug information
         logger.debug(f"🔍 [DEBUG] Analysis complete, decision type: {type(decision)}")
@@ -416,7 +490,9 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
             'decision': decision,
             'success': True,
             'error': None,
-            'session_id': session_id if TOKEN_TRACKING_ENABLED else None
+            'session_id': session_id if TOKEN_TRACKING_ENABLED else None,
+            'run_id': run_id,
+            'ttft': ttft_metrics
         }
 
         # Log detailed analysis completion
@@ -449,6 +525,13 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
         update_progress("✅ Analysis completed successfully!")
         return results
 
+    except DeadlineExceeded as e:
+        # Cancelled or out of time: report the failure instead of substituting demo results
+        logger.warning(f"⏱️ [Analysis Stopped] {stock_symbol}: {e}")
+        if run_id:
+            update_progress(f"⏱️ Analysis stopped: {e}. Resume with run ID: {run_id}")
+        raise
+
     except Exception as e:
         # Log detailed analysis failure
         analysis_duration = time.time() - analysis_start_time
@@ -470,8 +553,19 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
                         'event_type': 'web_analysis_error'
                     }, exc_info=True)
 
+        # Surface the run id so the user can resume from the last completed step
+        if run_id:
+            update_progress(f"❌ Analysis failed. Resume with run ID: {run_id}")
+
         # If real analysis fails, return simulated data for demonstration
-        return generate_demo_results(stock_symbol, analysis_date, analysts, research_depth, llm_provider, llm_model, str(e), market_type)
+        demo_results = generate_demo_results(stock_symbol, analysis_date, analysts, research_depth, llm_provider, llm_model, str(e), market_type)
+        demo_results['run_id'] = run_id
+        return demo_results
+
+def analysis_content_key(stock_symbol, decision, state):
+    """Stable key of a formatted result, used to memoize its rendered sections"""
+    content = json.dumps([stock_symbol, decision, state], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
 
 def format_analysis_results(results):
     """Format analysis results for display"""
@@ -577,6 +671,7 @@ def format_analysis_results(results):
     
     return {
         'stock_symbol': results['stock_symbol'],
+        'analysis_key': analysis_content_key(results['stock_symbol'], formatted_decision, formatted_state),
         'decision': formatted_decision,
         'state': formatted_state,
         'success': True,
@@ -586,6 +681,10 @@ def format_analysis_results(results):
         'research_depth': results['research_depth'],
         'llm_provider': results.get('llm_provider', 'dashscope'),
         'llm_model': results['llm_model'],
+        'is_demo': results.get('is_demo', False),
+        'demo_reason': results.get('demo_reason'),
+        'run_id': results.get('run_id'),
+        'ttft': results.get('ttft') or {},
         'metadata': {
             'analysis_date': results['analysis_date'],
             'analysts': results['analysts'],
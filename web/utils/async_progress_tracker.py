@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Asynchronous progress tracker
-Supports both Redis and file storage. The frontend polls for progress updates periodically.
+Supports both Redis and file storage. Every write publishes a progress event the frontend waits on.
 """
 
 import json
@@ -16,6 +16,28 @@ from pathlib import Path
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('async_progress')
 
+from .progress_events import get_redis_client, progress_file_path, publish_progress
+
+# Progress records expire after 1 hour
+PROGRESS_TTL = 3600
+
+
+def _progress_key(analysis_id: str) -> str:
+    return f"progress:{analysis_id}"
+
+
+def _steps_key(analysis_id: str) -> str:
+    return f"progress:{analysis_id}:steps"
+
+
+def _result_key(analysis_id: str) -> str:
+    return f"progress:{analysis_id}:result"
+
+
+def progress_result_path(analysis_id: str) -> str:
+    """Path of the analysis result file referenced from the progress record"""
+    return f"./data/progress_{analysis_id}_result.json"
+
 """Safely serialize objects, handling non-serializable types"""
 def safe_serialize(obj):
     if hasattr(obj, 'dict'):
@@ -73,8 +95,14 @@ class AsyncProgressTracker:
             'last_message': '准备开始分析...',
             'last_update': time.time(),
             'start_time': self.start_time,
-            'steps': self.analysis_steps
+            'steps': self.analysis_steps,
+            'live_output': None
         }
+        self._last_stream_save = 0.0
+        # Encoded field values as of the last save; only changed fields are written
+        self._saved_fields = {}
+        self._steps_saved = False
+        self._lock = threading.RLock()
         
         # Try to initialize Redis, fallback to file
         self.redis_client = None
@@ -82,7 +110,7 @@ class AsyncProgressTracker:
         
         if not self.use_redis:
             # Use file storage
-            self.progress_file = f"./data/progress_{analysis_id}.json"
+            self.progress_file = progress_file_path(analysis_id)
             os.makedirs(os.path.dirname(self.progress_file), exist_ok=True)
         
         # Save initial status
@@ -90,76 +118,32 @@ class AsyncProgressTracker:
         
         logger.info(f"📊 [异步进度] 初始化完成: {analysis_id}, 存储方式: {'Redis' if self.use_redis else '文件'}")
 
-        # Register with logging system for automatic progress updates
-        try:
-            from .progress_log_handler import register_analysis_tracker
-            import threading
-
-            # Use timeout mechanism to avoid deadlock
-            def register_with_timeout():
-                try:
-                    register_analysis_tracker(self.analysis_id, self)
-                    print(f"✅ [进度集成] 跟踪器注册成功: {self.analysis_id}")
-                except Exception as e:
-                    print(f"❌ [进度集成] 跟踪器注册失败: {e}")
-
-            # Register in a separate thread to avoid blocking the main thread
-            register_thread = threading.Thread(target=register_with_timeout, daemon=True)
-            register_thread.start()
-            register_thread.join(timeout=2.0)  # 2 seconds timeout
-
-            if register_thread.is_alive():
-                print(f"⚠️ [进度集成] 跟踪器注册超时，继续执行: {self.analysis_id}")
+    @classmethod
+    def attach(cls, analysis_id: str) -> Optional['AsyncProgressTracker']:
+        """Re-open an existing progress record without resetting it (e.g. from the job supervisor)"""
+        progress_data = get_progress_by_id(analysis_id, include_results=False)
+        if not progress_data:
+            return None
+        tracker = cls.__new__(cls)
+        tracker.analysis_id = analysis_id
+        tracker.progress_data = progress_data
+        tracker._last_stream_save = 0.0
+        tracker._saved_fields = {}
+        tracker._steps_saved = bool(progress_data.get('steps'))
+        tracker._lock = threading.RLock()
+        tracker.redis_client = None
+        tracker.use_redis = tracker._init_redis()
+        if not tracker.use_redis:
+            tracker.progress_file = progress_file_path(analysis_id)
+        return tracker
 
-        except ImportError:
-            logger.debug("📊 [异步进度] 日志集成不可用")
-        except Exception as e:
-            print(f"❌ [进度集成] 跟踪器注册异常: {e}")
-    
     def _init_redis(self) -> bool:
-        """Initialize Redis connection"""
-        try:
-            # First check REDIS_ENABLED environment variable
-            redis_enabled_raw = os.getenv('REDIS_ENABLED', 'false')
-            redis_enabled = redis_enabled_raw.lower()
-            logger.info(f"🔍 [Redis检查] REDIS_ENABLED原值='{redis_enabled_raw}' -> 处理后='{redis_enabled}'")
-
-            if redis_enabled != 'true':
-                logger.info(f"📊 [异步进度] Redis已禁用，使用文件存储")
-                return False
-
-            import redis
-
-            # Get Redis configuration from environment variables
-            redis_host = os.getenv('REDIS_HOST', 'localhost')
-            redis_port = int(os.getenv('REDIS_PORT', 6379))
-            redis_password = os.getenv('REDIS_PASSWORD', None)
-            redis_db = int(os.getenv('REDIS_DB', 0))
-
-            # Create Redis connection
-            if redis_password:
-                self.redis_client = redis.Redis(
-                    host=redis_host,
-                    port=redis_port,
-                    password=redis_password,
-                    db=redis_db,
-                    decode_responses=True
-                )
-            else:
-                self.redis_client = redis.Redis(
-                    host=redis_host,
-                    port=redis_port,
-                    db=redis_db,
-                    decode_responses=True
-                )
-
-            # Test connection
-            self.redis_client.ping()
-            logger.info(f"📊 [异步进度] Redis连接成功: {redis_host}:{redis_port}")
-            return True
-        except Exception as e:
-            logger.warning(f"📊 [异步进度] Redis连接失败，使用文件存储: {e}")
+        """Use the shared Redis connection pool when Redis is enabled"""
+        self.redis_client = get_redis_client()
+        if self.redis_client is None:
+            logger.info(f"📊 [异步进度] Redis未启用或不可用，使用文件存储")
             return False
+        return True
     
     def _generate_dynamic_steps(self) -> List[Dict]:
         """Dynamically generate analysis steps based on analyst count and research depth"""
@@ -360,6 +344,69 @@ class AsyncProgressTracker:
         logger.info(f"📊 [进度更新] {self.analysis_id}: {message[:50]}...")
         logger.debug(f"📊 [进度详情] 步骤{self.current_step + 1}/{len(self.analysis_steps)} ({step_name}), 进度{progress_percentage:.1f}%, 耗时{elapsed_time:.1f}s")
     
+    # Tail of the streaming LLM output kept in the progress record
+    LIVE_OUTPUT_MAX_CHARS = 3000
+    # Minimum seconds between progress writes caused by streamed tokens
+    STREAM_SAVE_INTERVAL = 1.0
+
+    def update_stream(self, node: str, text: str):
+        """Append streamed LLM tokens for a graph node to the live output"""
+        live_output = self.progress_data.get('live_output') or {}
+        if live_output.get('node') != node:
+            live_output = {'node': node, 'text': ''}
+        live_output['text'] = (live_output['text'] + text)[-self.LIVE_OUTPUT_MAX_CHARS:]
+        self.progress_data['live_output'] = live_output
+
+        current_time = time.time()
+        if current_time - self._last_stream_save >= self.STREAM_SAVE_INTERVAL:
+            self._last_stream_save = current_time
+            self.progress_data['last_update'] = current_time
+            self._save_progress()
+
+    # Graph node -> keywords of the progress step it runs in
+    NODE_STEP_KEYWORDS = {
+        "Market Analyst": ["市场分析"],
+        "Fundamentals Analyst": ["基本面分析"],
+        "News Analyst": ["新闻分析"],
+        "Social Analyst": ["社交媒体", "情绪分析"],
+        "Bull Researcher": ["多头观点"],
+        "Bear Researcher": ["空头观点"],
+        "Research Manager": ["观点整合"],
+        "Trader": ["投资建议"],
+        "Risky Analyst": ["激进策略", "风险提示"],
+        "Safe Analyst": ["保守策略", "风险提示"],
+        "Neutral Analyst": ["平衡策略", "风险提示"],
+        "Risk Judge": ["风险控制", "风险提示"],
+    }
+
+    def handle_graph_event(self, event):
+        """Apply a typed event of this tracker's graph run (see tradingagents.graph.run_events)"""
+        from tradingagents.graph.run_events import LLM_END, NODE_END, NODE_ERROR, NODE_START, TOOL_END, TOOL_START
+
+        with self._lock:
+            if event.type == LLM_END:
+                # Token counts ride along with the next saved update
+                usage = dict(self.progress_data.get('token_usage') or {'input': 0, 'output': 0})
+                usage['input'] += event.input_tokens
+                usage['output'] += event.output_tokens
+                self.progress_data['token_usage'] = usage
+            elif event.type == TOOL_END:
+                self.progress_data['tool_calls'] = self.progress_data.get('tool_calls', 0) + 1
+            elif event.type == NODE_START:
+                keywords = self.NODE_STEP_KEYWORDS.get(event.node)
+                step = self._find_step_by_keyword(keywords) if keywords else None
+                self.update_progress(f"📊 [模块开始] {event.node}",
+                                     step if step is not None else self.current_step)
+            elif event.type == NODE_END:
+                durations = dict(self.progress_data.get('node_durations') or {})
+                durations[event.node] = round(durations.get(event.node, 0.0) + event.duration, 2)
+                self.progress_data['node_durations'] = durations
+                self.update_progress(f"📊 [模块完成] {event.node} 耗时 {event.duration:.1f}s", self.current_step)
+            elif event.type == NODE_ERROR:
+                self.update_progress(f"❌ {event.node} 出错: {event.name}", self.current_step)
+            elif event.type == TOOL_START:
+                self.update_progress(f"🔧 [工具调用] {event.name}", self.current_step)
+
     def _detect_step_from_message(self, message: str) -> Optional[int]:
         """Intelligently detect current step based on message content"""
         message_lower = message.lower()
@@ -475,59 +522,105 @@ class AsyncProgressTracker:
         return remaining
     
     def _save_progress(self):
-        """Save progress to storage"""
+        """Save progress to storage (serialized: graph events may arrive from several threads)"""
+        with self._lock:
+            self._write_progress()
+
+    def _write_progress(self):
+        """Write progress to Redis or file.
+
+        Redis keeps the scalar fields in a hash and writes only the fields that
+        changed since the last save; the step list is pushed once. The file
+        store rewrites a compact document. Analysis results are never part of
+        the progress record (see ``_save_results``).
+        """
         try:
             current_step_name = self.progress_data.get('current_step_name', 'Unknown')
             progress_pct = self.progress_data.get('progress_percentage', 0)
             status = self.progress_data.get('status', 'running')
 
             if self.use_redis:
-                # Save to Redis (safely serialize)
-                key = f"progress:{self.analysis_id}"
-                safe_data = safe_serialize(self.progress_data)
-                data_json = json.dumps(safe_data, ensure_ascii=False)
-                self.redis_client.setex(key, 3600, data_json)  # 1 hour expiration
+                encoded = {
+                    field: json.dumps(safe_serialize(value), ensure_ascii=False)
+                    for field, value in self.progress_data.items() if field != 'steps'
+                }
+                changed = {field: value for field, value in encoded.items()
+                           if self._saved_fields.get(field) != value}
+
+                key = _progress_key(self.analysis_id)
+                steps_key = _steps_key(self.analysis_id)
+                pipe = self.redis_client.pipeline(transaction=False)
+                if changed:
+                    pipe.hset(key, mapping=changed)
+                if not self._steps_saved:
+                    pipe.delete(steps_key)
+                    steps = self.progress_data.get('steps') or []
+                    if steps:
+                        pipe.rpush(steps_key, *[json.dumps(step, ensure_ascii=False) for step in steps])
+                pipe.expire(key, PROGRESS_TTL)
+                pipe.expire(steps_key, PROGRESS_TTL)
+                pipe.execute()
+                self._saved_fields.update(changed)
+                self._steps_saved = True
 
                 logger.info(f"📊 [Redis写入] {self.analysis_id} -> {status} | {current_step_name} | {progress_pct:.1f}%")
-                logger.debug(f"📊 [Redis详情] 键: {key}, 数据大小: {len(data_json)} 字节")
+                logger.debug(f"📊 [Redis详情] 键: {key}, 更新字段: {list(changed)}")
             else:
-                # Save to file (safely serialize)
+                # Save to file (safely serialize), replace atomically so readers never see a partial file
                 safe_data = safe_serialize(self.progress_data)
-                with open(self.progress_file, 'w', encoding='utf-8') as f:
-                    json.dump(safe_data, f, ensure_ascii=False, indent=2)
+                temp_file = f"{self.progress_file}.tmp"
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(safe_data, f, ensure_ascii=False, separators=(',', ':'))
+                os.replace(temp_file, self.progress_file)
 
                 logger.info(f"📊 [文件写入] {self.analysis_id} -> {status} | {current_step_name} | {progress_pct:.1f}%")
                 logger.debug(f"📊 [文件详情] 路径: {self.progress_file}")
 
+            # 通知等待中的页面进度已变化
+            publish_progress(self.analysis_id, self.redis_client if self.use_redis else None)
+
         except Exception as e:
             logger.error(f"📊 [异步进度] 保存失败: {e}")
             # Try fallback storage method
             try:
+                backup_file = progress_file_path(self.analysis_id)
+                os.makedirs(os.path.dirname(backup_file), exist_ok=True)
                 if self.use_redis:
                     # Redis failed, try file storage
                     logger.warning(f"📊 [异步进度] Redis保存失败，尝试文件存储")
-                    backup_file = f"./data/progress_{self.analysis_id}.json"
-                    os.makedirs(os.path.dirname(backup_file), exist_ok=True)
-                    safe_data = safe_serialize(self.progress_data)
-                    with open(backup_file, 'w', encoding='utf-8') as f:
-                        json.dump(safe_data, f, ensure_ascii=False, indent=2)
-                    logger.info(f"📊 [备用存储] 文件保存成功: {backup_file}")
+                    backup_data = safe_serialize(self.progress_data)
                 else:
                     # File storage failed, try simplified data
-                    logger.warning(f"�� [异步进度] 文件保存失败，尝试简化数据")
-                    simplified_data = {
+                    logger.warning(f"📊 [异步进度] 文件保存失败，尝试简化数据")
+                    backup_data = {
                         'analysis_id': self.analysis_id,
                         'status': self.progress_data.get('status', 'unknown'),
                         'progress_percentage': self.progress_data.get('progress_percentage', 0),
                         'last_message': str(self.progress_data.get('last_message', '')),
                         'last_update': self.progress_data.get('last_update', time.time())
                     }
-                    backup_file = f"./data/progress_{self.analysis_id}.json"
-                    with open(backup_file, 'w', encoding='utf-8') as f:
-                        json.dump(simplified_data, f, ensure_ascii=False, indent=2)
-                    logger.info(f"📊 [备用存储] 简化数据保存成功: {backup_file}")
+                with open(backup_file, 'w', encoding='utf-8') as f:
+                    json.dump(backup_data, f, ensure_ascii=False, separators=(',', ':'))
+                logger.info(f"📊 [备用存储] 文件保存成功: {backup_file}")
             except Exception as backup_e:
                 logger.error(f"📊 [异步进度] 备用存储也失败: {backup_e}")
+
+    def _save_results(self, results: Any):
+        """Store the analysis results once, next to the progress record, and keep a reference"""
+        data_json = json.dumps(safe_serialize(results), ensure_ascii=False)
+        if self.use_redis:
+            try:
+                result_key = _result_key(self.analysis_id)
+                self.redis_client.setex(result_key, PROGRESS_TTL, data_json)
+                self.progress_data['raw_results_ref'] = result_key
+                return
+            except Exception as e:
+                logger.warning(f"📊 [异步进度] Redis结果保存失败，改用文件: {e}")
+        result_file = progress_result_path(self.analysis_id)
+        os.makedirs(os.path.dirname(result_file), exist_ok=True)
+        with open(result_file, 'w', encoding='utf-8') as f:
+            f.write(data_json)
+        self.progress_data['raw_results_ref'] = result_file
     
     def get_progress(self) -> Dict[str, Any]:
         """Get current progress"""
@@ -539,25 +632,18 @@ class AsyncProgressTracker:
         self.progress_data['status'] = 'completed'
         self.progress_data['progress_percentage'] = 100.0
         self.progress_data['remaining_time'] = 0.0
+        self.progress_data['live_output'] = None
 
-        # Save analysis results (safely serialize)
+        # Save analysis results once, referenced from the progress record
         if results is not None:
             try:
-                self.progress_data['raw_results'] = safe_serialize(results)
+                self._save_results(results)
                 logger.info(f"📊 [异步进度] 保存分析结果: {self.analysis_id}")
             except Exception as e:
-                logger.warning(f"📊 [异步进度] 结果序列化失败: {e}")
-                self.progress_data['raw_results'] = str(results)  # Final fallback
+                logger.warning(f"📊 [异步进度] 结果保存失败: {e}")
 
         self._save_progress()
         logger.info(f"📊 [异步进度] 分析完成: {self.analysis_id}")
-
-        # Unregister from logging system
-        try:
-            from .progress_log_handler import unregister_analysis_tracker
-            unregister_analysis_tracker(self.analysis_id)
-        except ImportError:
-            pass
     
     def mark_failed(self, error_message: str):
         """Mark analysis as failed"""
@@ -567,59 +653,55 @@ class AsyncProgressTracker:
         self._save_progress()
         logger.error(f"📊 [异步进度] 分析失败: {self.analysis_id}, 错误: {error_message}")
 
-        # Unregister from logging system
-        try:
-            from .progress_log_handler import unregister_analysis_tracker
-            unregister_analysis_tracker(self.analysis_id)
-        except ImportError:
-            pass
+def _load_result_file(path: str):
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return None
 
-def get_progress_by_id(analysis_id: str) -> Optional[Dict[str, Any]]:
-    """Get progress by analysis ID"""
-    try:
-        # Check REDIS_ENABLED environment variable
-        redis_enabled = os.getenv('REDIS_ENABLED', 'false').lower() == 'true'
 
+def get_progress_by_id(analysis_id: str, include_results: bool = True) -> Optional[Dict[str, Any]]:
+    """Get progress by analysis ID.
+
+    The analysis results are stored separately and only loaded (into
+    ``raw_results``) when ``include_results`` is set and the analysis has them.
+    """
+    try:
         # If Redis is enabled, try Redis first
-        if redis_enabled:
+        redis_client = get_redis_client()
+        if redis_client is not None:
             try:
-                import redis
-
-                # Get Redis configuration from environment variables
-                redis_host = os.getenv('REDIS_HOST', 'localhost')
-                redis_port = int(os.getenv('REDIS_PORT', 6379))
-                redis_password = os.getenv('REDIS_PASSWORD', None)
-                redis_db = int(os.getenv('REDIS_DB', 0))
-
-                # Create Redis connection
-                if redis_password:
-                    redis_client = redis.Redis(
-                        host=redis_host,
-                        port=redis_port,
-                        password=redis_password,
-                        db=redis_db,
-                        decode_responses=True
-                    )
-                else:
-                    redis_client = redis.Redis(
-                        host=redis_host,
-                        port=redis_port,
-                        db=redis_db,
-                        decode_responses=True
-                    )
-
-                key = f"progress:{analysis_id}"
-                data = redis_client.get(key)
-                if data:
-                    return json.loads(data)
+                pipe = redis_client.pipeline(transaction=False)
+                pipe.hgetall(_progress_key(analysis_id))
+                pipe.lrange(_steps_key(analysis_id), 0, -1)
+                fields, steps = pipe.execute()
+                if fields:
+                    progress_data = {field: json.loads(value) for field, value in fields.items()}
+                    progress_data['steps'] = [json.loads(step) for step in steps]
+                    ref = progress_data.get('raw_results_ref')
+                    if include_results and ref:
+                        if ref.startswith('progress:'):
+                            data = redis_client.get(ref)
+                            raw_results = json.loads(data) if data else None
+                        else:
+                            raw_results = _load_result_file(ref)
+                        if raw_results is not None:
+                            progress_data['raw_results'] = raw_results
+                    return progress_data
             except Exception as e:
                 logger.debug(f"📊 [异步进度] Redis读取失败: {e}")
 
         # Try file
-        progress_file = f"./data/progress_{analysis_id}.json"
+        progress_file = progress_file_path(analysis_id)
         if os.path.exists(progress_file):
             with open(progress_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                progress_data = json.load(f)
+            ref = progress_data.get('raw_results_ref')
+            if include_results and ref:
+                raw_results = _load_result_file(ref)
+                if raw_results is not None:
+                    progress_data['raw_results'] = raw_results
+            return progress_data
 
         return None
     except Exception as e:
@@ -641,58 +723,31 @@ def format_time(seconds: float) -> str:
 def get_latest_analysis_id() -> Optional[str]:
     """Get the latest analysis ID"""
     try:
-        # Check REDIS_ENABLED environment variable
-        redis_enabled = os.getenv('REDIS_ENABLED', 'false').lower() == 'true'
-
         # If Redis is enabled, try to get from Redis first
-        if redis_enabled:
+        redis_client = get_redis_client()
+        if redis_client is not None:
             try:
-                import redis
-
-                # Get Redis configuration from environment variables
-                redis_host = os.getenv('REDIS_HOST', 'localhost')
-                redis_port = int(os.getenv('REDIS_PORT', 6379))
-                redis_password = os.getenv('REDIS_PASSWORD', None)
-                redis_db = int(os.getenv('REDIS_DB', 0))
-
-                # Create Redis connection
-                if redis_password:
-                    redis_client = redis.Redis(
-                        host=redis_host,
-                        port=redis_port,
-                        password=redis_password,
-                        db=redis_db,
-                        decode_responses=True
-                    )
-                else:
-                    redis_client = redis.Redis(
-                        host=redis_host,
-                        port=redis_port,
-                        db=redis_db,
-                        decode_responses=True
-                    )
-
-                # Get all progress keys
-                keys = redis_client.keys("progress:*")
+                # Progress hashes only (skip the step lists and result blobs)
+                keys = [key for key in redis_client.scan_iter(match="progress:*", count=200)
+                        if not key.endswith((':steps', ':result'))]
                 if not keys:
                     return None
 
-                # Get data for each key, find the latest
+                # One round trip for every record's last_update, then pick the latest
+                pipe = redis_client.pipeline(transaction=False)
+                for key in keys:
+                    pipe.hget(key, 'last_update')
                 latest_time = 0
                 latest_id = None
-
-                for key in keys:
+                for key, last_update in zip(keys, pipe.execute()):
                     try:
-                        data = redis_client.get(key)
-                        if data:
-                            progress_data = json.loads(data)
-                            last_update = progress_data.get('last_update', 0)
-                            if last_update > latest_time:
-                                latest_time = last_update
-                                # Extract analysis_id from key (remove "progress:" prefix)
-                                latest_id = key.replace('progress:', '')
+                        last_update = json.loads(last_update) if last_update else 0
                     except Exception:
                         continue
+                    if last_update > latest_time:
+                        latest_time = last_update
+                        # Extract analysis_id from key (remove "progress:" prefix)
+                        latest_id = key[len('progress:'):]
 
                 if latest_id:
                     logger.info(f"📊 [恢复分析] 找到最新分析ID: {latest_id}")
@@ -704,7 +759,7 @@ def get_latest_analysis_id() -> Optional[str]:
         # If Redis fails or is not enabled, try to find from file
         data_dir = Path("data")
         if data_dir.exists():
-            progress_files = list(data_dir.glob("progress_*.json"))
+            progress_files = [f for f in data_dir.glob("progress_*.json") if not f.name.endswith("_result.json")]
             if progress_files:
                 # Sort by modification time, get the latest
                 latest_file = max(progress_files, key=lambda f: f.stat().st_mtime)
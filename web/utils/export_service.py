@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Background report export service
+Renders reports on a worker pool into a content-addressed artifact cache, so
+the page never blocks on pandoc and repeated exports of the same report are
+served from disk.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('web')
+
+EXPORT_FORMATS = {
+    'markdown': ('.md', 'text/markdown'),
+    'docx': ('.docx', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+    'pdf': ('.pdf', 'application/pdf'),
+}
+
+
+def artifact_key(results: Dict[str, Any], format_type: str, template_version: str) -> str:
+    """Content hash of (report content, format, template)"""
+    content = json.dumps(results, sort_keys=True, ensure_ascii=False, default=str)
+    digest = hashlib.sha256()
+    for part in (content, format_type, template_version):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """Rendered reports on disk, named by their artifact key"""
+
+    def __init__(self, cache_dir: str, max_age_days: float = 7):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_age_days = max_age_days
+
+    def path(self, key: str, format_type: str) -> Path:
+        return self.cache_dir / f"{key}{EXPORT_FORMATS[format_type][0]}"
+
+    def get(self, key: str, format_type: str) -> Optional[Path]:
+        path = self.path(key, format_type)
+        try:
+            # 命中时刷新修改时间，清理按最近使用淘汰
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def prune(self) -> int:
+        """Delete artifacts older than ``max_age_days``"""
+        cutoff = time.time() - self.max_age_days * 86400
+        removed = 0
+        for path in self.cache_dir.iterdir():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        if removed:
+            logger.info(f"🧹 [导出缓存] 清理过期文件 {removed} 个")
+        return removed
+
+
+class ExportHandle:
+    """Download handle of one export job"""
+
+    def __init__(self, key: str, format_type: str, future: Future):
+        self.key = key
+        self.format_type = format_type
+        self.future = future
+
+    @property
+    def ready(self) -> bool:
+        return self.future.done() and self.future.exception() is None
+
+    @property
+    def failed(self) -> bool:
+        return self.future.done() and self.future.exception() is not None
+
+    @property
+    def error(self) -> Optional[str]:
+        return str(self.future.exception()) if self.failed else None
+
+    @property
+    def path(self) -> Path:
+        return self.future.result()
+
+    @property
+    def mime(self) -> str:
+        return EXPORT_FORMATS[self.format_type][1]
+
+    def read(self) -> bytes:
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+
+class ExportService:
+    """Worker pool rendering reports into an ArtifactCache
+
+    The working PDF engine is probed once, on the pool, when the service
+    starts. ``submit`` returns a handle immediately: already cached artifacts
+    and identical in-flight exports share one rendering.
+    """
+
+    def __init__(self, exporter, cache: ArtifactCache, max_workers: int = 2):
+        self.exporter = exporter
+        self.cache = cache
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-export")
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self.executor.submit(exporter.probe_pdf_engine)
+
+    def submit(self, results: Dict[str, Any], format_type: str) -> ExportHandle:
+        if format_type not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {format_type}")
+        key = artifact_key(results, format_type, self.exporter.TEMPLATE_VERSION)
+
+        with self._lock:
+            cached = self.cache.get(key, format_type)
+            if cached is not None:
+                logger.info(f"♻️ [导出缓存] 命中 {format_type}: {key[:12]}")
+                future = Future()
+                future.set_result(cached)
+                return ExportHandle(key, format_type, future)
+
+            future = self._inflight.get(key)
+            if future is None:
+                future = self.executor.submit(self._render, results, format_type, key)
+                self._inflight[key] = future
+                future.add_done_callback(lambda _: self._forget(key))
+            return ExportHandle(key, format_type, future)
+
+    def _forget(self, key: str):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def _render(self, results: Dict[str, Any], format_type: str, key: str) -> Path:
+        started = time.time()
+        path = self.cache.path(key, format_type)
+        temp_path = path.with_name(f"{path.stem}.{threading.get_ident()}.tmp{path.suffix}")
+        try:
+            self.exporter.render_to_file(results, format_type, str(temp_path))
+            os.replace(temp_path, path)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+        logger.info(f"✅ [导出] {format_type} 生成完成: {key[:12]}, 耗时 {time.time() - started:.1f}s")
+        return path
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+
+_service: Optional[ExportService] = None
+_service_lock = threading.Lock()
+
+
+def get_export_service() -> ExportService:
+    """Process-wide export service (created, and its PDF engine probed, on first use)"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            from .report_exporter import report_exporter
+            cache = ArtifactCache(
+                os.getenv('EXPORT_CACHE_DIR', './data/export_cache'),
+                float(os.getenv('EXPORT_CACHE_MAX_AGE_DAYS', '7')),
+            )
+            cache.prune()
+            _service = ExportService(report_exporter, cache, int(os.getenv('EXPORT_MAX_WORKERS', '2')))
+        return _service
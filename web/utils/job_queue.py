@@ -0,0 +1,496 @@
+"""
+Analysis job queue
+SQLite-backed queue of analysis jobs drained by a bounded pool of worker processes.
+Provides admission control (global and per-user caps), priority lanes, cancellation,
+queue position reporting and crash isolation: every analysis runs in its own process,
+so a hung or crashing analysis cannot freeze the Streamlit server.
+"""
+
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# Import logging module
+from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.deadline import DeadlineExceeded, run_deadline
+logger = get_logger('job_queue')
+
+# Priority lanes (lower value is served first)
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+PRIORITY_LANES = {
+    'high': PRIORITY_HIGH,
+    'normal': PRIORITY_NORMAL,
+    'low': PRIORITY_LOW,
+}
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class QueueFullError(Exception):
+    """Raised when a job is rejected by admission control"""
+
+
+class AnalysisJobQueue:
+    """Persistent analysis job queue (SQLite)"""
+
+    def __init__(self, db_path: str, max_queued: int = 20, per_user_queued: int = 3,
+                 per_user_running: int = 1):
+        self.db_path = db_path
+        self.max_queued = max_queued
+        self.per_user_queued = per_user_queued
+        self.per_user_running = per_user_running
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS analysis_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    worker_pid INTEGER,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )"""
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_status_priority "
+                "ON analysis_jobs (status, priority, created_at)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call: safe across threads and processes
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def submit(self, job_id: str, user_id: str, params: Dict[str, Any],
+               priority: int = PRIORITY_NORMAL) -> int:
+        """Enqueue a job and return its queue position (0 means next to run)"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                queued = conn.execute(
+                    "SELECT COUNT(*) FROM analysis_jobs WHERE status = 'queued'"
+                ).fetchone()[0]
+                if queued >= self.max_queued:
+                    raise QueueFullError(
+                        f"The analysis queue is full ({queued} jobs waiting), please try again later"
+                    )
+                user_active = conn.execute(
+                    "SELECT COUNT(*) FROM analysis_jobs WHERE user_id = ? AND status IN ('queued', 'running')",
+                    (user_id,)
+                ).fetchone()[0]
+                if user_active >= self.per_user_queued:
+                    raise QueueFullError(
+                        f"You already have {user_active} analyses queued or running, please wait for them to finish"
+                    )
+                conn.execute(
+                    "INSERT INTO analysis_jobs (job_id, user_id, priority, status, params, created_at) "
+                    "VALUES (?, ?, ?, 'queued', ?, ?)",
+                    (job_id, user_id, priority, json.dumps(params, ensure_ascii=False, default=str), time.time())
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        logger.info(f"📥 [任务队列] 已入队: {job_id} (user={user_id}, priority={priority})")
+        return self.position(job_id)
+
+    def position(self, job_id: str) -> Optional[int]:
+        """Number of queued jobs that will run before this one, None if not queued"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT priority, created_at FROM analysis_jobs WHERE job_id = ? AND status = 'queued'",
+                (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            return conn.execute(
+                "SELECT COUNT(*) FROM analysis_jobs WHERE status = 'queued' "
+                "AND (priority < ? OR (priority = ? AND created_at < ?))",
+                (row['priority'], row['priority'], row['created_at'])
+            ).fetchone()[0]
+
+    def claim_next(self, worker_pid: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Atomically move the next eligible queued job to running"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT * FROM analysis_jobs j WHERE status = 'queued' AND ("
+                    "  SELECT COUNT(*) FROM analysis_jobs r WHERE r.user_id = j.user_id AND r.status = 'running'"
+                    ") < ? ORDER BY priority, created_at LIMIT 1",
+                    (self.per_user_running,)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE analysis_jobs SET status = 'running', started_at = ?, worker_pid = ? WHERE job_id = ?",
+                    (time.time(), worker_pid, row['job_id'])
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        job = self._to_dict(row)
+        job['status'] = 'running'
+        return job
+
+    def set_worker_pid(self, job_id: str, worker_pid: int):
+        with self._connect() as conn:
+            conn.execute("UPDATE analysis_jobs SET worker_pid = ? WHERE job_id = ?", (worker_pid, job_id))
+
+    def finish(self, job_id: str, status: str, error: str = None):
+        """Record the final status of a running job (completed/failed/cancelled)"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE analysis_jobs SET status = ?, error = ?, finished_at = ? "
+                "WHERE job_id = ? AND status IN ('queued', 'running')",
+                (status, error, time.time(), job_id)
+            )
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job: queued jobs are dropped, running jobs are terminated by the pool"""
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE analysis_jobs SET status = 'cancelled', finished_at = ? WHERE job_id = ? AND status = 'queued'",
+                (time.time(), job_id)
+            )
+            if cur.rowcount:
+                logger.info(f"🛑 [任务队列] 已取消排队任务: {job_id}")
+                return True
+            cur = conn.execute(
+                "UPDATE analysis_jobs SET cancel_requested = 1 WHERE job_id = ? AND status = 'running'",
+                (job_id,)
+            )
+            if cur.rowcount:
+                logger.info(f"🛑 [任务队列] 已请求取消运行中任务: {job_id}")
+            return bool(cur.rowcount)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM analysis_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list_jobs(self, statuses=ACTIVE_STATUSES) -> List[Dict[str, Any]]:
+        placeholders = ", ".join("?" for _ in statuses)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM analysis_jobs WHERE status IN ({placeholders}) ORDER BY priority, created_at",
+                tuple(statuses)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def recover_orphans(self):
+        """Fail jobs left running by a previous server process"""
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE analysis_jobs SET status = 'failed', error = 'Server restarted during analysis', "
+                "finished_at = ? WHERE status = 'running'",
+                (time.time(),)
+            )
+        if cur.rowcount:
+            logger.warning(f"⚠️ [任务队列] 已标记 {cur.rowcount} 个中断的任务为失败")
+
+    @staticmethod
+    def _to_dict(row) -> Dict[str, Any]:
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        return job
+
+
+def _store_result(job_id: str, results: Dict[str, Any]):
+    """Add a successful analysis to the searchable result store"""
+    from tradingagents.default_config import DEFAULT_CONFIG
+    from tradingagents.graph.result_store import create_result_store
+
+    if not DEFAULT_CONFIG.get('result_store_enabled', True):
+        return
+    if not results.get('success') or results.get('is_demo'):
+        return
+    try:
+        create_result_store(DEFAULT_CONFIG).save(results, analysis_id=job_id)
+    except Exception as e:
+        logger.warning(f"⚠️ [结果存储] 保存分析结果失败: {job_id} - {e}")
+
+
+def _run_job(job: Dict[str, Any], db_path: str):
+    """Worker process entry point: run one analysis and record its outcome"""
+    from .analysis_runner import run_stock_analysis
+    from .async_progress_tracker import AsyncProgressTracker
+
+    queue = AnalysisJobQueue(db_path)
+    job_id = job['job_id']
+    params = dict(job['params'])
+
+    tracker = AsyncProgressTracker(
+        analysis_id=job_id,
+        analysts=params['analysts'],
+        research_depth=params['research_depth'],
+        llm_provider=params['llm_provider']
+    )
+
+    def progress_callback(message: str, step: int = None, total_steps: int = None):
+        tracker.update_progress(message, step)
+
+    try:
+        # Data sources, HTTP requests and LLM calls size their timeouts from the job's remaining budget
+        with run_deadline(job.get('deadline_seconds')):
+            results = run_stock_analysis(
+                progress_callback=progress_callback,
+                token_callback=tracker.update_stream,
+                event_callback=tracker.handle_graph_event,
+                **params
+            )
+        job_state = queue.get(job_id)
+        if job_state and job_state['status'] != 'running':
+            # Thread mode: the pool already cancelled or timed out this job and abandoned its thread
+            logger.warning(f"⚠️ [任务队列] 任务已{job_state['status']}，忽略迟到的结果: {job_id}")
+            return
+        tracker.mark_completed("✅ Analysis completed successfully!", results=results)
+        _store_result(job_id, results)
+        queue.finish(job_id, 'completed')
+    except DeadlineExceeded as e:
+        tracker.mark_failed(str(e))
+        queue.finish(job_id, 'cancelled' if e.cancelled else 'failed', str(e))
+        raise
+    except Exception as e:
+        tracker.mark_failed(str(e))
+        queue.finish(job_id, 'failed', str(e))
+        raise
+
+
+WORKER_MODES = ('process', 'thread')
+
+
+class AnalysisWorkerPool:
+    """Bounded pool of workers draining an AnalysisJobQueue
+
+    A supervisor thread in the web server claims queued jobs while fewer than
+    ``max_workers`` are running and starts one worker per job. It terminates
+    workers whose job was cancelled or exceeded ``job_timeout`` seconds, and
+    marks jobs whose worker died without reporting as failed.
+
+    ``mode='process'`` (default) runs each job in its own spawned process, which
+    isolates crashes and hangs. ``mode='thread'`` runs jobs as threads of the
+    server process: analyses carry their configuration per run, so concurrent
+    in-process runs are safe and skip process start-up and re-imports, but a
+    cancelled or timed-out thread cannot be killed. It is abandoned (its late
+    result is ignored) and keeps its worker slot until it returns; its cancel
+    event is set so it stops at the next deadline check instead of running on.
+
+    Every job carries ``deadline_seconds`` (the job timeout) so the analysis
+    bounds each data source, HTTP and LLM call by the time it has left.
+    """
+
+    def __init__(self, queue: AnalysisJobQueue, max_workers: int = 2,
+                 job_timeout: float = 3600, poll_interval: float = 0.5, target=None,
+                 mode: str = 'process'):
+        if mode not in WORKER_MODES:
+            raise ValueError(f"Unknown worker mode: {mode}")
+        self.queue = queue
+        # Worker entry point target(job, db_path); must be importable by spawned processes
+        self.target = target or _run_job
+        self.max_workers = max_workers
+        self.job_timeout = job_timeout
+        self.poll_interval = poll_interval
+        self.mode = mode
+        # spawn: never fork the multithreaded server process
+        self._ctx = multiprocessing.get_context('spawn')
+        self._processes: Dict[str, Any] = {}
+        self._abandoned: List[threading.Thread] = []
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self._started_at: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self.queue.recover_orphans()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._supervise, name="analysis-worker-pool", daemon=True)
+        self._thread.start()
+        logger.info(f"👷 [任务队列] 工作池已启动: mode={self.mode}, max_workers={self.max_workers}")
+
+    def stop(self, terminate: bool = True):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if terminate:
+            for job_id in list(self._processes):
+                self._terminate(job_id, 'cancelled', 'Worker pool stopped')
+
+    def running_jobs(self) -> List[str]:
+        return list(self._processes)
+
+    def _supervise(self):
+        while not self._stop.is_set():
+            try:
+                self._tick()
+            except Exception as e:
+                logger.error(f"❌ [任务队列] 调度异常: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def _tick(self):
+        # Reap finished processes
+        for job_id, process in list(self._processes.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del self._processes[job_id]
+            self._started_at.pop(job_id, None)
+            job = self.queue.get(job_id)
+            if job and job['status'] == 'running':
+                # Worker died without reporting (crash, OOM kill, ...)
+                if self.mode == 'thread':
+                    reason = "Worker thread exited without reporting"
+                else:
+                    reason = f"Worker process exited with code {process.exitcode}"
+                self.queue.finish(job_id, 'failed', reason)
+                self._mark_progress_failed(job_id, reason)
+        self._abandoned = [worker for worker in self._abandoned if worker.is_alive()]
+
+        # Enforce cancellation and timeouts
+        now = time.time()
+        for job_id in list(self._processes):
+            job = self.queue.get(job_id)
+            if job and job['cancel_requested']:
+                self._terminate(job_id, 'cancelled', 'Cancelled by user')
+            elif now - self._started_at[job_id] > self.job_timeout:
+                self._terminate(job_id, 'failed', f"Timed out after {self.job_timeout:.0f}s")
+
+        # Start new jobs while there is capacity
+        while len(self._processes) + len(self._abandoned) < self.max_workers:
+            job = self.queue.claim_next()
+            if job is None:
+                break
+            job['deadline_seconds'] = self.job_timeout
+            if self.mode == 'thread':
+                cancel_event = threading.Event()
+                self._cancel_events[job['job_id']] = cancel_event
+                worker = threading.Thread(
+                    target=self._run_thread_job, args=(job, cancel_event),
+                    name=f"analysis-{job['job_id']}", daemon=True
+                )
+                pid = os.getpid()
+                self.queue.set_worker_pid(job['job_id'], pid)
+                worker.start()
+            else:
+                worker = self._ctx.Process(
+                    target=self.target, args=(job, self.queue.db_path),
+                    name=f"analysis-{job['job_id']}", daemon=True
+                )
+                worker.start()
+                pid = worker.pid
+                self.queue.set_worker_pid(job['job_id'], pid)
+            self._processes[job['job_id']] = worker
+            self._started_at[job['job_id']] = time.time()
+            logger.info(f"🚀 [任务队列] 任务开始: {job['job_id']} ({self.mode}, pid={pid})")
+
+    def _run_thread_job(self, job: Dict[str, Any], cancel_event: threading.Event):
+        """Thread-mode worker: run the target with the job's cancel event in its run context"""
+        try:
+            with run_deadline(cancel_event=cancel_event):
+                self.target(job, self.queue.db_path)
+        finally:
+            self._cancel_events.pop(job['job_id'], None)
+
+    def _terminate(self, job_id: str, status: str, reason: str):
+        process = self._processes.pop(job_id, None)
+        self._started_at.pop(job_id, None)
+        cancel_event = self._cancel_events.pop(job_id, None)
+        if cancel_event is not None:
+            cancel_event.set()
+        if isinstance(process, threading.Thread):
+            # Threads cannot be killed: signal cancellation, keep the slot until it returns
+            if process.is_alive():
+                self._abandoned.append(process)
+        elif process is not None and process.is_alive():
+            process.terminate()
+            process.join(timeout=5)
+            if process.is_alive():
+                process.kill()
+                process.join()
+        self.queue.finish(job_id, status, reason)
+        self._mark_progress_failed(job_id, reason)
+        logger.warning(f"🛑 [任务队列] 任务已终止: {job_id} ({reason})")
+
+    @staticmethod
+    def _mark_progress_failed(job_id: str, reason: str):
+        try:
+            from .async_progress_tracker import AsyncProgressTracker
+            tracker = AsyncProgressTracker.attach(job_id)
+            if tracker and tracker.progress_data.get('status') in ('queued', 'running'):
+                tracker.mark_failed(reason)
+        except Exception as e:
+            logger.warning(f"⚠️ [任务队列] 更新进度状态失败: {job_id} - {e}")
+
+
+def cancel_analysis(job_id: str) -> bool:
+    """Cancel a queued or running analysis job and mark its progress as cancelled"""
+    queue = get_job_queue()
+    job = queue.get(job_id)
+    if not queue.cancel(job_id):
+        return False
+    if job and job['status'] == 'queued':
+        # Running jobs are marked by the pool once their process is terminated
+        AnalysisWorkerPool._mark_progress_failed(job_id, 'Cancelled by user')
+    return True
+
+
+_queue: Optional[AnalysisJobQueue] = None
+_pool: Optional[AnalysisWorkerPool] = None
+_lock = threading.Lock()
+
+
+def get_job_queue() -> AnalysisJobQueue:
+    """Process-wide job queue configured from environment variables"""
+    global _queue
+    with _lock:
+        if _queue is None:
+            _queue = AnalysisJobQueue(
+                os.getenv('ANALYSIS_QUEUE_DB', './data/analysis_jobs.db'),
+                max_queued=int(os.getenv('ANALYSIS_MAX_QUEUED', 20)),
+                per_user_queued=int(os.getenv('ANALYSIS_PER_USER_QUEUED', 3)),
+                per_user_running=int(os.getenv('ANALYSIS_PER_USER_RUNNING', 1)),
+            )
+        return _queue
+
+
+def get_worker_pool() -> AnalysisWorkerPool:
+    """Process-wide worker pool, started on first use"""
+    global _pool
+    queue = get_job_queue()
+    with _lock:
+        if _pool is None:
+            _pool = AnalysisWorkerPool(
+                queue,
+                max_workers=int(os.getenv('ANALYSIS_MAX_WORKERS', 2)),
+                job_timeout=float(os.getenv('ANALYSIS_JOB_TIMEOUT', 3600)),
+                mode=os.getenv('ANALYSIS_WORKER_MODE', 'process').lower(),
+            )
+            prewarm = os.getenv('GRAPH_POOL_PREWARM', '').strip()
+            if _pool.mode == 'thread' and prewarm:
+                # Graphs are only reusable by in-process workers; build them off the request path
+                from .analysis_runner import prewarm_graphs
+                threading.Thread(target=prewarm_graphs, args=(prewarm,), name="graph-pool-prewarm", daemon=True).start()
+        _pool.start()
+        return _pool
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Progress change events
+
+Every progress write bumps a version and publishes an event, so watchers can
+block on "next change or timeout" instead of re-reading progress on a timer:
+
+- Redis: ``INCR progress_version:{id}`` plus ``PUBLISH progress_events:{id}``
+- File storage: the progress file's mtime is the version; an in-process
+  condition wakes watchers in the same process immediately and a cheap
+  ``os.stat`` every ``FILE_POLL_SLICE`` seconds picks up writes from worker
+  processes.
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('web')
+
+# Seconds between stat() checks of the progress file while waiting
+FILE_POLL_SLICE = 0.5
+# Version keys outlive the progress record itself (1 hour)
+VERSION_TTL = 3600
+
+_condition = threading.Condition()
+_local_versions = {}
+
+_redis_client = None
+_redis_checked_at = None
+_redis_lock = threading.Lock()
+# Seconds before retrying an unreachable Redis
+REDIS_RETRY_INTERVAL = 30
+
+
+def progress_file_path(analysis_id: str) -> str:
+    """Path of the JSON progress file used when Redis is disabled"""
+    return f"./data/progress_{analysis_id}.json"
+
+
+def _version_key(analysis_id: str) -> str:
+    return f"progress_version:{analysis_id}"
+
+
+def _channel(analysis_id: str) -> str:
+    return f"progress_events:{analysis_id}"
+
+
+def get_redis_client():
+    """Process-wide Redis client backed by one shared connection pool.
+
+    Returns None when Redis is disabled or unreachable; an unreachable Redis
+    is retried after ``REDIS_RETRY_INTERVAL`` seconds.
+    """
+    global _redis_client, _redis_checked_at
+    if _redis_client is not None:
+        return _redis_client
+    if _redis_checked_at is not None and time.monotonic() - _redis_checked_at < REDIS_RETRY_INTERVAL:
+        return None
+    with _redis_lock:
+        if _redis_client is not None:
+            return _redis_client
+        _redis_checked_at = time.monotonic()
+        if os.getenv('REDIS_ENABLED', 'false').lower() != 'true':
+            return None
+        try:
+            import redis
+            pool = redis.ConnectionPool(
+                host=os.getenv('REDIS_HOST', 'localhost'),
+                port=int(os.getenv('REDIS_PORT', 6379)),
+                password=os.getenv('REDIS_PASSWORD', None) or None,
+                db=int(os.getenv('REDIS_DB', 0)),
+                decode_responses=True,
+            )
+            client = redis.Redis(connection_pool=pool)
+            client.ping()
+            _redis_client = client
+            logger.info(f"📡 [进度事件] Redis连接池已创建: {os.getenv('REDIS_HOST', 'localhost')}:{os.getenv('REDIS_PORT', 6379)}")
+        except Exception as e:
+            logger.warning(f"📡 [进度事件] Redis连接失败，使用文件存储: {e}")
+        return _redis_client
+
+
+def publish_progress(analysis_id: str, redis_client=None):
+    """Announce that the progress of ``analysis_id`` changed"""
+    if redis_client is not None:
+        try:
+            pipe = redis_client.pipeline()
+            pipe.incr(_version_key(analysis_id))
+            pipe.expire(_version_key(analysis_id), VERSION_TTL)
+            pipe.publish(_channel(analysis_id), 1)
+            pipe.execute()
+        except Exception as e:
+            logger.debug(f"📡 [进度事件] Redis发布失败: {e}")
+
+    with _condition:
+        _local_versions[analysis_id] = _local_versions.get(analysis_id, 0) + 1
+        _condition.notify_all()
+
+
+def current_version(analysis_id: str, redis_client=None):
+    """Opaque version token of the latest progress write (None if nothing written yet)"""
+    if redis_client is not None:
+        try:
+            return ('redis', redis_client.get(_version_key(analysis_id)))
+        except Exception as e:
+            logger.debug(f"📡 [进度事件] Redis读取版本失败: {e}")
+    try:
+        mtime = os.stat(progress_file_path(analysis_id)).st_mtime_ns
+    except OSError:
+        mtime = None
+    with _condition:
+        local = _local_versions.get(analysis_id, 0)
+    return ('file', mtime, local)
+
+
+def wait_for_progress_update(analysis_id: str, since, timeout: float, redis_client=None):
+    """Block until the progress version differs from ``since`` or ``timeout`` passes.
+
+    Returns the new version token, or None on timeout. Passing ``since=None``
+    returns the current version immediately.
+    """
+    version = current_version(analysis_id, redis_client)
+    if since is None or version != since:
+        return version
+
+    deadline = time.monotonic() + timeout
+    if version[0] == 'redis':
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(_channel(analysis_id))
+            # 订阅后再检查一次，避免订阅前的发布被错过
+            version = current_version(analysis_id, redis_client)
+            while version == since:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                if pubsub.get_message(timeout=remaining) is not None:
+                    version = current_version(analysis_id, redis_client)
+            return version
+        except Exception as e:
+            logger.debug(f"📡 [进度事件] Redis订阅失败: {e}")
+            # 等到超时再返回，避免调用方立即重试形成忙循环
+            time.sleep(max(deadline - time.monotonic(), 0))
+            return None
+        finally:
+            try:
+                pubsub.close()
+            except Exception:
+                pass
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        with _condition:
+            if _local_versions.get(analysis_id, 0) == since[2]:
+                _condition.wait(min(remaining, FILE_POLL_SLICE))
+        version = current_version(analysis_id)
+        if version != since:
+            return version
@@ -12,6 +12,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional
 import tempfile
+import threading
 import base64
 
 # Import logging module
@@ -78,10 +79,17 @@ except ImportError as e:
 class ReportExporter:
     """Report exporter"""
 
+    # Bump when the report layout changes so cached artifacts are re-rendered
+    TEMPLATE_VERSION = "1"
+    _UNPROBED = object()
+
     def __init__(self):
         self.export_available = EXPORT_AVAILABLE
         self.pandoc_available = PANDOC_AVAILABLE
         self.is_docker = DOCKER_ADAPTER_AVAILABLE and is_docker_environment()
+        self._pdf_engine = self._UNPROBED
+        self._pdf_error = None
+        self._probe_lock = threading.Lock()
 
         # Record initialization status
         logger.info(f"📋 ReportExporter initialization:")
@@ -253,178 +261,125 @@ class ReportExporter:
         
         return md_content
     
-    def generate_docx_report(self, results: Dict[str, Any]) -> bytes:
-        """Generate Word document format report"""
+    # Candidate PDF engines, in order of preference (None lets pandoc choose)
+    PDF_ENGINES = [
+        ('wkhtmltopdf', 'HTML to PDF engine, recommended installation'),
+        ('weasyprint', 'Modern HTML to PDF engine'),
+        (None, 'Use pandoc default engine, let pandoc choose'),
+    ]
 
-        logger.info("📄 Starting Word document generation...")
+    PDF_INSTALL_HINT = """Possible solutions:
+1. Install wkhtmltopdf (recommended):
+   Windows: choco install wkhtmltopdf
+   macOS: brew install wkhtmltopdf
+   Linux: sudo apt-get install wkhtmltopdf
 
-        if not self.pandoc_available:
-            logger.error("❌ Pandoc is not available")
-            raise Exception("Pandoc is not available, cannot generate Word document. Please install pandoc or use Markdown format for export.")
+2. Install LaTeX:
+   Windows: choco install miktex
+   macOS: brew install mactex
+   Linux: sudo apt-get install texlive-full
 
-        # First generate markdown content
-        logger.info("📝 Generating Markdown content...")
+3. Use Markdown or Word format for export as an alternative
+"""
+
+    def _pandoc_convert(self, md_content: str, to_format: str, output_file: str, extra_args=None):
+        """Convert markdown with pandoc straight into ``output_file`` (YAML parsing disabled)"""
+        args = ['--from=markdown-yaml_metadata_block'] + list(extra_args or [])
+        pypandoc.convert_text(
+            self._clean_markdown_for_pandoc(md_content),
+            to_format,
+            format='markdown',  # Base markdown format
+            outputfile=output_file,
+            extra_args=args
+        )
+        if not os.path.exists(output_file) or os.path.getsize(output_file) == 0:
+            raise Exception(f"{to_format} file generation failed or is empty")
+
+    @property
+    def pdf_engine_probed(self) -> bool:
+        return self._pdf_engine is not self._UNPROBED
+
+    @property
+    def pdf_error(self) -> Optional[str]:
+        return self._pdf_error
+
+    def probe_pdf_engine(self) -> Optional[str]:
+        """Find the first working PDF engine; probed once per process and cached.
+
+        Returns the engine name, '' for pandoc's default engine, or None when
+        no engine works.
+        """
+        with self._probe_lock:
+            if self._pdf_engine is not self._UNPROBED:
+                return self._pdf_engine
+
+            self._pdf_engine = None
+            if self.pandoc_available:
+                with tempfile.TemporaryDirectory() as probe_dir:
+                    output_file = os.path.join(probe_dir, 'probe.pdf')
+                    for engine, description in self.PDF_ENGINES:
+                        try:
+                            extra_args = [f'--pdf-engine={engine}'] if engine else []
+                            self._pandoc_convert("# PDF engine probe\n\nok", 'pdf', output_file, extra_args)
+                            self._pdf_engine = engine or ''
+                            logger.info(f"✅ PDF engine probe: using {engine or 'Default'} ({description})")
+                            break
+                        except Exception as e:
+                            self._pdf_error = str(e)
+                            logger.info(f"🔧 PDF engine probe: {engine or 'Default'} unavailable: {e}")
+            if self._pdf_engine is None:
+                logger.warning("⚠️ PDF engine probe: no working PDF engine found")
+            return self._pdf_engine
+
+    def render_to_file(self, results: Dict[str, Any], format_type: str, output_file: str):
+        """Render a report in ``format_type`` (markdown/docx/pdf) directly to ``output_file``"""
         md_content = self.generate_markdown_report(results)
-        logger.info(f"✅ Markdown content generated, length: {len(md_content)} characters")
 
-        try:
-            logger.info("📁 Creating temporary file for docx output...")
-            # Create a temporary file for docx output
-            with tempfile.NamedTemporaryFile(suffix='.docx', delete=False) as tmp_file:
-                output_file = tmp_file.name
-            logger.info(f"📁 Temporary file path: {output_file}")
+        if format_type == 'markdown':
+            with open(output_file, 'w', encoding='utf-8') as f:
+                f.write(md_content)
+            return
 
-            # Use parameters to force disable YAML
-            extra_args = ['--from=markdown-yaml_metadata_block']  # Disable YAML parsing
-            logger.info(f"🔧 pypandoc parameters: {extra_args} (Disable YAML parsing)")
+        if not self.pandoc_available:
+            logger.error("❌ Pandoc is not available")
+            raise Exception(f"Pandoc is not available, cannot generate {format_type} document. Please install pandoc or use Markdown format for export.")
 
+        if format_type == 'docx':
             logger.info("🔄 Using pypandoc to convert markdown to docx...")
-
-            # Debug: save actual Markdown content
-            debug_file = '/app/debug_markdown.md'
             try:
-                with open(debug_file, 'w', encoding='utf-8') as f:
-                    f.write(md_content)
-                logger.info(f"🔍 Actual Markdown content saved to: {debug_file}")
-                logger.info(f"📊 Content length: {len(md_content)} characters")
-
-                # Display first few lines of content
-                lines = md_content.split('\n')[:5]
-                logger.info("🔍 First 5 lines of content:")
-                for i, line in enumerate(lines, 1):
-                    logger.info(f"  {i}: {repr(line)}")
+                self._pandoc_convert(md_content, 'docx', output_file)
             except Exception as e:
-                logger.error(f"Failed to save debug file: {e}")
-
-            # Clean content to avoid YAML parsing issues
-            cleaned_content = self._clean_markdown_for_pandoc(md_content)
-            logger.info(f"🧹 Content cleaned, length after cleaning: {len(cleaned_content)} characters")
-
-            # Use tested parameters for conversion
-            pypandoc.convert_text(
-                cleaned_content,
-                'docx',
-                format='markdown',  # Base markdown format
-                outputfile=output_file,
-                extra_args=extra_args
-            )
-            logger.info("✅ pypandoc conversion completed")
-
-            logger.info("📖 Reading generated docx file...")
-            # Read the generated docx file
-            with open(output_file, 'rb') as f:
-                docx_content = f.read()
-            logger.info(f"✅ File read completed, size: {len(docx_content)} bytes")
-
-            logger.info("🗑️ Cleaning up temporary file...")
-            # Clean up temporary file
-            os.unlink(output_file)
-            logger.info("✅ Temporary file cleaned")
-
-            return docx_content
-        except Exception as e:
-            logger.error(f"❌ Word document generation failed: {e}", exc_info=True)
-            raise Exception(f"Failed to generate Word document: {e}")
-    
-    
-    def generate_pdf_report(self, results: Dict[str, Any]) -> bytes:
-        """Generate PDF format report"""
-
-        logger.info("📊 Starting PDF document generation...")
-
-        if not self.pandoc_available:
-            logger.error("❌ Pandoc is not available")
-            raise Exception("Pandoc is not available, cannot generate PDF document. Please install pandoc or use Markdown format for export.")
-
-        # First generate markdown content
-        logger.info("📝 Generating Markdown content...")
-        md_content = self.generate_markdown_report(results)
-        logger.info(f"✅ Markdown content generated, length: {len(md_content)} characters")
-
-        # Simplified PDF engine list, prioritize the most likely successful one
-        pdf_engines = [
-            ('wkhtmltopdf', 'HTML to PDF engine, recommended installation'),
-            ('weasyprint', 'Modern HTML to PDF engine'),
-            (None, 'Use pandoc default engine, let pandoc choose')  # Do not specify engine, let pandoc choose
-        ]
-
-        last_error = None
-
-        for engine_info in pdf_engines:
-            engine, description = engine_info
+                logger.error(f"❌ Word document generation failed: {e}", exc_info=True)
+                raise Exception(f"Failed to generate Word document: {e}")
+        elif format_type == 'pdf':
+            engine = self.probe_pdf_engine()
+            if engine is None:
+                raise Exception(f"PDF generation failed, last error: {self._pdf_error}\n\n{self.PDF_INSTALL_HINT}")
+            logger.info(f"🔧 Using PDF engine: {engine or 'Default'}")
             try:
-                # Create a temporary file for PDF output
-                with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
-                    output_file = tmp_file.name
-
-                # Use parameters to disable YAML parsing (consistent with Word export)
-                extra_args = ['--from=markdown-yaml_metadata_block']
-
-                # If an engine is specified, add engine parameters
-                if engine:
-                    extra_args.append(f'--pdf-engine={engine}')
-                    logger.info(f"🔧 Using PDF engine: {engine}")
-                else:
-                    logger.info(f"🔧 Using default PDF engine")
-
-                logger.info(f"🔧 PDF parameters: {extra_args}")
-
-                # Clean content to avoid YAML parsing issues (consistent with Word export)
-                cleaned_content = self._clean_markdown_for_pandoc(md_content)
-
-                # Use pypandoc to convert markdown to PDF - disable YAML parsing
-                pypandoc.convert_text(
-                    cleaned_content,
-                    'pdf',
-                    format='markdown',  # Base markdown format
-                    outputfile=output_file,
-                    extra_args=extra_args
-                )
-
-                # Check if the file was generated and has content
-                if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
-                    # Read the generated PDF file
-                    with open(output_file, 'rb') as f:
-                        pdf_content = f.read()
-
-                    # Clean up temporary file
-                    os.unlink(output_file)
-
-                    logger.info(f"✅ PDF generation successful, using engine: {engine or 'Default'}")
-                    return pdf_content
-                else:
-                    raise Exception("PDF file generation failed or is empty")
-
+                self._pandoc_convert(md_content, 'pdf', output_file, [f'--pdf-engine={engine}'] if engine else [])
             except Exception as e:
-                last_error = str(e)
                 logger.error(f"PDF engine {engine or 'Default'} failed: {e}")
+                raise Exception(f"PDF generation failed, last error: {e}\n\n{self.PDF_INSTALL_HINT}")
+        else:
+            raise ValueError(f"Unsupported export format: {format_type}")
 
-                # Clean up potentially existing temporary file
-                try:
-                    if 'output_file' in locals() and os.path.exists(output_file):
-                        os.unlink(output_file)
-                except:
-                    pass
-
-                continue
-
-        # If all engines fail, provide detailed error information and solutions
-        error_msg = f"""PDF generation failed, last error: {last_error}
-
-Possible solutions:
-1. Install wkhtmltopdf (recommended):
-   Windows: choco install wkhtmltopdf
-   macOS: brew install wkhtmltopdf
-   Linux: sudo apt-get install wkhtmltopdf
+    def _render_bytes(self, results: Dict[str, Any], format_type: str, suffix: str) -> bytes:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = os.path.join(temp_dir, f"report{suffix}")
+            self.render_to_file(results, format_type, output_file)
+            with open(output_file, 'rb') as f:
+                return f.read()
 
-2. Install LaTeX:
-   Windows: choco install miktex
-   macOS: brew install mactex
-   Linux: sudo apt-get install texlive-full
+    def generate_docx_report(self, results: Dict[str, Any]) -> bytes:
+        """Generate Word document format report"""
+        logger.info("📄 Starting Word document generation...")
+        return self._render_bytes(results, 'docx', '.docx')
 
-3. Use Markdown or Word format for export as an alternative
-"""
-        raise Exception(error_msg)
+    def generate_pdf_report(self, results: Dict[str, Any]) -> bytes:
+        """Generate PDF format report"""
+        logger.info("📊 Starting PDF document generation...")
+        return self._render_bytes(results, 'pdf', '.pdf')
     
     def export_report(self, results: Dict[str, Any], format_type: str) -> Optional[bytes]:
         """Export report in specified format"""
@@ -483,6 +438,13 @@ Possible solutions:
 # Create global exporter instance
 report_exporter = ReportExporter()
 
+# Start the export worker pool (and its one-time PDF engine probe) with the app
+try:
+    from .export_service import get_export_service
+    get_export_service()
+except Exception as e:
+    logger.warning(f"⚠️ Export service failed to start: {e}")
+
 
 def render_export_buttons(results: Dict[str, Any]):
     """Render export buttons"""
@@ -507,11 +469,13 @@ def render_export_buttons(results: Dict[str, Any]):
     # Display Docker environment status
     if report_exporter.is_docker:
         if DOCKER_ADAPTER_AVAILABLE:
-            docker_status = get_docker_status_info()
-            if docker_status['dependencies_ok'] and docker_status['pdf_test_ok']:
+            # Use the startup PDF engine probe instead of test-rendering a PDF on every page render
+            if not report_exporter.pdf_engine_probed:
+                st.info("🐳 Checking Docker environment PDF support...")
+            elif report_exporter.probe_pdf_engine() is not None:
                 st.success("🐳 Docker environment PDF support enabled")
             else:
-                st.warning(f"🐳 Docker environment PDF support abnormal: {docker_status['dependency_message']}")
+                st.warning(f"🐳 Docker environment PDF support abnormal: {report_exporter.pdf_error}")
         else:
             st.warning("🐳 Docker environment detected, but adapter is not available")
 
@@ -537,148 +501,127 @@ def render_export_buttons(results: Dict[str, Any]):
         # In Docker environment, even if pandoc has issues, show all buttons for users to try
         pass
     
-    # Generate filename
+    _render_export_panel(results)
+
+
+# Export formats shown in the panel: (format, button label, help, display name)
+EXPORT_BUTTONS = [
+    ('markdown', "📄 Export Markdown", "Export as Markdown format", "Markdown"),
+    ('docx', "📝 Export Word", "Export as Word document format", "Word"),
+    ('pdf', "📊 Export PDF", "Export as PDF format (requires additional tools)", "PDF"),
+]
+
+# Longest the export panel blocks waiting for a running export before re-rendering itself
+EXPORT_WAIT_SLICE = 1.0
+
+
+@st.fragment
+def _render_export_panel(results: Dict[str, Any]):
+    """Export buttons and download handles; reruns only this fragment while exports render"""
+    from concurrent.futures import FIRST_COMPLETED, wait
+    from streamlit.errors import StreamlitAPIException
+    from .export_service import artifact_key, get_export_service
+
+    service = get_export_service()
     stock_symbol = results.get('stock_symbol', 'analysis')
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        if st.button("📄 Export Markdown", help="Export as Markdown format"):
-            logger.info(f"🖱️ [EXPORT] User clicked Markdown export button - Stock: {stock_symbol}")
-            logger.info(f"🖱️ User clicked Markdown export button - Stock: {stock_symbol}")
-            content = report_exporter.export_report(results, 'markdown')
-            if content:
-                filename = f"{stock_symbol}_analysis_{timestamp}.md"
-                logger.info(f"✅ [EXPORT] Markdown export successful, filename: {filename}")
-                logger.info(f"✅ Markdown export successful, filename: {filename}")
+
+    # Export handles belong to this report only
+    report_id = artifact_key(results, '', '')[:16]
+    handles = st.session_state.setdefault(f"export_handles_{report_id}", {})
+
+    columns = st.columns(len(EXPORT_BUTTONS))
+    for column, (format_type, label, help_text, display_name) in zip(columns, EXPORT_BUTTONS):
+        with column:
+            if st.button(label, help=help_text, key=f"export_{format_type}_{report_id}"):
+                logger.info(f"🖱️ [EXPORT] User clicked {display_name} export button - Stock: {stock_symbol}")
+                handles[format_type] = service.submit(results, format_type)
+
+            handle = handles.get(format_type)
+            if handle is None:
+                continue
+            if handle.ready:
                 st.download_button(
-                    label="📥 Download Markdown",
-                    data=content,
-                    file_name=filename,
-                    mime="text/markdown"
+                    label=f"📥 Download {display_name}",
+                    data=handle.read(),
+                    file_name=f"{stock_symbol}_analysis_{timestamp}{handle.path.suffix}",
+                    mime=handle.mime,
+                    key=f"download_{format_type}_{report_id}"
                 )
+            elif handle.failed:
+                logger.error(f"❌ [EXPORT] {display_name} export failed: {handle.error}")
+                st.error(f"❌ {display_name} generation failed")
+                with st.expander("🔍 View detailed error information"):
+                    st.text(handle.error)
+                _render_export_solutions(format_type)
             else:
-                logger.error(f"❌ [EXPORT] Markdown export failed, content is empty")
-                logger.error("❌ Markdown export failed, content is empty")
-    
-    with col2:
-        if st.button("📝 Export Word", help="Export as Word document format"):
-            logger.info(f"🖱️ [EXPORT] User clicked Word export button - Stock: {stock_symbol}")
-            logger.info(f"🖱️ User clicked Word export button - Stock: {stock_symbol}")
-            with st.spinner("Generating Word document, please wait..."):
-                try:
-                    logger.info(f"🔄 [EXPORT] Starting Word export process...")
-                    logger.info("🔄 Starting Word export process...")
-                    content = report_exporter.export_report(results, 'docx')
-                    if content:
-                        filename = f"{stock_symbol}_analysis_{timestamp}.docx"
-                        logger.info(f"✅ [EXPORT] Word export successful, filename: {filename}, size: {len(content)} bytes")
-                        logger.info(f"✅ Word export successful, filename: {filename}, size: {len(content)} bytes")
-                        st.success("✅ Word document generated successfully!")
-                        st.download_button(
-                            label="📥 Download Word",
-                            data=content,
-                            file_name=filename,
-                            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                        )
-                    else:
-                        logger.error(f"❌ [EXPORT] Word export failed, content is empty")
-                        logger.error("❌ Word export failed, content is empty")
-                        st.error("❌ Word document generation failed")
-                except Exception as e:
-                    logger.error(f"❌ [EXPORT] Word export exception: {str(e)}")
-                    logger.error(f"❌ Word export exception: {str(e)}", exc_info=True)
-                    st.error(f"❌ Word document generation failed: {str(e)}")
-
-                    # Display detailed error information
-                    with st.expander("🔍 View detailed error information"):
-                        st.text(str(e))
-
-                    # Provide solutions
-                    with st.expander("💡 Solutions"):
-                        st.markdown("""
-                        **Word export requires pandoc tool, please check:**
-
-                        1. **Docker environment**: Rebuild the image to ensure pandoc is included
-                        2. **Local environment**: Install pandoc
-                        ```bash
-                        # Windows
-                        choco install pandoc
-
-                        # macOS
-                        brew install pandoc
-
-                        # Linux
-                        sudo apt-get install pandoc
-                        ```
-
-                        3. **Alternative**: Use Markdown format for export
-                        """)
-    
-    with col3:
-        if st.button("📊 Export PDF", help="Export as PDF format (requires additional tools)"):
-            logger.info(f"🖱️ User clicked PDF export button - Stock: {stock_symbol}")
-            with st.spinner("Generating PDF, please wait..."):
-                try:
-                    logger.info("🔄 Starting PDF export process...")
-                    content = report_exporter.export_report(results, 'pdf')
-                    if content:
-                        filename = f"{stock_symbol}_analysis_{timestamp}.pdf"
-                        logger.info(f"✅ PDF export successful, filename: {filename}, size: {len(content)} bytes")
-                        st.success("✅ PDF generated successfully!")
-                        st.download_button(
-                            label="📥 Download PDF",
-                            data=content,
-                            file_name=filename,
-                            mime="application/pdf"
-                        )
-                    else:
-                        logger.error("❌ PDF export failed, content is empty")
-                        st.error("❌ PDF generation failed")
-                except Exception as e:
-                    logger.error(f"❌ PDF export exception: {str(e)}", exc_info=True)
-                    st.error(f"❌ PDF generation failed")
-
-                    # Display detailed error information
-                    with st.expander("🔍 View detailed error information"):
-                        st.text(str(e))
-
-                    # Provide solutions
-                    with st.expander("💡 Solutions"):
-                        st.markdown("""
-                        **PDF export requires additional tools, please choose one of the following options:**
-
-                        **Option 1: Install wkhtmltopdf (recommended)**
-                        ```bash
-                        # Windows
-                        choco install wkhtmltopdf
-
-                        # macOS
-                        brew install wkhtmltopdf
-
-                        # Linux
-                        sudo apt-get install wkhtmltopdf
-                        ```
-
-                        **Option 2: Install LaTeX**
-                        ```bash
-                        # Windows
-                        choco install miktex
-
-                        # macOS
-                        brew install mactex
-
-                        # Linux
-                        sudo apt-get install texlive-full
-                        ```
-
-                        **Option 3: Use alternative formats**
-                        - 📄 Markdown format - lightweight, high compatibility
-                        - 📝 Word format - suitable for further editing
-                        """)
-
-                    # Suggest using other formats
-                    st.info("💡 Suggestion: You can first export to Markdown or Word format, then use other tools to convert to PDF")
-    
- 
\ No newline at end of file
+                st.info(f"⏳ Generating {display_name}, the download will appear here when ready...")
+
+    pending = [handle.future for handle in handles.values() if not handle.future.done()]
+    if pending:
+        wait(pending, timeout=EXPORT_WAIT_SLICE, return_when=FIRST_COMPLETED)
+        try:
+            st.rerun(scope="fragment")
+        except StreamlitAPIException:
+            # 整页运行中（非片段重跑）只能整页重跑
+            st.rerun()
+
+
+def _render_export_solutions(format_type: str):
+    """Installation hints for a failed Word/PDF export"""
+    if format_type == 'docx':
+        with st.expander("💡 Solutions"):
+            st.markdown("""
+            **Word export requires pandoc tool, please check:**
+
+            1. **Docker environment**: Rebuild the image to ensure pandoc is included
+            2. **Local environment**: Install pandoc
+            ```bash
+            # Windows
+            choco install pandoc
+
+            # macOS
+            brew install pandoc
+
+            # Linux
+            sudo apt-get install pandoc
+            ```
+
+            3. **Alternative**: Use Markdown format for export
+            """)
+    elif format_type == 'pdf':
+        with st.expander("💡 Solutions"):
+            st.markdown("""
+            **PDF export requires additional tools, please choose one of the following options:**
+
+            **Option 1: Install wkhtmltopdf (recommended)**
+            ```bash
+            # Windows
+            choco install wkhtmltopdf
+
+            # macOS
+            brew install wkhtmltopdf
+
+            # Linux
+            sudo apt-get install wkhtmltopdf
+            ```
+
+            **Option 2: Install LaTeX**
+            ```bash
+            # Windows
+            choco install miktex
+
+            # macOS
+            brew install mactex
+
+            # Linux
+            sudo apt-get install texlive-full
+            ```
+
+            **Option 3: Use alternative formats**
+            - 📄 Markdown format - lightweight, high compatibility
+            - 📝 Word format - suitable for further editing
+            """)
+
+        # Suggest using other formats
+        st.info("💡 Suggestion: You can first export to Markdown or Word format, then use other tools to convert to PDF")
@@ -128,7 +128,21 @@ def check_analysis_status(analysis_id: str) -> str:
     """
     Check analysis status
     Returns: 'running', 'completed', 'failed', 'not_found'
+    Queued jobs are reported as 'running'.
     """
+    # Analyses submitted through the job queue
+    try:
+        from .job_queue import get_job_queue
+        job = get_job_queue().get(analysis_id)
+        if job:
+            return {
+                'queued': 'running',
+                'running': 'running',
+                'completed': 'completed',
+            }.get(job['status'], 'failed')
+    except Exception as e:
+        logger.warning(f"📊 [Status Check] Failed to check job queue: {e}")
+
     # First check if thread is alive
     if is_analysis_thread_alive(analysis_id):
         return 'running'
@@ -136,7 +150,7 @@ def check_analysis_status(analysis_id: str) -> str:
     # Thread does not exist, check progress data to determine final status
     try:
         from .async_progress_tracker import get_progress_by_id
-        progress_data = get_progress_by_id(analysis_id)
+        progress_data = get_progress_by_id(analysis_id, include_results=False)
         
         if progress_data:
             status = progress_data.get('status', 'unknown')
@@ -138,4 +138,22 @@ def apply_common_styles():
             margin: 1rem 0;
         }
     </style>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+    """, unsafe_allow_html=True)
+# Maximum points sent to the browser per chart series
+MAX_CHART_POINTS = 500
+
+def downsample_frame(df, y_column, max_points=MAX_CHART_POINTS):
+    """
+    Reduce a long ordered series to at most ``max_points`` rows for charting
+    The rows are split into equal buckets and each bucket keeps its minimum and
+    maximum ``y_column`` rows, so peaks and troughs survive downsampling
+    """
+    if len(df) <= max_points:
+        return df
+
+    buckets = max((max_points - 2) // 2, 1)
+    positions = df.reset_index(drop=True)
+    bucket_ids = positions.index * buckets // len(positions)
+    grouped = positions[y_column].groupby(bucket_ids)
+    keep = set(grouped.idxmin()) | set(grouped.idxmax()) | {0, len(positions) - 1}
+    return df.iloc[sorted(keep)]